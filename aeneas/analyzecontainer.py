@@ -350,7 +350,7 @@ class AnalyzeContainer(Loggable):
         self.log(u"Converting config string to config dict")
         parameters = gf.config_string_to_dict(config_string)
         self.log(u"Creating task")
-        task = Task(config_string, logger=self.logger)
+        task = Task(config_string, rconf=self.rconf, logger=self.logger)
         task.configuration["description"] = "Task %s" % task_info[0]
         self.log([u"Task description: %s", task.configuration["description"]])
         try:
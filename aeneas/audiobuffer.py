@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.audiobuffer.AudioBufferRegistry`,
+  a process-wide registry of decoded audio buffers.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import threading
+
+from aeneas.logger import Loggable
+
+
+class _AudioBufferEntry(object):
+    """
+    An entry of the registry:
+    the decoded value, the number of references to it,
+    and an event set when the value is available.
+    """
+
+    def __init__(self):
+        self.value = None
+        self.references = 0
+        self.failed = False
+        self.ready = threading.Event()
+
+
+class AudioBufferRegistry(Loggable):
+    """
+    A process-wide, reference-counted registry of decoded audio buffers,
+    so that the same audio file is decoded at most once,
+    as long as at least one reference to its buffer is held.
+
+    References are held explicitly, by the objects
+    which know that several consumers will read the same audio file
+    (e.g., :class:`~aeneas.executejob.ExecuteJob`
+    for the tasks sharing an audio file),
+    and by the readers decoding an audio file,
+    while they use its samples
+    (e.g., :class:`~aeneas.executetask.ExecuteTask`
+    until the end of the execution of the task,
+    :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
+    while computing the MFCCs,
+    and the ``plot_waveform`` tool while plotting the waveform),
+    see :func:`~aeneas.audiofile.AudioFile.read_samples_from_file`:
+    any other reader can look the buffer up with
+    :func:`~aeneas.audiobuffer.AudioBufferRegistry.get`,
+    without holding a reference to it.
+
+    A buffer is identified by a key, built by
+    :func:`~aeneas.audiobuffer.AudioBufferRegistry.key`
+    from the identity of the audio file
+    (absolute path, size, modification time, and inode)
+    and from the parameters of the decoding.
+
+    Each call to
+    :func:`~aeneas.audiobuffer.AudioBufferRegistry.acquire`
+    must be paired with a call to
+    :func:`~aeneas.audiobuffer.AudioBufferRegistry.release`:
+    when the last reference to a buffer is released,
+    the buffer is removed from the registry,
+    and its memory can be freed.
+
+    The registry is shared by all the instances of this class,
+    and it can be used from multiple threads.
+    Concurrent requests for the same key
+    wait for the first one to decode the audio file.
+
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    _ENTRIES = {}
+    """ The registry entries, keyed by buffer key """
+
+    _LOCK = threading.Lock()
+
+    TAG = u"AudioBufferRegistry"
+
+    @classmethod
+    def key(cls, file_path, *parameters):
+        """
+        Return the key identifying the buffer
+        obtained by decoding the given audio file
+        with the given parameters.
+
+        :param string file_path: the path of the audio file
+        :param list parameters: the (hashable) decoding parameters
+        :rtype: tuple
+        :raises: OSError: if the file cannot be accessed
+        """
+        stat = os.stat(file_path)
+        mtime = getattr(stat, "st_mtime_ns", stat.st_mtime)
+        return (os.path.abspath(file_path), stat.st_size, mtime, stat.st_ino) + tuple(parameters)
+
+    @classmethod
+    def references(cls, key):
+        """
+        Return the number of references to the buffer
+        with the given key, or ``0`` if the buffer is not in the registry.
+
+        :param tuple key: the buffer key
+        :rtype: int
+        """
+        with cls._LOCK:
+            entry = cls._ENTRIES.get(key, None)
+            return 0 if entry is None else entry.references
+
+    @classmethod
+    def clear(cls):
+        """
+        Remove all the buffers from the registry,
+        regardless of the references held to them.
+        """
+        with cls._LOCK:
+            cls._ENTRIES.clear()
+
+    def get(self, key):
+        """
+        Return the buffer with the given key,
+        or ``None`` if the buffer is not in the registry.
+
+        This function does not change the number of references
+        to the buffer, hence the caller must not release it.
+
+        :param tuple key: the buffer key
+        :rtype: object
+        """
+        with self._LOCK:
+            entry = self._ENTRIES.get(key, None)
+        if entry is None:
+            return None
+        entry.ready.wait()
+        if entry.failed:
+            return None
+        self.log([u"Buffer %s in the registry", key[0]])
+        return entry.value
+
+    def acquire(self, key, load_function):
+        """
+        Return the buffer with the given key,
+        calling ``load_function()`` to decode it
+        if it is not in the registry yet,
+        and increase the number of its references.
+
+        If ``load_function()`` raises an exception,
+        the exception is propagated,
+        and no reference is held.
+
+        :param tuple key: the buffer key
+        :param function load_function: a function with no arguments returning the buffer, not ``None``
+        :rtype: object
+        """
+        with self._LOCK:
+            entry = self._ENTRIES.get(key, None)
+            owner = entry is None
+            if owner:
+                entry = _AudioBufferEntry()
+                self._ENTRIES[key] = entry
+            entry.references += 1
+        if owner:
+            self.log([u"Buffer %s not in the registry: decoding", key[0]])
+            try:
+                entry.value = load_function()
+            finally:
+                if entry.value is None:
+                    with self._LOCK:
+                        entry.failed = True
+                        if self._ENTRIES.get(key, None) is entry:
+                            del self._ENTRIES[key]
+                entry.ready.set()
+        else:
+            self.log([u"Buffer %s in the registry: waiting for it", key[0]])
+            entry.ready.wait()
+            if entry.failed:
+                # the owner failed: try decoding again
+                return self.acquire(key, load_function)
+        return entry.value
+
+    def release(self, key):
+        """
+        Release one reference to the buffer with the given key.
+        Return ``True`` if the buffer has been removed from the registry
+        (i.e., this was the last reference), ``False`` otherwise.
+
+        :param tuple key: the buffer key
+        :rtype: bool
+        """
+        with self._LOCK:
+            entry = self._ENTRIES.get(key, None)
+            if entry is None:
+                return False
+            entry.references -= 1
+            if entry.references > 0:
+                return False
+            del self._ENTRIES[key]
+        self.log([u"Buffer %s has no references: removed", key[0]])
+        return True
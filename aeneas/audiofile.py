@@ -36,7 +36,10 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 import numpy
+import struct
 
+from aeneas.audiobuffer import AudioBufferRegistry
+from aeneas.audioprobe import AudioProbe
 from aeneas.exacttiming import TimeValue
 from aeneas.ffmpegwrapper import FFMPEGPathError
 from aeneas.ffmpegwrapper import FFMPEGWrapper
@@ -45,6 +48,7 @@ from aeneas.ffprobewrapper import FFPROBEPathError
 from aeneas.ffprobewrapper import FFPROBEUnsupportedFormatError
 from aeneas.ffprobewrapper import FFPROBEWrapper
 from aeneas.logger import Loggable
+from aeneas.resampler import Resampler
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.wavfile import read as scipywavread
 from aeneas.wavfile import write as scipywavwrite
@@ -93,7 +97,9 @@ class AudioFile(Loggable):
     The properties of the audio file (length, format, etc.)
     can set by invoking the :func:`~aeneas.audiofile.AudioFile.read_properties` function,
     which calls an audio file probe.
-    (Currently, the probe is :class:`~aeneas.ffprobewrapper.FFPROBEWrapper`)
+    (Currently, the probe is :class:`~aeneas.audioprobe.AudioProbe`,
+    which parses the header of common formats natively
+    and falls back to :class:`~aeneas.ffprobewrapper.FFPROBEWrapper`)
 
     Moreover, this class can read the audio data,
     by converting the original file format
@@ -103,6 +109,12 @@ class AudioFile(Loggable):
 
     The internal representation of the wave is a
     a NumPy 1D array of ``float64`` values in ``[-1.0, 1.0]``.
+    If :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.AUDIO_SAMPLES_INT16`
+    is ``True``, the wave is stored instead as
+    a NumPy 1D array of ``int16`` values (PCM16),
+    which are converted to ``float64`` values
+    only when they are accessed,
+    see :func:`~aeneas.audiofile.AudioFile.audio_samples_block`.
     It supports append, reverse, and trim operations.
     Audio samples can be written to file.
     Memory can be pre-allocated to speed append operations up.
@@ -204,9 +216,14 @@ class AudioFile(Loggable):
         self.audio_format = None
         self.audio_sample_rate = None
         self.audio_channels = None
+        self.source_properties = None
+        self.__samples_int16 = self.rconf[RuntimeConfiguration.AUDIO_SAMPLES_INT16]
         self.__samples_capacity = 0
         self.__samples_length = 0
         self.__samples = None
+        self.__samples_shared = False
+        self.__samples_key = None
+        self.__held_key = None
 
     def __unicode__(self):
         fmt = self.file_format
@@ -220,6 +237,7 @@ class AudioFile(Loggable):
             u"Audio format:      %s" % self.audio_format,
             u"Audio sample rate: %s" % gf.safe_int(self.audio_sample_rate),
             u"Audio channels:    %s" % gf.safe_int(self.audio_channels),
+            u"Samples int16:     %s" % self.__samples_int16,
             u"Samples capacity:  %s" % gf.safe_int(self.__samples_capacity),
             u"Samples length:    %s" % gf.safe_int(self.__samples_length),
         ]
@@ -306,6 +324,39 @@ class AudioFile(Loggable):
     def audio_channels(self, audio_channels):
         self.__audio_channels = audio_channels
 
+    @property
+    def source_properties(self):
+        """
+        The properties of the input audio stream,
+        parsed from the ``ffmpeg`` banner
+        when the samples were decoded through a pipe,
+        with the same keys returned by
+        :func:`~aeneas.ffprobewrapper.FFPROBEWrapper.read_properties`,
+        or ``None`` if the samples were not decoded that way.
+
+        :rtype: dict
+
+        .. versionadded:: 1.8.0
+        """
+        return self.__source_properties
+
+    @source_properties.setter
+    def source_properties(self, source_properties):
+        self.__source_properties = source_properties
+
+    @property
+    def samples_int16(self):
+        """
+        Return ``True`` if the audio samples
+        are stored as ``int16`` values,
+        ``False`` if they are stored as ``float64`` values.
+
+        :rtype: bool
+
+        .. versionadded:: 1.8.0
+        """
+        return self.__samples_int16
+
     @property
     def audio_samples(self):
         """
@@ -317,15 +368,72 @@ class AudioFile(Loggable):
         If you want to clone the values,
         you must use e.g. ``numpy.array(audiofile.audio_samples)``.
 
+        If the samples are stored as ``int16`` values,
+        this function returns a new array of ``float64`` values
+        instead of a view.
+        Use :func:`~aeneas.audiofile.AudioFile.audio_samples_block`
+        to convert only a portion of the wave.
+
+        If the samples are shared with other objects
+        through the :class:`~aeneas.audiobuffer.AudioBufferRegistry`,
+        they are copied first, so that the returned view can be modified.
+
         :rtype: :class:`numpy.ndarray` (1D, view)
         :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
         """
-        if self.__samples is None:
-            if self.file_path is None:
-                self.log_exc(u"AudioFile object not initialized", None, True, AudioFileNotInitializedError)
-            else:
-                self.read_samples_from_file()
-        return self.__samples[0:self.__samples_length]
+        self._ensure_samples()
+        self._own_samples()
+        return self.audio_samples_block()
+
+    @property
+    def audio_samples_length(self):
+        """
+        The number of audio samples.
+
+        :rtype: int
+        :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
+
+        .. versionadded:: 1.8.0
+        """
+        self._ensure_samples()
+        return self.__samples_length
+
+    def audio_samples_block(self, begin=None, end=None):
+        """
+        Return the audio samples with index
+        in ``[begin, end[``,
+        as an array of ``float64`` values in ``[-1.0, 1.0]``.
+
+        If ``begin`` is ``None``, start from the first sample.
+        If ``end`` is ``None``, stop at the last sample.
+
+        If the samples are stored as ``float64`` values,
+        this function returns a view,
+        otherwise a new array holding
+        only the converted block.
+        The view is read-only if the samples are shared
+        with other objects through the
+        :class:`~aeneas.audiobuffer.AudioBufferRegistry`.
+
+        :param int begin: the index of the first sample
+        :param int end: the index (+1) of the last sample
+        :rtype: :class:`numpy.ndarray` (1D)
+        :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
+
+        .. versionadded:: 1.8.0
+        """
+        self._ensure_samples()
+        begin = 0 if begin is None else max(0, begin)
+        end = self.__samples_length if end is None else min(end, self.__samples_length)
+        block = self.__samples[begin:max(begin, end)]
+        if self.__samples_int16:
+            # int16 [-32768, 32767] => float64 [-1, 1]
+            return block.astype("float64") / 32768
+        if self.__samples_shared:
+            # NOTE a read-only view, the shared array stays writable
+            block = block.view()
+            block.flags.writeable = False
+        return block
 
     def read_properties(self):
         """
@@ -333,8 +441,10 @@ class AudioFile(Loggable):
         the audio properties of the file at the given path.
 
         Currently this function uses
-        :class:`~aeneas.ffprobewrapper.FFPROBEWrapper`
-        to get the audio file properties.
+        :class:`~aeneas.audioprobe.AudioProbe`
+        to get the audio file properties,
+        which parses the header of common formats natively,
+        and calls :class:`~aeneas.ffprobewrapper.FFPROBEWrapper` otherwise.
 
         :raises: :class:`~aeneas.audiofile.AudioFileProbeError`: if the path to the ``ffprobe`` executable cannot be called
         :raises: :class:`~aeneas.audiofile.AudioFileUnsupportedFormatError`: if the audio file has a format not supported
@@ -351,14 +461,14 @@ class AudioFile(Loggable):
         self.file_size = gf.file_size(self.file_path)
         self.log([u"File size for '%s' is '%d'", self.file_path, self.file_size])
 
-        # get the audio properties using FFPROBEWrapper
+        # get the audio properties using AudioProbe
         try:
-            self.log(u"Reading properties with FFPROBEWrapper...")
-            properties = FFPROBEWrapper(
+            self.log(u"Reading properties with AudioProbe...")
+            properties = AudioProbe(
                 rconf=self.rconf,
                 logger=self.logger
             ).read_properties(self.file_path)
-            self.log(u"Reading properties with FFPROBEWrapper... done")
+            self.log(u"Reading properties with AudioProbe... done")
         except FFPROBEPathError:
             self.log_exc(u"Unable to call ffprobe executable", None, True, AudioFileProbeError)
         except (FFPROBEUnsupportedFormatError, FFPROBEParsingError):
@@ -375,41 +485,313 @@ class AudioFile(Loggable):
         self.log([u"Stored audio_channels: '%s'", self.audio_channels])
         self.log(u"Reading properties... done")
 
-    def read_samples_from_file(self):
+    def read_samples_from_file(self, begin=None, length=None, hold=False):
         """
         Load the audio samples from file into memory.
 
+        If ``begin`` and/or ``length`` are not ``None``,
+        only ``length`` seconds of audio,
+        starting from ``begin`` seconds, are decoded and loaded,
+        and the resulting audio data represents only that range
+        (i.e., its time ``0.000`` corresponds to ``begin``
+        in the original audio file).
+
         If ``self.file_format`` is ``None`` or it is not
         ``("pcm_s16le", 1, self.rconf.sample_rate)``,
         the file will be first converted
         to a temporary PCM16 mono WAVE file.
         Audio data will be read from this temporary file,
         which will be then deleted from disk immediately.
+        If ``ffmpeg_pipe`` is ``True``,
+        the PCM16 mono audio data will be read
+        from the ``ffmpeg`` output pipe instead.
 
         Otherwise,
         the audio data will be read directly
         from the given file,
         which will not be deleted from disk.
 
+        As an exception, if ``self.file_format`` is
+        ``("pcm_s16le", 1, sample_rate)`` with a different sample rate,
+        and ``audio_resample_native`` is ``True``,
+        the audio data will be read directly from the given file,
+        and then resampled in memory to ``self.rconf.sample_rate``.
+
+        The PCM16 mono WAVE file is read by the Python C extension ``cwave``,
+        if available, or by the pure Python code otherwise.
+        The latter memory-maps files which are read directly.
+        If samples are stored as ``int16`` values,
+        the pure Python code is always used,
+        and the returned samples of a file read directly
+        are backed by the (copy-on-write) memory-mapped file.
+
+        If ``audio_buffer_registry`` is ``True``,
+        and another object holds the samples of the same file,
+        read with the same parameters,
+        in the :class:`~aeneas.audiobuffer.AudioBufferRegistry`
+        (see :func:`~aeneas.audiofile.AudioFile.hold_samples`),
+        those samples are reused instead of decoding the file again.
+        Shared samples are copied before being modified.
+
+        If ``hold`` is ``True``, the samples are obtained
+        with :func:`~aeneas.audiobuffer.AudioBufferRegistry.acquire`,
+        hence this object holds them
+        (as :func:`~aeneas.audiofile.AudioFile.hold_samples` does)
+        until :func:`~aeneas.audiofile.AudioFile.release_samples`
+        or :func:`~aeneas.audiofile.AudioFile.clear_data` is called,
+        and concurrent readers of the same file
+        wait for a single decoding.
+
+        :param begin: the start position, in seconds, or ``None`` for ``0.000``
+        :type  begin: :class:`~aeneas.exacttiming.TimeValue`
+        :param length: the length, in seconds, or ``None`` for the rest of the file
+        :type  length: :class:`~aeneas.exacttiming.TimeValue`
+        :param bool hold: if ``True``, hold the samples in the registry
+        :raises: TypeError: if one of ``begin`` or ``length`` is not ``None``
+                            or :class:`~aeneas.exacttiming.TimeValue`
         :raises: :class:`~aeneas.audiofile.AudioFileConverterError`: if the path to the ``ffmpeg`` executable cannot be called
         :raises: :class:`~aeneas.audiofile.AudioFileUnsupportedFormatError`: if the audio file has a format not supported
         :raises: OSError: if the audio file cannot be read
         """
+        for variable, name in [(begin, "begin"), (length, "length")]:
+            if (variable is not None) and (not isinstance(variable, TimeValue)):
+                raise TypeError(u"%s is not None or TimeValue" % name)
         self.log(u"Loading audio data...")
+        if (begin is not None) or (length is not None):
+            self.log([u"Loading only range: begin %s length %s", gf.safe_float(begin, None), gf.safe_float(length, None)])
 
         # check the file can be read
         if not gf.file_can_be_read(self.file_path):
             self.log_exc(u"File '%s' cannot be read" % (self.file_path), None, True, OSError)
 
-        # determine if we need to convert the audio file
+        # release the samples held before, if any
+        self.release_samples()
+
+        key = None
+        buffer = None
+        if self.rconf[RuntimeConfiguration.AUDIO_BUFFER_REGISTRY]:
+            # NOTE the key must include all the parameters affecting the decoded samples
+            key = AudioBufferRegistry.key(
+                self.file_path,
+                self.file_format,
+                begin,
+                length,
+                self.rconf.sample_rate,
+                self.rconf.safety_checks,
+                self.rconf[RuntimeConfiguration.AUDIO_RESAMPLE_NATIVE],
+                self.__samples_int16
+            )
+            registry = AudioBufferRegistry(rconf=self.rconf, logger=self.logger)
+            if hold:
+                buffer = registry.acquire(key, lambda: self._decode_samples(begin, length))
+                self.__held_key = key
+            else:
+                buffer = registry.get(key)
+        if buffer is not None:
+            self.log(u"Using the samples in the audio buffer registry")
+            sample_rate, samples, file_format, properties = buffer
+        else:
+            sample_rate, samples, file_format, properties = self._decode_samples(begin, length)
+        self.__samples_shared = buffer is not None
+        self.__samples_key = key
+        self.file_format = file_format
+        self.source_properties = properties
+        self.audio_format = "pcm16"
+        self.audio_channels = 1
+        self.audio_sample_rate = sample_rate
+        self.__samples = samples
+        self.__samples_capacity = len(self.__samples)
+        self.__samples_length = self.__samples_capacity
+        self._update_length()
+        self.log([u"Sample length:  %.3f", self.audio_length])
+        self.log([u"Sample rate:    %d", self.audio_sample_rate])
+        self.log([u"Audio format:   %s", self.audio_format])
+        self.log([u"Audio channels: %d", self.audio_channels])
+        self.log(u"Loading audio data... done")
+
+    def read_samples_from_wave_data(self, data):
+        """
+        Load the audio samples from the given PCM16 mono WAVE data
+        (e.g., written by a TTS engine to its standard output)
+        into memory.
+
+        The sizes in the RIFF header are not trusted,
+        since programs writing WAVE data to a pipe
+        cannot rewrite the header at the end:
+        the ``data`` chunk extends to the end of ``data``,
+        unless its size is smaller.
+
+        If the sample rate is not ``self.rconf.sample_rate``,
+        and ``audio_resample_native`` is ``True``,
+        the samples are resampled in memory to ``self.rconf.sample_rate``,
+        as :func:`~aeneas.audiofile.AudioFile.read_samples_from_file` does.
+
+        .. versionadded:: 1.8.0
+
+        :param bytes data: the WAVE data
+        :raises: :class:`~aeneas.audiofile.AudioFileUnsupportedFormatError`: if ``data`` is not PCM16 mono WAVE data
+        """
+        self.log(u"Loading audio data from WAVE data...")
+        try:
+            sample_rate, samples = self._parse_wave_data(data)
+        except ValueError as exc:
+            self.log_exc(u"WAVE data not supported", exc, True, AudioFileUnsupportedFormatError)
+        self._load_pcm_samples(sample_rate, samples)
+        self.log(u"Loading audio data from WAVE data... done")
+
+    def read_samples_from_pcm_data(self, data, sample_rate):
+        """
+        Load the given PCM16 mono audio samples
+        (little-endian, without header)
+        into memory.
+
+        If the sample rate is not ``self.rconf.sample_rate``,
+        and ``audio_resample_native`` is ``True``,
+        the samples are resampled in memory to ``self.rconf.sample_rate``,
+        as :func:`~aeneas.audiofile.AudioFile.read_samples_from_file` does.
+
+        .. versionadded:: 1.8.0
+
+        :param bytes data: the PCM16 data
+        :param int sample_rate: the sample rate of the data
+        """
+        self.log(u"Loading audio data from PCM data...")
+        # NOTE drop a trailing odd byte, if any
+        samples = numpy.frombuffer(data[0:(len(data) - len(data) % 2)], dtype="<i2")
+        self._load_pcm_samples(sample_rate, samples)
+        self.log(u"Loading audio data from PCM data... done")
+
+    def _load_pcm_samples(self, sample_rate, samples):
+        """
+        Replace the audio data with the given PCM16 samples,
+        converting and resampling them if needed.
+
+        :param int sample_rate: the sample rate of the samples
+        :param samples: the samples
+        :type  samples: :class:`numpy.ndarray` (1D, ``int16``)
+        """
+        self.release_samples()
+        self.__samples_shared = False
+        self.__samples_key = None
+        self.source_properties = None
+        if self.__samples_int16:
+            samples = samples.astype("int16")
+        else:
+            samples = samples.astype("float64") / 32768
+        if (
+                (self.rconf.safety_checks) and
+                (self.rconf[RuntimeConfiguration.AUDIO_RESAMPLE_NATIVE]) and
+                (sample_rate != self.rconf.sample_rate)
+        ):
+            samples = self._resample_samples(samples, sample_rate, self.rconf.sample_rate)
+            sample_rate = self.rconf.sample_rate
+        self.file_format = ("pcm_s16le", 1, sample_rate)
+        self.audio_format = "pcm16"
+        self.audio_channels = 1
+        self.audio_sample_rate = sample_rate
+        self.__samples = samples
+        self.__samples_capacity = len(self.__samples)
+        self.__samples_length = self.__samples_capacity
+        self._update_length()
+        self.log([u"Sample length:  %.3f", self.audio_length])
+        self.log([u"Sample rate:    %d", self.audio_sample_rate])
+
+    @classmethod
+    def _parse_wave_data(cls, data):
+        """
+        Parse the given PCM16 mono WAVE data,
+        and return the pair ``(sample_rate, samples)``,
+        where ``samples`` is a read-only ``int16`` array
+        backed by ``data``.
+
+        :param bytes data: the WAVE data
+        :rtype: tuple ``(int, numpy.ndarray)``
+        :raises: ValueError: if ``data`` is not PCM16 mono WAVE data
+        """
+        if (len(data) < 12) or (data[0:4] != b"RIFF") or (data[8:12] != b"WAVE"):
+            raise ValueError(u"Not RIFF WAVE data")
+        sample_rate = None
+        position = 12
+        while position + 8 <= len(data):
+            chunk_id = data[position:(position + 4)]
+            chunk_size = struct.unpack("<I", data[(position + 4):(position + 8)])[0]
+            start = position + 8
+            if chunk_id == b"fmt ":
+                if chunk_size < 16:
+                    raise ValueError(u"Invalid fmt chunk")
+                codec, channels, sample_rate, byte_rate_nu, block_align_nu, bits = struct.unpack("<HHIIHH", data[start:(start + 16)])
+                if (codec != 1) or (channels != 1) or (bits != 16):
+                    raise ValueError(u"Not PCM16 mono data (codec %d, channels %d, bits %d)" % (codec, channels, bits))
+            elif chunk_id == b"data":
+                if sample_rate is None:
+                    raise ValueError(u"Missing fmt chunk")
+                # NOTE a streaming writer might store 0 or a huge size
+                end = len(data) if chunk_size == 0 else min(start + chunk_size, len(data))
+                end -= (end - start) % 2
+                return (sample_rate, numpy.frombuffer(data[start:end], dtype="<i2"))
+            position = start + chunk_size + (chunk_size % 2)
+        raise ValueError(u"Missing data chunk")
+
+    def _decode_samples(self, begin=None, length=None):
+        """
+        Decode the audio samples of ``self.file_path``,
+        converting or resampling them if needed,
+        and return a tuple ``(sample_rate, samples, file_format, properties)``.
+
+        If the samples are decoded by ``ffmpeg`` through a pipe,
+        ``properties`` is the dictionary of the properties
+        of the input audio stream parsed from the ``ffmpeg`` banner
+        (see :func:`~aeneas.ffmpegwrapper.FFMPEGWrapper.decode`),
+        otherwise it is ``None``.
+
+        This function does not modify ``self``.
+
+        :param begin: the start position, in seconds, or ``None``
+        :type  begin: :class:`~aeneas.exacttiming.TimeValue`
+        :param length: the length, in seconds, or ``None``
+        :type  length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: tuple ``(int, numpy.ndarray, tuple, dict)``
+        """
+        file_format = self.file_format
+
+        # determine if we need to convert or to resample the audio file
+        target_format = ("pcm_s16le", 1, self.rconf.sample_rate)
+        resample_audio_file = (
+            (self.rconf.safety_checks) and
+            (self.rconf[RuntimeConfiguration.AUDIO_RESAMPLE_NATIVE]) and
+            (file_format is not None) and
+            (tuple(file_format[0:2]) == ("pcm_s16le", 1)) and
+            (file_format != target_format)
+        )
         convert_audio_file = (
-            (self.file_format is None) or
+            (file_format is None) or
             (
                 (self.rconf.safety_checks) and
-                (self.file_format != ("pcm_s16le", 1, self.rconf.sample_rate))
+                (file_format != target_format) and
+                (not resample_audio_file)
             )
         )
 
+        if convert_audio_file and self.rconf[RuntimeConfiguration.FFMPEG_PIPE]:
+            # decode file to PCM16 mono samples with correct sample rate, in memory
+            self.log(u"self.file_format is None or not good => decoding self.file_path")
+            try:
+                self.log(u"Decoding audio file to mono...")
+                converter = FFMPEGWrapper(rconf=self.rconf, logger=self.logger)
+                sample_rate, samples, properties = converter.decode(self.file_path, head_length=begin, process_length=length)
+                self.log(u"Decoding audio file to mono... done")
+            except FFMPEGPathError:
+                self.log_exc(u"Unable to call ffmpeg executable", None, True, AudioFileConverterError)
+            except OSError:
+                self.log_exc(u"Audio file format not supported by ffmpeg", None, True, AudioFileUnsupportedFormatError)
+            # NOTE the properties parsed from the ffmpeg banner are not stored
+            #      in the AudioProbe cache, since the duration printed by ffmpeg
+            #      is rounded, or even estimated from the bitrate
+            self.log([u"Properties parsed from the ffmpeg banner: %s", properties])
+            if not self.__samples_int16:
+                samples = samples.astype("float64") / 32768
+            return (sample_rate, samples, target_format, properties)
+
         # convert the audio file if needed
         if convert_audio_file:
             # convert file to PCM16 mono WAVE with correct sample rate
@@ -419,8 +801,10 @@ class AudioFile(Loggable):
             try:
                 self.log(u"Converting audio file to mono...")
                 converter = FFMPEGWrapper(rconf=self.rconf, logger=self.logger)
-                converter.convert(self.file_path, tmp_file_path)
-                self.file_format = ("pcm_s16le", 1, self.rconf.sample_rate)
+                converter.convert(self.file_path, tmp_file_path, head_length=begin, process_length=length)
+                file_format = target_format
+                # NOTE ffmpeg already extracted the range
+                read_range = (None, None)
                 self.log(u"Converting audio file to mono... done")
             except FFMPEGPathError:
                 gf.delete_file(tmp_handler, tmp_file_path)
@@ -436,32 +820,151 @@ class AudioFile(Loggable):
                 self.log_warn(u"Safety checks disabled => reading self.file_path directly")
             tmp_handler = None
             tmp_file_path = self.file_path
+            # NOTE the range will be extracted after reading the WAVE header
+            read_range = (begin, length)
 
-        # TODO allow calling C extension cwave to read samples faster
         try:
-            self.audio_format = "pcm16"
-            self.audio_channels = 1
-            self.audio_sample_rate, self.__samples = scipywavread(tmp_file_path)
-            # scipy reads a sample as an int16_t, that is, a number in [-32768, 32767]
-            # so we convert it to a float64 in [-1, 1]
-            self.__samples = self.__samples.astype("float64") / 32768
-            self.__samples_capacity = len(self.__samples)
-            self.__samples_length = self.__samples_capacity
-            self._update_length()
+            # NOTE memory-map only files we do not delete right after reading them
+            mmap = not convert_audio_file
+            if self.__samples_int16:
+                # cwave returns float64 values, hence read int16 values directly
+                sample_rate, samples = self._read_samples_pure_python(tmp_file_path, mmap, *read_range)[1]
+            else:
+                sample_rate, samples = gf.run_c_extension_with_fallback(
+                    self.log,
+                    "cwave",
+                    self._read_samples_c_extension,
+                    self._read_samples_pure_python,
+                    (tmp_file_path, mmap) + read_range,
+                    rconf=self.rconf
+                )
+            # NOTE check the actual sample rate read from the WAVE header,
+            #      since the TTS engine might not honor self.file_format
+            if (resample_audio_file) and (sample_rate != self.rconf.sample_rate):
+                samples = self._resample_samples(samples, sample_rate, self.rconf.sample_rate)
+                sample_rate = self.rconf.sample_rate
+            if resample_audio_file:
+                file_format = target_format
         except ValueError:
             self.log_exc(u"Audio format not supported by scipywavread", None, True, AudioFileUnsupportedFormatError)
+        finally:
+            # if we converted the audio file, delete the temporary converted audio file
+            if convert_audio_file:
+                gf.delete_file(tmp_handler, tmp_file_path)
+                self.log([u"Deleted temporary audio file: '%s'", tmp_file_path])
 
-        # if we converted the audio file, delete the temporary converted audio file
-        if convert_audio_file:
-            gf.delete_file(tmp_handler, tmp_file_path)
-            self.log([u"Deleted temporary audio file: '%s'", tmp_file_path])
+        return (sample_rate, samples, file_format, None)
 
-        self._update_length()
-        self.log([u"Sample length:  %.3f", self.audio_length])
-        self.log([u"Sample rate:    %d", self.audio_sample_rate])
-        self.log([u"Audio format:   %s", self.audio_format])
-        self.log([u"Audio channels: %d", self.audio_channels])
-        self.log(u"Loading audio data... done")
+    def _read_samples_c_extension(self, file_path, mmap, begin=None, length=None):
+        """
+        Read the audio samples from the given PCM16 mono WAVE file
+        using the Python C extension cwave.
+
+        :param string file_path: the path of the WAVE file
+        :param bool mmap: ignored, for compatibility with the pure Python code
+        :param begin: the start position, in seconds, or ``None``
+        :type  begin: :class:`~aeneas.exacttiming.TimeValue`
+        :param length: the length, in seconds, or ``None``
+        :type  length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: tuple ``(bool, (int, numpy.ndarray))``
+        """
+        self.log(u"Reading audio samples using C extension...")
+        try:
+            self.log(u"Importing cwave...")
+            import aeneas.cwave.cwave
+            self.log(u"Importing cwave... done")
+            c_file_path = gf.safe_str(file_path)
+            sample_rate, total_samples = aeneas.cwave.cwave.get_audio_info(c_file_path)
+            begin_index, end_index = self._range_to_indices(sample_rate, total_samples, begin, length)
+            if begin_index == end_index:
+                # NOTE num_samples=0 would read the whole file
+                samples = numpy.zeros(0, dtype="float64")
+            else:
+                sample_rate, samples = aeneas.cwave.cwave.read_audio_data(c_file_path, begin_index, end_index - begin_index)
+            self.log(u"Reading audio samples using C extension... done")
+            return (True, (sample_rate, samples))
+        except Exception as exc:
+            self.log_exc(u"An unexpected error occurred while running cwave", exc, False, None)
+        return (False, None)
+
+    def _read_samples_pure_python(self, file_path, mmap, begin=None, length=None):
+        """
+        Read the audio samples from the given PCM16 mono WAVE file
+        using the pure Python code.
+
+        If ``mmap`` is ``True``, the file is memory-mapped
+        (copy-on-write) instead of being read into memory:
+        if samples are stored as ``int16`` values,
+        pages are loaded from disk only when accessed;
+        otherwise, the ``float64`` values are computed
+        without an intermediate copy of the file contents.
+
+        :param string file_path: the path of the WAVE file
+        :param bool mmap: if ``True``, memory-map the file
+        :param begin: the start position, in seconds, or ``None``
+        :type  begin: :class:`~aeneas.exacttiming.TimeValue`
+        :param length: the length, in seconds, or ``None``
+        :type  length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: tuple ``(bool, (int, numpy.ndarray))``
+        :raises: ValueError: if the file cannot be read by scipywavread
+        """
+        self.log([u"Reading audio samples using pure Python code (mmap: %s)...", mmap])
+        sample_rate, samples = scipywavread(file_path, mmap=mmap)
+        if (begin is not None) or (length is not None):
+            begin_index, end_index = self._range_to_indices(sample_rate, len(samples), begin, length)
+            samples = samples[begin_index:end_index]
+        # scipy reads a sample as an int16_t, that is, a number in [-32768, 32767]
+        # so we convert it to a float64 in [-1, 1], unless we store int16 values
+        if self.__samples_int16:
+            samples = samples.astype("int16", copy=False)
+        else:
+            samples = samples.astype("float64") / 32768
+        self.log(u"Reading audio samples using pure Python code... done")
+        return (True, (sample_rate, samples))
+
+    def _resample_samples(self, samples, from_rate, to_rate):
+        """
+        Resample the given audio samples, in memory,
+        and return them with the same data type.
+
+        :param samples: the samples to resample
+        :type  samples: :class:`numpy.ndarray` (1D)
+        :param int from_rate: the sample rate of ``samples``
+        :param int to_rate: the new sample rate
+        :rtype: :class:`numpy.ndarray` (1D)
+        """
+        self.log([u"Resampling from %d to %d...", from_rate, to_rate])
+        resampler = Resampler(rconf=self.rconf, logger=self.logger)
+        if self.__samples_int16:
+            samples = samples.astype("float64") / 32768
+        samples = resampler.resample(samples, from_rate, to_rate)
+        if self.__samples_int16:
+            samples = self._float_to_int16(samples)
+        self.log([u"Resampling from %d to %d... done", from_rate, to_rate])
+        return samples
+
+    @classmethod
+    def _range_to_indices(cls, sample_rate, total_samples, begin, length):
+        """
+        Convert the given range, in seconds, into
+        the ``(begin_index, end_index)`` pair of sample indices,
+        clipped to ``[0, total_samples]``.
+
+        :param int sample_rate: the sample rate
+        :param int total_samples: the number of samples
+        :param begin: the start position, in seconds, or ``None``
+        :type  begin: :class:`~aeneas.exacttiming.TimeValue`
+        :param length: the length, in seconds, or ``None``
+        :type  length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: tuple ``(int, int)``
+        """
+        begin_index = 0
+        if begin is not None:
+            begin_index = min(max(0, int(begin * sample_rate)), total_samples)
+        end_index = total_samples
+        if length is not None:
+            end_index = min(max(begin_index, begin_index + int(length * sample_rate)), total_samples)
+        return (begin_index, end_index)
 
     def preallocate_memory(self, capacity):
         """
@@ -488,13 +991,16 @@ class AudioFile(Loggable):
             raise ValueError(u"The capacity value cannot be negative")
         if self.__samples is None:
             self.log(u"Not initialized")
-            self.__samples = numpy.zeros(capacity)
+            self.__samples = numpy.zeros(capacity, dtype=self._samples_dtype())
             self.__samples_length = 0
         else:
             self.log([u"Previous sample length was   (samples): %d", self.__samples_length])
             self.log([u"Previous sample capacity was (samples): %d", self.__samples_capacity])
             self.__samples = numpy.resize(self.__samples, capacity)
             self.__samples_length = min(self.__samples_length, capacity)
+            # NOTE numpy.resize() returns a new array
+            self.__samples_shared = False
+            self.__samples_key = None
         self.__samples_capacity = capacity
         self.log([u"Current sample capacity is   (samples): %d", self.__samples_capacity])
 
@@ -526,6 +1032,12 @@ class AudioFile(Loggable):
         If ``reverse`` is ``True``, the new samples
         will be reversed and then concatenated.
 
+        If the samples are stored as ``int16`` values,
+        new ``int16`` samples are copied as they are,
+        while new samples of any other type are assumed
+        to be ``float64`` values in ``[-1.0, 1.0]``
+        and they are converted.
+
         :param samples: the new samples to be concatenated
         :type  samples: :class:`numpy.ndarray` (1D)
         :param bool reverse: if ``True``, concatenate new samples after reversing them
@@ -538,6 +1050,10 @@ class AudioFile(Loggable):
         future_length = current_length + samples_length
         if (self.__samples is None) or (self.__samples_capacity < future_length):
             self.preallocate_memory(2 * future_length)
+        else:
+            self._own_samples()
+        if (self.__samples_int16) and (samples.dtype != numpy.int16):
+            samples = self._float_to_int16(samples)
         if reverse:
             self.__samples[current_length:future_length] = samples[::-1]
         else:
@@ -554,12 +1070,9 @@ class AudioFile(Loggable):
 
         .. versionadded:: 1.2.0
         """
-        if self.__samples is None:
-            if self.file_path is None:
-                self.log_exc(u"AudioFile object not initialized", None, True, AudioFileNotInitializedError)
-            else:
-                self.read_samples_from_file()
+        self._ensure_samples()
         self.log(u"Reversing...")
+        self._own_samples()
         self.__samples[0:self.__samples_length] = numpy.flipud(self.__samples[0:self.__samples_length])
         self.log(u"Reversing... done")
 
@@ -599,11 +1112,42 @@ class AudioFile(Loggable):
             begin_index = int(begin * self.audio_sample_rate)
             end_index = int((begin + length) * self.audio_sample_rate)
             new_idx = end_index - begin_index
-            self.__samples[0:new_idx] = self.__samples[begin_index:end_index]
+            if self.__samples_shared:
+                # NOTE shared samples: keep a view, without copying
+                self.__samples = self.__samples[begin_index:end_index]
+                self.__samples_capacity = new_idx
+            else:
+                self.__samples[0:new_idx] = self.__samples[begin_index:end_index]
+            self.__samples_key = None
             self.__samples_length = new_idx
             self._update_length()
         self.log(u"Trimming... done")
 
+    def resample(self, sample_rate):
+        """
+        Resample the audio data to the given sample rate, in memory.
+
+        :param int sample_rate: the new sample rate
+        :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
+
+        .. versionadded:: 1.8.0
+        """
+        self._ensure_samples()
+        if self.audio_sample_rate == sample_rate:
+            self.log(u"Same sample rate: nothing to do")
+            return
+        self.__samples = self._resample_samples(
+            self.__samples[0:self.__samples_length],
+            self.audio_sample_rate,
+            sample_rate
+        )
+        self.__samples_shared = False
+        self.__samples_key = None
+        self.audio_sample_rate = sample_rate
+        self.__samples_capacity = len(self.__samples)
+        self.__samples_length = self.__samples_capacity
+        self._update_length()
+
     def write(self, file_path):
         """
         Write the audio data to file.
@@ -614,16 +1158,19 @@ class AudioFile(Loggable):
 
         .. versionadded:: 1.2.0
         """
-        if self.__samples is None:
-            if self.file_path is None:
-                self.log_exc(u"AudioFile object not initialized", None, True, AudioFileNotInitializedError)
-            else:
-                self.read_samples_from_file()
+        self._ensure_samples()
         self.log([u"Writing audio file '%s'...", file_path])
         try:
-            # our value is a float64 in [-1, 1]
-            # scipy writes the sample as an int16_t, that is, a number in [-32768, 32767]
-            data = (self.audio_samples * 32768).astype("int16")
+            if self.__samples_int16:
+                # our value is already an int16, dump it directly
+                data = self.__samples[0:self.__samples_length]
+                if isinstance(data, numpy.memmap):
+                    # file_path might be the memory-mapped file itself
+                    data = numpy.array(data)
+            else:
+                # our value is a float64 in [-1, 1]
+                # scipy writes the sample as an int16_t, that is, a number in [-32768, 32767]
+                data = (self.__samples[0:self.__samples_length] * 32768).astype("int16")
             scipywavwrite(file_path, self.audio_sample_rate, data)
         except Exception as exc:
             self.log_exc(u"Error writing audio file to '%s'" % (file_path), exc, True, OSError)
@@ -634,9 +1181,105 @@ class AudioFile(Loggable):
         Clear the audio data, freeing memory.
         """
         self.log(u"Clear audio_data")
+        self.release_samples()
         self.__samples_capacity = 0
         self.__samples_length = 0
         self.__samples = None
+        self.__samples_shared = False
+        self.__samples_key = None
+
+    def hold_samples(self):
+        """
+        Hold the audio samples read from file
+        in the :class:`~aeneas.audiobuffer.AudioBufferRegistry`,
+        so that any other object reading the same file
+        with the same parameters reuses them,
+        instead of decoding the file again,
+        until :func:`~aeneas.audiofile.AudioFile.release_samples`
+        or :func:`~aeneas.audiofile.AudioFile.clear_data` is called.
+
+        Call this function only if several objects
+        will read the same file, since the held samples
+        stay in memory until they are released.
+
+        If ``audio_buffer_registry`` is ``False``,
+        or the samples have been modified after reading them,
+        this function does nothing.
+
+        :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
+
+        .. versionadded:: 1.8.0
+        """
+        self._ensure_samples()
+        if self.__held_key is not None:
+            self.log(u"Samples already held")
+            return
+        if self.__samples_key is None:
+            self.log(u"Samples not read from file or modified: not holding them")
+            return
+        buffer = (self.audio_sample_rate, self.__samples, self.file_format, self.source_properties)
+        AudioBufferRegistry(rconf=self.rconf, logger=self.logger).acquire(self.__samples_key, lambda: buffer)
+        self.__held_key = self.__samples_key
+        self.__samples_shared = True
+
+    def release_samples(self):
+        """
+        Release the audio samples held by
+        :func:`~aeneas.audiofile.AudioFile.hold_samples`, if any.
+
+        The samples of this object are not cleared.
+
+        .. versionadded:: 1.8.0
+        """
+        if self.__held_key is not None:
+            AudioBufferRegistry(rconf=self.rconf, logger=self.logger).release(self.__held_key)
+            self.__held_key = None
+
+    def _own_samples(self):
+        """
+        Copy the audio samples, if they are shared
+        with other objects through the audio buffer registry,
+        so that they can be modified.
+        """
+        if self.__samples_shared:
+            self.log(u"Copying shared audio samples...")
+            self.__samples = numpy.array(self.__samples)
+            self.__samples_shared = False
+            self.log(u"Copying shared audio samples... done")
+        self.__samples_key = None
+
+    def _ensure_samples(self):
+        """
+        Ensure that the audio samples are in memory,
+        reading them from file if needed.
+
+        :raises: :class:`~aeneas.audiofile.AudioFileNotInitializedError`: if the audio file is not initialized yet
+        """
+        if self.__samples is None:
+            if self.file_path is None:
+                self.log_exc(u"AudioFile object not initialized", None, True, AudioFileNotInitializedError)
+            else:
+                self.read_samples_from_file()
+
+    def _samples_dtype(self):
+        """
+        Return the NumPy data type used to store the audio samples.
+
+        :rtype: string
+        """
+        return "int16" if self.__samples_int16 else "float64"
+
+    @classmethod
+    def _float_to_int16(cls, samples):
+        """
+        Convert the given ``float64`` values in ``[-1.0, 1.0]``
+        into ``int16`` values in ``[-32768, 32767]``.
+
+        :param samples: the samples to convert
+        :type  samples: :class:`numpy.ndarray` (1D)
+        :rtype: :class:`numpy.ndarray` (1D)
+        """
+        return numpy.clip(numpy.asarray(samples) * 32768, -32768, 32767).astype("int16")
 
     def _update_length(self):
         """
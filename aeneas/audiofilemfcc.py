@@ -86,6 +86,12 @@ class AudioFileMFCC(Loggable):
     This class heavily uses NumPy views and in-place operations
     to avoid creating temporary data or copying data around.
 
+    If the audio samples are stored as ``int16`` values
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.AUDIO_SAMPLES_INT16`),
+    the MFCCs are computed on consecutive blocks of
+    :data:`~aeneas.audiofilemfcc.AudioFileMFCC.INT16_BLOCK_FRAMES` frames,
+    so that only one block at a time is converted to ``float64`` values.
+
     :param string file_path: the path of the PCM16 mono WAVE file, or ``None``
     :param tuple file_format: the format of the audio file, if known in advance: ``(codec, channels, rate)`` or ``None``
     :param mfcc_matrix: the MFCC matrix to be set, or ``None``
@@ -101,6 +107,19 @@ class AudioFileMFCC(Loggable):
     .. versionadded:: 1.5.0
     """
 
+    INT16_BLOCK_FRAMES = 8192
+    """
+    When the audio samples are stored as ``int16`` values,
+    compute the MFCCs on blocks of this many frames.
+    The only difference with respect to computing
+    the MFCCs of the entire wave at once is that
+    the first sample of each block is not pre-emphasized.
+    Default: ``8192``, that is, ``327.68`` seconds
+    with the default MFCC window shift.
+
+    .. versionadded:: 1.8.0
+    """
+
     TAG = u"AudioFileMFCC"
 
     def __init__(
@@ -137,22 +156,26 @@ class AudioFileMFCC(Loggable):
                     rconf=self.rconf,
                     logger=self.logger
                 )
-                # NOTE load audio samples into memory, if not present already
-                self.audio_file.audio_samples
-            gf.run_c_extension_with_fallback(
-                self.log,
-                "cmfcc",
-                self._compute_mfcc_c_extension,
-                self._compute_mfcc_pure_python,
-                (),
-                rconf=self.rconf
-            )
-            self.audio_length = self.audio_file.audio_length
-            if audio_file_was_none:
-                self.log(u"Clearing the audio data...")
-                self.audio_file.clear_data()
-                self.audio_file = None
-                self.log(u"Clearing the audio data... done")
+            try:
+                if audio_file_was_none:
+                    # NOTE load audio samples into memory,
+                    #      holding them until they are cleared
+                    self.audio_file.read_samples_from_file(hold=True)
+                gf.run_c_extension_with_fallback(
+                    self.log,
+                    "cmfcc",
+                    self._compute_mfcc_c_extension,
+                    self._compute_mfcc_pure_python,
+                    (),
+                    rconf=self.rconf
+                )
+                self.audio_length = self.audio_file.audio_length
+            finally:
+                if audio_file_was_none:
+                    self.log(u"Clearing the audio data...")
+                    self.audio_file.clear_data()
+                    self.audio_file = None
+                    self.log(u"Clearing the audio data... done")
         self.__middle_begin = 0
         self.__middle_end = self.__mfcc.shape[1]
         self.log(u"Initializing MFCCs... done")
@@ -515,18 +538,21 @@ class AudioFileMFCC(Loggable):
             self.log(u"Importing cmfcc...")
             import aeneas.cmfcc.cmfcc
             self.log(u"Importing cmfcc... done")
-            self.__mfcc = (aeneas.cmfcc.cmfcc.compute_from_data(
-                self.audio_file.audio_samples,
-                self.audio_file.audio_sample_rate,
-                self.rconf[RuntimeConfiguration.MFCC_FILTERS],
-                self.rconf[RuntimeConfiguration.MFCC_SIZE],
-                self.rconf[RuntimeConfiguration.MFCC_FFT_ORDER],
-                self.rconf[RuntimeConfiguration.MFCC_LOWER_FREQUENCY],
-                self.rconf[RuntimeConfiguration.MFCC_UPPER_FREQUENCY],
-                self.rconf[RuntimeConfiguration.MFCC_EMPHASIS_FACTOR],
-                self.rconf[RuntimeConfiguration.MFCC_WINDOW_LENGTH],
-                self.rconf[RuntimeConfiguration.MFCC_WINDOW_SHIFT]
-            )[0]).transpose()
+
+            def _compute(data, sample_rate):
+                return aeneas.cmfcc.cmfcc.compute_from_data(
+                    data,
+                    sample_rate,
+                    self.rconf[RuntimeConfiguration.MFCC_FILTERS],
+                    self.rconf[RuntimeConfiguration.MFCC_SIZE],
+                    self.rconf[RuntimeConfiguration.MFCC_FFT_ORDER],
+                    self.rconf[RuntimeConfiguration.MFCC_LOWER_FREQUENCY],
+                    self.rconf[RuntimeConfiguration.MFCC_UPPER_FREQUENCY],
+                    self.rconf[RuntimeConfiguration.MFCC_EMPHASIS_FACTOR],
+                    self.rconf[RuntimeConfiguration.MFCC_WINDOW_LENGTH],
+                    self.rconf[RuntimeConfiguration.MFCC_WINDOW_SHIFT]
+                )[0]
+            self.__mfcc = self._compute_mfcc_on_samples(_compute).transpose()
             self.log(u"Computing MFCCs using C extension... done")
             return (True, None)
         except Exception as exc:
@@ -539,19 +565,57 @@ class AudioFileMFCC(Loggable):
         """
         self.log(u"Computing MFCCs using pure Python code...")
         try:
-            self.__mfcc = MFCC(
-                rconf=self.rconf,
-                logger=self.logger
-            ).compute_from_data(
-                self.audio_file.audio_samples,
-                self.audio_file.audio_sample_rate
-            ).transpose()
+            mfcc = MFCC(rconf=self.rconf, logger=self.logger)
+            self.__mfcc = self._compute_mfcc_on_samples(mfcc.compute_from_data).transpose()
             self.log(u"Computing MFCCs using pure Python code... done")
             return (True, None)
         except Exception as exc:
             self.log_exc(u"An unexpected error occurred while running pure Python code", exc, False, None)
         return (False, None)
 
+    def _compute_mfcc_on_samples(self, compute_function):
+        """
+        Compute the MFCCs of the samples of ``self.audio_file``
+        by calling ``compute_function(data, sample_rate)``,
+        which must return a "tall" matrix, with one row per frame.
+
+        If the samples are stored as ``float64`` values,
+        the function is called once on the entire wave.
+        If they are stored as ``int16`` values,
+        the function is called on consecutive blocks of
+        :data:`~aeneas.audiofilemfcc.AudioFileMFCC.INT16_BLOCK_FRAMES` frames,
+        each converted to ``float64`` values just before the call,
+        and the resulting matrices are concatenated.
+
+        :param function compute_function: the function computing the MFCCs
+        :rtype: :class:`numpy.ndarray` (2D)
+        """
+        sample_rate = self.audio_file.audio_sample_rate
+        if not self.audio_file.samples_int16:
+            return compute_function(self.audio_file.audio_samples_block(), sample_rate)
+
+        # NOTE these values must match those computed by MFCC and cmfcc
+        data_length = self.audio_file.audio_samples_length
+        frame_length = int(self.rconf[RuntimeConfiguration.MFCC_WINDOW_LENGTH] * sample_rate)
+        frame_length_padded = max(frame_length, self.rconf[RuntimeConfiguration.MFCC_FFT_ORDER])
+        frame_shift = int(self.rconf[RuntimeConfiguration.MFCC_WINDOW_SHIFT] * sample_rate)
+        number_of_frames = data_length // frame_shift
+        block_frames = self.INT16_BLOCK_FRAMES
+        if number_of_frames <= block_frames:
+            return compute_function(self.audio_file.audio_samples_block(), sample_rate)
+
+        self.log([u"Computing MFCCs on blocks of %d frames", block_frames])
+        blocks = []
+        for block_begin in range(0, number_of_frames, block_frames):
+            block_end = min(block_begin + block_frames, number_of_frames)
+            # a block must contain all the samples of its last frame
+            data = self.audio_file.audio_samples_block(
+                begin=(block_begin * frame_shift),
+                end=((block_end - 1) * frame_shift + frame_length_padded)
+            )
+            blocks.append(compute_function(data, sample_rate)[0:(block_end - block_begin)])
+        return numpy.concatenate(blocks)
+
     def reverse(self):
         """
         Reverse the audio file.
@@ -570,12 +634,10 @@ class AudioFileMFCC(Loggable):
         self.__middle_begin = all_length - tmp
         if self.__mfcc_mask is not None:
             self.__mfcc_mask = self.__mfcc_mask[::-1]
-            # equivalent to
-            # self.__mfcc_mask_map = ((all_length - 1) - self.__mfcc_mask_map)[::-1]
-            # but done in place using NumPy view
-            self.__mfcc_mask_map *= -1
-            self.__mfcc_mask_map += all_length - 1
-            self.__mfcc_mask_map = self.__mfcc_mask_map[::-1]
+            # NOTE not done in place, since the mask map
+            #      might be shared with windows of this object
+            #      (see middle_window())
+            self.__mfcc_mask_map = ((all_length - 1) - self.__mfcc_mask_map)[::-1]
             self.__speech_intervals = [(all_length - i[1], all_length - i[0]) for i in self.__speech_intervals[::-1]]
             self.__nonspeech_intervals = [(all_length - i[1], all_length - i[0]) for i in self.__nonspeech_intervals[::-1]]
         self.is_reversed = not self.is_reversed
@@ -674,3 +736,62 @@ class AudioFileMFCC(Loggable):
             self.middle_end = self.all_length - int(tail_length / mws)
         self.log([u"After:  0 %d %d %d", self.middle_begin, self.middle_end, self.all_length])
         self.log(u"Setting head middle tail... done")
+
+    def middle_window(self, head_length=None, middle_length=None, tail_length=None):
+        """
+        Return a new AudioFileMFCC object sharing the MFCCs
+        and the speech/nonspeech intervals of this one,
+        with HEAD, MIDDLE, TAIL set as in
+        :func:`~aeneas.audiofilemfcc.AudioFileMFCC.set_head_middle_tail`,
+        starting from those of this object,
+        which are not changed.
+
+        VAD is run on this object first, if it was not run already,
+        so that several windows of the same audio file
+        can be processed concurrently.
+
+        :param head_length: the length of HEAD, in seconds
+        :type  head_length: :class:`~aeneas.exacttiming.TimeValue`
+        :param middle_length: the length of MIDDLE, in seconds
+        :type  middle_length: :class:`~aeneas.exacttiming.TimeValue`
+        :param tail_length: the length of TAIL, in seconds
+        :type  tail_length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
+        :raises: TypeError: if one of the arguments is not ``None``
+                            or :class:`~aeneas.exacttiming.TimeValue`
+        :raises: ValueError: if one of the arguments is greater
+                             than the length of the audio file
+
+        .. versionadded:: 1.8.0
+        """
+        self._ensure_mfcc_mask()
+        window = AudioFileMFCC(mfcc_matrix=self.__mfcc, rconf=self.rconf, logger=self.logger)
+        window.file_path = self.file_path
+        window.audio_length = self.audio_length
+        window.is_reversed = self.is_reversed
+        window.__mfcc_mask = self.__mfcc_mask
+        window.__mfcc_mask_map = self.__mfcc_mask_map
+        window.__speech_intervals = self.__speech_intervals
+        window.__nonspeech_intervals = self.__nonspeech_intervals
+        window.__middle_begin = self.__middle_begin
+        window.__middle_end = self.__middle_end
+        window.set_head_middle_tail(head_length, middle_length, tail_length)
+        return window
+
+    def reversed_window(self):
+        """
+        Return a new AudioFileMFCC object sharing the MFCCs
+        and the speech/nonspeech intervals of this one,
+        as returned by
+        :func:`~aeneas.audiofilemfcc.AudioFileMFCC.middle_window`,
+        but reversed, as by
+        :func:`~aeneas.audiofilemfcc.AudioFileMFCC.reverse`,
+        leaving this object unchanged.
+
+        :rtype: :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
+
+        .. versionadded:: 1.8.0
+        """
+        window = self.middle_window()
+        window.reverse()
+        return window
@@ -0,0 +1,552 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.audioprobe.AudioProbe`, a probe reading the properties of an audio file,
+  by parsing the file header natively or by calling ``ffprobe``.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from collections import OrderedDict
+import io
+import os
+import struct
+import threading
+
+from aeneas.exacttiming import TimeValue
+from aeneas.ffprobewrapper import FFPROBEPathError
+from aeneas.ffprobewrapper import FFPROBEWrapper
+from aeneas.logger import Loggable
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+import aeneas.globalfunctions as gf
+
+
+class AudioProbe(Loggable):
+    """
+    A probe reading the properties of an audio file.
+
+    If :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.AUDIO_PROBE_NATIVE`
+    is ``True``, the headers of WAVE (RIFF), AIFF, FLAC, and MPEG audio (e.g., MP3) files
+    are parsed in Python, without spawning a process.
+    If the file has a different format, or its header cannot be parsed,
+    the probe falls back to :class:`~aeneas.ffprobewrapper.FFPROBEWrapper`.
+    If ``ffprobe_path`` has been set to a value other than the default one,
+    it must point to an executable file anyway.
+
+    If :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.AUDIO_PROBE_CACHE`
+    is ``True``, the properties read are stored in a cache,
+    shared by all the instances of this class,
+    and keyed by the absolute path, the size, and the modification time of the file.
+
+    The returned dictionary has the same keys as the one returned by
+    :func:`~aeneas.ffprobewrapper.FFPROBEWrapper.read_properties`.
+
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    DEFAULT_FFPROBE_PATH = u"ffprobe"
+    """
+    Default value of ``ffprobe_path``,
+    not checked before reading the properties natively.
+    """
+
+    CACHE_MAX_ENTRIES = 4096
+    """
+    Maximum number of entries of the probe cache.
+    When it is exceeded, the least recently used entry is removed.
+    """
+
+    MPEG_MAX_SYNC_SEARCH = 65536
+    """
+    Maximum number of bytes scanned to find the first MPEG audio frame.
+    """
+
+    MPEG_MIN_FRAMES = 4
+    """
+    Number of consecutive valid MPEG audio frames
+    required to recognize an MPEG audio file.
+    """
+
+    WAVE_CODECS = {
+        (0x0001, 8): u"pcm_u8",
+        (0x0001, 16): u"pcm_s16le",
+        (0x0001, 24): u"pcm_s24le",
+        (0x0001, 32): u"pcm_s32le",
+        (0x0003, 32): u"pcm_f32le",
+        (0x0003, 64): u"pcm_f64le",
+        (0x0006, 8): u"pcm_alaw",
+        (0x0007, 8): u"pcm_mulaw",
+    }
+    """ Map ``(format tag, bits per sample)`` of WAVE files to codec names """
+
+    AIFF_CODECS = {
+        8: u"pcm_s8",
+        16: u"pcm_s16be",
+        24: u"pcm_s24be",
+        32: u"pcm_s32be",
+    }
+    """ Map bits per sample of (uncompressed) AIFF files to codec names """
+
+    MPEG_BITRATES = {
+        (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+        (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    }
+    """ Map ``(MPEG version, layer)`` to bitrates, in kbit/s (MPEG 2.5 uses MPEG 2 values) """
+
+    MPEG_SAMPLE_RATES = {
+        1: [44100, 48000, 32000],
+        2: [22050, 24000, 16000],
+        25: [11025, 12000, 8000],
+    }
+    """ Map MPEG version to sample rates """
+
+    MPEG_CODECS = {
+        1: u"mp1",
+        2: u"mp2",
+        3: u"mp3",
+    }
+    """ Map MPEG audio layer to codec names """
+
+    TAG = u"AudioProbe"
+
+    _CACHE = OrderedDict()
+
+    _CACHE_LOCK = threading.Lock()
+
+    def read_properties(self, audio_file_path):
+        """
+        Read the properties of an audio file
+        and return them as a dictionary.
+
+        :param string audio_file_path: the path of the audio file to analyze
+        :rtype: dict
+        :raises: TypeError: if ``audio_file_path`` is None
+        :raises: OSError: if the file at ``audio_file_path`` cannot be read
+        :raises: :class:`~aeneas.ffprobewrapper.FFPROBEParsingError`: if the call to ``ffprobe`` does not produce any output
+        :raises: :class:`~aeneas.ffprobewrapper.FFPROBEPathError`: if the path to the ``ffprobe`` executable cannot be called
+        :raises: :class:`~aeneas.ffprobewrapper.FFPROBEUnsupportedFormatError`: if the file has a format not supported by ``ffprobe``
+        """
+        if audio_file_path is None:
+            self.log_exc(u"The audio file path is None", None, True, TypeError)
+        if not gf.file_can_be_read(audio_file_path):
+            self.log_exc(u"Input file '%s' cannot be read" % (audio_file_path), None, True, OSError)
+
+        self._check_ffprobe_path()
+
+        cache_key = None
+        if self.rconf[RuntimeConfiguration.AUDIO_PROBE_CACHE]:
+            cache_key = self._cache_key(audio_file_path)
+            properties = self._cache_get(cache_key)
+            if properties is not None:
+                self.log([u"Properties of '%s' found in cache", audio_file_path])
+                return properties
+
+        properties = None
+        if self.rconf[RuntimeConfiguration.AUDIO_PROBE_NATIVE]:
+            self.log(u"Reading properties natively...")
+            properties = self._read_properties_native(audio_file_path)
+            if properties is None:
+                self.log(u"Reading properties natively... failed")
+            else:
+                self.log(u"Reading properties natively... done")
+        if properties is None:
+            self.log(u"Reading properties with FFPROBEWrapper...")
+            properties = FFPROBEWrapper(
+                rconf=self.rconf,
+                logger=self.logger
+            ).read_properties(audio_file_path)
+            self.log(u"Reading properties with FFPROBEWrapper... done")
+
+        if cache_key is not None:
+            self._cache_add(cache_key, properties)
+        return properties
+
+    def _check_ffprobe_path(self):
+        """
+        Check that the ``ffprobe`` executable can be found,
+        if its path has been set explicitly,
+        so that an invalid ``ffprobe_path`` is reported
+        even if the properties of the audio file
+        are read natively or from the cache.
+
+        :raises: :class:`~aeneas.ffprobewrapper.FFPROBEPathError`: if the path to the ``ffprobe`` executable cannot be found
+        """
+        ffprobe_path = self.rconf[RuntimeConfiguration.FFPROBE_PATH]
+        if ffprobe_path == self.DEFAULT_FFPROBE_PATH:
+            return
+        if os.path.dirname(ffprobe_path) == u"":
+            candidates = [os.path.join(d, ffprobe_path) for d in os.environ.get("PATH", u"").split(os.pathsep)]
+        else:
+            candidates = [ffprobe_path]
+        if not any([os.path.isfile(c) and os.access(c, os.X_OK) for c in candidates]):
+            self.log_exc(u"Unable to find the '%s' ffprobe executable" % (ffprobe_path), None, True, FFPROBEPathError)
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        Remove all the entries from the probe cache.
+        """
+        with cls._CACHE_LOCK:
+            cls._CACHE.clear()
+
+    @classmethod
+    def _cache_key(cls, audio_file_path):
+        """
+        Return the cache key for the given file,
+        or ``None`` if the file cannot be accessed.
+
+        :param string audio_file_path: the path of the audio file
+        :rtype: tuple
+        """
+        try:
+            stat = os.stat(audio_file_path)
+            return (os.path.abspath(audio_file_path), stat.st_size, stat.st_mtime)
+        except (IOError, OSError):
+            return None
+
+    @classmethod
+    def _cache_get(cls, key):
+        """
+        Return a copy of the properties stored for the given key,
+        or ``None`` if not present.
+
+        :param tuple key: the cache key
+        :rtype: dict
+        """
+        if key is None:
+            return None
+        with cls._CACHE_LOCK:
+            properties = cls._CACHE.pop(key, None)
+            if properties is None:
+                return None
+            # re-insert as the most recently used entry
+            cls._CACHE[key] = properties
+            return dict(properties)
+
+    @classmethod
+    def _cache_add(cls, key, properties):
+        """
+        Store a copy of the given properties for the given key,
+        removing the least recently used entry if the cache is full.
+
+        :param tuple key: the cache key
+        :param dict properties: the properties
+        """
+        if key is None:
+            return
+        with cls._CACHE_LOCK:
+            cls._CACHE.pop(key, None)
+            cls._CACHE[key] = dict(properties)
+            while len(cls._CACHE) > cls.CACHE_MAX_ENTRIES:
+                cls._CACHE.popitem(last=False)
+
+    def _read_properties_native(self, audio_file_path):
+        """
+        Parse the header of the given audio file,
+        returning the properties dictionary,
+        or ``None`` if the format is not recognized
+        or the header cannot be parsed.
+
+        :param string audio_file_path: the path of the audio file
+        :rtype: dict
+        """
+        try:
+            file_size = gf.file_size(audio_file_path)
+            with io.open(audio_file_path, "rb") as audio_file:
+                magic = audio_file.read(12)
+                if (magic[0:4] == b"RIFF") and (magic[8:12] == b"WAVE"):
+                    return self._probe_wave(audio_file, file_size)
+                if (magic[0:4] == b"FORM") and (magic[8:12] == b"AIFF"):
+                    return self._probe_aiff(audio_file)
+                # FLAC and MPEG audio files might begin with an ID3v2 tag
+                offset = self._id3v2_length(magic)
+                audio_file.seek(offset)
+                marker = audio_file.read(4)
+                if marker == b"fLaC":
+                    return self._probe_flac(audio_file)
+                if (offset == 0) and ((magic[4:8] == b"ftyp") or (magic[0:4] in [b"OggS", b"\x1aE\xdf\xa3"])):
+                    # MP4, Ogg, or Matroska/WebM container: leave it to ffprobe
+                    return None
+                return self._probe_mpeg(audio_file, file_size, offset)
+        except (IOError, OSError, ValueError, IndexError, struct.error) as exc:
+            self.log_exc(u"Error while parsing the header of '%s'" % (audio_file_path), exc, False, None)
+        return None
+
+    def _properties(self, codec_name, sample_rate, channels, duration):
+        """
+        Return the properties dictionary,
+        or ``None`` if any value is invalid.
+
+        :rtype: dict
+        """
+        if (codec_name is None) or (sample_rate <= 0) or (channels <= 0) or (duration is None) or (duration < 0):
+            return None
+        properties = {
+            FFPROBEWrapper.STDOUT_CHANNELS: u"%d" % channels,
+            FFPROBEWrapper.STDOUT_CODEC_NAME: codec_name,
+            FFPROBEWrapper.STDOUT_DURATION: duration,
+            FFPROBEWrapper.STDOUT_SAMPLE_RATE: u"%d" % sample_rate,
+        }
+        self.log([u"Properties: %s", properties])
+        return properties
+
+    @classmethod
+    def _id3v2_length(cls, header):
+        """
+        Return the length of the ID3v2 tag at the begin of the file,
+        or ``0`` if there is no ID3v2 tag.
+
+        :param bytes header: the first (at least 10) bytes of the file
+        :rtype: int
+        """
+        if (len(header) < 10) or (header[0:3] != b"ID3"):
+            return 0
+        flags = bytearray(header[5:6])[0]
+        size = 0
+        for byte in bytearray(header[6:10]):
+            size = (size << 7) | (byte & 0x7F)
+        footer = 10 if (flags & 0x10) else 0
+        return 10 + size + footer
+
+    def _probe_wave(self, audio_file, file_size):
+        """
+        Parse a WAVE (RIFF) header.
+        The file pointer must be after the ``RIFF????WAVE`` header.
+
+        :rtype: dict
+        """
+        fmt = None
+        while True:
+            chunk_header = audio_file.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id = chunk_header[0:4]
+            chunk_size = struct.unpack("<I", chunk_header[4:8])[0]
+            if chunk_id == b"fmt ":
+                chunk = audio_file.read(chunk_size)
+                if len(chunk) < 16:
+                    return None
+                tag, channels, sample_rate, byte_rate, block_align, bits = struct.unpack("<HHIIHH", chunk[0:16])
+                if (tag == 0xFFFE) and (len(chunk) >= 26):
+                    # WAVE_FORMAT_EXTENSIBLE: the format tag is in the sub format GUID
+                    tag = struct.unpack("<H", chunk[24:26])[0]
+                fmt = (tag, channels, sample_rate, block_align, bits)
+                # chunks are padded to an even size
+                audio_file.seek(chunk_size % 2, 1)
+            elif chunk_id == b"data":
+                if (fmt is None) or (fmt[3] == 0):
+                    return None
+                tag, channels, sample_rate, block_align, bits = fmt
+                # NOTE streamed WAVE files might have a bogus data size
+                data_size = min(chunk_size, file_size - audio_file.tell())
+                if data_size // block_align == 0:
+                    # NOTE leave files without samples to ffprobe, which rejects them
+                    return None
+                duration = TimeValue(data_size // block_align) / TimeValue(sample_rate)
+                return self._properties(self.WAVE_CODECS.get((tag, bits), None), sample_rate, channels, duration)
+            else:
+                # chunks are padded to an even size
+                audio_file.seek(chunk_size + (chunk_size % 2), 1)
+
+    def _probe_aiff(self, audio_file):
+        """
+        Parse an AIFF header.
+        The file pointer must be after the ``FORM????AIFF`` header.
+
+        :rtype: dict
+        """
+        while True:
+            chunk_header = audio_file.read(8)
+            if len(chunk_header) < 8:
+                return None
+            chunk_id = chunk_header[0:4]
+            chunk_size = struct.unpack(">I", chunk_header[4:8])[0]
+            if chunk_id == b"COMM":
+                chunk = audio_file.read(chunk_size)
+                if len(chunk) < 18:
+                    return None
+                channels, frames, bits = struct.unpack(">HIH", chunk[0:8])
+                sample_rate = int(round(self._extended_to_float(chunk[8:18])))
+                if (sample_rate <= 0) or (frames == 0):
+                    return None
+                duration = TimeValue(frames) / TimeValue(sample_rate)
+                return self._properties(self.AIFF_CODECS.get(bits, None), sample_rate, channels, duration)
+            # chunks are padded to an even size
+            audio_file.seek(chunk_size + (chunk_size % 2), 1)
+
+    @classmethod
+    def _extended_to_float(cls, data):
+        """
+        Convert an 80-bit IEEE 754 extended precision
+        (big endian) value into a float.
+
+        :param bytes data: the 10 bytes to convert
+        :rtype: float
+        """
+        exponent, mantissa = struct.unpack(">HQ", data)
+        sign = -1 if (exponent & 0x8000) else 1
+        exponent = (exponent & 0x7FFF) - 16383
+        return sign * mantissa * (2.0 ** (exponent - 63))
+
+    def _probe_flac(self, audio_file):
+        """
+        Parse a FLAC STREAMINFO metadata block.
+        The file pointer must be after the ``fLaC`` marker.
+
+        :rtype: dict
+        """
+        block_header = bytearray(audio_file.read(4))
+        if (len(block_header) < 4) or ((block_header[0] & 0x7F) != 0):
+            # STREAMINFO must be the first metadata block
+            return None
+        block = audio_file.read(34)
+        if len(block) < 34:
+            return None
+        value = struct.unpack(">Q", block[10:18])[0]
+        sample_rate = value >> 44
+        channels = ((value >> 41) & 0x07) + 1
+        total_samples = value & 0xFFFFFFFFF
+        if (sample_rate == 0) or (total_samples == 0):
+            # NOTE total_samples == 0 means unknown
+            return None
+        duration = TimeValue(total_samples) / TimeValue(sample_rate)
+        return self._properties(u"flac", sample_rate, channels, duration)
+
+    def _parse_mpeg_frame_header(self, header):
+        """
+        Parse the given 4-byte MPEG audio frame header,
+        returning a tuple
+        ``(version, layer, bitrate, sample_rate, channels, frame_length, samples_per_frame)``
+        or ``None`` if the header is not valid.
+
+        :param bytearray header: the frame header
+        :rtype: tuple
+        """
+        if (len(header) < 4) or (header[0] != 0xFF) or ((header[1] & 0xE0) != 0xE0):
+            return None
+        version = {0: 25, 2: 2, 3: 1}.get((header[1] >> 3) & 0x03, None)
+        layer = {1: 3, 2: 2, 3: 1}.get((header[1] >> 1) & 0x03, None)
+        bitrate_index = header[2] >> 4
+        sample_rate_index = (header[2] >> 2) & 0x03
+        if (version is None) or (layer is None) or (bitrate_index in [0, 15]) or (sample_rate_index == 3):
+            # NOTE free format (bitrate_index == 0) is not supported
+            return None
+        bitrate = self.MPEG_BITRATES[(min(version, 2), layer)][bitrate_index] * 1000
+        sample_rate = self.MPEG_SAMPLE_RATES[version][sample_rate_index]
+        padding = (header[2] >> 1) & 0x01
+        channels = 1 if ((header[3] >> 6) == 3) else 2
+        if layer == 1:
+            samples_per_frame = 384
+            frame_length = (12 * bitrate // sample_rate + padding) * 4
+        elif (layer == 3) and (version != 1):
+            samples_per_frame = 576
+            frame_length = 72 * bitrate // sample_rate + padding
+        else:
+            samples_per_frame = 1152
+            frame_length = 144 * bitrate // sample_rate + padding
+        return (version, layer, bitrate, sample_rate, channels, frame_length, samples_per_frame)
+
+    def _mpeg_frames_follow(self, data, position, frame):
+        """
+        Return ``True`` if the frame at ``position``
+        is followed by consistent frames
+        (same version, layer, and sample rate),
+        so that at least ``MPEG_MIN_FRAMES`` consecutive frames are found,
+        or the end of ``data`` is reached.
+
+        :rtype: bool
+        """
+        for i in range(1, self.MPEG_MIN_FRAMES):
+            position += frame[5]
+            if position + 4 > len(data):
+                return i > 1
+            next_frame = self._parse_mpeg_frame_header(data[position:position + 4])
+            if (next_frame is None) or (next_frame[0:2] != frame[0:2]) or (next_frame[3] != frame[3]):
+                return False
+            frame = next_frame
+        return True
+
+    def _probe_mpeg(self, audio_file, file_size, offset):
+        """
+        Parse an MPEG audio file (e.g., MP3),
+        reading the Xing/Info or VBRI header if present,
+        or estimating the duration from the bitrate otherwise
+        (as ``ffprobe`` does).
+
+        :rtype: dict
+        """
+        audio_file.seek(offset)
+        data = bytearray(audio_file.read(self.MPEG_MAX_SYNC_SEARCH))
+        # find the first frame followed by MPEG_MIN_FRAMES - 1 consistent frames
+        frame = None
+        position = 0
+        while position < len(data) - 4:
+            if data[position] == 0xFF:
+                frame = self._parse_mpeg_frame_header(data[position:position + 4])
+                if (frame is not None) and (self._mpeg_frames_follow(data, position, frame)):
+                    break
+                frame = None
+            position += 1
+        if frame is None:
+            return None
+        version, layer, bitrate, sample_rate, channels, frame_length, samples_per_frame = frame
+
+        # look for a Xing/Info header (offset depends on version and channels)
+        if version == 1:
+            side_info = 17 if channels == 1 else 32
+        else:
+            side_info = 9 if channels == 1 else 17
+        frames = None
+        xing = position + 4 + side_info
+        if data[xing:xing + 4] in [b"Xing", b"Info"]:
+            flags = struct.unpack(">I", bytes(data[xing + 4:xing + 8]))[0]
+            if flags & 0x01:
+                frames = struct.unpack(">I", bytes(data[xing + 8:xing + 12]))[0]
+        vbri = position + 4 + 32
+        if (frames is None) and (data[vbri:vbri + 4] == b"VBRI"):
+            frames = struct.unpack(">I", bytes(data[vbri + 14:vbri + 18]))[0]
+
+        if frames:
+            duration = TimeValue(frames * samples_per_frame) / TimeValue(sample_rate)
+        else:
+            # constant bitrate: estimate from the audio data size, excluding the ID3v1 tag
+            audio_size = file_size - (offset + position)
+            if file_size >= 128:
+                audio_file.seek(-128, 2)
+                if audio_file.read(3) == b"TAG":
+                    audio_size -= 128
+            duration = TimeValue(max(0, audio_size) * 8) / TimeValue(bitrate)
+        return self._properties(self.MPEG_CODECS[layer], sample_rate, channels, duration)
@@ -73,6 +73,7 @@ static PyObject *compute_best_path(PyObject *self, PyObject *args) {
     uint32_t l1, l2, n, m;
     struct PATH_CELL *best_path;
     uint32_t best_path_length;
+    const char *error_message = NULL;
 
     // O = object (do not convert or check for errors)
     // I = unsigned int
@@ -123,31 +124,24 @@ static PyObject *compute_best_path(PyObject *self, PyObject *args) {
     centers = (PyArrayObject *)PyArray_SimpleNew(1, centers_dimensions, NPY_UINT32);
     centers_ptr = (uint32_t *)PyArray_DATA(centers);
 
-    // actual computation
+    // actual computation, on C arrays only:
+    // release the GIL, so that other Python threads can run meanwhile
+    Py_BEGIN_ALLOW_THREADS
     if (_compute_cost_matrix(mfcc1_ptr, mfcc2_ptr, delta, cost_matrix_ptr, centers_ptr, n, m, l1) != CDTW_SUCCESS) {
-       Py_XDECREF(mfcc1);
-       Py_XDECREF(mfcc2);
-       Py_XDECREF(cost_matrix);
-       Py_XDECREF(centers);
-       PyErr_SetString(PyExc_ValueError, "Error while computing cost matrix");
-       return NULL;
-    }
-    
-    if (_compute_accumulated_cost_matrix_in_place(cost_matrix_ptr, centers_ptr, n, delta) != CDTW_SUCCESS) {
-       Py_XDECREF(mfcc1);
-       Py_XDECREF(mfcc2);
-       Py_XDECREF(cost_matrix);
-       Py_XDECREF(centers);
-       PyErr_SetString(PyExc_ValueError, "Error while computing accumulated cost matrix");
-       return NULL;
+        error_message = "Error while computing cost matrix";
+    } else if (_compute_accumulated_cost_matrix_in_place(cost_matrix_ptr, centers_ptr, n, delta) != CDTW_SUCCESS) {
+        error_message = "Error while computing accumulated cost matrix";
+    } else if (_compute_best_path(cost_matrix_ptr, centers_ptr, n, delta, &best_path, &best_path_length) != CDTW_SUCCESS) {
+        error_message = "Error while computing best path";
     }
-    
-    if (_compute_best_path(cost_matrix_ptr, centers_ptr, n, delta, &best_path, &best_path_length) != CDTW_SUCCESS) {
+    Py_END_ALLOW_THREADS
+
+    if (error_message != NULL) {
        Py_XDECREF(mfcc1);
        Py_XDECREF(mfcc2);
        Py_XDECREF(cost_matrix);
        Py_XDECREF(centers);
-       PyErr_SetString(PyExc_ValueError, "Error while computing best path");
+       PyErr_SetString(PyExc_ValueError, error_message);
        return NULL;
     }
 
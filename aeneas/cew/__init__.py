@@ -24,7 +24,7 @@
 """
 aeneas.cew is a Python C extension to synthesize text with eSpeak.
 
-The only function provided by this module is:
+The functions provided by this module are:
 
 .. function:: cew.synthesize_multiple(output_file_path, quit_after, backwards, text)
 
@@ -55,4 +55,26 @@ The only function provided by this module is:
                       The ``fragment_text`` must be UTF-8 encoded.
     :rtype: tuple
 
+.. function:: cew.synthesize_multiple_marks(output_file_path, quit_after, backwards, text)
+
+    Like ``cew.synthesize_multiple``, but send each run
+    of consecutive fragments with the same voice code
+    as a single SSML message, with a ``<mark>`` element
+    before each fragment, and read the begin time
+    of each fragment from its mark event.
+
+    Raise ``RuntimeError`` if the library does not report mark events.
+
+    .. versionadded:: 1.8.0
+
+The module also provides the string ``cew.engine``,
+the library it is linked against:
+``espeak`` (default) or ``espeak-ng``,
+if it has been built by setting the ``AENEAS_CEW_ESPEAK_NG=True``
+environment variable.
+:class:`~aeneas.ttswrappers.espeakttswrapper.ESPEAKTTSWrapper`
+calls ``cew`` only in the former case, and
+:class:`~aeneas.ttswrappers.espeakngttswrapper.ESPEAKNGTTSWrapper`
+only in the latter one.
+
 """
@@ -36,6 +36,12 @@ static float current_time;
 static float last_end_time;
 static int synth_flags;
 static int sample_rate;
+static long samples_written;
+
+// times of the mark events of the current synthesis,
+// indexed by the (numeric) mark name
+static float *mark_times = NULL;
+static size_t number_of_marks = 0;
 
 static FILE *wave_file = NULL;
 
@@ -131,11 +137,18 @@ int _synth_callback(short *wav, int numsamples, espeak_EVENT *events) {
             last_end_time = (1.0 * events->audio_position / 1000);
         } else if (events->type == espeakEVENT_WORD) {
             //printf("  word event at time: %.3f\n", 1.0 * events->audio_position / 1000);
+        } else if ((events->type == espeakEVENT_MARK) && (mark_times != NULL) && (events->id.name != NULL)) {
+            char *end;
+            unsigned long mark = strtoul(events->id.name, &end, 10);
+            if ((*end == 0) && (mark < number_of_marks)) {
+                mark_times[mark] = (1.0 * events->audio_position / 1000);
+            }
         }
 		events++;
 	}
 	if (numsamples > 0) {
 		fwrite(wav, numsamples * 2, 1, wave_file);
+        samples_written += numsamples;
 	}
     return CEW_SUCCESS;
 }
@@ -235,6 +248,7 @@ int _initialize_synthesizer(char const *output_file_path) {
     // reset time
     current_time = 0.0;
     last_end_time = 0.0;
+    samples_written = 0;
 
     return CEW_SUCCESS;
 }
@@ -328,5 +342,174 @@ int _synthesize_multiple(
     return CEW_SUCCESS;
 }
 
+// append the given text to the given buffer, escaping XML special characters,
+// and return the number of bytes appended
+// NOTE: the buffer must have room for 6 * strlen(text) bytes
+static size_t _append_escaped(char *buffer, char const *text) {
+    size_t length = 0;
+    for (; *text != 0; text++) {
+        switch (*text) {
+            case '&':
+                memcpy(buffer + length, "&amp;", 5);
+                length += 5;
+                break;
+            case '<':
+                memcpy(buffer + length, "&lt;", 4);
+                length += 4;
+                break;
+            case '>':
+                memcpy(buffer + length, "&gt;", 4);
+                length += 4;
+                break;
+            case '"':
+                memcpy(buffer + length, "&quot;", 6);
+                length += 6;
+                break;
+            case '\'':
+                memcpy(buffer + length, "&apos;", 6);
+                length += 6;
+                break;
+            default:
+                buffer[length] = *text;
+                length += 1;
+        }
+    }
+    return length;
+}
+
+// synthesize the fragments [run_start, run_end), which have the same voice code,
+// as a single SSML message, with a mark element before each fragment,
+// and set their begin and end times from the times of the mark events
+int _synthesize_run_marks(struct FRAGMENT_INFO *fragments, const size_t run_start, const size_t run_end) {
+    size_t i, size, position;
+    long run_samples;
+    float run_time;
+    char *ssml;
+
+    // NOTE: each character might be escaped as 6 bytes,
+    //       and each fragment needs a mark element and a space
+    size = 1;
+    for (i = run_start; i < run_end; ++i) {
+        size += 6 * strlen(fragments[i].text) + 32;
+    }
+    ssml = (char *)malloc(size);
+    number_of_marks = run_end - run_start;
+    mark_times = (float *)malloc(number_of_marks * sizeof(float));
+    if ((ssml == NULL) || (mark_times == NULL)) {
+        free((void *)ssml);
+        free((void *)mark_times);
+        mark_times = NULL;
+        number_of_marks = 0;
+        return CEW_FAILURE;
+    }
+    position = 0;
+    for (i = run_start; i < run_end; ++i) {
+        mark_times[i - run_start] = -1.0;
+        position += sprintf(ssml + position, "<mark name=\"%lu\"/>", (unsigned long)(i - run_start));
+        position += _append_escaped(ssml + position, fragments[i].text);
+        // NOTE: separate the text of consecutive fragments
+        ssml[position++] = ' ';
+    }
+    ssml[position] = 0;
+
+    run_samples = samples_written;
+    espeak_Synth(ssml, position + 1, 0, POS_CHARACTER, 0, synth_flags | espeakSSML, NULL, NULL);
+    free((void *)ssml);
+    if (espeak_Synchronize() != EE_OK) {
+        free((void *)mark_times);
+        mark_times = NULL;
+        number_of_marks = 0;
+        return CEW_FAILURE;
+    }
+    run_samples = samples_written - run_samples;
+    run_time = (sample_rate > 0) ? (1.0 * run_samples / sample_rate) : last_end_time;
+
+    // NOTE: a missing mark event means the espeak library does not support them
+    for (i = run_start; i < run_end; ++i) {
+        if (mark_times[i - run_start] < 0) {
+            free((void *)mark_times);
+            mark_times = NULL;
+            number_of_marks = 0;
+            return CEW_FAILURE;
+        }
+        fragments[i].begin = current_time + mark_times[i - run_start];
+        if ((i > run_start) && (fragments[i].begin < fragments[i - 1].begin)) {
+            fragments[i].begin = fragments[i - 1].begin;
+        }
+    }
+    for (i = run_start; i < run_end; ++i) {
+        fragments[i].end = (i + 1 < run_end) ? fragments[i + 1].begin : current_time + run_time;
+    }
+    current_time += run_time;
 
+    free((void *)mark_times);
+    mark_times = NULL;
+    number_of_marks = 0;
+    return CEW_SUCCESS;
+}
 
+// synthesize multiple fragments, batching consecutive fragments
+// with the same voice code into a single SSML message
+int _synthesize_multiple_marks(
+        const char *output_file_path,
+        struct FRAGMENT_INFO **fragments_ret,
+        const size_t number_of_fragments,
+        const float quit_after,
+        const int backwards,
+        int *sample_rate_ret,
+        size_t *synthesized_ret
+    ) {
+
+    size_t run_start, run_end, synthesized;
+
+    if (quit_after > 0) {
+        // NOTE: stop at the first fragment reaching quit_after,
+        //       not at the end of a (possibly long) run of fragments
+        return _synthesize_multiple(
+            output_file_path,
+            fragments_ret,
+            number_of_fragments,
+            quit_after,
+            backwards,
+            sample_rate_ret,
+            synthesized_ret
+        );
+    }
+
+    // open output wave file
+    if (_initialize_synthesizer(output_file_path) != CEW_SUCCESS) {
+        return CEW_FAILURE;
+    }
+
+    // number of synthesized fragments
+    synthesized = 0;
+
+    // loop over all runs of fragments with the same voice code
+    // NOTE: quit_after <= 0 here, hence all the fragments are synthesized
+    run_start = 0;
+    while (run_start < number_of_fragments) {
+        run_end = run_start + 1;
+        while ((run_end < number_of_fragments) && (strcmp((*fragments_ret)[run_end].voice_code, (*fragments_ret)[run_start].voice_code) == 0)) {
+            run_end++;
+        }
+        if (_set_voice_code((*fragments_ret)[run_start].voice_code) != CEW_SUCCESS) {
+            _terminate_synthesis();
+            return CEW_FAILURE;
+        }
+        if (_synthesize_run_marks(*fragments_ret, run_start, run_end) != CEW_SUCCESS) {
+            _terminate_synthesis();
+            return CEW_FAILURE;
+        }
+        synthesized = run_end;
+        run_start = run_end;
+    }
+
+    // close output wave file
+    _terminate_synthesis();
+
+    // save values to be returned
+    *sample_rate_ret = sample_rate;
+    *synthesized_ret = synthesized;
+
+    return CEW_SUCCESS;
+}
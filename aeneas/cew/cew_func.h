@@ -63,5 +63,35 @@ int _synthesize_multiple(
     size_t *synthesized_ret
 );
 
+/*
+    Synthesize multiple text fragments,
+    as _synthesize_multiple() does,
+    but sending each run of consecutive fragments
+    with the same voice code to eSpeak as a single SSML message,
+    where each fragment is preceded by a mark element.
+
+    The begin time of each fragment is the time
+    of the corresponding mark event,
+    and its end time is the begin time of the next fragment
+    (or the end of the message).
+
+    If quit_after > 0, the fragments are synthesized
+    by _synthesize_multiple(), which can stop
+    at the first fragment reaching >= quit_after seconds,
+    while a run of fragments can be arbitrarily long.
+
+    If the eSpeak library does not report the mark events,
+    CEW_FAILURE is returned.
+*/
+int _synthesize_multiple_marks(
+    const char *output_file_path,
+    struct FRAGMENT_INFO **fragments_ret,
+    const size_t number_of_fragments,
+    const float quit_after,
+    const int backwards,
+    int *sample_rate_ret, // int because the espeak lib returns it as such
+    size_t *synthesized_ret
+);
+
 
 
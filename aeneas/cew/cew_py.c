@@ -33,7 +33,22 @@ Python C Extension for synthesizing text with eSpeak
 #include "speak_lib.h"
 #include "cew_func.h"
 
-static PyObject *synthesize_multiple(PyObject *self, PyObject *args) {
+// the library cew is linked against, "espeak" or "espeak-ng",
+// exposed as cew.engine (setup.py defines it when building against eSpeak-ng)
+#ifndef CEW_ENGINE
+#define CEW_ENGINE "espeak"
+#endif
+
+// synthesize multiple fragments with the given C function
+static PyObject *_synthesize_multiple_with(PyObject *args, int (*synthesize)(
+        const char *,
+        struct FRAGMENT_INFO **,
+        const size_t,
+        const float,
+        const int,
+        int *,
+        size_t *
+    )) {
     PyObject *tuple;
     PyObject *anchors;
     PyObject *fragments;
@@ -84,7 +99,7 @@ static PyObject *synthesize_multiple(PyObject *self, PyObject *args) {
     Py_DECREF(fragments);
 
     // synthesize multiple
-    if (_synthesize_multiple(
+    if (synthesize(
                 output_file_path,
                 &fragments_synt,
                 number_of_fragments,
@@ -129,6 +144,14 @@ static PyObject *synthesize_multiple(PyObject *self, PyObject *args) {
     return tuple;
 }
 
+static PyObject *synthesize_multiple(PyObject *self, PyObject *args) {
+    return _synthesize_multiple_with(args, _synthesize_multiple);
+}
+
+static PyObject *synthesize_multiple_marks(PyObject *self, PyObject *args) {
+    return _synthesize_multiple_with(args, _synthesize_multiple_marks);
+}
+
 static PyMethodDef cew_methods[] = {
     {
         "synthesize_multiple",
@@ -141,6 +164,19 @@ static PyMethodDef cew_methods[] = {
         ":param list fragments: list of (voice_code, text) tuples of text fragments to be synthesized\n"
         ":rtype: tuple (sample_rate, synthesized, list) where list is a list of (begin, end) time values"
     },
+    {
+        "synthesize_multiple_marks",
+        synthesize_multiple_marks,
+        METH_VARARGS,
+        "Synthesize multiple text fragments with eSpeak, sending consecutive fragments\n"
+        "with the same voice code as a single SSML message with mark elements,\n"
+        "and reading the begin time of each fragment from its mark event\n"
+        ":param string output_file_path: the path of the WAVE file to be created\n"
+        ":param float quit_after: if > 0, stop synthesizing when reaching quit_after seconds\n"
+        ":param int backwards: if 1, synthesize backwards, from the last fragment to the first\n"
+        ":param list fragments: list of (voice_code, text) tuples of text fragments to be synthesized\n"
+        ":rtype: tuple (sample_rate, synthesized, list) where list is a list of (begin, end) time values"
+    },
     {
         NULL,
         NULL,
@@ -173,6 +209,13 @@ static PyObject *moduleinit(void) {
     m = Py_InitModule("cew", cew_methods);
 #endif
 
+    if ((m != NULL) && (PyModule_AddStringConstant(m, "engine", CEW_ENGINE) < 0)) {
+#if PY_MAJOR_VERSION >= 3
+        Py_DECREF(m);
+#endif
+        return NULL;
+    }
+
     return m;
 }
 
@@ -26,7 +26,11 @@ This module contains the following classes:
 
 * :class:`aeneas.cewsubprocess.CEWSubprocess` which is an
   helper class executes the :mod:`aeneas.cew` C extension
-  in a separate process via ``subprocess``.
+  in a separate process via ``subprocess``;
+* :class:`aeneas.cewsubprocess.CEWWorker`,
+  a long-lived process serving calls to :mod:`aeneas.cew`;
+* :class:`aeneas.cewsubprocess.CEWWorkerPool`,
+  a pool of :class:`aeneas.cewsubprocess.CEWWorker` objects.
 
 This module works around a problem with the ``eSpeak`` library,
 which seems to generate different audio data for the same
@@ -44,11 +48,15 @@ See the following discussions for details:
 from __future__ import absolute_import
 from __future__ import print_function
 import io
+import json
+import os
+import struct
 import subprocess
 import sys
 
 from aeneas.exacttiming import TimeValue
 from aeneas.logger import Loggable
+from aeneas.processpool import ProcessPool
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 import aeneas.globalfunctions as gf
 
@@ -58,7 +66,10 @@ class CEWSubprocess(Loggable):
     This helper class executes the ``aeneas.cew`` C extension
     in a separate process by running
     the :func:`aeneas.cewsubprocess.CEWSubprocess.main` function
-    via ``subprocess``.
+    via ``subprocess``,
+    or, if ``cew_subprocess_workers`` is greater than ``0``,
+    by a worker of a shared
+    :class:`~aeneas.cewsubprocess.CEWWorkerPool`.
 
     :param rconf: a runtime configuration
     :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
@@ -84,6 +95,16 @@ class CEWSubprocess(Loggable):
         self.log([u"c_quit_after: '%.3f'", c_quit_after])
         self.log([u"c_backwards: '%d'", c_backwards])
 
+        workers = self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_WORKERS]
+        if workers > 0:
+            self.log([u"Calling a worker of a pool of %d", workers])
+            pool = CEWWorkerPool.get(
+                self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_PATH],
+                workers,
+                self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_WORKER_MAX_REQUESTS]
+            )
+            return pool.synthesize_multiple(audio_file_path, c_quit_after, c_backwards, u_text)
+
         text_file_handler, text_file_path = gf.tmp_file()
         data_file_handler, data_file_path = gf.tmp_file()
         self.log([u"Temporary text file path: '%s'", text_file_path])
@@ -133,12 +154,442 @@ class CEWSubprocess(Loggable):
 
         return (sr, sf, intervals)
 
+    def synthesize_multiple_data(self, c_quit_after, c_backwards, u_text):
+        """
+        Synthesize the text contained in the given fragment list,
+        and return the synthesized audio data,
+        as PCM16 mono samples (little-endian, without header).
+
+        If ``cew_subprocess_workers`` is greater than ``0``,
+        the audio data is sent back by the worker,
+        and no file is written to disk.
+        Otherwise, it is read from a temporary ``wav`` file.
+
+        :param float c_quit_after: stop synthesizing as soon as
+                                   reaching this many seconds
+        :param bool c_backwards: synthesizing from the end of the text file
+        :param object u_text: a list of ``(voice_code, text)`` tuples
+        :rtype: tuple ``(sample_rate, synthesized, intervals, data)``
+
+        .. versionadded:: 1.8.0
+        """
+        workers = self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_WORKERS]
+        if workers > 0:
+            self.log([u"Calling a worker of a pool of %d", workers])
+            pool = CEWWorkerPool.get(
+                self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_PATH],
+                workers,
+                self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_WORKER_MAX_REQUESTS]
+            )
+            return pool.synthesize_multiple_data(c_quit_after, c_backwards, u_text)
+
+        handler, audio_file_path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
+        try:
+            sr, sf, intervals = self.synthesize_multiple(audio_file_path, c_quit_after, c_backwards, u_text)
+            with io.open(audio_file_path, "rb") as audio_file:
+                data = _pcm_data(audio_file.read())
+        finally:
+            gf.delete_file(handler, audio_file_path)
+        return (sr, sf, intervals, data)
+
+
+class CEWWorker(Loggable):
+    """
+    A long-lived process running
+    the :func:`aeneas.cewsubprocess.serve` function,
+    which loads ``aeneas.cew`` once,
+    and then serves calls to it.
+
+    Requests and responses are exchanged
+    over the standard input and output of the process,
+    as frames written by :func:`aeneas.cewsubprocess.write_frame`.
+
+    :param string python_path: the path to the python executable
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    TAG = u"CEWWorker"
+
+    def __init__(self, python_path, rconf=None, logger=None):
+        super(CEWWorker, self).__init__(rconf=rconf, logger=logger)
+        self.python_path = python_path
+        self.process = None
+        self.requests = 0
+
+    @property
+    def alive(self):
+        """
+        Return ``True`` if the worker process is running.
+
+        :rtype: bool
+        """
+        return (self.process is not None) and (self.process.poll() is None)
+
+    @property
+    def started(self):
+        """
+        Return ``True`` if the worker process has been started,
+        even if it crashed afterwards.
+
+        :rtype: bool
+        """
+        return self.process is not None
+
+    def start(self):
+        """
+        Start the worker process.
+
+        :raises: OSError: if the worker process cannot be started
+        """
+        arguments = [self.python_path, "-m", "aeneas.cewsubprocess", "--worker"]
+        self.log([u"Starting worker with arguments '%s'", u" ".join(arguments)])
+        with io.open(os.devnull, "wb") as devnull:
+            self.process = subprocess.Popen(
+                arguments,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=devnull
+            )
+        self.requests = 0
+
+    def request(self, request):
+        """
+        Send the given request to the worker process,
+        and return its response.
+
+        :param dict request: the request
+        :rtype: dict
+        :raises: OSError: if the worker process crashed
+        """
+        try:
+            write_frame(self.process.stdin, request)
+            response = read_frame(self.process.stdout)
+        except (IOError, OSError, EOFError, ValueError) as exc:
+            self.log_exc(u"The worker process did not respond", exc, False, None)
+            raise OSError(u"The worker process did not respond")
+        self.requests += 1
+        return response
+
+    def stop(self):
+        """
+        Stop the worker process, if running.
+        """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except (IOError, OSError):
+            pass
+        # NOTE the worker process exits when its input is closed,
+        #      but it might hang if it crashed while serving a call
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+
+class CEWWorkerPool(ProcessPool):
+    """
+    A pool of :class:`aeneas.cewsubprocess.CEWWorker` objects,
+    serving concurrent calls to ``aeneas.cew``.
+
+    Worker processes are started when needed,
+    and started again if they crash while serving a call,
+    which is then retried once.
+
+    Pools are shared by all the callers in the current process,
+    see :func:`aeneas.processpool.ProcessPool.get`,
+    and their worker processes are stopped
+    when the current process exits.
+
+    :param string python_path: the path to the python executable
+    :param int size: the maximum number of worker processes
+    :param int max_requests: replace a worker process after it served
+                             this many calls (``0`` for never)
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    PROCESS_NAME = u"worker"
+
+    TAG = u"CEWWorkerPool"
+
+    def __init__(self, python_path, size, max_requests=0, rconf=None, logger=None):
+        super(CEWWorkerPool, self).__init__(size=size, max_requests=max_requests, rconf=rconf, logger=logger)
+        self.python_path = python_path
+
+    def synthesize_multiple(self, audio_file_path, c_quit_after, c_backwards, u_text):
+        """
+        Synthesize the text contained in the given fragment list
+        into a ``wav`` file, using a worker process.
+
+        :param string audio_file_path: the path to the output audio file
+        :param float c_quit_after: stop synthesizing as soon as
+                                   reaching this many seconds
+        :param bool c_backwards: synthesizing from the end of the text file
+        :param object u_text: a list of ``(voice_code, text)`` tuples
+        :rtype: tuple ``(sample_rate, synthesized, intervals)``
+        :raises: OSError: if the worker process crashed twice
+        :raises: RuntimeError: if ``aeneas.cew`` failed
+        """
+        response = self._synthesize(gf.safe_unicode(audio_file_path), c_quit_after, c_backwards, u_text)
+        intervals = [(TimeValue(b), TimeValue(e)) for b, e in response[u"intervals"]]
+        return (response[u"sr"], response[u"sf"], intervals)
+
+    def synthesize_multiple_data(self, c_quit_after, c_backwards, u_text):
+        """
+        Synthesize the text contained in the given fragment list,
+        using a worker process,
+        and return the synthesized audio data,
+        as PCM16 mono samples (little-endian, without header),
+        sent back by the worker without writing a file.
+
+        :param float c_quit_after: stop synthesizing as soon as
+                                   reaching this many seconds
+        :param bool c_backwards: synthesizing from the end of the text file
+        :param object u_text: a list of ``(voice_code, text)`` tuples
+        :rtype: tuple ``(sample_rate, synthesized, intervals, data)``
+        :raises: OSError: if the worker process crashed twice
+        :raises: RuntimeError: if ``aeneas.cew`` failed
+
+        .. versionadded:: 1.8.0
+        """
+        response = self._synthesize(None, c_quit_after, c_backwards, u_text)
+        intervals = [(TimeValue(b), TimeValue(e)) for b, e in response[u"intervals"]]
+        return (response[u"sr"], response[u"sf"], intervals, response[u"data"])
+
+    def _synthesize(self, audio_file_path, c_quit_after, c_backwards, u_text):
+        """
+        Send a synthesis request to a worker process,
+        and return its response.
+
+        :rtype: dict
+        """
+        request = {
+            "audio_file_path": audio_file_path,
+            "quit_after": c_quit_after,
+            "backwards": c_backwards,
+            "text": [[gf.safe_unicode(v), gf.safe_unicode(t)] for v, t in u_text],
+        }
+        response = self._call(request)
+        if u"error" in response:
+            self.log_exc(u"An unexpected error occurred in aeneas.cew: %s" % (response[u"error"]), None, True, RuntimeError)
+        return response
+
+    def _new_process(self):
+        return CEWWorker(self.python_path, rconf=self.rconf, logger=self.logger)
+
+    def _serve(self, process, request):
+        return process.request(request)
+
+
+def write_frame(stream, obj, data=None):
+    """
+    Write the given JSON-serializable object to the given binary stream,
+    as a frame made of its UTF-8 encoded JSON representation,
+    preceded by its length, as a 4-byte big-endian unsigned integer.
+
+    If ``data`` is not ``None``, ``obj`` must be a dictionary:
+    its length is stored with key ``data_length``,
+    and ``data`` is written as it is, right after the object.
+
+    :param stream: the binary stream
+    :param obj: the object
+    :param bytes data: the binary data, or ``None``
+    """
+    if data is not None:
+        obj = dict(obj)
+        obj["data_length"] = len(data)
+    payload = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    stream.write(struct.pack(">I", len(payload)) + payload)
+    if data is not None:
+        stream.write(data)
+    stream.flush()
+
+
+def read_frame(stream):
+    """
+    Read a frame written by :func:`aeneas.cewsubprocess.write_frame`
+    from the given binary stream, and return its object.
+
+    If the frame has binary data,
+    it is stored in the returned dictionary with key ``data``.
+
+    :param stream: the binary stream
+    :rtype: object
+    :raises: EOFError: if the stream ends before the frame is complete
+    """
+    def read_exactly(length):
+        data = b""
+        while len(data) < length:
+            chunk = stream.read(length - len(data))
+            if not chunk:
+                raise EOFError(u"The stream ended before the frame was complete")
+            data += chunk
+        return data
+    length = struct.unpack(">I", read_exactly(4))[0]
+    obj = json.loads(read_exactly(length).decode("utf-8"))
+    if isinstance(obj, dict) and (u"data_length" in obj):
+        obj[u"data"] = read_exactly(obj.pop(u"data_length"))
+    return obj
+
+
+def _memory_file():
+    """
+    Return a ``(handler, path)`` tuple of a new file
+    which ``aeneas.cew`` can write to,
+    backed by memory if the platform allows it
+    (i.e., Linux with Python 3.8 or later),
+    or a temporary file otherwise.
+
+    :rtype: tuple
+    """
+    if hasattr(os, "memfd_create") and os.path.isdir(u"/proc/self/fd"):
+        handler = os.memfd_create("cew")
+        return (handler, u"/proc/self/fd/%d" % handler)
+    return gf.tmp_file(suffix=u".wav")
+
+
+def _delete_memory_file(handler, path):
+    """
+    Delete a file returned by :func:`aeneas.cewsubprocess._memory_file`.
+
+    :param object handler: the file handler
+    :param string path: the file path
+    """
+    if path.startswith(u"/proc/self/fd/"):
+        # NOTE closing it frees the memory
+        gf.close_file_handler(handler)
+    else:
+        gf.delete_file(handler, path)
+
+
+def _pcm_data(wave_data):
+    """
+    Return the PCM16 samples in the given WAVE data written by ``aeneas.cew``.
+
+    :param bytes wave_data: the WAVE data
+    :rtype: bytes
+    :raises: ValueError: if ``wave_data`` is not PCM16 mono WAVE data
+    """
+    from aeneas.audiofile import AudioFile
+    return AudioFile._parse_wave_data(wave_data)[1].tobytes()
+
+
+def _c_text(s_text):
+    """
+    Convert the given list of ``(voice_code, text)`` tuples
+    to bytes/unicode, as required by ``aeneas.cew``.
+    """
+    if gf.PY2:
+        return [(gf.safe_bytes(f_voice_code), gf.safe_bytes(f_text)) for f_voice_code, f_text in s_text]
+    return [(gf.safe_unicode(f_voice_code), gf.safe_unicode(f_text)) for f_voice_code, f_text in s_text]
+
+
+def _cew_synthesize_multiple(audio_file_path, c_quit_after, c_backwards, s_text):
+    """
+    Call ``aeneas.cew``, importing it the first time.
+    """
+    import aeneas.cew.cew
+    return aeneas.cew.cew.synthesize_multiple(
+        audio_file_path,
+        c_quit_after,
+        c_backwards,
+        _c_text(s_text)
+    )
+
+
+def serve(input_stream, output_stream, function=_cew_synthesize_multiple):
+    """
+    Serve the requests read from ``input_stream``
+    by calling ``function``,
+    and write the responses to ``output_stream``,
+    until ``input_stream`` ends.
+
+    A request is a dictionary with keys
+    ``audio_file_path``, ``quit_after``, ``backwards``, and ``text``
+    (a list of ``[voice_code, text]`` pairs),
+    and a response is a dictionary with keys
+    ``sr``, ``sf``, and ``intervals``
+    (a list of ``[begin, end]`` pairs of strings),
+    or with key ``error``.
+
+    If ``audio_file_path`` is ``None``,
+    the audio is synthesized into a memory-backed file,
+    if the platform allows it,
+    and the response carries the PCM16 samples
+    as the binary data of its frame,
+    so that no file is written to disk.
+
+    :param input_stream: the binary stream to read requests from
+    :param output_stream: the binary stream to write responses to
+    :param function: the function synthesizing the text
+    """
+    while True:
+        try:
+            request = read_frame(input_stream)
+        except EOFError:
+            return
+        audio_file_path = request[u"audio_file_path"]
+        handler = None
+        data = None
+        try:
+            if audio_file_path is None:
+                handler, audio_file_path = _memory_file()
+            sr, sf, intervals = function(
+                audio_file_path,
+                float(request[u"quit_after"]),
+                int(request[u"backwards"]),
+                [(v, t) for v, t in request[u"text"]]
+            )
+            if handler is not None:
+                with io.open(audio_file_path, "rb") as audio_file:
+                    data = _pcm_data(audio_file.read())
+            response = {
+                "sr": sr,
+                "sf": sf,
+                "intervals": [[u"%.3f" % i[0], u"%.3f" % i[1]] for i in intervals],
+            }
+        except Exception as exc:
+            response = {"error": u"%s" % exc}
+            data = None
+        finally:
+            if handler is not None:
+                _delete_memory_file(handler, audio_file_path)
+        write_frame(output_stream, response, data)
+
+
+def main_worker():
+    """
+    Run ``aeneas.cew`` in a worker process,
+    serving the requests read from standard input,
+    and writing the responses to standard output.
+    """
+    # NOTE keep a private copy of standard output for the responses,
+    #      and redirect anything else written to it to standard error
+    output_stream = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    input_stream = getattr(sys.stdin, "buffer", sys.stdin)
+    serve(input_stream, output_stream)
+    output_stream.close()
+    return 0
+
 
 def main():
     """
     Run ``aeneas.cew``, reading input text from file and writing audio and interval data to file.
     """
 
+    # run as a long-lived worker
+    if (len(sys.argv) > 1) and (sys.argv[1] == "--worker"):
+        return main_worker()
+
     # make sure we have enough parameters
     if len(sys.argv) < 6:
         print("You must pass five arguments: QUIT_AFTER BACKWARDS TEXT_FILE_PATH AUDIO_FILE_PATH DATA_FILE_PATH")
@@ -163,22 +614,12 @@ def main():
                 f_text = line[(idx + 1):]
                 s_text.append((f_voice_code, f_text))
 
-    # convert to bytes/unicode as required by subprocess
-    c_text = []
-    if gf.PY2:
-        for f_voice_code, f_text in s_text:
-            c_text.append((gf.safe_bytes(f_voice_code), gf.safe_bytes(f_text)))
-    else:
-        for f_voice_code, f_text in s_text:
-            c_text.append((gf.safe_unicode(f_voice_code), gf.safe_unicode(f_text)))
-
     try:
-        import aeneas.cew.cew
-        sr, sf, intervals = aeneas.cew.cew.synthesize_multiple(
+        sr, sf, intervals = _cew_synthesize_multiple(
             audio_file_path,
             c_quit_after,
             c_backwards,
-            c_text
+            s_text
         )
         with io.open(data_file_path, "w", encoding="utf-8") as data:
             data.write(u"%d\n" % (sr))
@@ -51,6 +51,7 @@ static PyObject *compute_from_data(PyObject *self, PyObject *args) {
     npy_intp mfcc_dimensions[2];
     double *data_ptr, *mfcc_ptr;
     uint32_t data_length, mfcc_length;
+    int status;
 
     // O = object (do not convert or check for errors)
     // I = uint32_teger
@@ -82,8 +83,10 @@ static PyObject *compute_from_data(PyObject *self, PyObject *args) {
     // number of audio samples in data (= duration in seconds * sample_rate)
     data_length = (uint32_t)PyArray_DIMS(data)[0];
 
-    // compute MFCC matrix
-    if (compute_mfcc_from_data(
+    // compute MFCC matrix, on C arrays only:
+    // release the GIL, so that other Python threads can run meanwhile
+    Py_BEGIN_ALLOW_THREADS
+    status = compute_mfcc_from_data(
         data_ptr,
         data_length,
         sample_rate,
@@ -96,8 +99,10 @@ static PyObject *compute_from_data(PyObject *self, PyObject *args) {
         window_length,
         window_shift,
         &mfcc_ptr,
-        &mfcc_length) != CMFCC_SUCCESS
-    ) {
+        &mfcc_length
+    );
+    Py_END_ALLOW_THREADS
+    if (status != CMFCC_SUCCESS) {
         // failed
         PyErr_SetString(PyExc_ValueError, "Error while calling compute_mfcc_from_data()");
         Py_XDECREF(data);
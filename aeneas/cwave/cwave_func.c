@@ -262,6 +262,12 @@ int wave_read_double(
         } else {
             read = fread(buffer, bytes_per_sample, remaining, ptr);
         }
+        if (read == 0) {
+            // truncated file: avoid looping forever
+            free((void *)buffer);
+            buffer = NULL;
+            return CWAVE_FAILURE;
+        }
         for (i = 0; i < read; ++i) {
             dest[j++] = _le_to_double(buffer + i * bytes_per_sample, bytes_per_sample);
         }
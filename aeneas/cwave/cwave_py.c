@@ -75,7 +75,6 @@ static PyObject *read_audio_data(PyObject *self, PyObject *args) {
     struct WAVE_INFO audio_info;
     uint32_t from_sample, num_samples, total_samples; // a WAVE file cannot have more than 2^32 samples
     uint32_t sample_rate;                             // sample_rate is a uint32_t in the WAVE header
-    double *buffer;                                   // this buffer will store the data read
 
     // s = string
     // I = unsigned int
@@ -96,22 +95,28 @@ static PyObject *read_audio_data(PyObject *self, PyObject *args) {
         num_samples = total_samples;
     }
     if (from_sample + num_samples > total_samples) {
+        wave_close(audio_file_ptr);
         PyErr_SetString(PyExc_ValueError, "Error while reading WAVE data: wrong index or length");
         return NULL;
     }
-    buffer = (double *)calloc(num_samples, sizeof(double));
-    if (wave_read_double(audio_file_ptr, &audio_info, buffer, from_sample, num_samples) != CWAVE_SUCCESS) {
+
+    // create the array to be returned, and read the data directly into it,
+    // so that NumPy owns (and eventually frees) the memory
+    audio_data_dimensions[0] = num_samples;
+    audio_data = (PyArrayObject *)PyArray_SimpleNew(1, audio_data_dimensions, NPY_DOUBLE);
+    if (audio_data == NULL) {
+        wave_close(audio_file_ptr);
+        PyErr_SetString(PyExc_MemoryError, "Error while allocating the array of samples");
+        return NULL;
+    }
+    if (wave_read_double(audio_file_ptr, &audio_info, (double *)PyArray_DATA(audio_data), from_sample, num_samples) != CWAVE_SUCCESS) {
         wave_close(audio_file_ptr);
+        Py_DECREF(audio_data);
         PyErr_SetString(PyExc_ValueError, "Error while reading WAVE data: unable to read data");
         return NULL;
     }
     wave_close(audio_file_ptr);
 
-    // build the array to be returned
-    // create data object
-    audio_data_dimensions[0] = num_samples;
-    audio_data = (PyArrayObject *)PyArray_SimpleNewFromData(1, audio_data_dimensions, NPY_DOUBLE, buffer);
-
     // build the tuple to be returned
     tuple = PyTuple_New(2);
     PyTuple_SetItem(tuple, 0, Py_BuildValue("I", sample_rate));
@@ -242,6 +242,23 @@ class Diagnostics(object):
         gf.print_info(u"  Please refer to the installation documentation for details")
         return True
 
+    @classmethod
+    def check_cwave(cls):
+        """
+        Check whether Python C extension ``cwave`` can be imported.
+
+        Return ``True`` on failure and ``False`` on success.
+
+        :rtype: bool
+        """
+        if gf.can_run_c_extension("cwave"):
+            gf.print_success(u"aeneas.cwave   AVAILABLE")
+            return False
+        gf.print_warning(u"aeneas.cwave   NOT AVAILABLE")
+        gf.print_info(u"  You can still run aeneas but it will be a bit slower")
+        gf.print_info(u"  Please refer to the installation documentation for details")
+        return True
+
     @classmethod
     def check_all(cls, tools=True, encoding=True, c_ext=True):
         """
@@ -273,6 +290,7 @@ class Diagnostics(object):
             c_ext_warnings = cls.check_cdtw() or c_ext_warnings
             c_ext_warnings = cls.check_cmfcc() or c_ext_warnings
             c_ext_warnings = cls.check_cew() or c_ext_warnings
+            c_ext_warnings = cls.check_cwave() or c_ext_warnings
         # return results
         return (False, warnings, c_ext_warnings)
 
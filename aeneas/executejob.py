@@ -24,6 +24,8 @@
 """
 This module contains the following classes:
 
+* :class:`~aeneas.executejob.AudioPredecoder`,
+  a class to decode the audio files of the tasks of a job in advance;
 * :class:`~aeneas.executejob.ExecuteJob`, a class to process a job;
 * :class:`~aeneas.executejob.ExecuteJobExecutionError`,
 * :class:`~aeneas.executejob.ExecuteJobInputError`, and
@@ -33,14 +35,26 @@ This module contains the following classes:
 
 from __future__ import absolute_import
 from __future__ import print_function
+import copy
+import multiprocessing
+import pickle
+import threading
+import traceback
 
 from aeneas.analyzecontainer import AnalyzeContainer
+from aeneas.audiofile import AudioFile
+from aeneas.audioprobe import AudioProbe
 from aeneas.container import Container
 from aeneas.container import ContainerFormat
+from aeneas.exacttiming import TimeValue
 from aeneas.executetask import ExecuteTask
+from aeneas.ffmpegwrapper import FFMPEGWrapper
+from aeneas.ffprobewrapper import FFPROBEWrapper
 from aeneas.job import Job
 from aeneas.logger import Loggable
+from aeneas.logger import Logger
 from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.task import Task
 import aeneas.globalfunctions as gf
 
 
@@ -88,6 +102,13 @@ class ExecuteJob(Loggable):
     created by :func:`~aeneas.executejob.ExecuteJob.load_job_from_container`
     when creating the job object.
 
+    The failure of a task does not stop the execution of the others:
+    after executing all the tasks,
+    :func:`~aeneas.executejob.ExecuteJob.execute` raises
+    if any of them failed, recording the failures in ``failures``,
+    and :func:`~aeneas.executejob.ExecuteJob.write_output_container`
+    can still output the sync maps of the tasks which succeeded.
+
     :param job: the job to be executed
     :type  job: :class:`~aeneas.job.Job`
     :param rconf: a runtime configuration
@@ -104,6 +125,7 @@ class ExecuteJob(Loggable):
         self.job = job
         self.working_directory = None
         self.tmp_directory = None
+        self.failures = []
         if job is not None:
             self.load_job(self.job)
 
@@ -154,7 +176,7 @@ class ExecuteJob(Loggable):
                 self.working_directory,
                 logger=self.logger
             )
-            analyzer = AnalyzeContainer(working_container, logger=self.logger)
+            analyzer = AnalyzeContainer(working_container, rconf=self.rconf, logger=self.logger)
             self.job = analyzer.analyze(config_string=config_string)
             self.log(u"Creating job from working directory... done")
         except Exception as exc:
@@ -191,7 +213,13 @@ class ExecuteJob(Loggable):
         Each produced sync map will be stored
         inside the corresponding task object.
 
-        :raises: :class:`~aeneas.executejob.ExecuteJobExecutionError`: if there is a problem during the job execution
+        Each task which failed is recorded in ``self.failures``
+        as a tuple ``(task, exception, traceback)``,
+        where ``traceback`` is the formatted traceback
+        of the exception, even if raised in a worker process.
+
+        :raises: :class:`~aeneas.executejob.ExecuteJobExecutionError`: if there is a problem during the job execution,
+                 or if any task failed
         """
         self.log(u"Executing job")
 
@@ -204,18 +232,180 @@ class ExecuteJob(Loggable):
             self.log_exc(u"The Job has %d Tasks, more than the maximum allowed (%d)." % (len(self.job), job_max_tasks), None, True, ExecuteJobExecutionError)
         self.log([u"Number of tasks: '%d'", len(self.job)])
 
-        for task in self.job.tasks:
-            try:
+        self.failures = []
+        workers = min(self.rconf[RuntimeConfiguration.JOB_MAX_WORKERS], len(self.job))
+        if workers > 1:
+            self._execute_parallel(workers)
+        else:
+            self._execute_sequential()
+        if len(self.failures) > 0:
+            self.log_exc(u"Error while executing %d tasks: %s" % (
+                len(self.failures),
+                u"; ".join([
+                    u"'%s': %s: %s" % (task.configuration["custom_id"], type(exc).__name__, exc)
+                    for task, exc, exc_traceback in self.failures
+                ])
+            ), None, True, ExecuteJobExecutionError)
+        self.log(u"Executing job: succeeded")
+
+    def _execute_sequential(self):
+        """
+        Execute the tasks of the job one after the other,
+        storing the sync map of each task into it,
+        and recording the tasks which failed in ``self.failures``.
+        """
+        predecoder = None
+        if self.rconf[RuntimeConfiguration.JOB_PREDECODE_WORKERS] > 0:
+            self.log(u"Starting audio pre-decoding...")
+            predecoder = AudioPredecoder(self.job.tasks, rconf=self.rconf, logger=self.logger)
+            predecoder.start()
+            self.log(u"Starting audio pre-decoding... done")
+
+        # NOTE the tasks read the files converted in advance, if any
+        shared_audio_files = self._shared_audio_files() if predecoder is None else {}
+        holders = {}
+        try:
+            for index, task in enumerate(self.job.tasks):
+                audio_file_path = task.audio_file_path_absolute
+                if (audio_file_path in shared_audio_files) and (audio_file_path not in holders):
+                    holders[audio_file_path] = self._hold_audio_file(audio_file_path)
                 custom_id = task.configuration["custom_id"]
-                self.log([u"Executing task '%s'...", custom_id])
-                executor = ExecuteTask(task, rconf=self.rconf, logger=self.logger)
-                executor.execute()
-                self.log([u"Executing task '%s'... done", custom_id])
-            except Exception as exc:
-                self.log_exc(u"Error while executing task '%s'" % (custom_id), exc, True, ExecuteJobExecutionError)
-            self.log(u"Executing task: succeeded")
+                try:
+                    self.log([u"Executing task '%s'...", custom_id])
+                    executor = ExecuteTask(task, rconf=self.rconf, logger=self.logger)
+                    if predecoder is not None:
+                        executor.decoded_audio_file_path = predecoder.get(index)
+                    executor.execute()
+                    self.log([u"Executing task '%s'... done", custom_id])
+                except Exception as exc:
+                    self.log_exc(u"Error while executing task '%s'" % (custom_id), exc, True, None)
+                    self.failures.append((task, exc, traceback.format_exc()))
+                finally:
+                    if predecoder is not None:
+                        predecoder.release(index)
+                    if shared_audio_files.get(audio_file_path, None) == index:
+                        self._release_audio_file(holders.pop(audio_file_path))
+        finally:
+            for holder in holders.values():
+                self._release_audio_file(holder)
+            if predecoder is not None:
+                self.log(u"Stopping audio pre-decoding...")
+                predecoder.stop()
+                self.log(u"Stopping audio pre-decoding... done")
+
+    def _shared_audio_files(self):
+        """
+        Return a dictionary mapping the path of each audio file
+        decoded entirely by more than one task of the job
+        to the index of the last of those tasks.
 
-        self.log(u"Executing job: succeeded")
+        The samples of these audio files are held
+        in the :class:`~aeneas.audiobuffer.AudioBufferRegistry`
+        from the first to the last task reading them,
+        so that each of them is decoded only once.
+
+        :rtype: dict
+        """
+        if not self.rconf[RuntimeConfiguration.AUDIO_BUFFER_REGISTRY]:
+            return {}
+        counts = {}
+        last_indices = {}
+        for index, task in enumerate(self.job.tasks):
+            if (self.rconf[RuntimeConfiguration.TASK_DECODE_AUDIO_RANGE]) and (
+                    (task.configuration["i_a_head"] is not None) or
+                    (task.configuration["i_a_process"] is not None) or
+                    (task.configuration["i_a_tail"] is not None)
+            ):
+                # NOTE the task decodes only the range to be processed
+                continue
+            audio_file_path = task.audio_file_path_absolute
+            counts[audio_file_path] = counts.get(audio_file_path, 0) + 1
+            last_indices[audio_file_path] = index
+        shared = dict([(path, index) for path, index in last_indices.items() if counts[path] > 1])
+        self.log([u"Audio files read by more than one task: %d", len(shared)])
+        return shared
+
+    def _hold_audio_file(self, audio_file_path):
+        """
+        Decode the given audio file as the tasks do,
+        and hold its samples in the audio buffer registry.
+
+        Return the :class:`~aeneas.audiofile.AudioFile` holding them,
+        or ``None`` if the audio file cannot be decoded:
+        in that case, the tasks reading it will report the error.
+
+        :param string audio_file_path: the path of the audio file
+        :rtype: :class:`~aeneas.audiofile.AudioFile`
+        """
+        self.log([u"Holding the samples of audio file '%s'...", audio_file_path])
+        try:
+            # NOTE file_format=None, as in ExecuteTask
+            audio_file = AudioFile(file_path=audio_file_path, file_format=None, rconf=self.rconf, logger=self.logger)
+            audio_file.read_samples_from_file(hold=True)
+        except Exception as exc:
+            self.log_warn([u"Unable to decode audio file '%s': %s", audio_file_path, exc])
+            return None
+        self.log([u"Holding the samples of audio file '%s'... done", audio_file_path])
+        return audio_file
+
+    def _release_audio_file(self, audio_file):
+        """
+        Release the samples held by the given audio file, if any.
+
+        :param audio_file: the audio file holding the samples, or ``None``
+        :type  audio_file: :class:`~aeneas.audiofile.AudioFile`
+        """
+        if audio_file is not None:
+            self.log([u"Releasing the samples of audio file '%s'", audio_file.file_path])
+            audio_file.clear_data()
+
+    def _execute_parallel(self, workers):
+        """
+        Execute the tasks of the job in a pool of ``workers`` processes,
+        storing the sync map of each task into it,
+        and appending the entries of the logger of each task
+        to the logger of the job, in task order.
+        The tasks which failed are recorded in ``self.failures``.
+
+        :param int workers: the number of worker processes
+        """
+        if self.rconf[RuntimeConfiguration.JOB_PREDECODE_WORKERS] > 0:
+            self.log_warn(u"Executing tasks concurrently => not converting audio files in advance")
+        self.log([u"Executing tasks with %d worker processes...", workers])
+        # NOTE send the text file already parsed and the audio file properties
+        #      already read, if any, so that the worker processes
+        #      neither parse the text file nor probe the audio file again,
+        #      and tasks with a text file built in memory can be executed
+        arguments = [
+            (
+                task.configuration,
+                _detached_text_file(task.text_file),
+                task.audio_file_path_absolute,
+                _audio_file_properties(task.audio_file),
+                self.rconf,
+                self.logger.tee,
+                self.logger.tee_show_datetime
+            )
+            for task in self.job.tasks
+        ]
+        pool = multiprocessing.Pool(workers)
+        try:
+            results = pool.imap(_execute_task, arguments)
+            for task, (sync_map, entries, error) in zip(self.job.tasks, results):
+                custom_id = task.configuration["custom_id"]
+                self.logger.entries.extend(entries)
+                if error is None:
+                    task.sync_map = sync_map
+                    self.log([u"Executing task '%s'... done", custom_id])
+                else:
+                    exc, exc_traceback = error
+                    self.log_exc(u"Error while executing task '%s'" % (custom_id), exc, True, None)
+                    self.log([u"Traceback in the worker process:\n%s", exc_traceback])
+                    self.failures.append((task, exc, exc_traceback))
+        finally:
+            pool.close()
+            pool.join()
+        self.log([u"Executing tasks with %d worker processes... done", workers])
 
     def write_output_container(self, output_directory_path):
         """
@@ -225,6 +415,10 @@ class ExecuteJob(Loggable):
         which is the concatenation of ``output_directory_path``
         and of the output container file or directory name.
 
+        The sync maps of the tasks recorded in ``self.failures``
+        by :func:`~aeneas.executejob.ExecuteJob.execute`
+        are not output.
+
         :param string output_directory_path: the path to a directory where
                                              the output container must be created
         :rtype: string
@@ -242,12 +436,20 @@ class ExecuteJob(Loggable):
         # will be created
         # this temporary directory will be compressed into
         # the output container
+        failed = set([id(task) for task, exc, exc_traceback in self.failures])
+        if len(failed) == len(self.job):
+            self.log_exc(u"All the tasks failed", None, True, ExecuteJobOutputError)
+
         self.tmp_directory = gf.tmp_directory(root=self.rconf[RuntimeConfiguration.TMP_PATH])
         self.log([u"Created temporary directory '%s'", self.tmp_directory])
 
         for task in self.job.tasks:
             custom_id = task.configuration["custom_id"]
 
+            if id(task) in failed:
+                self.log_warn([u"Task '%s' failed => not outputting its sync map", custom_id])
+                continue
+
             # check if the task has sync map and sync map file path
             if task.sync_map_file_path is None:
                 self.log_exc(u"Task '%s' has sync_map_file_path not set" % (custom_id), None, True, ExecuteJobOutputError)
@@ -314,3 +516,316 @@ class ExecuteJob(Loggable):
         gf.delete_directory(self.tmp_directory)
         self.tmp_directory = None
         self.log(u"Removing temporary directory... done")
+
+
+AUDIO_FILE_PROPERTIES = [
+    "file_size",
+    "audio_length",
+    "audio_format",
+    "audio_sample_rate",
+    "audio_channels"
+]
+""" Properties of the audio file of a task sent to the worker processes """
+
+
+def _detached_text_file(text_file):
+    """
+    Return a shallow copy of the given text file without its logger,
+    so that the entries of the logger of the job
+    are not sent to the worker processes.
+
+    :param text_file: the text file, or ``None``
+    :type  text_file: :class:`~aeneas.textfile.TextFile`
+    :rtype: :class:`~aeneas.textfile.TextFile`
+    """
+    if text_file is None:
+        return None
+    text_file = copy.copy(text_file)
+    text_file.logger = None
+    return text_file
+
+
+def _audio_file_properties(audio_file):
+    """
+    Return a dictionary with the properties of the given audio file,
+    or ``None`` if they have not been read yet.
+
+    :param audio_file: the audio file, or ``None``
+    :type  audio_file: :class:`~aeneas.audiofile.AudioFile`
+    :rtype: dict
+    """
+    if (audio_file is None) or (audio_file.audio_length is None):
+        return None
+    return dict([(name, getattr(audio_file, name)) for name in AUDIO_FILE_PROPERTIES])
+
+
+def _execute_task(arguments):
+    """
+    Execute a task in a worker process of
+    :func:`~aeneas.executejob.ExecuteJob._execute_parallel`.
+
+    Return a tuple ``(sync_map, entries, error)``,
+    where ``entries`` are the entries of the logger of the task,
+    and ``error`` is ``None`` if the task was executed successfully,
+    or the pair ``(exception, traceback)`` otherwise.
+    If the exception cannot be sent back to the main process,
+    it is replaced by an
+    :class:`~aeneas.executejob.ExecuteJobExecutionError`
+    with its type and message.
+
+    :param tuple arguments: the task configuration, the parsed text file
+                            (without logger), the audio file path,
+                            the audio file properties (or ``None``),
+                            the runtime configuration,
+                            and the logger ``tee`` and ``tee_show_datetime`` flags
+    :rtype: tuple
+    """
+    configuration, text_file, audio_file_path, audio_properties, rconf, tee, tee_show_datetime = arguments
+    logger = Logger(tee=tee, tee_show_datetime=tee_show_datetime)
+    try:
+        # NOTE the properties of the audio file, if not known yet,
+        #      are read by ExecuteTask while decoding it
+        task_rconf = rconf.clone()
+        task_rconf[RuntimeConfiguration.TASK_DEFER_AUDIO_PROBE] = True
+        task = Task(rconf=task_rconf, logger=logger)
+        task.configuration = configuration
+        task.audio_file_path_absolute = audio_file_path
+        if audio_properties is not None:
+            for name, value in audio_properties.items():
+                setattr(task.audio_file, name, value)
+        if text_file is not None:
+            text_file.logger = logger
+        task.text_file = text_file
+        ExecuteTask(task, rconf=rconf, logger=logger).execute()
+        return (task.sync_map, logger.entries, None)
+    except Exception as exc:
+        exc_traceback = traceback.format_exc()
+        try:
+            pickle.loads(pickle.dumps(exc))
+        except Exception:
+            exc = ExecuteJobExecutionError(u"%s: %s" % (type(exc).__name__, exc))
+        return (None, logger.entries, (exc, exc_traceback))
+
+
+class AudioPredecoder(Loggable):
+    """
+    Decode the audio files of the given tasks in advance,
+    converting them to PCM16 mono WAVE files
+    with the sample rate used internally,
+    so that the decoding of the audio file of a task
+    overlaps with the alignment of the previous tasks.
+
+    The audio files are converted in task order
+    by a pool of
+    :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.JOB_PREDECODE_WORKERS`
+    threads, each running one ``ffmpeg`` process at a time.
+    The converted files are created inside
+    :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TMP_PATH`,
+    and their total (estimated) size never exceeds
+    :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.JOB_PREDECODE_MAX_SIZE`:
+    conversions wait until enough converted files have been released.
+    Audio files larger than the budget are not converted in advance.
+
+    :param list tasks: the tasks, each an instance of :class:`~aeneas.task.Task`
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+
+    .. versionadded:: 1.8.0
+    """
+
+    WAVE_HEADER_SIZE = 44
+    """ Size of the header of the converted WAVE files, in bytes """
+
+    TAG = u"AudioPredecoder"
+
+    def __init__(self, tasks, rconf=None, logger=None):
+        super(AudioPredecoder, self).__init__(rconf=rconf, logger=logger)
+        self.tasks = tasks
+        self.workers = []
+        self.condition = threading.Condition()
+        self.next_index = 0
+        self.next_reserved_index = 0
+        self.used_size = 0
+        self.results = {}
+        self.stopped = False
+        self.max_size = self.rconf[RuntimeConfiguration.JOB_PREDECODE_MAX_SIZE] * 1024 * 1024
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        number_workers = min(self.rconf[RuntimeConfiguration.JOB_PREDECODE_WORKERS], len(self.tasks))
+        self.log([u"Starting %d worker threads", number_workers])
+        for i in range(number_workers):
+            worker = threading.Thread(target=self._worker)
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+
+    def get(self, index):
+        """
+        Return the path of the converted audio file
+        of the task with the given index,
+        waiting for its conversion to complete if needed,
+        or ``None`` if the audio file has not been converted
+        (e.g., because it is larger than the budget,
+        or because its conversion failed).
+
+        :param int index: the index of the task
+        :rtype: string
+        """
+        with self.condition:
+            while (index not in self.results) and (not self.stopped) and (self._alive()):
+                self.condition.wait()
+            result = self.results.get(index, None)
+        if result is None:
+            self.log([u"Task %d: audio file not converted in advance", index])
+            return None
+        self.log([u"Task %d: converted audio file '%s'", index, result[1]])
+        return result[1]
+
+    def release(self, index):
+        """
+        Delete the converted audio file
+        of the task with the given index, if any,
+        freeing its share of the budget.
+
+        :param int index: the index of the task
+        """
+        with self.condition:
+            result = self.results.pop(index, None)
+            if result is not None:
+                self.used_size -= result[2]
+                self.condition.notify_all()
+        if result is not None:
+            gf.delete_file(result[0], result[1])
+            self.log([u"Task %d: deleted converted audio file '%s'", index, result[1]])
+
+    def stop(self):
+        """
+        Stop the worker threads, waiting for the running conversions to end,
+        and delete all the converted audio files.
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        for index in list(self.results.keys()):
+            self.release(index)
+
+    def _alive(self):
+        """
+        Return ``True`` if at least one worker thread is alive.
+
+        :rtype: bool
+        """
+        return any([worker.is_alive() for worker in self.workers])
+
+    def _estimated_size(self, task):
+        """
+        Return the estimated size, in bytes,
+        of the converted audio file of the given task,
+        or ``None`` if it cannot be estimated.
+
+        If the properties of the audio file of the task
+        have not been read yet
+        (e.g., because ``task_defer_audio_probe`` is ``True``),
+        the audio file is probed, without modifying the task.
+
+        :rtype: int
+        """
+        if task.audio_file_path_absolute is None:
+            return None
+        audio_length = None
+        if task.audio_file is not None:
+            audio_length = task.audio_file.audio_length
+        if audio_length is None:
+            try:
+                properties = AudioProbe(rconf=self.rconf, logger=self.logger).read_properties(task.audio_file_path_absolute)
+                audio_length = TimeValue(properties[FFPROBEWrapper.STDOUT_DURATION])
+            except Exception as exc:
+                self.log_exc(u"Unable to probe audio file '%s'" % (task.audio_file_path_absolute), exc, False, None)
+                return None
+        return self.WAVE_HEADER_SIZE + 2 * int(audio_length * self.rconf.sample_rate + 1)
+
+    def _next_task(self):
+        """
+        Reserve the budget for the next task to be converted,
+        waiting until enough budget is available,
+        and return ``(index, size)``,
+        or ``(None, None)`` if there are no more tasks
+        or the workers have been stopped.
+
+        The size of the converted file is estimated
+        without holding the lock, since it might require
+        probing the audio file,
+        but the budget is reserved in task order,
+        hence the task currently executed (whose converted file
+        has not been released yet) is always
+        converted before any later task.
+
+        :rtype: tuple
+        """
+        while True:
+            with self.condition:
+                if (self.stopped) or (self.next_index >= len(self.tasks)):
+                    return (None, None)
+                index = self.next_index
+                self.next_index += 1
+            size = self._estimated_size(self.tasks[index])
+            with self.condition:
+                while (not self.stopped) and (self.next_reserved_index < index):
+                    self.condition.wait()
+                if (size is None) or (size > self.max_size):
+                    self.log([u"Task %d: not converting in advance (estimated size: %s)", index, size])
+                    self.results[index] = None
+                    self.next_reserved_index += 1
+                    self.condition.notify_all()
+                    continue
+                while (not self.stopped) and (self.used_size + size > self.max_size):
+                    self.condition.wait()
+                if self.stopped:
+                    return (None, None)
+                self.used_size += size
+                self.next_reserved_index += 1
+                self.condition.notify_all()
+                return (index, size)
+
+    def _worker(self):
+        """
+        Convert audio files until there are no more tasks.
+        """
+        while True:
+            index, size = self._next_task()
+            if index is None:
+                return
+            result = None
+            handler, path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
+            try:
+                self.log([u"Task %d: converting audio file...", index])
+                self._convert(self.tasks[index].audio_file_path_absolute, path)
+                result = (handler, path, size)
+                self.log([u"Task %d: converting audio file... done", index])
+            except Exception as exc:
+                self.log_exc(u"Task %d: error while converting audio file" % (index), exc, False, None)
+                gf.delete_file(handler, path)
+            with self.condition:
+                if result is None:
+                    self.used_size -= size
+                self.results[index] = result
+                self.condition.notify_all()
+
+    def _convert(self, input_file_path, output_file_path):
+        """
+        Convert the given audio file to a PCM16 mono WAVE file
+        with the sample rate used internally.
+
+        :param string input_file_path: the path of the audio file
+        :param string output_file_path: the path of the converted file
+        """
+        converter = FFMPEGWrapper(rconf=self.rconf, logger=self.logger)
+        converter.convert(input_file_path, output_file_path)
@@ -33,15 +33,25 @@ This module contains the following classes:
 from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
+import numpy
+import os
+import threading
 
 from aeneas.adjustboundaryalgorithm import AdjustBoundaryAlgorithm
 from aeneas.audiofile import AudioFile
+from aeneas.audiofile import AudioFileConverterError
+from aeneas.audiofile import AudioFileProbeError
+from aeneas.audiofile import AudioFileUnsupportedFormatError
 from aeneas.audiofilemfcc import AudioFileMFCC
+from aeneas.audioprobe import AudioProbe
 from aeneas.dtw import DTWAligner
 from aeneas.exacttiming import TimeInterval
 from aeneas.exacttiming import TimeValue
 from aeneas.ffmpegwrapper import FFMPEGWrapper
+from aeneas.ffprobewrapper import FFPROBEWrapper
 from aeneas.logger import Loggable
+from aeneas.mfcccache import MFCCCache
+from aeneas.phonemetable import PhonemeTable
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.sd import SD
 from aeneas.syncmap import SyncMap
@@ -49,6 +59,7 @@ from aeneas.syncmap import SyncMapFragment
 from aeneas.syncmap import SyncMapHeadTailFormat
 from aeneas.synthesizer import Synthesizer
 from aeneas.task import Task
+from aeneas.textfile import TextFile
 from aeneas.textfile import TextFileFormat
 from aeneas.textfile import TextFragment
 from aeneas.tree import Tree
@@ -73,6 +84,23 @@ class ExecuteTask(Loggable):
     """
     Execute a task, that is, compute the sync map for it.
 
+    If ``decoded_audio_file_path`` is set
+    to the path of a PCM16 mono WAVE file
+    with the sample rate used internally,
+    containing the audio of the task
+    (e.g., converted in advance by
+    :class:`~aeneas.executejob.AudioPredecoder`),
+    the audio samples are read from it,
+    instead of decoding the audio file of the task.
+
+    If the properties of the audio file of the task
+    have not been read yet
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TASK_DEFER_AUDIO_PROBE`),
+    the entire audio file is decoded first,
+    and its properties are read from the decoded stream,
+    unless only the range to be processed will be decoded:
+    in that case, the audio file is probed first.
+
     :param task: the task to be executed
     :type  task: :class:`~aeneas.task.Task`
     :param rconf: a runtime configuration
@@ -91,6 +119,12 @@ class ExecuteTask(Loggable):
         self.step_begin_time = None
         self.step_total = 0.000
         self.synthesizer = None
+        self.leaf_synthesis = None
+        self.phoneme_tables = {}
+        self.decoded_audio_file_path = None
+        self.synthesis_lock = threading.Lock()
+        self.__audio_file = None
+        self.__held_audio_files = []
         if task is not None:
             self.load_task(self.task)
 
@@ -145,6 +179,37 @@ class ExecuteTask(Loggable):
         # check that we have the AudioFile object
         if self.task.audio_file is None:
             self.log_exc(u"The task does not seem to have its audio file set", None, True, ExecuteTaskInputError)
+        try:
+            if self.task.audio_file.audio_length is None:
+                if self._has_explicit_range():
+                    # NOTE probing is cheaper than decoding the entire audio file
+                    #      when only a range of it will be decoded
+                    self._probe_audio_file()
+                else:
+                    self._read_audio_file_properties()
+            self._execute_checked()
+        finally:
+            if self.__audio_file is not None:
+                self.__audio_file.clear_data()
+                self.__audio_file = None
+            self._release_audio_files()
+        self.log(u"Executing task... done")
+
+    def _release_audio_files(self):
+        """
+        Clear the audio files of the task read by this object,
+        releasing the samples they hold
+        in the :class:`~aeneas.audiobuffer.AudioBufferRegistry`.
+        """
+        for audio_file in self.__held_audio_files:
+            audio_file.clear_data()
+        self.__held_audio_files = []
+
+    def _execute_checked(self):
+        """
+        Check the audio and text files of the task,
+        and execute it.
+        """
         if (
                 (self.task.audio_file.audio_length is None) or
                 (self.task.audio_file.audio_length <= 0)
@@ -180,28 +245,159 @@ class ExecuteTask(Loggable):
             self._execute_multi_level_task()
         else:
             self._execute_single_level_task()
-        self.log(u"Executing task... done")
+
+    def _has_explicit_range(self):
+        """
+        Return ``True`` if decoding only the range to be processed is enabled
+        and the Task configuration specifies explicit
+        head, process, and/or tail lengths.
+
+        :rtype: bool
+        """
+        if not self.rconf[RuntimeConfiguration.TASK_DECODE_AUDIO_RANGE]:
+            return False
+        return (
+            (self.task.configuration["i_a_head"] is not None) or
+            (self.task.configuration["i_a_process"] is not None) or
+            (self.task.configuration["i_a_tail"] is not None)
+        )
+
+    def _probe_audio_file(self):
+        """
+        Read the properties of the audio file of the task
+        without decoding it.
+        """
+        self.log(u"Reading the properties of the audio file...")
+        try:
+            self.task.audio_file.read_properties()
+        except AudioFileProbeError:
+            self.log_exc(u"Unable to read the audio file of the task", None, True, ExecuteTaskInputError)
+        except (AudioFileUnsupportedFormatError, OSError):
+            self.log_exc(u"The task seems to have an invalid audio file", None, True, ExecuteTaskInputError)
+        self.log(u"Reading the properties of the audio file... done")
+
+    def _read_audio_file_properties(self):
+        """
+        Decode the entire audio file of the task,
+        keeping it in memory for the execution,
+        and set the length of the audio file of the task
+        to the length of the decoded samples,
+        hence no process other than the decoder is run.
+
+        The format, the sample rate and the number of channels
+        of the audio file of the task are set
+        from the properties parsed from the ``ffmpeg`` banner.
+        If the samples were not decoded through a pipe
+        (e.g., the audio file has been decoded in advance),
+        they are read by :class:`~aeneas.audioprobe.AudioProbe`,
+        which parses the header of common formats natively,
+        and returns the properties cached while probing
+        the audio file in advance, if any.
+        """
+        self.log(u"Reading the properties of the audio file while decoding it...")
+        file_path, file_format = self._real_wave_path_format()
+        try:
+            audio_file = AudioFile(
+                file_path=file_path,
+                file_format=file_format,
+                rconf=self.rconf,
+                logger=self.logger
+            )
+            # NOTE hold the samples until the end of the execution
+            self.__held_audio_files.append(audio_file)
+            audio_file.read_samples_from_file(hold=True)
+            self.__audio_file = audio_file
+            # NOTE exact, unlike the duration printed by ffmpeg,
+            #      which is rounded or even estimated from the bitrate
+            self.task.audio_file.audio_length = audio_file.audio_length
+        except (AudioFileConverterError, AudioFileProbeError):
+            self.log_exc(u"Unable to read the audio file of the task", None, True, ExecuteTaskInputError)
+        except (AudioFileUnsupportedFormatError, OSError):
+            self.log_exc(u"The task seems to have an invalid audio file", None, True, ExecuteTaskInputError)
+        properties = audio_file.source_properties
+        if properties is None:
+            self.log(u"Samples not decoded through a pipe => reading the properties with AudioProbe")
+            try:
+                properties = AudioProbe(rconf=self.rconf, logger=self.logger).read_properties(self.task.audio_file_path_absolute)
+            except Exception as exc:
+                self.log_exc(u"Unable to read the properties of the audio file of the task", exc, False, None)
+        if properties is not None:
+            self.task.audio_file.audio_format = properties[FFPROBEWrapper.STDOUT_CODEC_NAME]
+            self.task.audio_file.audio_sample_rate = gf.safe_int(properties[FFPROBEWrapper.STDOUT_SAMPLE_RATE])
+            self.task.audio_file.audio_channels = gf.safe_int(properties[FFPROBEWrapper.STDOUT_CHANNELS])
+        self.log(u"Reading the properties of the audio file while decoding it... done")
 
     def _execute_single_level_task(self):
         """ Execute a single-level task """
         self.log(u"Executing single level task...")
         try:
-            # load audio file, extract MFCCs from real wave, clear audio file
-            self._step_begin(u"extract MFCC real wave")
-            real_wave_mfcc = self._extract_mfcc(
-                file_path=self.task.audio_file_path_absolute,
-                file_format=None,
-            )
-            self._step_end()
+            decode_range = self._compute_decode_range()
+
+            # synthesize the text while decoding the real wave, if requested
+            synt_wave = None
+            join_synthesis = None
+            if self.rconf[RuntimeConfiguration.TASK_PIPELINE]:
+                if self.rconf[RuntimeConfiguration.TTS_RATE_AUTO]:
+                    self.log_warn(u"The speaking rate depends on the real wave => synthesizing the text after decoding it")
+                else:
+                    self.log(u"Synthesizing the text while decoding the real wave")
+                    self._set_synthesizer()
+                    join_synthesis = gf.start_thread(self._synthesize_wave, self.task.text_file, False)
+
+            # NOTE the synthesis thread must be waited for
+            #      even if decoding the real wave fails,
+            #      in which case its result is discarded
+            decoded = False
+            try:
+                if (decode_range is None) and (self.__audio_file is None):
+                    # load audio file, extract MFCCs from real wave, clear audio file
+                    self._step_begin(u"extract MFCC real wave")
+                    file_path, file_format = self._real_wave_path_format()
+                    real_wave_mfcc = self._extract_mfcc(
+                        file_path=file_path,
+                        file_format=file_format,
+                    )
+                    self._step_end()
+                else:
+                    # load only the range to be processed (or take the audio file
+                    # decoded while reading its properties), extract MFCCs, clear audio file
+                    audio_file = self._load_audio_file(decode_range)
+                    self._step_begin(u"extract MFCC real wave")
+                    real_wave_mfcc = self._extract_mfcc(audio_file=audio_file)
+                    self._step_end()
+                    self._clear_audio_file(audio_file)
+                decoded = True
+            finally:
+                if (join_synthesis is not None) and (not decoded):
+                    self.log(u"Decoding the real wave failed => waiting for the synthesis of the text and discarding it")
+                    try:
+                        join_synthesis()
+                    except Exception as exc:
+                        self.log_warn([u"The synthesis of the text failed as well: %s", exc])
+
+            if join_synthesis is not None:
+                self._step_begin(u"wait for synthesis of text and MFCC synt wave")
+                synt_wave = join_synthesis()
+                self._step_end()
 
             # compute head and/or tail and set it
             self._step_begin(u"compute head tail")
-            (head_length, process_length, tail_length) = self._compute_head_process_tail(real_wave_mfcc)
-            real_wave_mfcc.set_head_middle_tail(head_length, process_length, tail_length)
+            if decode_range is None:
+                (head_length, process_length, tail_length) = self._compute_head_process_tail(real_wave_mfcc)
+                real_wave_mfcc.set_head_middle_tail(head_length, process_length, tail_length)
+            else:
+                self.log(u"Only the range to be processed was loaded => nothing to set")
             self._step_end()
 
+            # select the speaking rate of the TTS engine, if requested
+            if self.rconf[RuntimeConfiguration.TTS_RATE_AUTO]:
+                # NOTE do not modify the rconf passed by the caller
+                self.rconf = self.rconf.clone()
+            self._select_tts_rate(real_wave_mfcc, [self.rconf])
+
             # compute alignment, outputting a tree of time intervals
-            self._set_synthesizer()
+            if synt_wave is None:
+                self._set_synthesizer()
             sync_root = Tree()
             self._execute_inner(
                 real_wave_mfcc,
@@ -209,9 +405,12 @@ class ExecuteTask(Loggable):
                 sync_root=sync_root,
                 force_aba_auto=False,
                 log=True,
-                leaf_level=True
+                leaf_level=True,
+                synt_wave=synt_wave
             )
             self._clear_cache_synthesizer()
+            if decode_range is not None:
+                self._shift_sync_root(sync_root, decode_range)
 
             # create syncmap and add it to task
             self._step_begin(u"create sync map")
@@ -247,7 +446,8 @@ class ExecuteTask(Loggable):
         self.log(u"Saving rconf... done")
         try:
             self.log(u"Creating AudioFile object...")
-            audio_file = self._load_audio_file()
+            decode_range = self._compute_decode_range()
+            audio_file = self._load_audio_file(decode_range)
             self.log(u"Creating AudioFile object... done")
 
             # extract MFCC for each level
@@ -268,10 +468,28 @@ class ExecuteTask(Loggable):
 
             # compute head tail for the entire real wave (level 1)
             self._step_begin(u"compute head tail")
-            (head_length, process_length, tail_length) = self._compute_head_process_tail(level_mfccs[1])
-            level_mfccs[1].set_head_middle_tail(head_length, process_length, tail_length)
+            if decode_range is None:
+                (head_length, process_length, tail_length) = self._compute_head_process_tail(level_mfccs[1])
+                level_mfccs[1].set_head_middle_tail(head_length, process_length, tail_length)
+            else:
+                self.log(u"Only the range to be processed was loaded => nothing to set")
             self._step_end()
 
+            # select the speaking rate of the TTS engine for all levels, if requested
+            self._select_tts_rate(level_mfccs[1], level_rconfs[1:])
+
+            # synthesize the finest level once, if requested
+            if self.rconf[RuntimeConfiguration.TTS_REUSE_LEVELS]:
+                if len(set([(r.tts, r.tts_path) for r in level_rconfs[1:]])) == 1:
+                    self._step_begin(u"synthesize text leaves")
+                    self.rconf = level_rconfs[-1]
+                    self._set_synthesizer()
+                    self.leaf_synthesis = self._synthesize_leaves(self.task.text_file)
+                    self._clear_cache_synthesizer()
+                    self._step_end()
+                else:
+                    self.log_warn(u"Levels use different TTS engines => not reusing the synthesis of the finest level")
+
             # compute alignment at each level
             sync_root = Tree()
             sync_roots = [sync_root]
@@ -289,6 +507,9 @@ class ExecuteTask(Loggable):
                 )
                 self._step_end()
 
+            if decode_range is not None:
+                self._shift_sync_root(sync_root, decode_range)
+
             # restore original rconf, and create syncmap and add it to task
             self._step_begin(u"create sync map")
             self.rconf = orig_rconf
@@ -299,6 +520,10 @@ class ExecuteTask(Loggable):
             self.log(u"Executing multi level task... done")
         except Exception as exc:
             self._step_failure(exc)
+        finally:
+            if self.leaf_synthesis is not None:
+                self.leaf_synthesis[0].clear_data()
+                self.leaf_synthesis = None
 
     def _execute_level(self, level, audio_file_mfcc, text_files, sync_roots, force_aba_auto=False):
         """
@@ -320,8 +545,7 @@ class ExecuteTask(Loggable):
         :rtype: (list, list)
         """
         self._set_synthesizer()
-        next_level_text_files = []
-        next_level_sync_roots = []
+        nodes = []
         for text_file_index, text_file in enumerate(text_files):
             self.log([u"Text level %d, fragment %d", level, text_file_index])
             self.log([u"  Len:   %d", len(text_file)])
@@ -334,22 +558,26 @@ class ExecuteTask(Loggable):
                 self._append_trivial_tree(text_file, sync_root)
             else:
                 self.log(u"Level == 1 or more than one text fragment with non-zero parent => compute tree")
+                window = audio_file_mfcc
                 if not sync_root.is_empty:
                     begin = sync_root.value.begin
                     end = sync_root.value.end
                     self.log([u"  Setting begin: %.3f", begin])
                     self.log([u"  Setting end:   %.3f", end])
-                    audio_file_mfcc.set_head_middle_tail(head_length=begin, middle_length=(end - begin))
+                    # NOTE do not change HEAD, MIDDLE, TAIL of audio_file_mfcc,
+                    #      so that the nodes can be aligned concurrently
+                    window = audio_file_mfcc.middle_window(head_length=begin, middle_length=(end - begin))
                 else:
                     self.log(u"  No begin or end to set")
-                self._execute_inner(
-                    audio_file_mfcc,
-                    text_file,
-                    sync_root=sync_root,
-                    force_aba_auto=force_aba_auto,
-                    log=False,
-                    leaf_level=(level == 3)
-                )
+                nodes.append((window, text_file, sync_root))
+        self._execute_nodes(
+            nodes,
+            force_aba_auto=force_aba_auto,
+            leaf_level=(level == 3)
+        )
+        next_level_text_files = []
+        next_level_sync_roots = []
+        for text_file, sync_root in zip(text_files, sync_roots):
             # store next level roots
             next_level_text_files.extend(text_file.children_not_empty)
             # we added head and tail, we must not pass them to the next level
@@ -357,7 +585,74 @@ class ExecuteTask(Loggable):
         self._clear_cache_synthesizer()
         return (next_level_text_files, next_level_sync_roots)
 
-    def _execute_inner(self, audio_file_mfcc, text_file, sync_root=None, force_aba_auto=False, log=True, leaf_level=False):
+    def _execute_nodes(self, nodes, force_aba_auto=False, leaf_level=False):
+        """
+        Align the given nodes of a level,
+        with :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TASK_NODE_WORKERS`
+        threads, if greater than ``1``, or sequentially otherwise.
+
+        Each node is a tuple ``(audio_file_mfcc, text_file, sync_root)``,
+        whose elements are passed to
+        :func:`~aeneas.executetask.ExecuteTask._execute_inner`,
+        and it must not share any of them with the other nodes,
+        except the MFCCs and the speech/nonspeech intervals
+        of the audio file.
+
+        If aligning a node raises an exception,
+        no other node is started,
+        and the exception of the first such node is raised again.
+
+        :param list nodes: the nodes to be aligned
+        :param bool force_aba_auto: if ``True``, force using the AUTO ABA algorithm
+        :param bool leaf_level: alert aba if the computation is at a leaf level
+
+        .. versionadded:: 1.8.0
+        """
+        def execute_node(node):
+            audio_file_mfcc, text_file, sync_root = node
+            self._execute_inner(
+                audio_file_mfcc,
+                text_file,
+                sync_root=sync_root,
+                force_aba_auto=force_aba_auto,
+                log=False,
+                leaf_level=leaf_level
+            )
+
+        workers = min(self.rconf[RuntimeConfiguration.TASK_NODE_WORKERS], len(nodes))
+        if workers <= 1:
+            for node in nodes:
+                execute_node(node)
+            return
+
+        self.log([u"Aligning %d nodes with %d threads", len(nodes), workers])
+        lock = threading.Lock()
+        errors = {}
+        state = {"next": 0}
+
+        def worker():
+            while True:
+                with lock:
+                    if (len(errors) > 0) or (state["next"] >= len(nodes)):
+                        return
+                    num = state["next"]
+                    state["next"] += 1
+                try:
+                    execute_node(nodes[num])
+                except Exception as exc:
+                    with lock:
+                        errors[num] = exc
+
+        threads = [threading.Thread(target=worker) for i in range(workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(errors) > 0:
+            raise errors[min(errors)]
+
+    def _execute_inner(self, audio_file_mfcc, text_file, sync_root=None, force_aba_auto=False, log=True, leaf_level=False, synt_wave=None):
         """
         Align a subinterval of the given AudioFileMFCC
         with the given TextFile.
@@ -380,19 +675,15 @@ class ExecuteTask(Loggable):
         :param bool force_aba_auto: if ``True``, do not run aba algorithm
         :param bool log: if ``True``, log steps
         :param bool leaf_level: alert aba if the computation is at a leaf level
+        :param tuple synt_wave: the synthetic wave of ``text_file``,
+                                as returned by
+                                :func:`~aeneas.executetask.ExecuteTask._synthesize_wave`,
+                                if already computed
         :rtype: :class:`~aeneas.tree.Tree`
         """
-        self._step_begin(u"synthesize text", log=log)
-        synt_handler, synt_path, synt_anchors, synt_format = self._synthesize(text_file)
-        self._step_end(log=log)
-
-        self._step_begin(u"extract MFCC synt wave", log=log)
-        synt_wave_mfcc = self._extract_mfcc(
-            file_path=synt_path,
-            file_format=synt_format,
-        )
-        gf.delete_file(synt_handler, synt_path)
-        self._step_end(log=log)
+        if synt_wave is None:
+            synt_wave = self._synthesize_wave(text_file, log=log)
+        synt_wave_mfcc, synt_anchors = synt_wave
 
         self._step_begin(u"align waves", log=log)
         indices = self._align_waves(audio_file_mfcc, synt_wave_mfcc, synt_anchors)
@@ -402,25 +693,95 @@ class ExecuteTask(Loggable):
         self._adjust_boundaries(indices, text_file, audio_file_mfcc, sync_root, force_aba_auto, leaf_level)
         self._step_end(log=log)
 
-    def _load_audio_file(self):
+    def _synthesize_wave(self, text_file, log=True):
+        """
+        Synthesize the given text file and extract its MFCCs,
+        or build them from phonemes or from the MFCC cache,
+        if enabled.
+
+        Return a tuple consisting of:
+
+        1. the MFCCs of the synthetic wave
+        2. the list of anchors, as returned by
+           :func:`~aeneas.executetask.ExecuteTask._synthesize`
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :param bool log: if ``True``, log steps
+        :rtype: tuple (:class:`~aeneas.audiofilemfcc.AudioFileMFCC`, list)
+
+        .. versionadded:: 1.8.0
+        """
+        synt_wave = None
+        if self.rconf[RuntimeConfiguration.TTS_PHONEME_TABLES_DIR] is not None:
+            self._step_begin(u"build MFCC synt wave from phonemes", log=log)
+            synt_wave = self._phoneme_mfcc(text_file)
+            self._step_end(log=log)
+        if synt_wave is not None:
+            return synt_wave
+        if self.rconf[RuntimeConfiguration.MFCC_CACHE_MAX_SIZE] > 0:
+            self._step_begin(u"synthesize text and extract MFCC synt wave", log=log)
+            synt_wave_mfcc, synt_anchors = self._synthesize_mfcc(text_file)
+            self._step_end(log=log)
+        else:
+            self._step_begin(u"synthesize text", log=log)
+            synt_audio_file, synt_anchors = self._synthesize(text_file)
+            self._step_end(log=log)
+
+            self._step_begin(u"extract MFCC synt wave", log=log)
+            synt_wave_mfcc = self._extract_mfcc(audio_file=synt_audio_file)
+            synt_audio_file.clear_data()
+            self._step_end(log=log)
+        return (synt_wave_mfcc, synt_anchors)
+
+    def _load_audio_file(self, decode_range=None):
         """
         Load audio in memory.
 
+        If ``decode_range`` is not ``None``,
+        load only the given ``(begin, length)`` range.
+
+        If the entire audio file has been decoded
+        while reading its properties, return it instead.
+
+        :param tuple decode_range: the range to load, or ``None``
         :rtype: :class:`~aeneas.audiofile.AudioFile`
         """
+        if self.__audio_file is not None:
+            self.log(u"Audio file decoded while reading its properties")
+            audio_file, self.__audio_file = self.__audio_file, None
+            return audio_file
         self._step_begin(u"load audio file")
-        # NOTE file_format=None forces conversion to
-        #      PCM16 mono WAVE with default sample rate
+        file_path, file_format = self._real_wave_path_format()
         audio_file = AudioFile(
-            file_path=self.task.audio_file_path_absolute,
-            file_format=None,
+            file_path=file_path,
+            file_format=file_format,
             rconf=self.rconf,
             logger=self.logger
         )
-        audio_file.read_samples_from_file()
+        # NOTE hold the samples until the end of the execution
+        self.__held_audio_files.append(audio_file)
+        if decode_range is None:
+            audio_file.read_samples_from_file(hold=True)
+        else:
+            audio_file.read_samples_from_file(begin=decode_range[0], length=decode_range[1], hold=True)
         self._step_end()
         return audio_file
 
+    def _real_wave_path_format(self):
+        """
+        Return the path and the format of the file
+        from which the audio samples of the real wave must be read.
+
+        :rtype: tuple ``(string, tuple)``
+        """
+        if self.decoded_audio_file_path is not None:
+            self.log([u"Reading the audio file decoded in advance '%s'", self.decoded_audio_file_path])
+            return (self.decoded_audio_file_path, ("pcm_s16le", 1, self.rconf.sample_rate))
+        # NOTE file_format=None forces conversion to
+        #      PCM16 mono WAVE with default sample rate
+        return (self.task.audio_file_path_absolute, None)
+
     def _clear_audio_file(self, audio_file):
         """
         Clear audio from memory.
@@ -433,15 +794,17 @@ class ExecuteTask(Loggable):
         audio_file = None
         self._step_end()
 
-    def _extract_mfcc(self, file_path=None, file_format=None, audio_file=None):
+    def _extract_mfcc(self, file_path=None, file_format=None, audio_file=None, mfcc_matrix=None):
         """
-        Extract the MFCCs from the given audio file.
+        Extract the MFCCs from the given audio file,
+        or wrap the given MFCC matrix.
 
         :rtype: :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
         """
         audio_file_mfcc = AudioFileMFCC(
             file_path=file_path,
             file_format=file_format,
+            mfcc_matrix=mfcc_matrix,
             audio_file=audio_file,
             rconf=self.rconf,
             logger=self.logger
@@ -488,12 +851,20 @@ class ExecuteTask(Loggable):
             head_length = TimeValue("0.000")
             process_length = None
             tail_length = TimeValue("0.000")
-            if (head_min is not None) or (head_max is not None):
+            detect_head = (head_min is not None) or (head_max is not None)
+            detect_tail = (tail_min is not None) or (tail_max is not None)
+            if detect_head and detect_tail:
+                self.log(u"Detecting HEAD and TAIL concurrently...")
+                head_length, tail_length = sd.detect_head_tail(head_min, head_max, tail_min, tail_max)
+                self.log([u"Detected HEAD: %.3f", head_length])
+                self.log([u"Detected TAIL: %.3f", tail_length])
+                self.log(u"Detecting HEAD and TAIL concurrently... done")
+            elif detect_head:
                 self.log(u"Detecting HEAD...")
                 head_length = sd.detect_head(head_min, head_max)
                 self.log([u"Detected HEAD: %.3f", head_length])
                 self.log(u"Detecting HEAD... done")
-            if (tail_min is not None) or (tail_max is not None):
+            elif detect_tail:
                 self.log(u"Detecting TAIL...")
                 tail_length = sd.detect_tail(tail_min, tail_max)
                 self.log([u"Detected TAIL: %.3f", tail_length])
@@ -504,6 +875,95 @@ class ExecuteTask(Loggable):
         self.log([u"Tail:    %s", gf.safe_float(tail_length, None)])
         return (head_length, process_length, tail_length)
 
+    def _compute_decode_range(self):
+        """
+        If the Task configuration specifies explicit
+        head, process, and/or tail lengths,
+        and decoding only the range to be processed is enabled,
+        return the ``(begin, length)`` range, in seconds,
+        of the audio file to be processed.
+        Otherwise, return ``None``.
+
+        :rtype: tuple (:class:`~aeneas.exacttiming.TimeValue`, :class:`~aeneas.exacttiming.TimeValue`)
+        """
+        if not self.rconf[RuntimeConfiguration.TASK_DECODE_AUDIO_RANGE]:
+            self.log(u"Decoding only the range to be processed is disabled")
+            return None
+        if self.__audio_file is not None:
+            self.log(u"The entire audio file has been decoded already")
+            return None
+        head_length = self.task.configuration["i_a_head"]
+        process_length = self.task.configuration["i_a_process"]
+        tail_length = self.task.configuration["i_a_tail"]
+        if (head_length is None) and (process_length is None) and (tail_length is None):
+            self.log(u"No explicit head process tail => decoding the entire audio file")
+            return None
+        audio_length = self.task.audio_file.audio_length
+        begin = TimeValue("0.000")
+        if head_length is not None:
+            begin = min(max(TimeValue("0.000"), head_length), audio_length)
+        if process_length is not None:
+            length = min(max(TimeValue("0.000"), process_length), audio_length - begin)
+        elif tail_length is not None:
+            length = max(TimeValue("0.000"), audio_length - begin - tail_length)
+        else:
+            length = audio_length - begin
+        if (begin == 0) and (length == audio_length):
+            self.log(u"Range to be processed is the entire audio file")
+            return None
+        self.log([u"Range to be processed: begin %.3f length %.3f", begin, length])
+        return (begin, length)
+
+    def _shift_sync_root(self, sync_root, decode_range):
+        """
+        Shift the time intervals of the given tree,
+        computed on the range ``decode_range`` of the audio file only,
+        so that they refer to the entire audio file.
+        The HEAD (TAIL) fragment is extended to the begin (end)
+        of the audio file.
+
+        :param sync_root: the root of the tree of sync map fragments
+        :type  sync_root: :class:`~aeneas.tree.Tree`
+        :param tuple decode_range: the ``(begin, length)`` range
+        """
+        begin, length = decode_range
+        self.log([u"Shifting sync map fragments by %.3f", begin])
+        for node in sync_root.pre:
+            if node.value is not None:
+                node.value.interval.offset(begin)
+        if len(sync_root.children) > 0:
+            sync_root.children[0].value.begin = TimeValue("0.000")
+            tail = sync_root.children[-1].value
+            tail.end = max(tail.end, self.task.audio_file.audio_length)
+
+    def _select_tts_rate(self, audio_file_mfcc, rconfs):
+        """
+        If requested, select the speaking rate of the TTS engine
+        so that the duration of the synthetic wave,
+        estimated from the number of characters of the text,
+        roughly matches the duration of the middle part of the real wave,
+        and set it in the given runtime configurations.
+
+        :param audio_file_mfcc: the audio MFCC representation of the real wave
+        :type  audio_file_mfcc: :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
+        :param list rconfs: the runtime configurations to be updated
+        """
+        if not self.rconf[RuntimeConfiguration.TTS_RATE_AUTO]:
+            return
+        chars = self.task.text_file.chars
+        real_length = float(audio_file_mfcc.middle_length * self.rconf.mws)
+        if (chars == 0) or (real_length <= 0):
+            self.log_warn(u"Empty text or empty real wave => not selecting the speaking rate")
+            return
+        tts_engine = Synthesizer(rconf=self.rconf, logger=self.logger).tts_engine
+        synt_length = chars / tts_engine.CHARACTERS_PER_SECOND
+        rate = synt_length / real_length
+        self.log([u"Estimated synt length: %.3f", synt_length])
+        self.log([u"Real middle length:    %.3f", real_length])
+        self.log([u"Selected TTS rate:     %.3f", rate])
+        for rconf in rconfs:
+            rconf[RuntimeConfiguration.TTS_RATE] = rate
+
     def _set_synthesizer(self):
         """ Create synthesizer """
         self.log(u"Setting synthesizer...")
@@ -516,27 +976,368 @@ class ExecuteTask(Loggable):
         self.synthesizer.clear_cache()
         self.log(u"Clearing synthesizer... done")
 
+    def _synthesize_audio_file(self, text_file):
+        """
+        Synthesize the given text file with the current synthesizer,
+        returning the result of
+        :func:`~aeneas.synthesizer.Synthesizer.synthesize_audio_file`.
+
+        Calls from different threads are serialized
+        (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TASK_NODE_WORKERS`),
+        since TTS engines might not be thread-safe.
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :rtype: tuple
+
+        .. versionadded:: 1.8.0
+        """
+        with self.synthesis_lock:
+            return self.synthesizer.synthesize_audio_file(text_file)
+
     def _synthesize(self, text_file):
         """
-        Synthesize text into a WAVE file.
+        Synthesize text into an audio file kept in memory.
 
         Return a tuple consisting of:
 
-        1. the handler of the generated audio file
-        2. the path of the generated audio file
-        3. the list of anchors, that is, a list of floats
+        1. the generated audio file
+        2. the list of anchors, that is, a list of floats
            each representing the start time of the corresponding
            text fragment in the generated wave file
            ``[start_1, start_2, ..., start_n]``
-        4. a tuple describing the format of the audio file
 
         :param text_file: the text to be synthesized
         :type  text_file: :class:`~aeneas.textfile.TextFile`
-        :rtype: tuple (handler, string, list)
+        :rtype: tuple (:class:`~aeneas.audiofile.AudioFile`, list)
+        """
+        if self.leaf_synthesis is not None:
+            result = self._synthesize_from_leaves(text_file)
+            if result is not None:
+                return result
+        result = self._synthesize_audio_file(text_file)
+        return (result[0], result[1])
+
+    def _synthesize_leaves(self, text_file):
+        """
+        Synthesize the leaves of the tree of the given text file,
+        that is, the text fragments of the finest level,
+        in order, into an audio file kept in memory.
+
+        Return a tuple consisting of:
+
+        1. the generated audio file
+        2. a dictionary mapping each leaf text fragment
+           to the pair ``(begin, end)`` of the indices
+           of its samples in the generated audio file
+
+        Each leaf is synthesized with the language of its ancestor
+        among the text fragments of ``text_file``,
+        without modifying the leaf text fragment itself.
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :rtype: tuple (:class:`~aeneas.audiofile.AudioFile`, dict)
+        """
+        leaves = []
+        leaves_text_file = TextFile()
+        for node in text_file.fragments_tree.children_not_empty:
+            for leaf in node.leaves_not_empty:
+                leaves.append(leaf.value)
+                leaves_text_file.add_fragment(TextFragment(
+                    identifier=leaf.value.identifier,
+                    language=node.value.language,
+                    lines=leaf.value.lines,
+                    filtered_lines=leaf.value.filtered_lines
+                ))
+        self.log([u"Synthesizing %d leaves", len(leaves_text_file)])
+        audio_file, anchors, total_time, num_chars_nu = self._synthesize_audio_file(leaves_text_file)
+        intervals = dict(zip(
+            leaves,
+            self._anchors_to_intervals(audio_file, anchors, total_time)
+        ))
+        return (audio_file, intervals)
+
+    def _anchors_to_intervals(self, audio_file, anchors, total_time):
         """
-        handler, path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
-        result = self.synthesizer.synthesize(text_file, path)
-        return (handler, path, result[0], self.synthesizer.output_audio_format)
+        Convert the anchors of the given synthesized audio file
+        into the list of the pairs ``(begin, end)``
+        of the indices of the samples
+        of the corresponding text fragments.
+
+        :param audio_file: the synthesized audio file
+        :type  audio_file: :class:`~aeneas.audiofile.AudioFile`
+        :param list anchors: the anchors returned by the synthesizer
+        :param total_time: the duration of the synthesized audio file
+        :type  total_time: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: list of tuples
+        """
+        sample_rate = audio_file.audio_sample_rate
+        times = [anchor[0] for anchor in anchors] + [total_time]
+        indices = [min(int(round(t * sample_rate)), audio_file.audio_samples_length) for t in times]
+        return [(indices[i], indices[i + 1]) for i in range(len(anchors))]
+
+    def _leaves_interval(self, node):
+        """
+        Return the pair ``(begin, end)`` of the indices
+        of the samples of the given node of the text file tree
+        in the audio file synthesized by
+        :func:`~aeneas.executetask.ExecuteTask._synthesize_leaves`,
+        or ``None`` if its leaves have not been synthesized.
+
+        :param node: the node
+        :type  node: :class:`~aeneas.tree.Tree`
+        :rtype: tuple
+        """
+        intervals = self.leaf_synthesis[1]
+        leaves = [leaf.value for leaf in node.leaves_not_empty]
+        if (len(leaves) == 0) or (leaves[0] not in intervals) or (leaves[-1] not in intervals):
+            return None
+        return (intervals[leaves[0]][0], intervals[leaves[-1]][1])
+
+    def _synthesize_from_leaves(self, text_file):
+        """
+        Build the audio file and the list of anchors
+        for the given text file, as returned by
+        :func:`~aeneas.executetask.ExecuteTask._synthesize`,
+        by concatenating the audio data of the leaves
+        synthesized by
+        :func:`~aeneas.executetask.ExecuteTask._synthesize_leaves`.
+
+        Return ``None`` if the text file contains leaves
+        not synthesized, or only empty ones.
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :rtype: tuple (:class:`~aeneas.audiofile.AudioFile`, list)
+        """
+        leaves_audio_file = self.leaf_synthesis[0]
+        sample_rate = leaves_audio_file.audio_sample_rate
+        blocks = []
+        anchors = []
+        current = 0
+        for node in text_file.fragments_tree.children_not_empty:
+            interval = self._leaves_interval(node)
+            if interval is None:
+                self.log_warn(u"Text fragment with leaves not synthesized => synthesizing the text")
+                return None
+            begin, end = interval
+            anchors.append([TimeValue(current) / TimeValue(sample_rate), node.value.identifier, node.value.text])
+            blocks.append(leaves_audio_file.audio_samples_block(begin, end))
+            current += end - begin
+        if current == 0:
+            return None
+        self.log([u"Reusing %d samples of the synthesized leaves", current])
+        audio_file = AudioFile(rconf=self.rconf, logger=self.logger)
+        audio_file.audio_format = leaves_audio_file.audio_format
+        audio_file.audio_channels = 1
+        audio_file.audio_sample_rate = sample_rate
+        audio_file.add_samples(numpy.concatenate(blocks))
+        return (audio_file, anchors)
+
+    def _synthesize_mfcc(self, text_file):
+        """
+        Build the MFCCs of the synthetic wave for the given text file
+        by concatenating the MFCC matrices of its text fragments,
+        read from the MFCC cache of the current process
+        (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.MFCC_CACHE_MAX_SIZE`),
+        or computed by
+        :func:`~aeneas.executetask.ExecuteTask._compute_fragments_mfcc`
+        and added to it.
+        Text fragments with the same cache key
+        are processed only once.
+
+        Return a tuple consisting of:
+
+        1. the MFCCs of the synthetic wave
+        2. the list of anchors, as returned by
+           :func:`~aeneas.executetask.ExecuteTask._synthesize`,
+           each at the begin of the first MFCC frame
+           of the corresponding text fragment
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :rtype: tuple (:class:`~aeneas.audiofilemfcc.AudioFileMFCC`, list)
+        """
+        cache = MFCCCache.shared(self.rconf[RuntimeConfiguration.MFCC_CACHE_MAX_SIZE] * 1024 * 1024)
+        mfcc_parameters = [self.rconf[key] for key in [
+            RuntimeConfiguration.MFCC_FILTERS,
+            RuntimeConfiguration.MFCC_SIZE,
+            RuntimeConfiguration.MFCC_FFT_ORDER,
+            RuntimeConfiguration.MFCC_LOWER_FREQUENCY,
+            RuntimeConfiguration.MFCC_UPPER_FREQUENCY,
+            RuntimeConfiguration.MFCC_EMPHASIS_FACTOR,
+            RuntimeConfiguration.MFCC_WINDOW_LENGTH,
+            RuntimeConfiguration.MFCC_WINDOW_SHIFT,
+            RuntimeConfiguration.SAFETY_CHECKS,
+        ]] + [self.rconf.sample_rate]
+        nodes = text_file.fragments_tree.children_not_empty
+        keys = [cache.key(self.synthesizer.fragment_parameters(node.value) + mfcc_parameters) for node in nodes]
+        matrices = {}
+        missing = []
+        for node, key in zip(nodes, keys):
+            if key not in matrices:
+                matrices[key] = cache.get(key)
+                if matrices[key] is None:
+                    missing.append((key, node))
+        self.log([u"MFCC of %d text fragments out of %d not cached", len(missing), len(nodes)])
+        if len(missing) > 0:
+            computed = self._compute_fragments_mfcc([node for key, node in missing])
+            for (key, node), matrix in zip(missing, computed):
+                cache.put(key, matrix)
+                matrices[key] = matrix
+
+        blocks = []
+        anchors = []
+        current = 0
+        for node, key in zip(nodes, keys):
+            anchors.append([TimeValue(current) * self.rconf.mws, node.value.identifier, node.value.text])
+            blocks.append(matrices[key])
+            current += matrices[key].shape[1]
+        if current == 0:
+            self.log_warn(u"No MFCC frames for the text fragments => synthesizing the text")
+            synt_audio_file, synt_anchors = self._synthesize(text_file)
+            synt_wave_mfcc = self._extract_mfcc(audio_file=synt_audio_file)
+            synt_audio_file.clear_data()
+            return (synt_wave_mfcc, synt_anchors)
+        return (self._extract_mfcc(mfcc_matrix=numpy.concatenate(blocks, axis=1)), anchors)
+
+    def _compute_fragments_mfcc(self, nodes):
+        """
+        Compute the MFCC matrix of each of the given nodes
+        of the text file tree, separately,
+        on the audio data synthesized for it,
+        reusing the synthesis of the leaves, if available
+        (see :func:`~aeneas.executetask.ExecuteTask._synthesize_leaves`).
+
+        :param list nodes: the nodes, each a :class:`~aeneas.tree.Tree`
+        :rtype: list of :class:`numpy.ndarray` (2D)
+        """
+        sources = [None] * len(nodes)
+        if self.leaf_synthesis is not None:
+            for i, node in enumerate(nodes):
+                interval = self._leaves_interval(node)
+                if interval is not None:
+                    sources[i] = (self.leaf_synthesis[0], interval)
+        indices = [i for i, source in enumerate(sources) if source is None]
+        audio_file = None
+        if len(indices) > 0:
+            missing_text_file = TextFile()
+            for i in indices:
+                missing_text_file.add_fragment(nodes[i].value)
+            audio_file, anchors, total_time, num_chars_nu = self._synthesize_audio_file(missing_text_file)
+            for i, interval in zip(indices, self._anchors_to_intervals(audio_file, anchors, total_time)):
+                sources[i] = (audio_file, interval)
+        matrices = [self._samples_mfcc(source, begin, end) for source, (begin, end) in sources]
+        if audio_file is not None:
+            audio_file.clear_data()
+        return matrices
+
+    def _samples_mfcc(self, audio_file, begin, end):
+        """
+        Compute the MFCC matrix of the samples
+        of the given audio file
+        with indices between ``begin`` (included)
+        and ``end`` (excluded).
+
+        The samples are padded with silence
+        up to a whole number of window shifts,
+        so that the matrix has one frame
+        for each window shift, even partial, they span:
+        otherwise, the partial last frame of each text fragment
+        would be dropped, and a text fragment
+        shorter than a window shift would have no frames at all.
+        The matrix is empty only if there are no samples.
+
+        :param audio_file: the audio file
+        :type  audio_file: :class:`~aeneas.audiofile.AudioFile`
+        :param int begin: the index of the first sample
+        :param int end: the index after the last sample
+        :rtype: :class:`numpy.ndarray` (2D)
+        """
+        sample_rate = audio_file.audio_sample_rate
+        if end <= begin:
+            return numpy.zeros((self.rconf[RuntimeConfiguration.MFCC_SIZE], 0))
+        # NOTE this value must match the one computed by MFCC and cmfcc
+        frame_shift = int(self.rconf.mws * sample_rate)
+        samples = audio_file.audio_samples_block(begin, end)
+        block_audio_file = AudioFile(rconf=self.rconf, logger=self.logger)
+        block_audio_file.audio_format = audio_file.audio_format
+        block_audio_file.audio_channels = 1
+        block_audio_file.audio_sample_rate = sample_rate
+        block_audio_file.add_samples(samples)
+        padding = (-len(samples)) % frame_shift
+        if padding > 0:
+            block_audio_file.add_samples(numpy.zeros(padding, dtype=samples.dtype))
+        return AudioFileMFCC(audio_file=block_audio_file, rconf=self.rconf, logger=self.logger).all_mfcc
+
+    def _phoneme_mfcc(self, text_file):
+        """
+        Build the MFCCs of the synthetic wave for the given text file
+        from the phonemes of its text fragments,
+        output by the TTS engine without synthesizing them,
+        and from the phoneme tables of the TTS voices
+        (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TTS_PHONEME_TABLES_DIR`).
+
+        Return a tuple consisting of:
+
+        1. the MFCCs of the synthetic wave
+        2. the list of anchors, as returned by
+           :func:`~aeneas.executetask.ExecuteTask._synthesize`,
+           each at the begin of the first MFCC frame
+           of the corresponding text fragment
+
+        Return ``None`` if the TTS engine cannot output phonemes,
+        or if the phoneme table of a TTS voice does not exist.
+
+        :param text_file: the text to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :rtype: tuple (:class:`~aeneas.audiofilemfcc.AudioFileMFCC`, list)
+        """
+        blocks = []
+        anchors = []
+        current = 0
+        for fragment in text_file.fragments:
+            table = self._phoneme_table(fragment)
+            if table is None:
+                self.log_warn(u"Phoneme table not available => synthesizing the text")
+                return None
+            with self.synthesis_lock:
+                phonemes = self.synthesizer.fragment_phonemes(fragment)
+            if phonemes is None:
+                self.log_warn(u"TTS engine cannot output phonemes => synthesizing the text")
+                return None
+            anchors.append([TimeValue(current) * self.rconf.mws, fragment.identifier, fragment.text])
+            blocks.append(table.mfcc(phonemes))
+            current += blocks[-1].shape[1]
+        if current == 0:
+            return None
+        self.log([u"Built %d MFCC frames from phonemes", current])
+        return (self._extract_mfcc(mfcc_matrix=numpy.concatenate(blocks, axis=1)), anchors)
+
+    def _phoneme_table(self, fragment):
+        """
+        Return the phoneme table of the TTS voice
+        used to synthesize the given text fragment,
+        with the current MFCC parameters,
+        or ``None`` if it does not exist.
+
+        Each table is read from disk only once
+        for each MFCC window shift.
+
+        :param fragment: the text fragment
+        :type  fragment: :class:`~aeneas.textfile.TextFragment`
+        :rtype: :class:`~aeneas.phonemetable.PhonemeTable`
+        """
+        file_path = os.path.join(
+            self.rconf[RuntimeConfiguration.TTS_PHONEME_TABLES_DIR],
+            PhonemeTable.file_name(self.synthesizer.voice_parameters(fragment), self.rconf)
+        )
+        # NOTE the table builds the frames with the MFCC window shift of its rconf
+        key = (file_path, self.rconf.mws)
+        if key not in self.phoneme_tables:
+            self.phoneme_tables[key] = PhonemeTable.load(file_path, rconf=self.rconf, logger=self.logger)
+        return self.phoneme_tables[key]
 
     def _align_waves(self, real_wave_mfcc, synt_wave_mfcc, synt_anchors):
         """
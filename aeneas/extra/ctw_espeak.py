@@ -148,6 +148,15 @@ class CustomTTSWrapper(BaseTTSWrapper):
         #      you can use the
         #      BaseTTSWrapper.CLI_PARAMETER_WAVE_STDOUT placeholder.
         #
+        # NOTE if your TTS engine can also write audio data to stdout,
+        #      you can call set_subprocess_pipe_arguments()
+        #      with a second list of arguments using the
+        #      BaseTTSWrapper.CLI_PARAMETER_WAVE_STDOUT placeholder,
+        #      which will be used if tts_pipe is True,
+        #      avoiding a temporary output file per fragment, e.g.:
+        #      [u"/usr/bin/espeak", u"-v", VOICE_CODE_STRING,
+        #       u"--stdout", WAVE_STDOUT, TEXT_STDIN]
+        #
         # NOTE if your TTS engine needs a more complex parameter
         #      for selecting the voice, e.g. Festival needs
         #      '-eval "(language_italian)"',
@@ -0,0 +1,375 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.festivalserver.FestivalServer`,
+  a connection to a ``Festival`` server,
+  optionally started as a long-lived process;
+* :class:`~aeneas.festivalserver.FestivalServerPool`,
+  a pool of :class:`~aeneas.festivalserver.FestivalServer` objects.
+
+Starting ``Festival`` and loading a voice
+takes several hundred milliseconds,
+which dominate the time needed to synthesize
+a short text fragment with ``text2wave``.
+A ``Festival`` server (``festival --server``)
+pays this cost once, and then synthesizes
+the text sent over a socket.
+
+Please refer to
+http://www.cstr.ed.ac.uk/projects/festival/manual/festival_28.html
+for further details about the ``Festival`` server protocol.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import io
+import os
+import socket
+import subprocess
+import time
+
+from aeneas.logger import Loggable
+from aeneas.processpool import ProcessPool
+import aeneas.globalfunctions as gf
+
+
+class FestivalServer(Loggable):
+    """
+    A connection to a ``Festival`` server.
+
+    If ``festival_path`` is not ``None``,
+    :func:`~aeneas.festivalserver.FestivalServer.start`
+    starts a ``festival --server`` process,
+    listening on a free local port,
+    and connects to it.
+    Otherwise, it connects to the server
+    already listening on the given local ``port``.
+
+    Each connection synthesizes one text at a time,
+    as a RIFF WAVE file sent back over the socket.
+
+    :param string festival_path: the path to the ``festival`` executable
+    :param int port: the port of a running server
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    FILE_STUFF_KEY = b"ft_StUfF_key"
+    """
+    Key terminating a file (e.g., a waveform)
+    sent by the server; occurrences of the key
+    within the file are escaped by inserting an ``X``
+    before its last character
+    """
+
+    HOST = "127.0.0.1"
+    """ Host of the server """
+
+    RECEIVE_SIZE = 65536
+    """ Maximum number of bytes read from the socket at once """
+
+    START_TIMEOUT = 30.0
+    """
+    Wait at most this number of seconds
+    for a server process to accept connections
+    """
+
+    TAG = u"FestivalServer"
+
+    def __init__(self, festival_path=None, port=None, rconf=None, logger=None):
+        super(FestivalServer, self).__init__(rconf=rconf, logger=logger)
+        self.festival_path = festival_path
+        self.port = port
+        self.process = None
+        self.connection = None
+        self.buffer = b""
+        self.voice_function = None
+        self.requests = 0
+
+    @property
+    def alive(self):
+        """
+        Return ``True`` if the connection is open,
+        and the server process, if any, is running.
+
+        :rtype: bool
+        """
+        if self.connection is None:
+            return False
+        return (self.process is None) or (self.process.poll() is None)
+
+    @property
+    def started(self):
+        """
+        Return ``True`` if the server has been started,
+        even if it crashed afterwards.
+
+        :rtype: bool
+        """
+        return self.connection is not None
+
+    def start(self):
+        """
+        Start the server process, if needed, and connect to it.
+
+        :raises: OSError: if the server process cannot be started
+                          or the server does not accept connections
+        """
+        if self.festival_path is not None:
+            self.port = self._free_port()
+            arguments = [self.festival_path, "--server", "(set! server_port %d)" % self.port]
+            self.log([u"Starting server with arguments '%s'", u" ".join(arguments)])
+            with io.open(os.devnull, "wb") as devnull:
+                self.process = subprocess.Popen(
+                    arguments,
+                    stdin=devnull,
+                    stdout=devnull,
+                    stderr=devnull
+                )
+        # NOTE the server process loads its voices before listening
+        deadline = time.time() + self.START_TIMEOUT
+        while True:
+            try:
+                self.connection = socket.create_connection((self.HOST, self.port))
+                break
+            except (IOError, OSError, socket.error) as exc:
+                if (self.process is None) or (self.process.poll() is not None) or (time.time() > deadline):
+                    self.stop()
+                    self.log_exc(u"Unable to connect to the Festival server on port %d" % (self.port), exc, True, OSError)
+                time.sleep(0.1)
+        self.buffer = b""
+        self.voice_function = None
+        self.requests = 0
+        self.command(u"(Parameter.set 'Wavefiletype 'riff)")
+        self.log([u"Connected to the Festival server on port %d", self.port])
+
+    def stop(self):
+        """
+        Close the connection, and stop the server process, if any.
+        """
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except (IOError, OSError, socket.error):
+                pass
+            self.connection = None
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process = None
+
+    def synthesize(self, voice_function, text):
+        """
+        Synthesize the given text with the voice
+        selected by the given Scheme expression,
+        e.g. ``(language_italian)``,
+        and return the RIFF WAVE data.
+
+        :param string voice_function: the Scheme expression selecting the voice
+        :param string text: the text
+        :rtype: bytes
+        :raises: OSError: if the connection to the server failed
+        :raises: ValueError: if the server failed to synthesize the text
+        """
+        if voice_function != self.voice_function:
+            self.command(voice_function)
+            self.voice_function = voice_function
+        escaped = gf.safe_unicode(text).replace(u"\\", u"\\\\").replace(u"\"", u"\\\"")
+        data = self.command(u"(utt.send.wave.client (utt.synth (Utterance Text \"%s\")))" % (escaped))
+        if data is None:
+            self.log_exc(u"The Festival server sent no waveform", None, True, ValueError)
+        self.requests += 1
+        return data
+
+    def command(self, expression):
+        """
+        Send the given Scheme expression to the server,
+        and return the last waveform sent back
+        while evaluating it, or ``None``.
+
+        :param string expression: the Scheme expression
+        :rtype: bytes
+        :raises: OSError: if the connection to the server failed
+        :raises: ValueError: if the server failed to evaluate the expression
+        """
+        try:
+            self.connection.sendall(gf.safe_bytes(expression) + b"\n")
+            data = None
+            while True:
+                ack = self._read_exactly(3)
+                if ack == b"WV\n":
+                    data = self._read_file()
+                elif ack == b"LP\n":
+                    self._read_file()
+                elif ack == b"OK\n":
+                    return data
+                elif ack == b"ER\n":
+                    break
+                else:
+                    raise ValueError(u"Unexpected reply from the Festival server")
+        except (IOError, OSError, socket.error, EOFError, ValueError) as exc:
+            self.log_exc(u"The Festival server did not respond", exc, False, None)
+            raise OSError(u"The Festival server did not respond")
+        self.log_exc(u"The Festival server failed to evaluate '%s'" % (expression), None, True, ValueError)
+
+    def _free_port(self):
+        """
+        Return a free local port.
+
+        :rtype: int
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.bind((self.HOST, 0))
+            return sock.getsockname()[1]
+        finally:
+            sock.close()
+
+    def _receive(self):
+        """
+        Append the bytes read from the socket to the buffer.
+
+        :raises: EOFError: if the server closed the connection
+        """
+        data = self.connection.recv(self.RECEIVE_SIZE)
+        if len(data) == 0:
+            raise EOFError(u"The Festival server closed the connection")
+        self.buffer += data
+
+    def _read_exactly(self, length):
+        """
+        Read exactly ``length`` bytes.
+
+        :rtype: bytes
+        """
+        while len(self.buffer) < length:
+            self._receive()
+        data, self.buffer = self.buffer[:length], self.buffer[length:]
+        return data
+
+    def _read_file(self):
+        """
+        Read a file terminated by ``FILE_STUFF_KEY``,
+        removing the escape characters,
+        as the ``festival_client`` program does.
+
+        :rtype: bytes
+        """
+        key = self.FILE_STUFF_KEY
+        chunks = []
+        matched = 0
+        while True:
+            if len(self.buffer) == 0:
+                self._receive()
+            buf = self.buffer
+            i = 0
+            while i < len(buf):
+                if matched == 0:
+                    # NOTE copy everything before the next candidate key at once
+                    j = buf.find(key[0:1], i)
+                    if j < 0:
+                        chunks.append(buf[i:])
+                        break
+                    chunks.append(buf[i:j])
+                    i = j
+                c = buf[i:i + 1]
+                i += 1
+                if c == key[matched:matched + 1]:
+                    matched += 1
+                    if matched == len(key):
+                        self.buffer = buf[i:]
+                        return b"".join(chunks)
+                elif (c == b"X") and (matched == len(key) - 1):
+                    # it looked like the key, but it was not: drop the X
+                    chunks.append(key[0:matched])
+                    matched = 0
+                else:
+                    chunks.append(key[0:matched])
+                    chunks.append(c)
+                    matched = 0
+            self.buffer = b""
+
+
+class FestivalServerPool(ProcessPool):
+    """
+    A pool of :class:`~aeneas.festivalserver.FestivalServer` objects,
+    serving concurrent synthesis requests.
+
+    Servers are started when needed,
+    and started again if they crash while serving a request,
+    which is then retried once.
+
+    Pools are shared by all the callers in the current process,
+    see :func:`~aeneas.processpool.ProcessPool.get`,
+    and their server processes are stopped
+    when the current process exits.
+
+    :param string festival_path: the path to the ``festival`` executable,
+                                 or ``None`` to connect to a running server
+    :param int port: the port of a running server,
+                     if ``festival_path`` is ``None``
+    :param int size: the maximum number of servers (or connections)
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    PROCESS_NAME = u"server"
+
+    TAG = u"FestivalServerPool"
+
+    def __init__(self, festival_path, port, size, rconf=None, logger=None):
+        super(FestivalServerPool, self).__init__(size=size, rconf=rconf, logger=logger)
+        self.festival_path = festival_path
+        self.port = port
+
+    def synthesize(self, voice_function, text):
+        """
+        Synthesize the given text with the voice
+        selected by the given Scheme expression,
+        using a server of the pool,
+        and return the RIFF WAVE data.
+
+        :param string voice_function: the Scheme expression selecting the voice
+        :param string text: the text
+        :rtype: bytes
+        :raises: OSError: if the server crashed twice
+        :raises: ValueError: if the server failed to synthesize the text
+        """
+        return self._call((voice_function, text))
+
+    def _new_process(self):
+        return FestivalServer(self.festival_path, self.port, rconf=self.rconf, logger=self.logger)
+
+    def _serve(self, process, request):
+        voice_function, text = request
+        return process.synthesize(voice_function, text)
@@ -30,8 +30,12 @@ This module contains the following classes:
 
 from __future__ import absolute_import
 from __future__ import print_function
+import numpy
+import re
 import subprocess
 
+from aeneas.exacttiming import TimeValue
+from aeneas.ffprobewrapper import FFPROBEWrapper
 from aeneas.logger import Loggable
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 import aeneas.globalfunctions as gf
@@ -93,6 +97,20 @@ class FFMPEGWrapper(Loggable):
     (must be the second to last argument to ``ffmpeg``,
     just before path of the output file) """
 
+    FFMPEG_FORMAT_PCM16 = ["-f", "s16le", "-acodec", "pcm_s16le"]
+    """ Single parameter for ``ffmpeg``: produce raw PCM16 little endian output,
+    without header (must be the second to last argument to ``ffmpeg``,
+    just before path of the output file)
+
+    .. versionadded:: 1.8.0
+    """
+
+    FFMPEG_PIPE_OUTPUT = "pipe:1"
+    """ Path of the output file for ``ffmpeg`` writing to stdout
+
+    .. versionadded:: 1.8.0
+    """
+
     FFMPEG_PARAMETERS_SAMPLE_KEEP = (
         FFMPEG_MONO +
         FFMPEG_OVERWRITE +
@@ -158,6 +176,45 @@ class FFMPEGWrapper(Loggable):
     FFMPEG_PARAMETERS_DEFAULT = FFMPEG_PARAMETERS_SAMPLE_16000
     """ Default set of parameters for ``ffmpeg`` """
 
+    FFMPEG_SAMPLE_RATE_DEFAULT = 16000
+    """ Sample rate of the output of ``ffmpeg``
+    with the default set of parameters
+
+    .. versionadded:: 1.8.0
+    """
+
+    STDERR_CHANNEL_LAYOUTS = {
+        "mono": 1,
+        "stereo": 2,
+        "2.1": 3,
+        "3.0": 3,
+        "quad": 4,
+        "4.0": 4,
+        "4.1": 5,
+        "5.0": 5,
+        "5.1": 6,
+        "6.0": 6,
+        "6.1": 7,
+        "7.0": 7,
+        "7.1": 8,
+    }
+    """ Map ``ffmpeg`` channel layout names to number of channels
+
+    .. versionadded:: 1.8.0
+    """
+
+    STDERR_CHANNELS_REGEX = re.compile(r"^([0-9]+) channels")
+    """ Regex to match ``ffmpeg`` stderr number of channels
+
+    .. versionadded:: 1.8.0
+    """
+
+    STDERR_INPUT_STREAM_REGEX = re.compile(r"Stream #[0-9]+:[0-9]+.*: Audio: ([^ ,]+)[^,]*, ([0-9]+) Hz, ([^,]+)")
+    """ Regex to match ``ffmpeg`` stderr audio stream line
+
+    .. versionadded:: 1.8.0
+    """
+
     TAG = u"FFMPEGWrapper"
 
     def convert(
@@ -203,11 +260,13 @@ class FFMPEGWrapper(Loggable):
 
         # call ffmpeg
         arguments = [self.rconf[RuntimeConfiguration.FFMPEG_PATH]]
-        arguments.extend(["-i", input_file_path])
+        # NOTE -ss before -i seeks the input file instead of
+        #      decoding and discarding the first head_length seconds
         if head_length is not None:
-            arguments.extend(["-ss", head_length])
+            arguments.extend(["-ss", u"%.3f" % head_length])
+        arguments.extend(["-i", input_file_path])
         if process_length is not None:
-            arguments.extend(["-t", process_length])
+            arguments.extend(["-t", u"%.3f" % process_length])
         if self.rconf.sample_rate in self.FFMPEG_PARAMETERS_MAP:
             arguments.extend(self.FFMPEG_PARAMETERS_MAP[self.rconf.sample_rate])
         else:
@@ -236,3 +295,172 @@ class FFMPEGWrapper(Loggable):
         # returning the output file path
         self.log([u"Returning output file path '%s'", output_file_path])
         return output_file_path
+
+    def decode(
+            self,
+            input_file_path,
+            head_length=None,
+            process_length=None
+    ):
+        """
+        Decode the audio file at ``input_file_path``
+        into PCM16 mono samples, read from the ``ffmpeg`` stdout,
+        and parse the properties of the input audio stream
+        from the ``ffmpeg`` stderr,
+        with a single ``ffmpeg`` process.
+
+        Return a tuple ``(sample_rate, samples, properties)``,
+        where ``samples`` is a :class:`numpy.ndarray` of ``int16`` values,
+        and ``properties`` is a dictionary with the same keys
+        returned by
+        :func:`~aeneas.ffprobewrapper.FFPROBEWrapper.read_properties`,
+        describing the input audio file (not the decoded samples).
+        Properties which cannot be parsed are ``None``.
+        Note that the duration printed by ``ffmpeg``
+        is rounded to centiseconds, and for some formats
+        it is estimated from the bitrate,
+        hence it might differ from the duration
+        of the decoded samples and from the one read by ``ffprobe``.
+
+        ``head_length`` and ``process_length`` have the same meaning
+        as in :func:`~aeneas.ffmpegwrapper.FFMPEGWrapper.convert`.
+
+        :param string input_file_path: the path of the audio file to decode
+        :param float head_length: skip these many seconds
+                                  from the beginning of the audio file
+        :param float process_length: process these many seconds of the audio file
+        :rtype: tuple ``(int, numpy.ndarray, dict)``
+        :raises: :class:`~aeneas.ffmpegwrapper.FFMPEGPathError`: if the path to the ``ffmpeg`` executable cannot be called
+        :raises: OSError: if ``input_file_path`` does not exist
+                          or it cannot be decoded
+
+        .. versionadded:: 1.8.0
+        """
+        # test if we can read the input file
+        if not gf.file_can_be_read(input_file_path):
+            self.log_exc(u"Input file '%s' cannot be read" % (input_file_path), None, True, OSError)
+
+        # call ffmpeg
+        if self.rconf.sample_rate in self.FFMPEG_PARAMETERS_MAP:
+            sample_rate = self.rconf.sample_rate
+        else:
+            sample_rate = self.FFMPEG_SAMPLE_RATE_DEFAULT
+        arguments = [self.rconf[RuntimeConfiguration.FFMPEG_PATH]]
+        if head_length is not None:
+            arguments.extend(["-ss", u"%.3f" % head_length])
+        arguments.extend(["-i", input_file_path])
+        if process_length is not None:
+            arguments.extend(["-t", u"%.3f" % process_length])
+        arguments.extend(self.FFMPEG_MONO)
+        arguments.extend(["-ar", u"%d" % sample_rate])
+        arguments.extend(self.FFMPEG_FORMAT_PCM16)
+        arguments.append(self.FFMPEG_PIPE_OUTPUT)
+        self.log([u"Calling with arguments '%s'", arguments])
+        try:
+            proc = subprocess.Popen(
+                arguments,
+                stdout=subprocess.PIPE,
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            # NOTE communicate() reads stdout and stderr concurrently,
+            #      hence ffmpeg cannot block writing to a full pipe
+            (stdoutdata, stderrdata) = proc.communicate()
+            proc.stdout.close()
+            proc.stdin.close()
+            proc.stderr.close()
+        except OSError as exc:
+            self.log_exc(u"Unable to call the '%s' ffmpeg executable" % (self.rconf[RuntimeConfiguration.FFMPEG_PATH]), exc, True, FFMPEGPathError)
+        self.log(u"Call completed")
+
+        if proc.returncode != 0:
+            self.log_exc(u"Input file '%s' was not decoded (return code %d)" % (input_file_path, proc.returncode), None, True, OSError)
+
+        # NOTE drop a trailing odd byte, if any
+        stdoutdata = stdoutdata[0:(len(stdoutdata) // 2) * 2]
+        # NOTE astype() copies the read-only buffer into a writable array
+        samples = numpy.frombuffer(stdoutdata, dtype="<i2").astype("int16")
+        self.log([u"Decoded %d samples at %d Hz", len(samples), sample_rate])
+
+        properties = self._parse_stderr(stderrdata)
+        if (
+                (properties[FFPROBEWrapper.STDOUT_DURATION] is None) and
+                (head_length is None) and
+                (process_length is None)
+        ):
+            # e.g., "Duration: N/A": the entire file has been decoded
+            properties[FFPROBEWrapper.STDOUT_DURATION] = TimeValue(len(samples)) / sample_rate
+            self.log([u"Duration computed from the decoded samples: '%.3f'", properties[FFPROBEWrapper.STDOUT_DURATION]])
+        return (sample_rate, samples, properties)
+
+    def _parse_stderr(self, stderrdata):
+        """
+        Parse the properties of the (first) input audio stream
+        from the banner printed by ``ffmpeg`` on stderr,
+        and return them as a dictionary
+        with the same keys returned by
+        :func:`~aeneas.ffprobewrapper.FFPROBEWrapper.read_properties`.
+
+        Example: ::
+
+            Input #0, mp3, from 'p001.mp3':
+              Duration: 00:00:53.70, start: 0.025057, bitrate: 128 kb/s
+                Stream #0:0: Audio: mp3, 44100 Hz, stereo, fltp, 128 kb/s
+            Stream mapping:
+              Stream #0:0 -> #0:0 (mp3 (mp3float) -> pcm_s16le (native))
+            Output #0, s16le, to 'pipe:1':
+
+        :param variant stderrdata: the stderr of ``ffmpeg`` (bytes or Unicode string)
+        :rtype: dict
+
+        .. versionadded:: 1.8.0
+        """
+        if gf.is_bytes(stderrdata):
+            # NOTE metadata tags might not be valid UTF-8
+            stderrdata = stderrdata.decode("utf-8", "replace")
+        results = {
+            FFPROBEWrapper.STDOUT_CHANNELS: None,
+            FFPROBEWrapper.STDOUT_CODEC_NAME: None,
+            FFPROBEWrapper.STDOUT_DURATION: None,
+            FFPROBEWrapper.STDOUT_SAMPLE_RATE: None
+        }
+        for line in stderrdata.splitlines():
+            line = line.strip()
+            if line.startswith(u"Output #") or line.startswith(u"Stream mapping:"):
+                self.log(u"Reached end of the input description")
+                break
+            if results[FFPROBEWrapper.STDOUT_DURATION] is None:
+                match = FFPROBEWrapper.STDERR_DURATION_REGEX.search(line)
+                if match is not None:
+                    self.log([u"Found duration line '%s'", line])
+                    results[FFPROBEWrapper.STDOUT_DURATION] = gf.time_from_hhmmssmmm(line)
+                    continue
+            if results[FFPROBEWrapper.STDOUT_CODEC_NAME] is None:
+                match = self.STDERR_INPUT_STREAM_REGEX.search(line)
+                if match is not None:
+                    self.log([u"Found audio stream line '%s'", line])
+                    results[FFPROBEWrapper.STDOUT_CODEC_NAME] = match.group(1)
+                    results[FFPROBEWrapper.STDOUT_SAMPLE_RATE] = match.group(2)
+                    results[FFPROBEWrapper.STDOUT_CHANNELS] = self._parse_channels(match.group(3))
+        self.log([u"Parsed properties: %s", results])
+        return results
+
+    def _parse_channels(self, layout):
+        """
+        Return the number of channels (as a string, like ``ffprobe`` does)
+        corresponding to the given ``ffmpeg`` channel layout,
+        or ``None`` if it is not known.
+
+        :param string layout: the channel layout, e.g. ``stereo`` or ``5.1(side)``
+        :rtype: string
+        """
+        layout = layout.strip()
+        match = self.STDERR_CHANNELS_REGEX.search(layout)
+        if match is not None:
+            return match.group(1)
+        # NOTE drop variants like "(side)"
+        layout = layout.split("(")[0]
+        if layout in self.STDERR_CHANNEL_LAYOUTS:
+            return u"%d" % self.STDERR_CHANNEL_LAYOUTS[layout]
+        self.log_warn([u"Unknown channel layout '%s'", layout])
+        return None
@@ -28,6 +28,7 @@ Global common functions.
 from __future__ import absolute_import
 from __future__ import print_function
 import datetime
+import hashlib
 import io
 import math
 import os
@@ -35,6 +36,7 @@ import re
 import shutil
 import sys
 import tempfile
+import threading
 import uuid
 
 from aeneas.exacttiming import TimeValue
@@ -844,6 +846,14 @@ def can_run_c_extension(name=None):
         except ImportError:
             return False
 
+    def can_run_cwave():
+        """ Python C extension for reading WAVE files """
+        try:
+            import aeneas.cwave.cwave
+            return True
+        except ImportError:
+            return False
+
     if name == "cdtw":
         return can_run_cdtw()
     elif name == "cmfcc":
@@ -852,11 +862,31 @@ def can_run_c_extension(name=None):
         return can_run_cew()
     elif name == "cfw":
         return can_run_cfw()
+    elif name == "cwave":
+        return can_run_cwave()
     else:
         # NOTE cfw is still experimental!
         return can_run_cdtw() and can_run_cmfcc() and can_run_cew()
 
 
+def cew_engine():
+    """
+    Return the name of the library the Python C extension ``cew``
+    is linked against, ``espeak`` or ``espeak-ng``,
+    or ``None`` if it cannot be loaded.
+
+    :rtype: string
+
+    .. versionadded:: 1.8.0
+    """
+    try:
+        import aeneas.cew.cew
+    except ImportError:
+        return None
+    # NOTE cew built by older versions is linked against espeak
+    return getattr(aeneas.cew.cew, "engine", u"espeak")
+
+
 def run_c_extension_with_fallback(
         log_function,
         extension,
@@ -908,6 +938,40 @@ def run_c_extension_with_fallback(
     return result
 
 
+def start_thread(function, *args):
+    """
+    Call ``function(*args)`` in a new (daemon) thread.
+
+    Return a function which waits for the thread to finish
+    and returns the value returned by ``function``,
+    or raises again the exception raised by it.
+
+    :param function function: the function to be called
+    :rtype: function
+
+    .. versionadded:: 1.8.0
+    """
+    outcome = {}
+
+    def target():
+        try:
+            outcome["result"] = function(*args)
+        except Exception as exc:
+            outcome["error"] = exc
+
+    thread = threading.Thread(target=target)
+    thread.daemon = True
+    thread.start()
+
+    def join():
+        thread.join()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    return join
+
+
 def file_can_be_read(path):
     """
     Return ``True`` if the file at the given ``path`` can be read.
@@ -1280,6 +1344,25 @@ def object_to_bytes(obj):
     return bytes(obj, encoding="utf-8")
 
 
+def parameters_digest(parameters):
+    """
+    Return the hexadecimal SHA-256 digest
+    of the Unicode representation of the given parameters,
+    joined by ``NUL`` characters.
+
+    Byte strings are decoded as UTF-8,
+    so that equal values yield the same digest
+    under Python 2 and 3.
+
+    :param list parameters: the parameters
+    :rtype: string
+
+    .. versionadded:: 1.8.0
+    """
+    string = u"\x00".join([safe_unicode(p) if is_bytes(p) else u"%s" % (p,) for p in parameters])
+    return hashlib.sha256(string.encode("utf-8")).hexdigest()
+
+
 def bundle_directory():
     """
     Return the absolute path of the bundle directory
@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.mfcccache.MFCCCache`,
+  a thread-safe, in-memory cache of the MFCC matrices
+  of synthesized text fragments.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import threading
+
+import aeneas.globalfunctions as gf
+
+
+class MFCCCache(object):
+    """
+    A thread-safe, in-memory cache of the MFCC matrices
+    of synthesized text fragments.
+
+    Each entry is the MFCC matrix of the audio data
+    produced by a TTS engine for a text fragment,
+    identified by the parameters affecting
+    both the synthesis and the MFCC extraction
+    (e.g., the TTS engine, the voice code, the text,
+    and the MFCC window length and shift),
+    as computed by :func:`~aeneas.mfcccache.MFCCCache.key`.
+
+    When the total size of the cached matrices
+    exceeds the maximum size,
+    the least recently used entries are removed first.
+    The cached matrices are read-only,
+    since they might be shared by several callers.
+
+    :param int max_size: the maximum size of the cache, in bytes
+    :raises: ValueError: if ``max_size`` is not positive
+    """
+
+    _SHARED = {}
+    """ Caches shared by the callers in the current process """
+
+    _SHARED_LOCK = threading.Lock()
+
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise ValueError(u"The maximum size must be positive")
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @classmethod
+    def shared(cls, max_size):
+        """
+        Return the cache with the given maximum size
+        shared by the callers in the current process,
+        creating it if needed.
+
+        :param int max_size: the maximum size of the cache, in bytes
+        :rtype: :class:`~aeneas.mfcccache.MFCCCache`
+        """
+        with cls._SHARED_LOCK:
+            if max_size not in cls._SHARED:
+                cls._SHARED[max_size] = cls(max_size)
+            return cls._SHARED[max_size]
+
+    @classmethod
+    def key(cls, parameters):
+        """
+        Return the key of the entry identified
+        by the given list of parameters,
+        that is, the hexadecimal SHA-256 digest
+        of their Unicode representation.
+
+        :param list parameters: the parameters
+        :rtype: string
+        """
+        return gf.parameters_digest(parameters)
+
+    def get(self, key):
+        """
+        Return the MFCC matrix of the entry with the given key,
+        marking it as the most recently used one,
+        or ``None`` if the entry is not in the cache.
+
+        :param string key: the key
+        :rtype: :class:`numpy.ndarray` (2D)
+        """
+        with self.lock:
+            matrix = self.entries.pop(key, None)
+            if matrix is None:
+                self.misses += 1
+                return None
+            self.entries[key] = matrix
+            self.hits += 1
+            return matrix
+
+    def put(self, key, matrix):
+        """
+        Store the given MFCC matrix as the entry with the given key,
+        removing the least recently used entries if needed,
+        and return ``True`` if it has been stored,
+        or ``False`` if it is larger than the maximum size.
+
+        The matrix is made read-only.
+
+        :param string key: the key
+        :param matrix: the MFCC matrix
+        :type  matrix: :class:`numpy.ndarray` (2D)
+        :rtype: bool
+        """
+        if matrix.nbytes > self.max_size:
+            return False
+        matrix.flags.writeable = False
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old.nbytes
+            self.entries[key] = matrix
+            self.size += matrix.nbytes
+            while self.size > self.max_size:
+                self.size -= self.entries.popitem(last=False)[1].nbytes
+        return True
+
+    def clear(self):
+        """
+        Remove all the entries.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
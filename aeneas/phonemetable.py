@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.phonemetable.PhonemeTable`,
+  a table of the average MFCC vector and duration
+  of each phoneme of a TTS voice.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import io
+import numpy
+import os
+
+from aeneas.logger import Loggable
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.vad import VAD
+import aeneas.globalfunctions as gf
+
+
+class PhonemeTable(Loggable):
+    """
+    A table of the average MFCC vector and the average duration
+    of each phoneme of a TTS voice,
+    used to build the MFCCs of a synthetic wave
+    from the phonemes of its text,
+    without synthesizing it.
+
+    The table is built by adding
+    the MFCCs of text fragments synthesized with the voice,
+    along with their phonemes
+    (see :func:`~aeneas.phonemetable.PhonemeTable.add`):
+    the nonspeech frames at the begin and at the end
+    of each text fragment are averaged into the silence vector,
+    while its speech frames are split evenly among its phonemes.
+
+    Since the MFCC vectors depend on the MFCC parameters,
+    except the window shift,
+    the name of the file of a table
+    (see :func:`~aeneas.phonemetable.PhonemeTable.file_name`)
+    depends on them, besides the TTS engine and the voice code.
+
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    FILE_EXTENSION = u".npz"
+    """ Extension of the table files """
+
+    MFCC_PARAMETERS = [
+        RuntimeConfiguration.MFCC_FILTERS,
+        RuntimeConfiguration.MFCC_SIZE,
+        RuntimeConfiguration.MFCC_FFT_ORDER,
+        RuntimeConfiguration.MFCC_LOWER_FREQUENCY,
+        RuntimeConfiguration.MFCC_UPPER_FREQUENCY,
+        RuntimeConfiguration.MFCC_EMPHASIS_FACTOR,
+        RuntimeConfiguration.MFCC_WINDOW_LENGTH,
+    ]
+    """ The MFCC parameters the MFCC vectors depend on """
+
+    TAG = u"PhonemeTable"
+
+    def __init__(self, rconf=None, logger=None):
+        super(PhonemeTable, self).__init__(rconf=rconf, logger=logger)
+        size = self.rconf[RuntimeConfiguration.MFCC_SIZE]
+        self.fragments = 0
+        self.sums = {}
+        self.frames = {}
+        self.durations = {}
+        self.counts = {}
+        self.silence_sum = numpy.zeros(size)
+        self.silence_frames = 0
+        self.lead = 0.0
+        self.trail = 0.0
+
+    def __len__(self):
+        return len(self.counts)
+
+    @classmethod
+    def file_name(cls, voice_parameters, rconf):
+        """
+        Return the name of the file of the table
+        for the given voice, with the MFCC parameters of ``rconf``.
+
+        :param list voice_parameters: the parameters identifying the voice
+                                      (e.g., the TTS engine and the voice code)
+        :param rconf: a runtime configuration
+        :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+        :rtype: string
+        """
+        parameters = list(voice_parameters) + [rconf[key] for key in cls.MFCC_PARAMETERS]
+        return gf.parameters_digest(parameters) + cls.FILE_EXTENSION
+
+    def add(self, mfcc, phonemes):
+        """
+        Add the MFCCs of a synthesized text fragment,
+        with the MFCC parameters of ``rconf``,
+        along with its phonemes.
+
+        :param mfcc: the MFCC matrix of the text fragment
+        :type  mfcc: :class:`numpy.ndarray` (2D)
+        :param list phonemes: the phonemes of the text fragment
+        """
+        mws = float(self.rconf.mws)
+        frames = mfcc.shape[1]
+        if frames == 0:
+            return
+        self.fragments += 1
+        vad = VAD(rconf=self.rconf, logger=self.logger)
+        speech = numpy.where(vad.run_vad(
+            wave_energy=mfcc[0],
+            min_nonspeech_length=1,
+            extend_before=0,
+            extend_after=0
+        ))[0]
+        if (len(speech) == 0) or (len(phonemes) == 0):
+            self.silence_sum += numpy.sum(mfcc, axis=1)
+            self.silence_frames += frames
+            return
+        begin = speech[0]
+        end = speech[-1] + 1
+        self.silence_sum += numpy.sum(mfcc[:, :begin], axis=1) + numpy.sum(mfcc[:, end:], axis=1)
+        self.silence_frames += begin + frames - end
+        self.lead += begin * mws
+        self.trail += (frames - end) * mws
+        for phoneme, block in zip(phonemes, numpy.array_split(mfcc[:, begin:end], len(phonemes), axis=1)):
+            if phoneme not in self.counts:
+                self.sums[phoneme] = numpy.zeros(mfcc.shape[0])
+                self.frames[phoneme] = 0
+                self.durations[phoneme] = 0.0
+                self.counts[phoneme] = 0
+            self.sums[phoneme] += numpy.sum(block, axis=1)
+            self.frames[phoneme] += block.shape[1]
+            self.durations[phoneme] += block.shape[1] * mws
+            self.counts[phoneme] += 1
+
+    def mfcc(self, phonemes):
+        """
+        Return the MFCC matrix of a text fragment
+        with the given phonemes,
+        with one frame for each MFCC window shift of ``rconf``:
+        the silence vector for the average nonspeech duration
+        at the begin of a text fragment,
+        followed by the average vector of each phoneme
+        for its average duration,
+        and by the silence vector for the average nonspeech duration
+        at the end of a text fragment.
+
+        Phonemes not in the table take the average vector
+        and the average duration of all the phonemes.
+
+        :param list phonemes: the phonemes of the text fragment
+        :rtype: :class:`numpy.ndarray` (2D)
+        :raises: ValueError: if the table is empty
+        """
+        if len(self) == 0:
+            self.log_exc(u"The phoneme table is empty", None, True, ValueError)
+        default_vector = sum(self.sums.values()) / max(sum(self.frames.values()), 1)
+        default_duration = sum(self.durations.values()) / sum(self.counts.values())
+        silence_vector = self.silence_sum / max(self.silence_frames, 1)
+        vectors = [silence_vector]
+        durations = [self.lead / self.fragments]
+        unknown = 0
+        for phoneme in phonemes:
+            if (phoneme in self.counts) and (self.frames[phoneme] > 0):
+                vectors.append(self.sums[phoneme] / self.frames[phoneme])
+                durations.append(self.durations[phoneme] / self.counts[phoneme])
+            else:
+                unknown += 1
+                vectors.append(default_vector)
+                durations.append(default_duration)
+        vectors.append(silence_vector)
+        durations.append(self.trail / self.fragments)
+        if unknown > 0:
+            self.log([u"%d phonemes not in the table", unknown])
+        # NOTE round the cumulative times, so that the rounding errors do not add up
+        boundaries = numpy.round(numpy.cumsum([0.0] + durations) / float(self.rconf.mws)).astype("int")
+        return numpy.repeat(numpy.array(vectors).transpose(), numpy.diff(boundaries), axis=1)
+
+    def save(self, file_path):
+        """
+        Save the table to the given file.
+
+        :param string file_path: the path of the file
+        """
+        phonemes = sorted(self.counts.keys())
+        size = self.rconf[RuntimeConfiguration.MFCC_SIZE]
+        with io.open(file_path, "wb") as table_file:
+            numpy.savez(
+                table_file,
+                phonemes=numpy.array(phonemes, dtype="U"),
+                sums=numpy.array([self.sums[p] for p in phonemes]).reshape(len(phonemes), size),
+                frames=numpy.array([self.frames[p] for p in phonemes]),
+                durations=numpy.array([self.durations[p] for p in phonemes]),
+                counts=numpy.array([self.counts[p] for p in phonemes]),
+                silence_sum=self.silence_sum,
+                others=numpy.array([self.fragments, self.silence_frames, self.lead, self.trail])
+            )
+        self.log([u"Saved table with %d phonemes to '%s'", len(phonemes), file_path])
+
+    @classmethod
+    def load(cls, file_path, rconf=None, logger=None):
+        """
+        Load the table from the given file,
+        or return ``None`` if the file does not exist.
+
+        :param string file_path: the path of the file
+        :param rconf: a runtime configuration
+        :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+        :param logger: the logger object
+        :type  logger: :class:`~aeneas.logger.Logger`
+        :rtype: :class:`~aeneas.phonemetable.PhonemeTable`
+        :raises: ValueError: if the file cannot be read
+        """
+        table = cls(rconf=rconf, logger=logger)
+        if not os.path.isfile(file_path):
+            table.log([u"Phoneme table '%s' does not exist", file_path])
+            return None
+        try:
+            with io.open(file_path, "rb") as table_file:
+                data = numpy.load(table_file, allow_pickle=False)
+                phonemes = [gf.safe_unicode(p) for p in data["phonemes"]]
+                for i, phoneme in enumerate(phonemes):
+                    table.sums[phoneme] = data["sums"][i].copy()
+                    table.frames[phoneme] = int(data["frames"][i])
+                    table.durations[phoneme] = float(data["durations"][i])
+                    table.counts[phoneme] = int(data["counts"][i])
+                table.silence_sum = data["silence_sum"].copy()
+                others = data["others"]
+                table.fragments = int(others[0])
+                table.silence_frames = int(others[1])
+                table.lead = float(others[2])
+                table.trail = float(others[3])
+        except Exception as exc:
+            table.log_exc(u"Unable to read phoneme table '%s'" % (file_path), exc, True, ValueError)
+        table.log([u"Loaded table with %d phonemes from '%s'", len(phonemes), file_path])
+        return table
@@ -534,7 +534,7 @@ class PlotWaveform(PlotElement):
         draw = ImageDraw.Draw(image)
         mws = self.rconf.mws
         rate = self.audio_file.audio_sample_rate
-        samples = self.audio_file.audio_samples
+        samples_length = self.audio_file.audio_samples_length
         duration = self.audio_file.audio_length
 
         current_y_px = current_y * v_zoom
@@ -543,7 +543,7 @@ class PlotWaveform(PlotElement):
 
         samples_per_pixel = int(rate * mws / h_zoom)
         pixels_per_second = int(h_zoom / mws)
-        windows = len(samples) // samples_per_pixel
+        windows = samples_length // samples_per_pixel
 
         if self.label is not None:
             font_height_pt = 18
@@ -552,14 +552,16 @@ class PlotWaveform(PlotElement):
 
         for i in range(windows):
             x = i * samples_per_pixel
-            pos = numpy.clip(samples[x:(x + samples_per_pixel)], 0.0, 1.0)
+            # NOTE get a float64 block, even if the samples are stored as int16
+            samples = self.audio_file.audio_samples_block(x, x + samples_per_pixel)
+            pos = numpy.clip(samples, 0.0, 1.0)
             mpos = numpy.max(pos) * half_waveform_px
             if self.fast:
                 # just draw a simple version, mirroring max positive samples
                 draw.line((i, zero_y_px + mpos, i, zero_y_px - mpos), fill=PlotterColors.AUDACITY_DARK_BLUE, width=1)
             else:
                 # draw a better version, taking min and std of positive and negative samples
-                neg = numpy.clip(samples[x:(x + samples_per_pixel)], -1.0, 0.0)
+                neg = numpy.clip(samples, -1.0, 0.0)
                 spos = numpy.std(pos) * half_waveform_px
                 sneg = numpy.std(neg) * half_waveform_px
                 mneg = numpy.min(neg) * half_waveform_px
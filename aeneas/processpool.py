@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.processpool.ProcessPool`,
+  the base class for the pools of long-lived helper processes,
+  shared by all the callers in the current process.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import atexit
+import os
+import threading
+
+from aeneas.logger import Loggable
+
+
+class ProcessPool(Loggable):
+    """
+    A pool of long-lived helper processes,
+    serving concurrent requests.
+
+    Processes are started when needed,
+    and started again if they crash while serving a request,
+    which is then retried once.
+
+    Pools are shared by all the callers in the current process,
+    see :func:`~aeneas.processpool.ProcessPool.get`,
+    and their processes are stopped
+    when the current process exits.
+
+    A subclass must implement
+    :func:`~aeneas.processpool.ProcessPool._new_process`
+    and :func:`~aeneas.processpool.ProcessPool._serve`.
+    The objects it creates must expose
+    the ``alive`` and ``started`` properties,
+    the ``requests`` counter,
+    and the ``start()`` and ``stop()`` methods.
+
+    :param int size: the maximum number of processes
+    :param int max_requests: replace a process after it served
+                             this many requests (``0`` for never)
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    _POOLS = {}
+    """ Pools shared by the callers in the current process """
+
+    _POOLS_LOCK = threading.Lock()
+
+    PROCESS_NAME = u"process"
+    """ The name of a process of the pool, used in log messages """
+
+    TAG = u"ProcessPool"
+
+    def __init__(self, size, max_requests=0, rconf=None, logger=None):
+        super(ProcessPool, self).__init__(rconf=rconf, logger=logger)
+        self.size = size
+        self.max_requests = max_requests
+        self.idle = []
+        self.respawns = 0
+        self.lock = threading.Lock()
+        self.semaphore = threading.Semaphore(size)
+
+    @classmethod
+    def get(cls, *args):
+        """
+        Return the pool of this class with the given parameters
+        shared by the callers in the current process,
+        creating it if needed.
+
+        The parameters are those of the constructor
+        of the actual pool class.
+
+        :rtype: :class:`~aeneas.processpool.ProcessPool`
+        """
+        # NOTE a forked process must not share the pipes or sockets of its parent
+        key = (os.getpid(), cls) + tuple(args)
+        with ProcessPool._POOLS_LOCK:
+            if key not in ProcessPool._POOLS:
+                if len(ProcessPool._POOLS) == 0:
+                    atexit.register(ProcessPool.close_all)
+                ProcessPool._POOLS[key] = cls(*args)
+            return ProcessPool._POOLS[key]
+
+    @classmethod
+    def close_all(cls):
+        """
+        Stop the processes of all the shared pools of this class.
+        """
+        with ProcessPool._POOLS_LOCK:
+            for key, pool in list(ProcessPool._POOLS.items()):
+                if issubclass(key[1], cls):
+                    if key[0] == os.getpid():
+                        pool.close()
+                    del ProcessPool._POOLS[key]
+
+    def close(self):
+        """
+        Stop the idle processes of this pool.
+        """
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for process in idle:
+            process.stop()
+
+    def _call(self, request):
+        """
+        Serve the given request with a process of the pool,
+        waiting for one if all of them are busy,
+        and return its response.
+
+        :param object request: the request, passed to
+                               :func:`~aeneas.processpool.ProcessPool._serve`
+        :rtype: object
+        :raises: OSError: if the process crashed twice
+        """
+        self.semaphore.acquire()
+        try:
+            process = self._acquire()
+            try:
+                return self._request(process, request)
+            finally:
+                self._release(process)
+        finally:
+            self.semaphore.release()
+
+    def _new_process(self):
+        """
+        Return a new, not started process.
+
+        :rtype: object
+        """
+        raise NotImplementedError(u"This method must be implemented in a subclass")
+
+    def _serve(self, process, request):
+        """
+        Send the given request to the given started process,
+        and return its response.
+
+        :rtype: object
+        :raises: OSError: if the process crashed
+        """
+        raise NotImplementedError(u"This method must be implemented in a subclass")
+
+    def _acquire(self):
+        """
+        Return an idle process, or a new one.
+
+        :rtype: object
+        """
+        with self.lock:
+            if len(self.idle) > 0:
+                return self.idle.pop()
+        return self._new_process()
+
+    def _release(self, process):
+        """
+        Return the given process to the pool,
+        or stop it if it crashed or it served enough requests.
+
+        :param object process: the process
+        """
+        if (not process.alive) or ((self.max_requests > 0) and (process.requests >= self.max_requests)):
+            self.log([u"Stopping %s", self.PROCESS_NAME])
+            process.stop()
+            return
+        with self.lock:
+            self.idle.append(process)
+
+    def _request(self, process, request):
+        """
+        Send the given request to the given process,
+        starting it if needed,
+        and starting it again and retrying once
+        if it crashed.
+
+        :rtype: object
+        """
+        for attempt in [1, 2]:
+            if not process.alive:
+                if process.started:
+                    self.log_warn([u"The %s crashed, starting it again", self.PROCESS_NAME])
+                    process.stop()
+                    self.respawns += 1
+                process.start()
+            try:
+                return self._serve(process, request)
+            except OSError:
+                process.stop()
+                if attempt == 2:
+                    raise
+                self.respawns += 1
+                self.log_warn([u"The %s crashed while serving a request, starting it again", self.PROCESS_NAME])
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.resampler.Resampler`,
+  changing the sample rate of audio samples in memory.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import numpy
+import threading
+
+from aeneas.logger import Loggable
+
+
+class Resampler(Loggable):
+    """
+    A polyphase resampler, changing the sample rate
+    of audio samples in memory,
+    without calling ``ffmpeg``.
+
+    The samples are upsampled by ``L``,
+    low-pass filtered with a Kaiser-windowed sinc filter,
+    and downsampled by ``M``,
+    where ``L/M`` is the ratio between the two sample rates,
+    reduced to lowest terms.
+    Only the filter taps contributing to each output sample
+    are actually evaluated (polyphase decomposition).
+
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    """
+
+    BLOCK_SIZE = 1048576
+    """ Number of output samples computed at once, to bound memory usage """
+
+    KAISER_BETA = 5.0
+    """ Shape parameter of the Kaiser window """
+
+    ZERO_CROSSINGS = 10
+    """ Number of zero crossings of the sinc filter on each side """
+
+    _FILTERS = {}
+    """ Polyphase filters, keyed by ``(L, M)`` """
+
+    _FILTERS_LOCK = threading.Lock()
+
+    TAG = u"Resampler"
+
+    def resample(self, samples, from_rate, to_rate):
+        """
+        Resample the given samples from ``from_rate`` to ``to_rate``,
+        and return the resampled samples
+        as a new array of ``float64`` values.
+
+        The output contains ``ceil(len(samples) * to_rate / from_rate)``
+        samples, hence its duration matches the input one.
+
+        :param samples: the samples to resample
+        :type  samples: :class:`numpy.ndarray` (1D)
+        :param int from_rate: the sample rate of ``samples``
+        :param int to_rate: the desired sample rate
+        :rtype: :class:`numpy.ndarray` (1D)
+        :raises: ValueError: if one of the two sample rates is not positive
+        """
+        if (from_rate <= 0) or (to_rate <= 0):
+            self.log_exc(u"Sample rates must be positive", None, True, ValueError)
+        samples = numpy.asarray(samples, dtype="float64")
+        if from_rate == to_rate:
+            self.log(u"Sample rates are equal, returning a copy")
+            return numpy.array(samples)
+        up, down = self._ratio(from_rate, to_rate)
+        self.log([u"Resampling %d => %d (L=%d, M=%d)...", from_rate, to_rate, up, down])
+        half_length, phases = self._polyphase_filter(up, down)
+        taps = phases.shape[0]
+        input_length = len(samples)
+        output_length = (input_length * up + down - 1) // down
+        # pad so that all the indices computed below are valid
+        left_pad = taps
+        right_pad = half_length // up + 2
+        padded = numpy.zeros(left_pad + input_length + right_pad, dtype="float64")
+        padded[left_pad:left_pad + input_length] = samples
+        output = numpy.zeros(output_length, dtype="float64")
+        for block_begin in range(0, output_length, self.BLOCK_SIZE):
+            block_end = min(block_begin + self.BLOCK_SIZE, output_length)
+            # position of each output sample in the upsampled signal,
+            # delayed by half the filter length to center the filter
+            position = numpy.arange(block_begin, block_end, dtype="int64") * down + half_length
+            phase = position % up
+            index = position // up + left_pad
+            block = output[block_begin:block_end]
+            for tap in range(taps):
+                block += phases[tap][phase] * padded[index - tap]
+        self.log([u"Resampling %d => %d (L=%d, M=%d)... done", from_rate, to_rate, up, down])
+        return output
+
+    @classmethod
+    def _ratio(cls, from_rate, to_rate):
+        """
+        Return the ``(L, M)`` pair such that ``L/M = to_rate/from_rate``,
+        in lowest terms.
+
+        :param int from_rate: the input sample rate
+        :param int to_rate: the output sample rate
+        :rtype: tuple ``(int, int)``
+        """
+        a, b = int(from_rate), int(to_rate)
+        while b != 0:
+            a, b = b, a % b
+        return (int(to_rate) // a, int(from_rate) // a)
+
+    @classmethod
+    def _polyphase_filter(cls, up, down):
+        """
+        Return the half length of the low-pass filter
+        for the given ``(L, M)`` pair,
+        and the filter split into its ``L`` phases,
+        as a 2D array whose ``[j][p]`` element
+        is the filter tap ``p + j * L``.
+
+        Filters are computed once and cached.
+
+        :param int up: the upsampling factor ``L``
+        :param int down: the downsampling factor ``M``
+        :rtype: tuple ``(int, numpy.ndarray)``
+        """
+        key = (up, down)
+        with cls._FILTERS_LOCK:
+            if key not in cls._FILTERS:
+                max_factor = max(up, down)
+                half_length = cls.ZERO_CROSSINGS * max_factor
+                filter_length = 2 * half_length + 1
+                # ideal low-pass filter with cutoff at the lower Nyquist frequency,
+                # windowed, and normalized to have gain L
+                ideal = numpy.sinc((numpy.arange(filter_length) - half_length) / max_factor)
+                coefficients = ideal * numpy.kaiser(filter_length, cls.KAISER_BETA)
+                coefficients *= up / numpy.sum(coefficients)
+                taps = (filter_length + up - 1) // up
+                padded = numpy.zeros(taps * up, dtype="float64")
+                padded[0:filter_length] = coefficients
+                cls._FILTERS[key] = (half_length, padded.reshape(taps, up))
+            return cls._FILTERS[key]
@@ -81,6 +81,80 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.4.1
     """
 
+    AUDIO_BUFFER_REGISTRY = "audio_buffer_registry"
+    """
+    If ``True``, share the decoded samples of audio files
+    through the process-wide
+    :class:`~aeneas.audiobuffer.AudioBufferRegistry`,
+    so that an audio file read by several objects
+    is decoded only once,
+    while its samples are held by
+    :func:`~aeneas.audiofile.AudioFile.hold_samples`
+    (e.g., by :class:`~aeneas.executejob.ExecuteJob`
+    for the tasks sharing an audio file).
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    AUDIO_PROBE_CACHE = "audio_probe_cache"
+    """
+    If ``True``, cache the properties of audio files
+    read by :class:`~aeneas.audioprobe.AudioProbe`,
+    keyed by path, size, and modification time of each file.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    AUDIO_PROBE_NATIVE = "audio_probe_native"
+    """
+    If ``True``, read the properties of WAVE, AIFF, FLAC, and MPEG audio files
+    by parsing their headers in Python,
+    falling back to ``ffprobe`` for other formats.
+    If ``False``, always call ``ffprobe``.
+
+    If ``ffprobe_path`` is set explicitly,
+    it must point to an executable file
+    even if the audio file is read natively.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    AUDIO_RESAMPLE_NATIVE = "audio_resample_native"
+    """
+    If ``True`` and safety checks are enabled,
+    read PCM16 mono WAVE files with a sample rate
+    different from ``ffmpeg_sample_rate``
+    (e.g., the output of TTS engines)
+    directly, and resample them in memory,
+    instead of converting them with ``ffmpeg``.
+    If ``False``, always convert them with ``ffmpeg``.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    AUDIO_SAMPLES_INT16 = "audio_samples_int16"
+    """
+    If ``True``, store the audio samples of
+    :class:`~aeneas.audiofile.AudioFile` objects
+    as PCM16 ``int16`` values,
+    converting them to ``float64`` only when needed,
+    one block at a time (e.g., when computing MFCCs).
+    This uses one fourth of the memory required by
+    the default ``float64`` storage.
+
+    Default: ``False``.
+
+    .. versionadded:: 1.8.0
+    """
+
     C_EXTENSIONS = "c_extensions"
     """
     If ``True`` and the Python C/C++ extensions
@@ -89,7 +163,7 @@ class RuntimeConfiguration(Configuration):
 
     This option is equivalent to
     setting ``CDTW``, ``CEW``, ``CFW``,
-    and ``CMFCC`` to ``True`` or ``False`` at once.
+    ``CMFCC``, and ``CWAVE`` to ``True`` or ``False`` at once.
 
     Default: ``True``.
 
@@ -129,6 +203,32 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.6.0
     """
 
+    CEW_SSML_MARKS = "cew_ssml_marks"
+    """
+    If ``True``, ``aeneas.cew`` sends consecutive text fragments
+    with the same voice code to eSpeak
+    (or eSpeak-ng, if ``cew`` has been built against it)
+    as a single SSML message,
+    with a ``<mark>`` element before each fragment,
+    and the time anchors of the fragments are
+    the times of the mark events reported by eSpeak,
+    instead of synthesizing each fragment separately.
+
+    Since the fragments are synthesized as continuous speech,
+    the synthesized audio is shorter and more natural,
+    but different from the one synthesized when ``False``.
+
+    If the eSpeak library does not report the mark events,
+    or if the synthesis must stop after a given duration
+    (e.g., when detecting the head or the tail of the audio file),
+    the fragments are synthesized separately.
+    This option is ignored if ``cew_subprocess_enabled`` is ``True``.
+
+    Default: ``False``.
+
+    .. versionadded:: 1.8.0
+    """
+
     CEW_SUBPROCESS_ENABLED = "cew_subprocess_enabled"
     """
     If ``True``, calls to ``aeneas.cew``
@@ -153,6 +253,38 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.5.0
     """
 
+    CEW_SUBPROCESS_WORKERS = "cew_subprocess_workers"
+    """
+    If greater than ``0``, and ``cew_subprocess_enabled`` is ``True``,
+    calls to ``aeneas.cew`` will be served by a pool
+    of this many long-lived processes,
+    each loading ``aeneas.cew`` once,
+    instead of starting a new process for each call.
+
+    Note that each worker process calls ``aeneas.cew`` multiple times,
+    which is what ``cew_subprocess_enabled`` works around:
+    use ``cew_subprocess_worker_max_requests``
+    to replace the workers periodically.
+
+    Default: ``0``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    CEW_SUBPROCESS_WORKER_MAX_REQUESTS = "cew_subprocess_worker_max_requests"
+    """
+    Replace a worker process of the ``aeneas.cew`` pool
+    (see ``cew_subprocess_workers``)
+    after it served this many calls.
+
+    If ``0``, never replace a worker process,
+    unless it crashes.
+
+    Default: ``0``.
+
+    .. versionadded:: 1.8.0
+    """
+
     CMFCC = "cmfcc"
     """
     If ``True`` and the Python C extension ``cmfcc``
@@ -164,6 +296,18 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.5.1
     """
 
+    CWAVE = "cwave"
+    """
+    If ``True`` and the Python C extension ``cwave``
+    is available, use it to read
+    PCM16 mono WAVE files.
+    Otherwise, use the pure Python code.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
     DOWNLOADER_SLEEP = "downloader_sleep"
     """
     Wait this number of seconds before the next HTTP POST request
@@ -242,6 +386,52 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.7.0
     """
 
+    FESTIVAL_SERVER_PATH = "festival_server_path"
+    """
+    Path to the ``festival`` executable,
+    started in server mode
+    if ``festival_server_workers`` is greater than ``0``.
+
+    Default: ``festival``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    FESTIVAL_SERVER_PORT = "festival_server_port"
+    """
+    If not ``None``, the ``Festival`` TTS wrapper
+    synthesizes text fragments by connecting
+    to the ``Festival`` server (``festival --server``)
+    already listening on this local port,
+    using up to ``festival_server_workers`` connections
+    (at least one),
+    instead of starting its own servers.
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    FESTIVAL_SERVER_WORKERS = "festival_server_workers"
+    """
+    If greater than ``0``, the ``Festival`` TTS wrapper
+    synthesizes text fragments using a pool
+    of this many long-lived ``Festival`` servers
+    (``festival --server``),
+    which load their voices once,
+    instead of calling ``text2wave`` for each text fragment.
+    Set ``tts_workers`` to the same value
+    to synthesize text fragments concurrently.
+
+    If a server cannot be started,
+    the ``Festival`` TTS wrapper falls back
+    to the C extension or to ``text2wave``.
+
+    Default: ``0``.
+
+    .. versionadded:: 1.8.0
+    """
+
     FFMPEG_PATH = "ffmpeg_path"
     """
     Path to the ``ffmpeg`` executable.
@@ -253,6 +443,21 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.4.1
     """
 
+    FFMPEG_PIPE = "ffmpeg_pipe"
+    """
+    If ``True``, when an audio file must be converted,
+    read the PCM16 samples produced by ``ffmpeg``
+    from a pipe, instead of writing and reading back
+    a temporary WAVE file,
+    and parse the properties of the input audio stream
+    (duration, sample rate, channels)
+    from the ``ffmpeg`` banner.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
     FFMPEG_SAMPLE_RATE = "ffmpeg_sample_rate"
     """
     Sample rate for ``ffmpeg``, in Hertz.
@@ -285,6 +490,89 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.4.1
     """
 
+    JOB_MAX_WORKERS = "job_max_workers"
+    """
+    Number of worker processes executing
+    the tasks of a job concurrently,
+    each task with its own logger.
+    As when executing them sequentially,
+    if a task fails, the other tasks are executed anyway,
+    and an error listing the failed tasks
+    is raised at the end of the job.
+    Use ``1`` for executing the tasks sequentially,
+    in the current process.
+
+    Note that each worker process has its own TTS caches
+    and its own limit on the rate of the TTS API calls
+    (see ``tts_api_rate``),
+    and that audio files are not converted in advance
+    (see ``job_predecode_workers``)
+    when the tasks are executed concurrently.
+
+    Default: ``1``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    JOB_PREDECODE_MAX_SIZE = "job_predecode_max_size"
+    """
+    Maximum total size, in MB, of the audio files
+    converted in advance by
+    :class:`~aeneas.executejob.AudioPredecoder`
+    and not processed yet.
+    The converted files are created inside ``tmp_path``.
+
+    Default: ``256``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    JOB_PREDECODE_WORKERS = "job_predecode_workers"
+    """
+    Number of threads converting in advance
+    the audio files of the tasks of a job,
+    while the previous tasks are being processed,
+    each running one ``ffmpeg`` process at a time.
+    Use ``0`` for disabling the conversion in advance.
+
+    Default: ``0`` (disabled).
+
+    .. versionadded:: 1.8.0
+    """
+
+    MFCC_CACHE_MAX_SIZE = "mfcc_cache_max_size"
+    """
+    Maximum size, in MB, of the MFCC matrices
+    of the synthesized text fragments
+    kept in memory by the current process.
+
+    If positive, the MFCCs of the synthetic wave
+    are computed separately for each text fragment,
+    and cached, keyed by the TTS engine, the voice code,
+    the text, and the MFCC parameters.
+    The MFCC matrix of the synthetic wave
+    is built by concatenating the cached matrices,
+    so that text fragments synthesized before
+    (e.g., when processing the same text again,
+    or repeated words) are neither synthesized
+    nor processed again.
+
+    Since each text fragment is processed separately,
+    its last frames are computed on its own samples
+    followed by zeros,
+    instead of the first samples of the next text fragment.
+    This is negligible, as TTS engines
+    add a short silence at the begin of the synthesized audio,
+    while the begin of each text fragment
+    falls exactly at the begin of an MFCC frame.
+
+    Use ``0`` for disabling the cache.
+
+    Default: ``0`` (disabled).
+
+    .. versionadded:: 1.8.0
+    """
+
     MFCC_FILTERS = "mfcc_filters"
     """
     Number of filters for extracting MFCCs.
@@ -584,6 +872,17 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.5.0
     """
 
+    NUANCE_TTS_API_URL = "nuance_tts_api_url"
+    """
+    The URL of the Nuance TTS API,
+    if different from the default one
+    (e.g., a proxy or a local server for testing).
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
     SAFETY_CHECKS = "safety_checks"
     """
     If ``True``, perform safety checks on input files and parameters.
@@ -599,6 +898,51 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.7.0
     """
 
+    TASK_DECODE_AUDIO_RANGE = "task_decode_audio_range"
+    """
+    If ``True`` and a Task explicitly specifies
+    the head, process, and/or tail lengths of its audio file
+    (``is_audio_file_head_length``,
+    ``is_audio_file_process_length``, or
+    ``is_audio_file_tail_length``),
+    decode and compute the MFCCs of the range to be processed only,
+    instead of the entire audio file.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TASK_DEFER_AUDIO_PROBE = "task_defer_audio_probe"
+    """
+    If ``True``, a Task does not read the properties
+    of its audio file when the audio file path is set.
+    Instead, the entire audio file is decoded
+    when the Task is executed,
+    and its length is the length of the decoded samples,
+    so that a single ``ffmpeg`` process is run for each audio file,
+    instead of one ``ffprobe`` and one ``ffmpeg`` process.
+    The other properties of the audio file of the Task
+    (format, sample rate, channels) are parsed
+    from the banner printed by ``ffmpeg`` while decoding.
+
+    Note that the properties of the audio file of the Task
+    are ``None`` until the Task is executed,
+    and that the maximum audio length
+    (:data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TASK_MAX_AUDIO_LENGTH`)
+    is checked after decoding the audio file.
+    If the Task specifies the range to be processed
+    and :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TASK_DECODE_AUDIO_RANGE`
+    is ``True``, the audio file is probed first,
+    so that only that range is decoded.
+    Set this option to ``False`` to read the properties
+    when the audio file path is set.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
     TASK_MAX_AUDIO_LENGTH = "task_max_audio_length"
     """
     Maximum length of the audio file of a Task, in seconds.
@@ -625,6 +969,41 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.4.1
     """
 
+    TASK_NODE_WORKERS = "task_node_workers"
+    """
+    Number of threads aligning concurrently
+    the text subtrees of the same level of a multilevel Task
+    (e.g., the sentences of each paragraph),
+    each against its own window of the audio file.
+    The sync map does not depend on this value.
+
+    Calls to the TTS engine are serialized,
+    since TTS engines might not be thread-safe:
+    use ``tts_workers`` for synthesizing concurrently
+    the text fragments of each subtree.
+
+    If ``1``, align the text subtrees sequentially.
+
+    Default: ``1``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TASK_PIPELINE = "task_pipeline"
+    """
+    If ``True``, when executing a single level Task,
+    synthesize the text and extract the MFCCs of the synthetic wave
+    in a separate thread,
+    while decoding the audio file and extracting the MFCCs of the real wave.
+
+    This option is ignored if ``tts_rate_auto`` is ``True``,
+    since the speaking rate is then selected from the real wave.
+
+    Default: ``False``.
+
+    .. versionadded:: 1.8.0
+    """
+
     TMP_PATH = "tmp_path"
     """
     Path to the temporary directory to be used.
@@ -752,10 +1131,114 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.6.0
     """
 
+    TTS_CACHE_DIR = "tts_cache_dir"
+    """
+    Path of a directory where the audio files
+    synthesized for each text fragment are cached persistently,
+    so that they can be reused by other tasks, jobs, and processes,
+    or in later runs,
+    see :class:`~aeneas.ttsdiskcache.TTSDiskCache`.
+    The directory can be shared by concurrent processes.
+
+    Entries are keyed by TTS engine, its path and version,
+    voice code, text, and output format.
+
+    This cache applies to TTS engines called
+    once per text fragment, that is,
+    via a direct Python call or via ``subprocess``.
+    For example, to use it with eSpeak,
+    disable the ``cew`` Python C extension (``cew=False``).
+
+    If ``None``, the persistent cache is disabled.
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_CACHE_DIR_MAX_SIZE = "tts_cache_dir_max_size"
+    """
+    Maximum size of the persistent TTS cache directory, in MB
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TTS_CACHE_DIR`).
+    When exceeded, the least recently used entries are removed.
+
+    Use ``0`` for an unbounded cache.
+
+    Default: ``1024``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_DEDUP_MAX_SIZE = "tts_dedup_max_size"
+    """
+    Maximum size, in MB, of the audio samples
+    kept in memory while synthesizing a text file,
+    so that text fragments with the same language and text
+    are synthesized only once,
+    by TTS engines called once per text fragment,
+    that is, via a direct Python call or via ``subprocess``.
+
+    Only the samples of the text fragments
+    which occur again later in the text file are kept,
+    and they are released after their last occurrence.
+
+    Use ``0`` to synthesize each text fragment.
+
+    Default: ``64``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_API_BACKOFF = "tts_api_backoff"
+    """
+    Wait this number of seconds before retrying
+    a request to a TTS API which failed
+    because of too many requests (HTTP status code ``429``),
+    a server error (HTTP status code ``5xx``),
+    or a connection error,
+    doubling the wait at each retry,
+    unless the service asks to wait longer.
+
+    Default: ``1.000``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_API_BURST = "tts_api_burst"
+    """
+    Maximum number of requests to a TTS API
+    which can be sent at once,
+    without waiting for the rate limit
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TTS_API_RATE`).
+
+    Default: ``1``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_API_RATE = "tts_api_rate"
+    """
+    Maximum number of requests per second to a TTS API,
+    shared by all the requests of the current process
+    to the same TTS API,
+    including the ones sent concurrently
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TTS_WORKERS`).
+    Set it according to the quota of your account.
+
+    If ``None``, send at most one request
+    every ``tts_api_sleep`` seconds.
+    If ``0``, do not limit the requests.
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
     TTS_API_SLEEP = "tts_api_sleep"
     """
-    Wait this number of seconds before the next HTTP POST request
-    to the Nuance TTS API.
+    Wait this number of seconds between
+    two HTTP POST requests to a TTS API,
+    if ``tts_api_rate`` is ``None``.
     This parameter can be used to throttle the HTTP usage.
     It cannot be a negative value.
 
@@ -781,6 +1264,122 @@ class RuntimeConfiguration(Configuration):
     .. versionadded:: 1.5.0
     """
 
+    TTS_PHONEME_TABLES_DIR = "tts_phoneme_tables_dir"
+    """
+    Path of the directory containing the phoneme tables
+    of the TTS voices, built by
+    ``aeneas.tools.build_phoneme_table``
+    (see :class:`~aeneas.phonemetable.PhonemeTable`).
+
+    If not ``None``, and if the TTS engine can output
+    the phonemes of a text without synthesizing it
+    (e.g., eSpeak and eSpeak-ng),
+    the MFCCs of the synthetic wave are built
+    from the phonemes of the text,
+    using the average MFCC vector and duration of each phoneme
+    stored in the table of the voice,
+    instead of synthesizing the text
+    and extracting the MFCCs of the synthetic wave.
+    If the table of the voice does not exist,
+    the text is synthesized as usual.
+
+    Note that the MFCCs built in this way
+    are only a rough approximation of the actual ones,
+    hence the alignment might be less accurate.
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_PIPE = "tts_pipe"
+    """
+    If ``True``, TTS engines called via ``subprocess``
+    which can write WAVE data to their standard output
+    (e.g., eSpeak, eSpeak-ng, and Festival)
+    read the text from their standard input,
+    and write the audio data to their standard output,
+    which is read in memory,
+    instead of writing it to a temporary file.
+
+    Default: ``True``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_RATE = "tts_rate"
+    """
+    Speaking rate of the TTS engine,
+    as a multiple of its default speaking rate
+    (e.g., ``1.500`` to speak 50% faster).
+
+    Speaking faster shortens the synthetic wave,
+    hence it reduces the time spent by the TTS engine
+    and by the DTW, at the cost of a less accurate alignment
+    if the synthetic wave becomes much shorter than the real wave.
+    The rate is honored by the eSpeak, eSpeak-ng, Festival, macOS,
+    AWS Polly, and Nuance TTS wrappers,
+    clamped to the range supported by each of them.
+
+    If ``None``, use the default speaking rate of the TTS engine.
+
+    Default: ``None``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_RATE_AUTO = "tts_rate_auto"
+    """
+    If ``True``, select the speaking rate of the TTS engine
+    so that the duration of the synthetic wave
+    roughly matches the duration of the middle part of the real wave,
+    estimating the former from the number of characters of the text
+    (see
+    :data:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper.CHARACTERS_PER_SECOND`),
+    overriding ``tts_rate``.
+
+    Default: ``False``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_REUSE_LEVELS = "tts_reuse_levels"
+    """
+    If ``True``, multilevel tasks synthesize
+    each text fragment of the finest level (e.g., each word) once,
+    and build the synthetic wave of each coarser level
+    (e.g., paragraphs and sentences)
+    by concatenating the synthetic waves
+    of the text fragments it contains,
+    instead of synthesizing the text again at each level.
+
+    This is done only if all the levels
+    use the same TTS engine
+    (see ``tts_l1``, ``tts_l2``, and ``tts_l3``).
+    Note that the synthetic waves of the coarser levels
+    lack the prosody of whole sentences.
+
+    Default: ``False``.
+
+    .. versionadded:: 1.8.0
+    """
+
+    TTS_WORKERS = "tts_workers"
+    """
+    Number of text fragments synthesized concurrently
+    by TTS engines called once per text fragment,
+    that is, via a direct Python call (e.g., remote APIs)
+    or via ``subprocess``.
+    The synthesized audio data is assembled
+    in the original order of the text fragments.
+
+    If ``1``, synthesize the text fragments sequentially.
+
+    Default: ``1``.
+
+    .. versionadded:: 1.8.0
+    """
+
     TTS_L1 = "tts_l1"
     """
     The TTS engine to use for synthesizing text
@@ -916,15 +1515,24 @@ class RuntimeConfiguration(Configuration):
         (ABA_NONSPEECH_TOLERANCE, ("0.080", TimeValue, [], u"adjust nonspeech tolerance, in s")),
         (ABA_NO_ZERO_DURATION, ("0.001", TimeValue, [], u"add this shift to zero length fragments, in s")),
         (ALLOW_UNLISTED_LANGUAGES, (False, bool, [], u"if True, allow languages not listed")),
+        (AUDIO_BUFFER_REGISTRY, (True, bool, [], u"if True, share decoded audio samples")),
+        (AUDIO_PROBE_CACHE, (True, bool, [], u"if True, cache audio file properties")),
+        (AUDIO_PROBE_NATIVE, (True, bool, [], u"if True, parse WAVE/AIFF/FLAC/MPEG audio headers natively")),
+        (AUDIO_RESAMPLE_NATIVE, (True, bool, [], u"if True, resample PCM16 mono WAVE files in memory")),
+        (AUDIO_SAMPLES_INT16, (False, bool, [], u"if True, store audio samples as int16")),
 
         (C_EXTENSIONS, (True, bool, [], u"run C/C++ extensions")),
         (CDTW, (True, bool, [], u"run C extension cdtw")),
         (CEW, (True, bool, [], u"run C extension cew")),
         (CFW, (True, bool, [], u"run C++ extension cfw")),
         (CMFCC, (True, bool, [], u"run C extension cmfcc")),
+        (CWAVE, (True, bool, [], u"run C extension cwave")),
 
+        (CEW_SSML_MARKS, (False, bool, [], u"synthesize fragments as a single SSML message with marks")),
         (CEW_SUBPROCESS_ENABLED, (False, bool, [], u"run cew in separate subprocess")),
         (CEW_SUBPROCESS_PATH, ("python", None, [], u"path to python executable")),          # or a full path like "/usr/bin/python"
+        (CEW_SUBPROCESS_WORKERS, (0, int, [], u"number of long-lived cew worker processes (0 to start one per call)")),
+        (CEW_SUBPROCESS_WORKER_MAX_REQUESTS, (0, int, [], u"replace a cew worker process after this many calls (0 for never)")),
 
         (DTW_ALGORITHM, ("stripe", None, [], u"DTW algorithm (stripe, exact)")),
         (DTW_MARGIN, ("60.000", TimeValue, [], u"DTW margin, in s")),
@@ -932,13 +1540,22 @@ class RuntimeConfiguration(Configuration):
         (DOWNLOADER_SLEEP, ("1.000", TimeValue, [], u"sleep between Downloader calls, in s")),
         (DOWNLOADER_RETRY_ATTEMPTS, (5, int, [], u"number of retries for a failed Downloader call")),
 
+        (FESTIVAL_SERVER_PATH, ("festival", None, [], u"path to festival executable, started in server mode")),  # or a full path like "/usr/bin/festival"
+        (FESTIVAL_SERVER_PORT, (None, int, [], u"port of a running Festival server")),
+        (FESTIVAL_SERVER_WORKERS, (0, int, [], u"number of Festival server processes (0 to call text2wave)")),
+
         (FFMPEG_PATH, ("ffmpeg", None, [], u"path to ffmpeg executable")),                  # or a full path like "/usr/bin/ffmpeg"
+        (FFMPEG_PIPE, (True, bool, [], u"if True, read ffmpeg output from a pipe")),
         (FFMPEG_SAMPLE_RATE, (16000, int, [], u"ffmpeg sample rate")),
 
         (FFPROBE_PATH, ("ffprobe", None, [], u"path to ffprobe executable")),               # or a full path like "/usr/bin/ffprobe"
 
         (JOB_MAX_TASKS, (0, int, [], u"max number of tasks per job (0 to disable)")),
+        (JOB_MAX_WORKERS, (1, int, [], u"number of processes executing the tasks of a job concurrently")),
+        (JOB_PREDECODE_MAX_SIZE, (256, int, [], u"max size of audio files decoded in advance, in MB")),
+        (JOB_PREDECODE_WORKERS, (0, int, [], u"number of threads decoding audio files in advance (0 to disable)")),
 
+        (MFCC_CACHE_MAX_SIZE, (0, int, [], u"max size of the MFCC of synthesized text fragments kept in memory, in MB (0 to disable)")),
         (MFCC_FILTERS, (40, int, [], u"number of MFCC filters")),
         (MFCC_SIZE, (13, int, [], u"number of MFCC")),
         (MFCC_FFT_ORDER, (512, int, [], u"FFT order for computing MFCC")),
@@ -970,11 +1587,16 @@ class RuntimeConfiguration(Configuration):
 
         (NUANCE_TTS_API_ID, (None, None, [], u"Nuance Developer API ID")),
         (NUANCE_TTS_API_KEY, (None, None, [], u"Nuance Developer API Key")),
+        (NUANCE_TTS_API_URL, (None, None, [], u"Nuance TTS API URL, if not the default one")),
 
         (SAFETY_CHECKS, (True, bool, [], u"if True, always perform safety checks")),
 
+        (TASK_DECODE_AUDIO_RANGE, (True, bool, [], u"if True, decode only the audio range to be processed")),
+        (TASK_DEFER_AUDIO_PROBE, (True, bool, [], u"if True, read task audio properties when executing")),
         (TASK_MAX_AUDIO_LENGTH, ("0", TimeValue, [], u"max length of single audio file, in s (0 to disable)")),
         (TASK_MAX_TEXT_LENGTH, (0, int, [], u"max length of single text file, in fragments (0 to disable)")),
+        (TASK_NODE_WORKERS, (1, int, [], u"number of text subtrees of a multilevel task aligned concurrently")),
+        (TASK_PIPELINE, (False, bool, [], u"if True, synthesize the text while decoding the audio file")),
 
         (TMP_PATH, (None, None, [], u"path to the temporary dir")),
 
@@ -982,8 +1604,20 @@ class RuntimeConfiguration(Configuration):
         (TTS_PATH, (None, None, [], u"path of the TTS executable/wrapper")),                # None (= default) or "espeak" or "/usr/bin/espeak"
         (TTS_VOICE_CODE, (None, None, [], u"overrides TTS voice code selected by language with this value")),
         (TTS_CACHE, (False, bool, [], u"if True, cache synthesized audio files")),
+        (TTS_CACHE_DIR, (None, None, [], u"path of the persistent TTS cache directory")),
+        (TTS_CACHE_DIR_MAX_SIZE, (1024, int, [], u"max size of the persistent TTS cache directory, in MB (0 for unbounded)")),
+        (TTS_DEDUP_MAX_SIZE, (64, int, [], u"max size of the samples of repeated text fragments kept in memory, in MB (0 to disable)")),
+        (TTS_API_BACKOFF, ("1.000", TimeValue, [], u"initial wait before retrying a failed TTS API call, in s")),
+        (TTS_API_BURST, (1, int, [], u"max number of TTS API calls sent at once")),
+        (TTS_API_RATE, (None, float, [], u"max number of TTS API calls per second (0 for unlimited)")),
         (TTS_API_SLEEP, ("1.000", TimeValue, [], u"sleep between TTS API calls, in s")),
         (TTS_API_RETRY_ATTEMPTS, (5, int, [], u"number of retries for a failed TTS API call")),
+        (TTS_PHONEME_TABLES_DIR, (None, None, [], u"path of the directory with the phoneme tables of the TTS voices")),
+        (TTS_PIPE, (True, bool, [], u"read TTS audio data from stdout, if supported")),
+        (TTS_RATE, (None, float, [], u"speaking rate of the TTS engine, as a multiple of its default rate")),
+        (TTS_RATE_AUTO, (False, bool, [], u"select the speaking rate to match the duration of the real wave")),
+        (TTS_REUSE_LEVELS, (False, bool, [], u"in multilevel tasks, synthesize only the finest level and reuse it")),
+        (TTS_WORKERS, (1, int, [], u"number of text fragments synthesized concurrently")),
 
         (TTS_L1, ("espeak", None, [], u"TTS wrapper to use at level 1 (para)")),
         (TTS_PATH_L1, (None, None, [], u"path to level 1 (para) TTS executable/wrapper")),  # None (= default) or "espeak" or "/usr/bin/espeak"
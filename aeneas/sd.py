@@ -36,6 +36,7 @@ from __future__ import division
 from __future__ import print_function
 
 import numpy
+import threading
 
 from aeneas.audiofilemfcc import AudioFileMFCC
 from aeneas.dtw import DTWAligner
@@ -43,7 +44,6 @@ from aeneas.exacttiming import Decimal
 from aeneas.exacttiming import InvalidOperation
 from aeneas.exacttiming import TimeValue
 from aeneas.logger import Loggable
-from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.synthesizer import Synthesizer
 import aeneas.globalfunctions as gf
 
@@ -70,6 +70,10 @@ class SD(Loggable):
 
     (Similarly for the audio tail.)
 
+    The audio file is not changed:
+    the audio tail is detected on a reversed window of it
+    (see :func:`~aeneas.audiofilemfcc.AudioFileMFCC.reversed_window`).
+
     :param real_wave_mfcc: the audio file
     :type  real_wave_mfcc: :class:`~aeneas.audiofile.AudioFileMFCC`
     :param text_file: the text file
@@ -122,6 +126,8 @@ class SD(Loggable):
         super(SD, self).__init__(rconf=rconf, logger=logger)
         self.real_wave_mfcc = real_wave_mfcc
         self.text_file = text_file
+        self.synthesizer = None
+        self.synthesis_lock = threading.Lock()
 
     def detect_interval(
             self,
@@ -154,8 +160,7 @@ class SD(Loggable):
         :raises: TypeError: if one of the parameters is not ``None`` or a number
         :raises: ValueError: if one of the parameters is negative
         """
-        head = self.detect_head(min_head_length, max_head_length)
-        tail = self.detect_tail(min_tail_length, max_tail_length)
+        head, tail = self.detect_head_tail(min_head_length, max_head_length, min_tail_length, max_tail_length)
         begin = head
         end = self.real_wave_mfcc.audio_length - tail
         self.log([u"Audio length: %.3f", self.real_wave_mfcc.audio_length])
@@ -181,7 +186,7 @@ class SD(Loggable):
         :raises: TypeError: if one of the parameters is not ``None`` or a number
         :raises: ValueError: if one of the parameters is negative
         """
-        return self._detect(min_head_length, max_head_length, tail=False)
+        return self._detect(self.real_wave_mfcc, min_head_length, max_head_length, tail=False)
 
     def detect_tail(self, min_tail_length=None, max_tail_length=None):
         """
@@ -195,17 +200,100 @@ class SD(Loggable):
         :raises: TypeError: if one of the parameters is not ``None`` or a number
         :raises: ValueError: if one of the parameters is negative
         """
-        return self._detect(min_tail_length, max_tail_length, tail=True)
+        return self._detect(self.real_wave_mfcc.reversed_window(), min_tail_length, max_tail_length, tail=True)
 
-    def _detect(self, min_length, max_length, tail=False):
+    def detect_head_tail(
+            self,
+            min_head_length=None,
+            max_head_length=None,
+            min_tail_length=None,
+            max_tail_length=None
+    ):
+        """
+        Detect the audio head and the audio tail,
+        returning their durations, in seconds.
+
+        The audio tail is detected in a separate thread,
+        while the audio head is detected in the current one,
+        both synthesizing their queries with the same synthesizer.
+
+        :param min_head_length: estimated minimum head length
+        :type  min_head_length: :class:`~aeneas.exacttiming.TimeValue`
+        :param max_head_length: estimated maximum head length
+        :type  max_head_length: :class:`~aeneas.exacttiming.TimeValue`
+        :param min_tail_length: estimated minimum tail length
+        :type  min_tail_length: :class:`~aeneas.exacttiming.TimeValue`
+        :param max_tail_length: estimated maximum tail length
+        :type  max_tail_length: :class:`~aeneas.exacttiming.TimeValue`
+        :rtype: (:class:`~aeneas.exacttiming.TimeValue`, :class:`~aeneas.exacttiming.TimeValue`)
+        :raises: TypeError: if one of the parameters is not ``None`` or a number
+        :raises: ValueError: if one of the parameters is negative
+
+        .. versionadded:: 1.8.0
+        """
+        # NOTE check the parameters before starting the thread
+        min_head_length = self._sanitize(min_head_length, self.MIN_LENGTH, "min_head_length")
+        max_head_length = self._sanitize(max_head_length, self.MAX_LENGTH, "max_head_length")
+        min_tail_length = self._sanitize(min_tail_length, self.MIN_LENGTH, "min_tail_length")
+        max_tail_length = self._sanitize(max_tail_length, self.MAX_LENGTH, "max_tail_length")
+        # NOTE creating the window runs VAD on the real wave, if not done before,
+        #      hence the two detections only read the speech intervals
+        reversed_wave_mfcc = self.real_wave_mfcc.reversed_window()
+        join_tail = gf.start_thread(self._detect, reversed_wave_mfcc, min_tail_length, max_tail_length, True)
+        head = self._detect(self.real_wave_mfcc, min_head_length, max_head_length, tail=False)
+        tail = join_tail()
+        return (head, tail)
+
+    def _sanitize(self, value, default, name):
+        """
+        Return the given length as a
+        :class:`~aeneas.exacttiming.TimeValue`,
+        or ``default`` if it is ``None``.
+
+        :raises: TypeError: if ``value`` is not ``None`` or a number
+        :raises: ValueError: if ``value`` is negative
+        """
+        if value is None:
+            value = default
+        try:
+            value = TimeValue(value)
+        except (TypeError, ValueError, InvalidOperation) as exc:
+            self.log_exc(u"The value of %s is not a number" % (name), exc, True, TypeError)
+        if value < 0:
+            self.log_exc(u"The value of %s is negative" % (name), None, True, ValueError)
+        return value
+
+    def _synthesize_query(self, duration, tail=False):
+        """
+        Synthesize the text file until at least ``duration`` seconds
+        are reached, backwards if ``tail`` is ``True``.
+
+        All the queries are synthesized with the same synthesizer,
+        one at a time, since TTS engines might not be thread-safe.
+
+        :rtype: tuple, as returned by :func:`~aeneas.synthesizer.Synthesizer.synthesize_audio_file`
+        """
+        with self.synthesis_lock:
+            if self.synthesizer is None:
+                self.synthesizer = Synthesizer(rconf=self.rconf, logger=self.logger)
+            return self.synthesizer.synthesize_audio_file(
+                self.text_file,
+                quit_after=duration,
+                backwards=tail
+            )
+
+    def _detect(self, real_wave_mfcc, min_length, max_length, tail=False):
         """
         Detect the head or tail within ``min_length`` and ``max_length`` duration.
 
-        If detecting the tail, the real wave MFCC and the query are reversed
+        If detecting the tail, ``real_wave_mfcc`` must be reversed,
+        and the query is reversed as well,
         so that the tail detection problem reduces to a head detection problem.
 
         Return the duration of the head or tail, in seconds.
 
+        :param real_wave_mfcc: the (reversed, if ``tail``) real wave MFCC
+        :type  real_wave_mfcc: :class:`~aeneas.audiofilemfcc.AudioFileMFCC`
         :param min_length: estimated minimum length
         :type  min_length: :class:`~aeneas.exacttiming.TimeValue`
         :param max_length: estimated maximum length
@@ -214,19 +302,8 @@ class SD(Loggable):
         :raises: TypeError: if one of the parameters is not ``None`` or a number
         :raises: ValueError: if one of the parameters is negative
         """
-        def _sanitize(value, default, name):
-            if value is None:
-                value = default
-            try:
-                value = TimeValue(value)
-            except (TypeError, ValueError, InvalidOperation) as exc:
-                self.log_exc(u"The value of %s is not a number" % (name), exc, True, TypeError)
-            if value < 0:
-                self.log_exc(u"The value of %s is negative" % (name), None, True, ValueError)
-            return value
-
-        min_length = _sanitize(min_length, self.MIN_LENGTH, "min_length")
-        max_length = _sanitize(max_length, self.MAX_LENGTH, "max_length")
+        min_length = self._sanitize(min_length, self.MIN_LENGTH, "min_length")
+        max_length = self._sanitize(max_length, self.MAX_LENGTH, "max_length")
         mws = self.rconf.mws
         min_length_frames = int(min_length / mws)
         max_length_frames = int(max_length / mws)
@@ -240,42 +317,32 @@ class SD(Loggable):
         self.log(u"Synthesizing query...")
         synt_duration = max_length * self.QUERY_FACTOR
         self.log([u"Synthesizing at least %.3f seconds", synt_duration])
-        tmp_handler, tmp_file_path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
-        synt = Synthesizer(rconf=self.rconf, logger=self.logger)
-        anchors, total_time, synthesized_chars = synt.synthesize(
-            self.text_file,
-            tmp_file_path,
-            quit_after=synt_duration,
-            backwards=tail
-        )
+        query_audio_file, anchors, total_time, synthesized_chars = self._synthesize_query(synt_duration, tail)
         self.log(u"Synthesizing query... done")
 
         self.log(u"Extracting MFCCs for query...")
-        query_mfcc = AudioFileMFCC(tmp_file_path, rconf=self.rconf, logger=self.logger)
+        query_mfcc = AudioFileMFCC(audio_file=query_audio_file, rconf=self.rconf, logger=self.logger)
         self.log(u"Extracting MFCCs for query... done")
 
         self.log(u"Cleaning up...")
-        gf.delete_file(tmp_handler, tmp_file_path)
+        query_audio_file.clear_data()
         self.log(u"Cleaning up... done")
 
         search_window = max_length * self.AUDIO_FACTOR
-        search_window_end = min(int(search_window / mws), self.real_wave_mfcc.all_length)
+        search_window_end = min(int(search_window / mws), real_wave_mfcc.all_length)
         self.log([u"Query MFCC length (frames): %d", query_mfcc.all_length])
-        self.log([u"Real MFCC length (frames):  %d", self.real_wave_mfcc.all_length])
+        self.log([u"Real MFCC length (frames):  %d", real_wave_mfcc.all_length])
         self.log([u"Search window end (s):      %.3f", search_window])
         self.log([u"Search window end (frames): %d", search_window_end])
 
         if tail:
-            self.log(u"Tail => reversing real_wave_mfcc and query_mfcc")
-            self.real_wave_mfcc.reverse()
+            self.log(u"Tail => reversing query_mfcc")
             query_mfcc.reverse()
 
         # NOTE: VAD will be run here, if not done before
-        speech_intervals = self.real_wave_mfcc.intervals(speech=True, time=False)
+        speech_intervals = real_wave_mfcc.intervals(speech=True, time=False)
         if len(speech_intervals) < 1:
             self.log(u"No speech intervals, hence no start found")
-            if tail:
-                self.real_wave_mfcc.reverse()
             return TimeValue("0.000")
 
         # generate a list of begin indices
@@ -298,7 +365,7 @@ class SD(Loggable):
             self.log([u"Candidate interval starting at %d == %.3f", candidate_begin, candidate_begin * mws])
             try:
                 rwm = AudioFileMFCC(
-                    mfcc_matrix=self.real_wave_mfcc.all_mfcc[:, candidate_begin:search_end],
+                    mfcc_matrix=real_wave_mfcc.all_mfcc[:, candidate_begin:search_end],
                     rconf=self.rconf,
                     logger=self.logger
                 )
@@ -319,11 +386,6 @@ class SD(Loggable):
             except Exception as exc:
                 self.log_exc(u"An unexpected error occurred while running _detect", exc, False, None)
 
-        # reverse again the real wave
-        if tail:
-            self.log(u"Tail => reversing real_wave_mfcc again")
-            self.real_wave_mfcc.reverse()
-
         # return
         if len(candidates) < 1:
             self.log(u"No candidates found")
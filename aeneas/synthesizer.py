@@ -34,6 +34,7 @@ This module contains the following classes:
 from __future__ import absolute_import
 from __future__ import print_function
 
+from aeneas.audiofile import AudioFile
 from aeneas.logger import Loggable
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.textfile import TextFile
@@ -162,6 +163,66 @@ class Synthesizer(Loggable):
             return self.tts_engine.OUTPUT_AUDIO_FORMAT
         return None
 
+    def fragment_parameters(self, fragment):
+        """
+        Return the list of the parameters identifying
+        the audio data synthesized for the given text fragment
+        by the actual TTS engine
+        (e.g., the TTS engine, its path and version,
+        the voice code, and the text).
+
+        :param fragment: the text fragment
+        :type  fragment: :class:`~aeneas.textfile.TextFragment`
+        :rtype: list
+
+        .. versionadded:: 1.8.0
+        """
+        if self.tts_engine is None:
+            self.log_exc(u"Cannot select the TTS engine", None, True, ValueError)
+        voice_code = self.tts_engine._language_to_voice_code(fragment.language)
+        return self.tts_engine._disk_cache_parameters(fragment.filtered_text, voice_code)
+
+    def voice_parameters(self, fragment):
+        """
+        Return the list of the parameters identifying
+        the voice of the actual TTS engine
+        used to synthesize the given text fragment,
+        that is, the TTS engine, the voice code,
+        and the speaking rate, if not the default one.
+
+        :param fragment: the text fragment
+        :type  fragment: :class:`~aeneas.textfile.TextFragment`
+        :rtype: list
+
+        .. versionadded:: 1.8.0
+        """
+        if self.tts_engine is None:
+            self.log_exc(u"Cannot select the TTS engine", None, True, ValueError)
+        parameters = [
+            self.tts_engine.__class__.__name__,
+            self.tts_engine._language_to_voice_code(fragment.language)
+        ]
+        if self.tts_engine.rate is not None:
+            parameters.append(u"rate=%.3f" % (self.tts_engine.rate))
+        return parameters
+
+    def fragment_phonemes(self, fragment):
+        """
+        Return the list of the phonemes of the given text fragment,
+        output by the actual TTS engine without synthesizing it,
+        or ``None`` if the TTS engine cannot output phonemes.
+
+        :param fragment: the text fragment
+        :type  fragment: :class:`~aeneas.textfile.TextFragment`
+        :rtype: list of strings
+
+        .. versionadded:: 1.8.0
+        """
+        if self.tts_engine is None:
+            self.log_exc(u"Cannot select the TTS engine", None, True, ValueError)
+        voice_code = self.tts_engine._language_to_voice_code(fragment.language)
+        return self.tts_engine.phonemes(fragment.filtered_text, voice_code)
+
     def clear_cache(self):
         """
         Clear the TTS cache, removing all cache files from disk.
@@ -220,3 +281,55 @@ class Synthesizer(Loggable):
             self.log_exc(u"Audio file path '%s' cannot be read" % (audio_file_path), None, True, OSError)
 
         return result
+
+    def synthesize_audio_file(
+            self,
+            text_file,
+            quit_after=None,
+            backwards=False
+    ):
+        """
+        Synthesize the text contained in the given fragment list
+        into an audio file kept in memory,
+        without writing a ``wav`` file
+        (unless the TTS engine is called via a C extension,
+        in which case a temporary file is written and then deleted).
+
+        If safety checks are enabled,
+        the audio samples are resampled in memory,
+        if needed, to the sample rate used internally.
+
+        Return a tuple ``(audio_file, anchors, total_time, num_chars)``.
+
+        :param text_file: the text file to be synthesized
+        :type  text_file: :class:`~aeneas.textfile.TextFile`
+        :param float quit_after: stop synthesizing as soon as
+                                 reaching this many seconds
+        :param bool backwards: if ``True``, synthesizing from the end of the text file
+        :rtype: tuple
+        :raises: TypeError: if ``text_file`` is ``None`` or not an instance of ``TextFile``
+        :raises: ValueError: if the TTS engine has not been set yet
+
+        .. versionadded:: 1.8.0
+        """
+        if text_file is None:
+            self.log_exc(u"text_file is None", None, True, TypeError)
+        if not isinstance(text_file, TextFile):
+            self.log_exc(u"text_file is not an instance of TextFile", None, True, TypeError)
+        if self.tts_engine is None:
+            self.log_exc(u"Cannot select the TTS engine", None, True, ValueError)
+
+        # synthesize
+        self.log(u"Synthesizing text in memory...")
+        audio_file = AudioFile(rconf=self.rconf, logger=self.logger)
+        anchors, total_time, num_chars = self.tts_engine.synthesize_multiple(
+            text_file=text_file,
+            output_file_path=None,
+            quit_after=quit_after,
+            backwards=backwards,
+            output_audio_file=audio_file
+        )
+        if (self.rconf.safety_checks) and (audio_file.audio_sample_rate != self.rconf.sample_rate):
+            audio_file.resample(self.rconf.sample_rate)
+        self.log(u"Synthesizing text in memory... done")
+        return (audio_file, anchors, total_time, num_chars)
@@ -38,6 +38,7 @@ from aeneas.configuration import Configuration
 from aeneas.exacttiming import Decimal
 from aeneas.exacttiming import TimeValue
 from aeneas.logger import Loggable
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.textfile import TextFile
 import aeneas.globalconstants as gc
 import aeneas.globalfunctions as gf
@@ -230,15 +231,28 @@ class Task(Loggable):
         """
         Create the ``self.audio_file`` object by reading
         the audio file at ``self.audio_file_path_absolute``.
+
+        If ``task_defer_audio_probe`` is ``True``,
+        the properties of the audio file are not read,
+        and they will be read when the task is executed.
+
+        :raises: OSError: if the audio file cannot be read
         """
         self.log(u"Populate audio file...")
         if self.audio_file_path_absolute is not None:
             self.log([u"audio_file_path_absolute is '%s'", self.audio_file_path_absolute])
             self.audio_file = AudioFile(
                 file_path=self.audio_file_path_absolute,
+                rconf=self.rconf,
                 logger=self.logger
             )
-            self.audio_file.read_properties()
+            if self.rconf[RuntimeConfiguration.TASK_DEFER_AUDIO_PROBE]:
+                # NOTE fail early, as reading the properties does
+                if not gf.file_can_be_read(self.audio_file_path_absolute):
+                    self.log_exc(u"File '%s' cannot be read" % (self.audio_file_path_absolute), None, True, OSError)
+                self.log(u"Reading audio file properties deferred to execution")
+            else:
+                self.audio_file.read_properties()
         else:
             self.log(u"audio_file_path_absolute is None")
         self.log(u"Populate audio file... done")
@@ -115,6 +115,30 @@ class TestBaseTTSWrapper(unittest.TestCase):
         tts_engine = self.TTS_CLASS()
         tts_engine.clear_cache()
 
+    def test_rate(self):
+        if self.TTS == u"":
+            return
+        for rate, expected in [
+            (None, None),
+            (1.0, None),
+            (1.5, 1.5),
+            (100.0, self.TTS_CLASS.MAX_RATE),
+            (0.01, self.TTS_CLASS.MIN_RATE),
+        ]:
+            rconf = RuntimeConfiguration()
+            rconf[RuntimeConfiguration.TTS_RATE] = rate
+            self.assertEqual(self.TTS_CLASS(rconf=rconf).rate, expected)
+
+    def test_rate_disk_cache_parameters(self):
+        if self.TTS == u"":
+            return
+        tts_engine = self.TTS_CLASS()
+        parameters = tts_engine._disk_cache_parameters(u"word", u"voice")
+        tts_engine.rconf[RuntimeConfiguration.TTS_RATE] = 1.0
+        self.assertEqual(tts_engine._disk_cache_parameters(u"word", u"voice"), parameters)
+        tts_engine.rconf[RuntimeConfiguration.TTS_RATE] = 1.5
+        self.assertNotEqual(tts_engine._disk_cache_parameters(u"word", u"voice"), parameters)
+
     def test_tfl_none(self):
         self.synthesize(None, zero_length=True, expected_exc=TypeError)
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import time
+import unittest
+
+from aeneas.executetask import ExecuteTask
+from aeneas.logger import Logger
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.syncmap.fragment import SyncMapFragment
+from aeneas.task import Task
+
+
+BENCH_DIR = os.path.join(os.path.expanduser("~"), ".aeneas", "benchmark_input")
+BENCH_TESTS = os.path.exists(BENCH_DIR)
+
+
+class TestBenchmarkTTSRate(unittest.TestCase):
+
+    # NOTE compare the boundaries computed speaking faster
+    #      with the ones computed at the default speaking rate,
+    #      logging the mean and max absolute deviation,
+    #      and the runtime, for each rate
+    RATES = [u"1.250", u"1.500", u"2.000", u"auto"]
+
+    TAG = u"BenchTTSRate"
+
+    def setUp(self):
+        self.logger = Logger(tee=True)
+
+    def execute(self, prefix, text_type, rate):
+        rconf = RuntimeConfiguration()
+        if rate == u"auto":
+            rconf[RuntimeConfiguration.TTS_RATE_AUTO] = True
+        elif rate is not None:
+            rconf[RuntimeConfiguration.TTS_RATE] = float(rate)
+        task = Task(u"task_language=eng|is_text_type=%s|os_task_file_format=json" % (text_type.split(u".")[0]))
+        task.audio_file_path_absolute = os.path.join(BENCH_DIR, u"%s.mp3" % prefix)
+        task.text_file_path_absolute = os.path.join(BENCH_DIR, u"%s.%s.txt" % (prefix, text_type))
+        start = time.time()
+        ExecuteTask(task, rconf=rconf).execute()
+        runtime = time.time() - start
+        boundaries = [float(f.begin) for f in task.sync_map_leaves(SyncMapFragment.REGULAR)]
+        return (boundaries, runtime)
+
+    def bench(self, prefix, text_type, max_mean_deviation):
+        if not BENCH_TESTS:
+            return
+        reference, reference_runtime = self.execute(prefix, text_type, None)
+        self.logger.log([u"%s %s rate=1.000: %.3fs", prefix, text_type, reference_runtime], tag=self.TAG)
+        for rate in self.RATES:
+            boundaries, runtime = self.execute(prefix, text_type, rate)
+            self.assertEqual(len(boundaries), len(reference))
+            deviations = [abs(b - r) for b, r in zip(boundaries, reference)]
+            mean_deviation = sum(deviations) / max(1, len(deviations))
+            self.logger.log([
+                u"%s %s rate=%s: %.3fs (%.2fx), mean deviation %.3fs, max deviation %.3fs",
+                prefix,
+                text_type,
+                rate,
+                runtime,
+                reference_runtime / runtime,
+                mean_deviation,
+                max(deviations + [0.0])
+            ], tag=self.TAG)
+            self.assertLess(mean_deviation, max_mean_deviation)
+
+    def test_010_plain_sentence(self):
+        self.bench(u"010m", u"plain.sentence", 0.500)
+
+    def test_010_plain_word(self):
+        self.bench(u"010m", u"plain.word", 0.500)
+
+    def test_010_mplain(self):
+        self.bench(u"010m", u"mplain", 0.500)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -50,6 +50,13 @@ class TestExecuteJobCLI(unittest.TestCase):
             ("out", "")
         ], 0)
 
+    def test_exec_tool_example_workers(self):
+        self.execute([
+            ("in", "../tools/res/job.zip"),
+            ("out", ""),
+            ("", "--workers=2")
+        ], 0)
+
     def test_exec_tool_wizard(self):
         self.execute([
             ("in", "../tools/res/job_no_config.zip"),
@@ -164,6 +164,27 @@ class TestExecuteJobCLI(unittest.TestCase):
             ("", "-r=\"ffprobe_path=%s\"" % path)
         ], 0)
 
+    def test_exec_job_max_workers(self):
+        self.execute([
+            ("in", "../tools/res/job.zip"),
+            ("out", ""),
+            ("", "-r=\"job_max_workers=2\"")
+        ], 0)
+
+    def test_exec_job_predecode_workers(self):
+        self.execute([
+            ("in", "../tools/res/job.zip"),
+            ("out", ""),
+            ("", "-r=\"job_predecode_workers=2\"")
+        ], 0)
+
+    def test_exec_job_predecode_max_size(self):
+        self.execute([
+            ("in", "../tools/res/job.zip"),
+            ("out", ""),
+            ("", "-r=\"job_predecode_workers=2|job_predecode_max_size=1\"")
+        ], 0)
+
     def test_exec_mfcc_emphasis_factor(self):
         self.execute([
             ("in", "../tools/res/job.zip"),
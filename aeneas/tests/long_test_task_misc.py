@@ -210,6 +210,24 @@ class TestExecuteTaskCLI(unittest.TestCase):
             ("out", "sonnet.json")
         ], 0)
 
+    def test_exec_mplain_tts_reuse_levels(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/mplain.txt"),
+            ("", "task_language=eng|is_text_type=mplain|os_task_file_format=json"),
+            ("out", "sonnet.json"),
+            ("", "-r=\"tts_reuse_levels=True\"")
+        ], 0)
+
+    def test_exec_munparsed_tts_reuse_levels(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/munparsed.xhtml"),
+            ("", "task_language=eng|is_text_type=munparsed|os_task_file_format=json|is_text_munparsed_l1_id_regex=p[0-9]+|is_text_munparsed_l2_id_regex=p[0-9]+s[0-9]+|is_text_munparsed_l3_id_regex=p[0-9]+s[0-9]+w[0-9]+"),
+            ("out", "sonnet.json"),
+            ("", "-r=\"tts_reuse_levels=True\"")
+        ], 0)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -321,6 +321,33 @@ class TestExecuteTaskCLI(unittest.TestCase):
             ("", "-r=\"safety_checks=False\"")
         ], 0)
 
+    def test_exec_task_node_workers(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/mplain.txt"),
+            ("", "task_language=eng|is_text_type=mplain|os_task_file_format=json"),
+            ("out", "sonnet.json"),
+            ("", "-r=\"task_node_workers=4\"")
+        ], 0)
+
+    def test_exec_task_pipeline(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/subtitles.txt"),
+            ("", "task_language=eng|is_text_type=subtitles|os_task_file_format=srt"),
+            ("out", "sonnet.srt"),
+            ("", "-r=\"task_pipeline=True\"")
+        ], 0)
+
+    def test_exec_task_pipeline_head_tail(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/subtitles.txt"),
+            ("", "task_language=eng|is_text_type=subtitles|os_task_file_format=srt|is_audio_file_head_length=1.000|is_audio_file_tail_length=1.000"),
+            ("out", "sonnet.srt"),
+            ("", "-r=\"task_pipeline=True\"")
+        ], 0)
+
     def test_exec_tmp_path(self):
         tmp_path = gf.tmp_directory()
         self.execute([
@@ -367,6 +394,35 @@ class TestExecuteTaskCLI(unittest.TestCase):
             ("", "-r=\"tts=espeak|tts_path=%s\"" % path)
         ], 0)
 
+    def test_exec_tts_rate(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/subtitles.txt"),
+            ("", "task_language=eng|is_text_type=subtitles|os_task_file_format=srt"),
+            ("out", "sonnet.srt"),
+            ("", "-r=\"tts_rate=1.500\"")
+        ], 0)
+
+    def test_exec_tts_rate_auto(self):
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/subtitles.txt"),
+            ("", "task_language=eng|is_text_type=subtitles|os_task_file_format=srt"),
+            ("out", "sonnet.srt"),
+            ("", "-r=\"tts_rate_auto=True\"")
+        ], 0)
+
+    def test_exec_tts_rate_festival(self):
+        if not EXTRA_TESTS:
+            return
+        self.execute([
+            ("in", "../tools/res/audio.mp3"),
+            ("in", "../tools/res/subtitles.txt"),
+            ("", "task_language=eng|is_text_type=subtitles|os_task_file_format=srt"),
+            ("out", "sonnet.srt"),
+            ("", "-r=\"tts=festival|tts_rate=1.500\"")
+        ], 0)
+
     def test_exec_voice_code(self):
         self.execute([
             ("in", "../tools/res/audio.mp3"),
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import unittest
+
+from aeneas.audiobuffer import AudioBufferRegistry
+import aeneas.globalfunctions as gf
+
+
+class TestAudioBufferRegistry(unittest.TestCase):
+
+    AUDIO_FILE_WAVE = "res/audioformats/mono.16000.wav"
+
+    def setUp(self):
+        AudioBufferRegistry.clear()
+        self.calls = 0
+
+    def tearDown(self):
+        AudioBufferRegistry.clear()
+
+    def load(self):
+        self.calls += 1
+        return [self.calls]
+
+    def fail(self):
+        raise ValueError(u"Decoding failed")
+
+    def key(self, *parameters):
+        return AudioBufferRegistry.key(gf.absolute_path(self.AUDIO_FILE_WAVE, __file__), *parameters)
+
+    def test_key_not_existing(self):
+        with self.assertRaises(OSError):
+            AudioBufferRegistry.key(gf.absolute_path("res/audioformats/x/y/z/not_existing.wav", __file__))
+
+    def test_key_parameters(self):
+        self.assertEqual(self.key(16000), self.key(16000))
+        self.assertNotEqual(self.key(16000), self.key(22050))
+
+    def test_key_file_changed(self):
+        handler, file_path = gf.tmp_file(suffix=".wav")
+        with open(file_path, "wb") as file_object:
+            file_object.write(b"abc")
+        key1 = AudioBufferRegistry.key(file_path)
+        with open(file_path, "wb") as file_object:
+            file_object.write(b"abcd")
+        key2 = AudioBufferRegistry.key(file_path)
+        self.assertNotEqual(key1, key2)
+        gf.delete_file(handler, file_path)
+
+    def test_acquire_release(self):
+        registry = AudioBufferRegistry()
+        key = self.key()
+        self.assertEqual(AudioBufferRegistry.references(key), 0)
+        value1 = registry.acquire(key, self.load)
+        value2 = registry.acquire(key, self.load)
+        self.assertTrue(value1 is value2)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(AudioBufferRegistry.references(key), 2)
+        self.assertFalse(registry.release(key))
+        self.assertEqual(AudioBufferRegistry.references(key), 1)
+        self.assertTrue(registry.release(key))
+        self.assertEqual(AudioBufferRegistry.references(key), 0)
+        self.assertFalse(registry.release(key))
+
+    def test_get(self):
+        registry = AudioBufferRegistry()
+        key = self.key()
+        self.assertIsNone(registry.get(key))
+        value = registry.acquire(key, self.load)
+        self.assertTrue(registry.get(key) is value)
+        self.assertEqual(AudioBufferRegistry.references(key), 1)
+        registry.release(key)
+        self.assertIsNone(registry.get(key))
+
+    def test_acquire_after_release(self):
+        registry = AudioBufferRegistry()
+        key = self.key()
+        registry.acquire(key, self.load)
+        registry.release(key)
+        self.assertEqual(registry.acquire(key, self.load), [2])
+        self.assertEqual(self.calls, 2)
+
+    def test_acquire_failure(self):
+        registry = AudioBufferRegistry()
+        key = self.key()
+        with self.assertRaises(ValueError):
+            registry.acquire(key, self.fail)
+        self.assertEqual(AudioBufferRegistry.references(key), 0)
+        self.assertEqual(registry.acquire(key, self.load), [1])
+
+    def test_acquire_concurrent(self):
+        registry = AudioBufferRegistry()
+        key = self.key()
+        results = []
+
+        def worker():
+            results.append(registry.acquire(key, self.load))
+
+        threads = [threading.Thread(target=worker) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 8)
+        self.assertEqual(AudioBufferRegistry.references(key), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,13 +21,19 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import io
 import numpy
+import struct
 import unittest
 
+from aeneas.audiobuffer import AudioBufferRegistry
 from aeneas.audiofile import AudioFile
 from aeneas.audiofile import AudioFileNotInitializedError
 from aeneas.audiofile import AudioFileUnsupportedFormatError
 from aeneas.exacttiming import TimeValue
+from aeneas.ffmpegwrapper import FFMPEGWrapper
+from aeneas.ffprobewrapper import FFPROBEWrapper
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 import aeneas.globalfunctions as gf
 
 
@@ -37,6 +43,7 @@ class TestAudioFile(unittest.TestCase):
     AUDIO_FILE_EMPTY = "res/audioformats/p001.empty"
     AUDIO_FILE_NOT_WAVE = "res/audioformats/p001.mp3"
     AUDIO_FILE_EXACT = "res/audioformats/exact.5600.16000.wav"
+    AUDIO_FILE_WAVE_FORMAT = ("pcm_s16le", 1, 16000)
     NOT_EXISTING_FILE = "res/audioformats/x/y/z/not_existing.wav"
     FILES = [
         {
@@ -105,6 +112,9 @@ class TestAudioFile(unittest.TestCase):
         },
     ]
 
+    def tearDown(self):
+        AudioBufferRegistry.clear()
+
     def load(self, path, rp=False, rs=False):
         af = AudioFile(gf.absolute_path(path, __file__))
         if rp:
@@ -113,6 +123,12 @@ class TestAudioFile(unittest.TestCase):
             af.read_samples_from_file()
         return af
 
+    def load_int16(self, path, file_format=None):
+        rconf = RuntimeConfiguration(u"audio_samples_int16=True")
+        af = AudioFile(gf.absolute_path(path, __file__), file_format=file_format, rconf=rconf)
+        af.read_samples_from_file()
+        return af
+
     def test_read_properties_from_none(self):
         with self.assertRaises(OSError):
             audiofile = self.load(None, rp=True)
@@ -283,6 +299,337 @@ class TestAudioFile(unittest.TestCase):
         self.assertEqual(audiofile.audio_samples[6], 9)
         self.assertEqual(audiofile.audio_samples[9], 6)
 
+    def test_int16_read_samples(self):
+        audiofile = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT
+        )
+        audiofile.read_samples_from_file()
+        audiofile16 = self.load_int16(self.AUDIO_FILE_WAVE, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        self.assertFalse(audiofile.samples_int16)
+        self.assertTrue(audiofile16.samples_int16)
+        self.assertEqual(audiofile16.audio_samples.dtype, numpy.float64)
+        self.assertEqual(audiofile16.audio_samples_length, audiofile.audio_samples_length)
+        self.assertEqual(audiofile16.audio_length, audiofile.audio_length)
+        self.assertTrue((audiofile16.audio_samples == audiofile.audio_samples).all())
+
+    def test_int16_audio_samples_block(self):
+        audiofile = self.load_int16(self.AUDIO_FILE_WAVE, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        data = audiofile.audio_samples
+        self.assertTrue((audiofile.audio_samples_block(100, 200) == data[100:200]).all())
+        self.assertTrue((audiofile.audio_samples_block(end=200) == data[0:200]).all())
+        self.assertTrue((audiofile.audio_samples_block(begin=100) == data[100:]).all())
+        self.assertEqual(len(audiofile.audio_samples_block(200, 100)), 0)
+
+    def test_int16_write(self):
+        audiofile = self.load_int16(self.AUDIO_FILE_WAVE, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        data = audiofile.audio_samples
+        handler, output_file_path = gf.tmp_file(suffix=".wav")
+        audiofile.write(output_file_path)
+        audiocopy = self.load_int16(output_file_path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        self.assertTrue((audiocopy.audio_samples == data).all())
+        gf.delete_file(handler, output_file_path)
+
+    def test_int16_reverse_trim(self):
+        audiofile = self.load_int16(self.AUDIO_FILE_WAVE, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        data = audiofile.audio_samples
+        audiofile.reverse()
+        self.assertTrue((audiofile.audio_samples == data[::-1]).all())
+        audiofile.reverse()
+        audiofile.trim(TimeValue("1.0"), TimeValue("2.0"))
+        self.assertAlmostEqual(audiofile.audio_length, TimeValue("2.0"), places=1)
+        self.assertTrue((audiofile.audio_samples == data[16000:48000]).all())
+
+    def test_read_samples_from_file_mmap(self):
+        audiofile = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT,
+            rconf=RuntimeConfiguration(u"cwave=False")
+        )
+        audiofile.read_samples_from_file()
+        sr, data = audiofile._read_samples_pure_python(audiofile.file_path, False)[1]
+        self.assertEqual(audiofile.audio_sample_rate, sr)
+        self.assertTrue((audiofile.audio_samples == data).all())
+
+    def test_int16_mmap_copy_on_write(self):
+        handler, input_file_path = gf.tmp_file(suffix=".wav")
+        self.load_int16(self.AUDIO_FILE_WAVE, file_format=self.AUDIO_FILE_WAVE_FORMAT).write(input_file_path)
+        audiofile = self.load_int16(input_file_path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        data = audiofile.audio_samples
+        audiofile.reverse()
+        self.assertTrue((audiofile.audio_samples == data[::-1]).all())
+        # the file on disk must be unchanged
+        audiocopy = self.load_int16(input_file_path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        self.assertTrue((audiocopy.audio_samples == data).all())
+        # overwrite the memory-mapped file itself
+        audiofile.write(input_file_path)
+        audiocopy = self.load_int16(input_file_path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        self.assertTrue((audiocopy.audio_samples == data[::-1]).all())
+        gf.delete_file(handler, input_file_path)
+
+    def test_read_samples_from_file_range(self):
+        audiofile = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT
+        )
+        audiofile.read_samples_from_file()
+        data = audiofile.audio_samples
+        for begin, length, expected in [
+            (TimeValue("1.000"), TimeValue("2.000"), data[16000:48000]),
+            (TimeValue("1.000"), None, data[16000:]),
+            (None, TimeValue("2.000"), data[0:32000]),
+            (TimeValue("1.000"), TimeValue("1000.000"), data[16000:]),
+            (TimeValue("1000.000"), TimeValue("2.000"), data[0:0]),
+        ]:
+            for rconf in [RuntimeConfiguration(), RuntimeConfiguration(u"cwave=False"), RuntimeConfiguration(u"audio_samples_int16=True")]:
+                audiorange = AudioFile(
+                    gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+                    file_format=self.AUDIO_FILE_WAVE_FORMAT,
+                    rconf=rconf
+                )
+                audiorange.read_samples_from_file(begin=begin, length=length)
+                self.assertEqual(audiorange.audio_samples_length, len(expected))
+                self.assertTrue((audiorange.audio_samples == expected).all())
+
+    def test_read_samples_from_file_range_bad(self):
+        audiofile = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT
+        )
+        with self.assertRaises(TypeError):
+            audiofile.read_samples_from_file(begin=1.000)
+        with self.assertRaises(TypeError):
+            audiofile.read_samples_from_file(length=2.000)
+
+    def test_read_samples_from_file_resample(self):
+        expected = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT
+        )
+        expected.read_samples_from_file()
+        expected = expected.audio_samples
+        for rconf in [RuntimeConfiguration(), RuntimeConfiguration(u"cwave=False"), RuntimeConfiguration(u"audio_samples_int16=True")]:
+            audiofile = AudioFile(
+                gf.absolute_path("res/audioformats/mono.22050.wav", __file__),
+                file_format=("pcm_s16le", 1, 22050),
+                rconf=rconf
+            )
+            audiofile.read_samples_from_file()
+            self.assertEqual(audiofile.audio_sample_rate, 16000)
+            self.assertEqual(audiofile.file_format, self.AUDIO_FILE_WAVE_FORMAT)
+            self.assertEqual(audiofile.audio_samples_length, len(expected))
+            self.assertGreater(numpy.corrcoef(audiofile.audio_samples, expected)[0, 1], 0.999)
+
+    def test_read_samples_from_file_resample_wrong_format(self):
+        # the actual sample rate is read from the WAVE header
+        audiofile = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=("pcm_s16le", 1, 22050)
+        )
+        audiofile.read_samples_from_file()
+        self.assertEqual(audiofile.audio_sample_rate, 16000)
+        self.assertEqual(audiofile.audio_samples_length, 852266)
+
+    def test_read_samples_from_file_not_held(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile1.read_samples_from_file()
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile2.read_samples_from_file()
+        self.assertFalse(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+        # the view returned by audio_samples can be modified
+        data = numpy.array(audiofile2.audio_samples)
+        audiofile1.audio_samples[0] = 0.5
+        self.assertEqual(audiofile1.audio_samples[0], 0.5)
+        self.assertTrue((audiofile2.audio_samples == data).all())
+
+    def test_read_samples_from_file_held(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile1.read_samples_from_file()
+        audiofile1.hold_samples()
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile2.read_samples_from_file()
+        audiofile3 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile3.read_samples_from_file()
+        self.assertTrue(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+        self.assertTrue(numpy.shares_memory(audiofile2.audio_samples_block(), audiofile3.audio_samples_block()))
+        data = numpy.array(audiofile1.audio_samples_block())
+        # modifying one object must not modify the other ones
+        audiofile1.reverse()
+        self.assertFalse(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+        self.assertTrue((audiofile1.audio_samples == data[::-1]).all())
+        self.assertTrue((audiofile2.audio_samples_block() == data).all())
+        audiofile2.trim(TimeValue("1.000"), TimeValue("2.000"))
+        self.assertTrue((audiofile2.audio_samples_block() == data[16000:48000]).all())
+        audiofile2.add_samples(numpy.array([0.0, 0.5]))
+        self.assertEqual(audiofile2.audio_samples_length, 32002)
+        audiofile3.audio_samples[0] = 0.5
+        self.assertEqual(audiofile3.audio_samples[0], 0.5)
+        self.assertTrue((audiofile1.audio_samples == data[::-1]).all())
+        # the samples of the registry are not modified
+        audiofile4 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile4.read_samples_from_file()
+        self.assertTrue((audiofile4.audio_samples_block() == data).all())
+        audiofile1.clear_data()
+        audiofile5 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile5.read_samples_from_file()
+        self.assertFalse(numpy.shares_memory(audiofile4.audio_samples_block(), audiofile5.audio_samples_block()))
+
+    def test_read_samples_from_file_hold(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile1.read_samples_from_file(hold=True)
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile2.read_samples_from_file(hold=True)
+        audiofile3 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile3.read_samples_from_file()
+        self.assertTrue(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+        self.assertTrue(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile3.audio_samples_block()))
+        # the samples are held until the last holder releases them
+        audiofile1.clear_data()
+        audiofile4 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile4.read_samples_from_file()
+        self.assertTrue(numpy.shares_memory(audiofile2.audio_samples_block(), audiofile4.audio_samples_block()))
+        audiofile2.release_samples()
+        self.assertEqual(len(AudioBufferRegistry._ENTRIES), 0)
+
+    def test_read_samples_from_file_source_properties(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        properties = {
+            FFPROBEWrapper.STDOUT_CHANNELS: u"2",
+            FFPROBEWrapper.STDOUT_CODEC_NAME: u"mp3",
+            FFPROBEWrapper.STDOUT_DURATION: TimeValue("1.000"),
+            FFPROBEWrapper.STDOUT_SAMPLE_RATE: u"44100"
+        }
+
+        def decode(self, input_file_path, head_length=None, process_length=None):
+            return (16000, numpy.zeros(16000, dtype="int16"), properties)
+
+        orig_decode = FFMPEGWrapper.decode
+        try:
+            FFMPEGWrapper.decode = decode
+            audiofile1 = AudioFile(path)
+            audiofile1.read_samples_from_file(hold=True)
+            self.assertEqual(audiofile1.source_properties, properties)
+            # the properties are shared with the samples
+            audiofile2 = AudioFile(path)
+            audiofile2.read_samples_from_file()
+            self.assertEqual(audiofile2.source_properties, properties)
+            audiofile1.clear_data()
+        finally:
+            FFMPEGWrapper.decode = orig_decode
+        audiofile3 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile3.read_samples_from_file()
+        self.assertIsNone(audiofile3.source_properties)
+
+    def test_read_samples_from_file_shared_read_only_block(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile1.read_samples_from_file()
+        audiofile1.hold_samples()
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile2.read_samples_from_file()
+        with self.assertRaises(ValueError):
+            audiofile2.audio_samples_block()[0] = 0.5
+        audiofile1.release_samples()
+        audiofile2.clear_data()
+
+    def test_hold_samples_modified(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile1.read_samples_from_file()
+        audiofile1.reverse()
+        audiofile1.hold_samples()
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT)
+        audiofile2.read_samples_from_file()
+        self.assertFalse(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+
+    def test_read_samples_from_file_not_shared(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        rconf = RuntimeConfiguration(u"audio_buffer_registry=False")
+        audiofile1 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT, rconf=rconf)
+        audiofile1.read_samples_from_file()
+        audiofile1.hold_samples()
+        audiofile2 = AudioFile(path, file_format=self.AUDIO_FILE_WAVE_FORMAT, rconf=rconf)
+        audiofile2.read_samples_from_file()
+        self.assertFalse(numpy.shares_memory(audiofile1.audio_samples_block(), audiofile2.audio_samples_block()))
+
+    def wave_data(self, path=None):
+        if path is None:
+            path = self.AUDIO_FILE_WAVE
+        with io.open(gf.absolute_path(path, __file__), "rb") as wave_file:
+            return wave_file.read()
+
+    def test_read_samples_from_wave_data(self):
+        expected = AudioFile(
+            gf.absolute_path(self.AUDIO_FILE_WAVE, __file__),
+            file_format=self.AUDIO_FILE_WAVE_FORMAT
+        )
+        expected.read_samples_from_file()
+        for rconf in [RuntimeConfiguration(), RuntimeConfiguration(u"audio_samples_int16=True")]:
+            audiofile = AudioFile(rconf=rconf)
+            audiofile.read_samples_from_wave_data(self.wave_data())
+            self.assertEqual(audiofile.audio_sample_rate, 16000)
+            self.assertEqual(audiofile.file_format, self.AUDIO_FILE_WAVE_FORMAT)
+            self.assertEqual(audiofile.audio_length, expected.audio_length)
+            self.assertTrue((audiofile.audio_samples == expected.audio_samples).all())
+
+    def test_read_samples_from_wave_data_streaming_header(self):
+        samples = numpy.array([0, 16384, -16384, 32767, -32768], dtype="<i2").tobytes()
+        fmt = b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, 16000, 32000, 2, 16)
+        # NOTE programs writing to a pipe store placeholder sizes
+        for size in [0, 0x7ffff000, 0xffffffff]:
+            data = b"RIFF" + struct.pack("<I", size) + b"WAVE" + fmt + b"data" + struct.pack("<I", size) + samples
+            audiofile = AudioFile()
+            audiofile.read_samples_from_wave_data(data)
+            self.assertEqual(list(audiofile.audio_samples), [0.0, 0.5, -0.5, 32767 / 32768.0, -1.0])
+            # truncated data
+            audiofile.read_samples_from_wave_data(data[:-3])
+            self.assertEqual(list(audiofile.audio_samples), [0.0, 0.5, -0.5])
+
+    def test_read_samples_from_wave_data_resample(self):
+        audiofile = AudioFile()
+        audiofile.read_samples_from_wave_data(self.wave_data("res/audioformats/mono.22050.wav"))
+        self.assertEqual(audiofile.audio_sample_rate, 16000)
+        audiofile = AudioFile(rconf=RuntimeConfiguration(u"safety_checks=False"))
+        audiofile.read_samples_from_wave_data(self.wave_data("res/audioformats/mono.22050.wav"))
+        self.assertEqual(audiofile.audio_sample_rate, 22050)
+
+    def test_read_samples_from_pcm_data(self):
+        samples = numpy.array([0, 16384, -16384, 32767, -32768], dtype="<i2").tobytes()
+        audiofile = AudioFile()
+        audiofile.read_samples_from_pcm_data(samples, 16000)
+        self.assertEqual(audiofile.file_format, ("pcm_s16le", 1, 16000))
+        self.assertEqual(list(audiofile.audio_samples), [0.0, 0.5, -0.5, 32767 / 32768.0, -1.0])
+        # odd trailing byte
+        audiofile.read_samples_from_pcm_data(samples[:-1], 16000)
+        self.assertEqual(list(audiofile.audio_samples), [0.0, 0.5, -0.5, 32767 / 32768.0])
+
+    def test_read_samples_from_pcm_data_resample(self):
+        audiofile = AudioFile()
+        audiofile.read_samples_from_pcm_data(b"\x00\x00" * 22050, 22050)
+        self.assertEqual(audiofile.audio_sample_rate, 16000)
+        self.assertEqual(audiofile.audio_length, TimeValue("1.000"))
+
+    def test_read_samples_from_wave_data_unsupported(self):
+        for data in [b"", b"RIFF", self.wave_data(self.AUDIO_FILE_NOT_WAVE), self.wave_data("res/audioformats/p001.wav")]:
+            audiofile = AudioFile()
+            with self.assertRaises(AudioFileUnsupportedFormatError):
+                audiofile.read_samples_from_wave_data(data)
+
+    def test_int16_add_samples_memory(self):
+        audiofile = AudioFile(rconf=RuntimeConfiguration(u"audio_samples_int16=True"))
+        audiofile.add_samples(numpy.array([0.0, 0.5, -0.5, 1.0, -1.0]))
+        audiofile.add_samples(numpy.array([16384, -16384], dtype=numpy.int16), reverse=True)
+        self.assertEqual(audiofile.audio_samples_length, 7)
+        self.assertEqual(audiofile.audio_samples[1], 0.5)
+        self.assertEqual(audiofile.audio_samples[2], -0.5)
+        self.assertEqual(audiofile.audio_samples[3], 32767.0 / 32768)
+        self.assertEqual(audiofile.audio_samples[4], -1.0)
+        self.assertEqual(audiofile.audio_samples[5], -0.5)
+        self.assertEqual(audiofile.audio_samples[6], 0.5)
+
 
 if __name__ == "__main__":
     unittest.main()
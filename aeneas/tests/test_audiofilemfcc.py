@@ -24,10 +24,12 @@
 import numpy
 import unittest
 
+from aeneas.audiobuffer import AudioBufferRegistry
 from aeneas.audiofile import AudioFile
 from aeneas.audiofile import AudioFileUnsupportedFormatError
 from aeneas.audiofilemfcc import AudioFileMFCC
 from aeneas.exacttiming import TimeValue
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 import aeneas.globalfunctions as gf
 
 
@@ -71,6 +73,50 @@ class TestAudioFileMFCC(unittest.TestCase):
         self.assertEqual(audiofile.all_mfcc.shape[1], 1331)
         self.assertAlmostEqual(audiofile.audio_length, TimeValue("53.3"), places=1)     # 53.266
 
+    def test_load_int16(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        file_format = ("pcm_s16le", 1, 16000)
+        audiofile = AudioFileMFCC(path, file_format=file_format)
+        orig_block_frames = AudioFileMFCC.INT16_BLOCK_FRAMES
+        try:
+            AudioFileMFCC.INT16_BLOCK_FRAMES = 100
+            rconf = RuntimeConfiguration(u"audio_samples_int16=True")
+            audiofile16 = AudioFileMFCC(path, file_format=file_format, rconf=rconf)
+        finally:
+            AudioFileMFCC.INT16_BLOCK_FRAMES = orig_block_frames
+        self.assertEqual(audiofile16.all_mfcc.shape, audiofile.all_mfcc.shape)
+        self.assertEqual(audiofile16.audio_length, audiofile.audio_length)
+        # only the first frame of each block might differ, and only slightly
+        not_first = numpy.arange(audiofile.all_length) % 100 != 0
+        self.assertTrue(numpy.allclose(audiofile16.all_mfcc[:, not_first], audiofile.all_mfcc[:, not_first]))
+        self.assertTrue(numpy.allclose(audiofile16.all_mfcc, audiofile.all_mfcc, atol=0.1))
+
+    def test_load_path_releases_samples(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        AudioFileMFCC(path, file_format=("pcm_s16le", 1, 16000))
+        self.assertEqual(len(AudioBufferRegistry._ENTRIES), 0)
+
+    def test_load_path_held_samples(self):
+        path = gf.absolute_path(self.AUDIO_FILE_WAVE, __file__)
+        file_format = ("pcm_s16le", 1, 16000)
+        holder = AudioFile(path, file_format=file_format)
+        holder.read_samples_from_file(hold=True)
+        decodings = []
+        orig_decode_samples = AudioFile._decode_samples
+        try:
+            def decode_samples(self, *args):
+                decodings.append(self.file_path)
+                return orig_decode_samples(self, *args)
+            AudioFile._decode_samples = decode_samples
+            audiofile = AudioFileMFCC(path, file_format=file_format)
+        finally:
+            AudioFile._decode_samples = orig_decode_samples
+        # the samples held by holder are reused
+        self.assertEqual(decodings, [])
+        self.assertEqual(audiofile.all_mfcc.shape[1], 1331)
+        holder.clear_data()
+        self.assertEqual(len(AudioBufferRegistry._ENTRIES), 0)
+
     def test_load_on_non_existing_path(self):
         with self.assertRaises(OSError):
             audiofile = self.load(self.NOT_EXISTING_FILE)
@@ -364,6 +410,49 @@ class TestAudioFileMFCC(unittest.TestCase):
         audiofile.set_head_middle_tail(head_length=TimeValue("10.000"), tail_length=TimeValue("10.000"))
         self.assertNotEqual(pre, audiofile.masked_middle_length)
 
+    def test_middle_window(self):
+        audiofile = self.load(self.AUDIO_FILE_WAVE)
+        window = audiofile.middle_window(head_length=TimeValue("2.000"), middle_length=TimeValue("18.000"))
+        self.assertIs(window.all_mfcc, audiofile.all_mfcc)
+        self.assertEqual(window.audio_length, audiofile.audio_length)
+        self.assertEqual(window.head_length, 50)
+        self.assertEqual(window.middle_length, 450)
+        self.assertEqual(window.tail_length, 831)
+        self.assertEqual(audiofile.head_length, 0)
+        self.assertEqual(audiofile.middle_length, 1331)
+        self.assertEqual(audiofile.tail_length, 0)
+
+    def test_middle_window_from_middle(self):
+        audiofile = self.load(self.AUDIO_FILE_WAVE)
+        audiofile.set_head_middle_tail(head_length=TimeValue("2.000"), tail_length=TimeValue("2.000"))
+        window = audiofile.middle_window(head_length=TimeValue("4.000"))
+        self.assertEqual(window.head_length, 100)
+        self.assertEqual(window.tail_length, 50)
+        self.assertEqual(audiofile.head_length, 50)
+        self.assertEqual(audiofile.tail_length, 50)
+
+    def test_middle_window_vad(self):
+        audiofile = self.load(self.AUDIO_FILE_WAVE)
+        window = audiofile.middle_window(head_length=TimeValue("2.000"), middle_length=TimeValue("18.000"))
+        self.assertEqual(window.intervals(), audiofile.intervals())
+        self.assertTrue((window.masked_mfcc == audiofile.masked_mfcc).all())
+        audiofile.set_head_middle_tail(head_length=TimeValue("2.000"), middle_length=TimeValue("18.000"))
+        self.assertTrue((window.masked_middle_map == audiofile.masked_middle_map).all())
+
+    def test_middle_window_reverse(self):
+        audiofile = self.load(self.AUDIO_FILE_WAVE)
+        window = audiofile.middle_window(head_length=TimeValue("2.000"))
+        masked_map = window.masked_map.copy()
+        audiofile.reverse()
+        self.assertTrue((window.masked_map == masked_map).all())
+
+    def test_middle_window_bad(self):
+        audiofile = self.load(self.AUDIO_FILE_WAVE)
+        with self.assertRaises(TypeError):
+            audiofile.middle_window(head_length=2.000)
+        with self.assertRaises(ValueError):
+            audiofile.middle_window(head_length=TimeValue("100.000"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import sys
+import unittest
+
+from aeneas.audioprobe import AudioProbe
+from aeneas.exacttiming import TimeValue
+from aeneas.ffprobewrapper import FFPROBEPathError
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+import aeneas.globalfunctions as gf
+
+
+class TestAudioProbe(unittest.TestCase):
+
+    FILES = [
+        {
+            "path": "res/audioformats/p001.aiff",
+            "rate": 44100,
+            "channels": 2,
+            "format": "pcm_s16be",
+            "length": TimeValue("8.995"),
+        },
+        {
+            "path": "res/audioformats/p001.flac",
+            "rate": 44100,
+            "channels": 2,
+            "format": "flac",
+            "length": TimeValue("8.995"),
+        },
+        {
+            "path": "res/audioformats/p001.mp3",
+            "rate": 44100,
+            "channels": 2,
+            "format": "mp3",
+            "length": TimeValue("9.038"),
+        },
+        {
+            "path": "res/audioformats/p001.wav",
+            "rate": 44100,
+            "channels": 2,
+            "format": "pcm_s16le",
+            "length": TimeValue("8.995"),
+        },
+        {
+            "path": "res/audioformats/mono.16000.wav",
+            "rate": 16000,
+            "channels": 1,
+            "format": "pcm_s16le",
+            "length": TimeValue("53.267"),
+        },
+    ]
+
+    NOT_NATIVE_FILES = [
+        "res/audioformats/mono.empty.wav",
+        "res/audioformats/mono.invalid.wav",
+        "res/audioformats/mono.zero.wav",
+        "res/audioformats/p001.aac",
+        "res/audioformats/p001.empty",
+        "res/audioformats/p001.mp4",
+        "res/audioformats/p001.ogg",
+        "res/audioformats/p001.webm",
+    ]
+
+    NOT_EXISTING_PATH = "this_file_does_not_exist.mp3"
+
+    def setUp(self):
+        AudioProbe.clear_cache()
+
+    def tearDown(self):
+        AudioProbe.clear_cache()
+
+    def load(self, input_file_path, rconf=None):
+        prober = AudioProbe(rconf=rconf)
+        return prober.read_properties(
+            gf.absolute_path(input_file_path, __file__)
+        )
+
+    def test_path_none(self):
+        with self.assertRaises(TypeError):
+            self.load(None)
+
+    def test_path_not_existing(self):
+        with self.assertRaises(OSError):
+            self.load(self.NOT_EXISTING_PATH)
+
+    def test_native_formats(self):
+        for f in self.FILES:
+            properties = self.load(f["path"], rconf=RuntimeConfiguration(u"audio_probe_cache=False"))
+            self.assertEqual(gf.safe_int(properties["sample_rate"]), f["rate"])
+            self.assertEqual(gf.safe_int(properties["channels"]), f["channels"])
+            self.assertEqual(properties["codec_name"], f["format"])
+            self.assertAlmostEqual(properties["duration"], f["length"], places=3)
+
+    def test_native_ffprobe_path_bad(self):
+        with self.assertRaises(FFPROBEPathError):
+            self.load("res/audioformats/p001.wav", rconf=RuntimeConfiguration(u"ffprobe_path=/foo/bar/ffprobe"))
+
+    def test_native_ffprobe_path_executable(self):
+        properties = self.load("res/audioformats/p001.wav", rconf=RuntimeConfiguration(u"ffprobe_path=%s" % sys.executable))
+        self.assertEqual(properties["codec_name"], u"pcm_s16le")
+
+    def test_not_native_formats(self):
+        prober = AudioProbe()
+        for f in self.NOT_NATIVE_FILES:
+            self.assertIsNone(prober._read_properties_native(gf.absolute_path(f, __file__)))
+
+    def test_cache(self):
+        properties = self.load("res/audioformats/p001.wav")
+        self.assertEqual(len(AudioProbe._CACHE), 1)
+        # the native probe is disabled, and ffprobe_path is not ffprobe,
+        # hence the value must come from the cache
+        cached = self.load("res/audioformats/p001.wav", rconf=RuntimeConfiguration(u"audio_probe_native=False|ffprobe_path=%s" % sys.executable))
+        self.assertEqual(cached, properties)
+        # modifying the returned dictionary must not alter the cache
+        cached["codec_name"] = u"foo"
+        self.assertEqual(self.load("res/audioformats/p001.wav")["codec_name"], u"pcm_s16le")
+
+    def test_cache_disabled(self):
+        self.load("res/audioformats/p001.wav", rconf=RuntimeConfiguration(u"audio_probe_cache=False"))
+        self.assertEqual(len(AudioProbe._CACHE), 0)
+
+    def test_cache_file_changed(self):
+        handler, tmp_path = gf.tmp_file(suffix=".wav")
+        shutil.copyfile(gf.absolute_path("res/audioformats/p001.wav", __file__), tmp_path)
+        properties = AudioProbe().read_properties(tmp_path)
+        self.assertEqual(gf.safe_int(properties["sample_rate"]), 44100)
+        shutil.copyfile(gf.absolute_path("res/audioformats/mono.16000.wav", __file__), tmp_path)
+        properties = AudioProbe().read_properties(tmp_path)
+        self.assertEqual(gf.safe_int(properties["sample_rate"]), 16000)
+        self.assertEqual(len(AudioProbe._CACHE), 2)
+        gf.delete_file(handler, tmp_path)
+
+    def test_cache_max_entries(self):
+        orig = AudioProbe.CACHE_MAX_ENTRIES
+        AudioProbe.CACHE_MAX_ENTRIES = 2
+        try:
+            for f in self.FILES[0:3]:
+                self.load(f["path"])
+            self.assertEqual(len(AudioProbe._CACHE), 2)
+            paths = [key[0] for key in AudioProbe._CACHE]
+            self.assertNotIn(os.path.abspath(gf.absolute_path(self.FILES[0]["path"], __file__)), paths)
+        finally:
+            AudioProbe.CACHE_MAX_ENTRIES = orig
+
+
+if __name__ == "__main__":
+    unittest.main()
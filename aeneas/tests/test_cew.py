@@ -76,6 +76,58 @@ class TestCEW(unittest.TestCase):
             pass
         gf.delete_file(handler, output_file_path)
 
+    def test_cew_synthesize_multiple_marks(self):
+        handler, output_file_path = gf.tmp_file(suffix=".wav")
+        try:
+            c_quit_after = 0.0
+            c_backwards = 0
+            c_text = [
+                (u"en", u"Dummy 1"),        # NOTE cew requires the actual eSpeak voice code
+                (u"en", u"Dummy & <2>"),    # NOTE cew requires the actual eSpeak voice code
+                (u"it", u"Segnaposto 3"),   # NOTE cew requires the actual eSpeak voice code
+                (u"it", u"Segnaposto 4"),   # NOTE cew requires the actual eSpeak voice code
+            ]
+            import aeneas.cew.cew
+            sr, sf, intervals = aeneas.cew.cew.synthesize_multiple_marks(
+                output_file_path,
+                c_quit_after,
+                c_backwards,
+                c_text
+            )
+            self.assertEqual(sr, 22050)
+            self.assertEqual(sf, 4)
+            self.assertEqual(len(intervals), 4)
+            # fragments are contiguous, since their anchors come from mark events
+            for i in range(3):
+                self.assertEqual(intervals[i][1], intervals[i + 1][0])
+        except ImportError:
+            pass
+        gf.delete_file(handler, output_file_path)
+
+    def test_cew_synthesize_multiple_marks_quit_after(self):
+        handler, output_file_path = gf.tmp_file(suffix=".wav")
+        try:
+            c_quit_after = 0.1
+            c_backwards = 0
+            c_text = [
+                (u"en", u"Dummy 1"),        # NOTE cew requires the actual eSpeak voice code
+                (u"it", u"Segnaposto 2"),   # NOTE cew requires the actual eSpeak voice code
+                (u"en", u"Dummy 3"),        # NOTE cew requires the actual eSpeak voice code
+            ]
+            import aeneas.cew.cew
+            sr, sf, intervals = aeneas.cew.cew.synthesize_multiple_marks(
+                output_file_path,
+                c_quit_after,
+                c_backwards,
+                c_text
+            )
+            # NOTE the synthesis stops at the end of the first run of fragments
+            self.assertEqual(sf, 1)
+            self.assertEqual(len(intervals), 1)
+        except ImportError:
+            pass
+        gf.delete_file(handler, output_file_path)
+
 
 if __name__ == "__main__":
     unittest.main()
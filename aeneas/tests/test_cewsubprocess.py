@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import struct
+import sys
+import unittest
+import wave
+
+from aeneas.cewsubprocess import CEWWorkerPool
+from aeneas.cewsubprocess import read_frame
+from aeneas.cewsubprocess import serve
+from aeneas.cewsubprocess import write_frame
+import aeneas.globalfunctions as gf
+
+
+class TestCEWSubprocess(unittest.TestCase):
+
+    PATH_NOT_WRITEABLE = gf.absolute_path("x/y/z/not_writeable.wav", __file__)
+
+    def fake_synthesize_multiple(self, audio_file_path, c_quit_after, c_backwards, s_text):
+        if len(s_text) == 0:
+            raise ValueError(u"No text")
+        intervals = [(0.1 * i, 0.1 * (i + 1)) for i in range(len(s_text))]
+        return (22050, len(s_text), intervals)
+
+    def fake_synthesize_multiple_wave(self, audio_file_path, c_quit_after, c_backwards, s_text):
+        # NOTE one sample per fragment
+        wave_file = wave.open(audio_file_path, "wb")
+        wave_file.setnchannels(1)
+        wave_file.setsampwidth(2)
+        wave_file.setframerate(22050)
+        wave_file.writeframes(struct.pack("<%dh" % len(s_text), *range(1, len(s_text) + 1)))
+        wave_file.close()
+        return self.fake_synthesize_multiple(audio_file_path, c_quit_after, c_backwards, s_text)
+
+    def serve(self, requests, function=None):
+        input_stream = io.BytesIO()
+        for request in requests:
+            write_frame(input_stream, request)
+        input_stream.seek(0)
+        output_stream = io.BytesIO()
+        serve(input_stream, output_stream, function or self.fake_synthesize_multiple)
+        output_stream.seek(0)
+        return [read_frame(output_stream) for request in requests]
+
+    def request(self, text):
+        return {"audio_file_path": u"foo.wav", "quit_after": 0.0, "backwards": 0, "text": text}
+
+    def test_frame(self):
+        stream = io.BytesIO()
+        obj = {"text": [[u"eng", u"Hello"], [u"ita", u"Città"]], "quit_after": 1.5}
+        write_frame(stream, obj)
+        write_frame(stream, [])
+        stream.seek(0)
+        self.assertEqual(read_frame(stream), obj)
+        self.assertEqual(read_frame(stream), [])
+        with self.assertRaises(EOFError):
+            read_frame(stream)
+
+    def test_frame_data(self):
+        stream = io.BytesIO()
+        write_frame(stream, {"sr": 16000}, b"\x01\x00\x02\x00")
+        write_frame(stream, {"sr": 16000}, b"")
+        stream.seek(0)
+        self.assertEqual(read_frame(stream), {u"sr": 16000, u"data": b"\x01\x00\x02\x00"})
+        self.assertEqual(read_frame(stream), {u"sr": 16000, u"data": b""})
+
+    def test_frame_data_truncated(self):
+        stream = io.BytesIO()
+        write_frame(stream, {"sr": 16000}, b"\x01\x00\x02\x00")
+        stream = io.BytesIO(stream.getvalue()[:-1])
+        with self.assertRaises(EOFError):
+            read_frame(stream)
+
+    def test_frame_truncated(self):
+        stream = io.BytesIO()
+        write_frame(stream, {"foo": u"bar"})
+        stream = io.BytesIO(stream.getvalue()[:-1])
+        with self.assertRaises(EOFError):
+            read_frame(stream)
+
+    def test_serve(self):
+        responses = self.serve([
+            self.request([[u"eng", u"Hello"], [u"eng", u"World"]]),
+            self.request([[u"eng", u"Hello"]]),
+        ])
+        self.assertEqual(responses[0], {u"sr": 22050, u"sf": 2, u"intervals": [[u"0.000", u"0.100"], [u"0.100", u"0.200"]]})
+        self.assertEqual(responses[1][u"sf"], 1)
+
+    def test_serve_error(self):
+        responses = self.serve([
+            self.request([]),
+            self.request([[u"eng", u"Hello"]]),
+        ])
+        self.assertIn(u"error", responses[0])
+        self.assertEqual(responses[1][u"sf"], 1)
+
+    def test_serve_data(self):
+        request = self.request([[u"eng", u"Hello"], [u"eng", u"World"]])
+        request["audio_file_path"] = None
+        responses = self.serve([request], self.fake_synthesize_multiple_wave)
+        self.assertEqual(responses[0][u"sf"], 2)
+        self.assertEqual(responses[0][u"data"], b"\x01\x00\x02\x00")
+
+    def test_serve_data_error(self):
+        request = self.request([])
+        request["audio_file_path"] = None
+        responses = self.serve([request], self.fake_synthesize_multiple_wave)
+        self.assertIn(u"error", responses[0])
+        self.assertNotIn(u"data", responses[0])
+
+    def test_pool_worker_data(self):
+        # NOTE the worker fails importing aeneas.cew, if it is not available,
+        #      or synthesizing an unknown voice
+        pool = CEWWorkerPool(sys.executable, 1)
+        try:
+            with self.assertRaises(RuntimeError):
+                pool.synthesize_multiple_data(0.0, 0, [(u"x-unknown", u"Hello")])
+            self.assertEqual(len(pool.idle), 1)
+        finally:
+            pool.close()
+
+    def test_pool_worker(self):
+        # NOTE the worker fails writing to a path that does not exist,
+        #      or importing aeneas.cew, if it is not available
+        pool = CEWWorkerPool(sys.executable, 1)
+        try:
+            for i in range(2):
+                with self.assertRaises(RuntimeError):
+                    pool.synthesize_multiple(self.PATH_NOT_WRITEABLE, 0.0, 0, [(u"en", u"Hello")])
+            self.assertEqual(len(pool.idle), 1)
+            self.assertEqual(pool.idle[0].requests, 2)
+            self.assertEqual(pool.respawns, 0)
+        finally:
+            pool.close()
+        self.assertEqual(len(pool.idle), 0)
+
+    def test_pool_worker_crash(self):
+        pool = CEWWorkerPool(sys.executable, 1)
+        try:
+            with self.assertRaises(RuntimeError):
+                pool.synthesize_multiple(self.PATH_NOT_WRITEABLE, 0.0, 0, [(u"en", u"Hello")])
+            worker = pool.idle[0]
+            worker.process.kill()
+            worker.process.wait()
+            with self.assertRaises(RuntimeError):
+                pool.synthesize_multiple(self.PATH_NOT_WRITEABLE, 0.0, 0, [(u"en", u"Hello")])
+            self.assertEqual(pool.respawns, 1)
+            self.assertTrue(pool.idle[0].alive)
+        finally:
+            pool.close()
+
+    def test_pool_max_requests(self):
+        pool = CEWWorkerPool(sys.executable, 1, max_requests=1)
+        try:
+            with self.assertRaises(RuntimeError):
+                pool.synthesize_multiple(self.PATH_NOT_WRITEABLE, 0.0, 0, [(u"en", u"Hello")])
+            self.assertEqual(len(pool.idle), 0)
+        finally:
+            pool.close()
+
+    def test_pool_get_shared(self):
+        pool = CEWWorkerPool.get(sys.executable, 2)
+        self.assertIs(CEWWorkerPool.get(sys.executable, 2), pool)
+        self.assertIsNot(CEWWorkerPool.get(sys.executable, 3), pool)
+        CEWWorkerPool.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from aeneas.audiofile import AudioFile
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+import aeneas.globalfunctions as gf
+
+
+class TestCWAVE(unittest.TestCase):
+
+    AUDIO = gf.absolute_path("res/audioformats/mono.16000.wav", __file__)
+
+    AUDIO_FORMAT = ("pcm_s16le", 1, 16000)
+
+    def test_get_audio_info(self):
+        try:
+            import aeneas.cwave.cwave
+            sr, length = aeneas.cwave.cwave.get_audio_info(self.AUDIO)
+            self.assertEqual(sr, 16000)
+            self.assertGreater(length, 0)
+        except ImportError:
+            pass
+
+    def test_read_audio_data(self):
+        try:
+            import aeneas.cwave.cwave
+            audio_file = AudioFile(
+                self.AUDIO,
+                file_format=self.AUDIO_FORMAT,
+                rconf=RuntimeConfiguration(u"cwave=False")
+            )
+            audio_file.read_samples_from_file()
+            sr, data = aeneas.cwave.cwave.read_audio_data(self.AUDIO, 0, 0)
+            self.assertEqual(sr, audio_file.audio_sample_rate)
+            self.assertTrue((data == audio_file.audio_samples).all())
+            sr, data = aeneas.cwave.cwave.read_audio_data(self.AUDIO, 100, 200)
+            self.assertEqual(len(data), 200)
+            self.assertTrue((data == audio_file.audio_samples[100:300]).all())
+        except ImportError:
+            pass
+
+    def test_read_audio_data_out_of_range(self):
+        try:
+            import aeneas.cwave.cwave
+            sr, length = aeneas.cwave.cwave.get_audio_info(self.AUDIO)
+            with self.assertRaises(ValueError):
+                aeneas.cwave.cwave.read_audio_data(self.AUDIO, length, 1)
+        except ImportError:
+            pass
+
+
+if __name__ == "__main__":
+    unittest.main()
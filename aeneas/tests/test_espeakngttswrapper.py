@@ -23,8 +23,10 @@
 
 import unittest
 
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.tests.base_ttswrapper import TestBaseTTSWrapper
 from aeneas.ttswrappers.espeakngttswrapper import ESPEAKNGTTSWrapper
+import aeneas.globalfunctions as gf
 
 
 class TestESPEAKNGTTSWrapper(TestBaseTTSWrapper):
@@ -35,6 +37,20 @@ class TestESPEAKNGTTSWrapper(TestBaseTTSWrapper):
     TTS_LANGUAGE = ESPEAKNGTTSWrapper.ENG
     TTS_LANGUAGE_VARIATION = ESPEAKNGTTSWrapper.ENG_GBR
 
+    def test_rate_to_subprocess(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_RATE] = 1.5
+        tts_engine = ESPEAKNGTTSWrapper(rconf=rconf)
+        self.assertEqual(tts_engine._rate_to_subprocess(tts_engine.rate), [u"-s", u"262"])
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_arguments)
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_pipe_arguments)
+
+    def test_c_extension_not_espeak_ng(self):
+        if gf.cew_engine() == u"espeak-ng":
+            return
+        tts_engine = ESPEAKNGTTSWrapper()
+        self.assertEqual(tts_engine._synthesize_multiple_c_extension(None, None), (False, None))
+
 
 if __name__ == "__main__":
     unittest.main()
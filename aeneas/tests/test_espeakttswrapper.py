@@ -23,6 +23,7 @@
 
 import unittest
 
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.tests.base_ttswrapper import TestBaseTTSWrapper
 from aeneas.ttswrappers.espeakttswrapper import ESPEAKTTSWrapper
 
@@ -55,6 +56,14 @@ class TestESPEAKTTSWrapper(TestBaseTTSWrapper):
         ])
         self.synthesize(tfl)
 
+    def test_rate_to_subprocess(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_RATE] = 1.5
+        tts_engine = ESPEAKTTSWrapper(rconf=rconf)
+        self.assertEqual(tts_engine._rate_to_subprocess(tts_engine.rate), [u"-s", u"262"])
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_arguments)
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_pipe_arguments)
+
 
 if __name__ == "__main__":
     unittest.main()
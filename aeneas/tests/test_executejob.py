@@ -0,0 +1,382 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import pickle
+import shutil
+import threading
+import unittest
+
+from aeneas.executejob import _audio_file_properties
+from aeneas.executejob import _detached_text_file
+from aeneas.executejob import _execute_task
+from aeneas.executejob import AudioPredecoder
+from aeneas.executejob import ExecuteJob
+from aeneas.executejob import ExecuteJobExecutionError
+from aeneas.executejob import ExecuteJobOutputError
+from aeneas.exacttiming import TimeValue
+from aeneas.job import Job
+from aeneas.language import Language
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.syncmap import SyncMap
+from aeneas.syncmap import SyncMapFragment
+from aeneas.task import Task
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFragment
+import aeneas.globalfunctions as gf
+
+
+class TestExecuteJob(unittest.TestCase):
+
+    AUDIO_FILE_1 = "res/audioformats/mono.16000.wav"
+    AUDIO_FILE_2 = "res/audioformats/mono.22050.wav"
+
+    # NOTE the tasks have no audio file, hence they fail
+    #      without calling ffmpeg or the TTS engine
+    def job(self, number_tasks):
+        job = Job(u"job_language=eng|os_job_file_name=output|os_job_file_container=unpacked")
+        for i in range(number_tasks):
+            task = Task(u"task_language=eng|is_text_type=plain|os_task_file_format=json|task_custom_id=t%03d" % i)
+            task.text_file_path_absolute = gf.absolute_path("res/inputtext/sonnet_plain.txt", __file__)
+            task.sync_map_file_path = u"t%03d.json" % i
+            job.add_task(task)
+        return job
+
+    # NOTE the tasks with index in failing have no audio file
+    def executable_job(self, number_tasks, failing=[]):
+        job = self.job(number_tasks)
+        for i, task in enumerate(job.tasks):
+            if i in failing:
+                continue
+            task.text_file_path_absolute = gf.absolute_path("../tools/res/plain.txt", __file__)
+            task.audio_file_path_absolute = gf.absolute_path("../tools/res/audio.wav", __file__)
+        return job
+
+    def sync_map(self):
+        sync_map = SyncMap()
+        fragment = TextFragment(u"f001", Language.ENG, [u"Fragment 1"])
+        sync_map.add_fragment(SyncMapFragment(text_fragment=fragment, begin=TimeValue("0.000"), end=TimeValue("1.000")))
+        return sync_map
+
+    def write_output_container(self, executor):
+        output_path = gf.tmp_directory()
+        try:
+            executor.write_output_container(output_path)
+            return sorted(os.listdir(os.path.join(output_path, u"output")))
+        finally:
+            gf.delete_directory(output_path)
+
+    def execute(self, workers, number_tasks):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = workers
+        with self.assertRaises(ExecuteJobExecutionError) as context:
+            ExecuteJob(self.job(number_tasks), rconf=rconf).execute()
+        return u"%s" % (context.exception)
+
+    def shared_audio_files(self, paths, config=u"", rconf=None):
+        job = self.job(len(paths))
+        for task, path in zip(job.tasks, paths):
+            if config != u"":
+                task.configuration = Task(u"task_language=eng|is_text_type=plain|os_task_file_format=json|%s" % config).configuration
+            task.audio_file_path_absolute = gf.absolute_path(path, __file__)
+        return ExecuteJob(job, rconf=rconf)._shared_audio_files()
+
+    def test_shared_audio_files(self):
+        shared = self.shared_audio_files([self.AUDIO_FILE_1, self.AUDIO_FILE_1, self.AUDIO_FILE_2, self.AUDIO_FILE_1])
+        self.assertEqual(shared, {gf.absolute_path(self.AUDIO_FILE_1, __file__): 3})
+
+    def test_shared_audio_files_none(self):
+        shared = self.shared_audio_files([self.AUDIO_FILE_1, self.AUDIO_FILE_2])
+        self.assertEqual(shared, {})
+
+    def test_shared_audio_files_registry_disabled(self):
+        rconf = RuntimeConfiguration(u"audio_buffer_registry=False")
+        shared = self.shared_audio_files([self.AUDIO_FILE_1, self.AUDIO_FILE_1], rconf=rconf)
+        self.assertEqual(shared, {})
+
+    def test_shared_audio_files_decode_range(self):
+        shared = self.shared_audio_files([self.AUDIO_FILE_1, self.AUDIO_FILE_1], config=u"is_audio_file_head_length=1.000")
+        self.assertEqual(shared, {})
+
+    def test_hold_audio_file_not_existing(self):
+        executor = ExecuteJob(self.job(1))
+        self.assertIsNone(executor._hold_audio_file(gf.absolute_path("res/audioformats/x/y/z/not_existing.wav", __file__)))
+        executor._release_audio_file(None)
+
+    def test_execute_task(self):
+        task = self.job(1).tasks[0]
+        sync_map, entries, error = _execute_task((
+            task.configuration,
+            _detached_text_file(task.text_file),
+            None,
+            None,
+            RuntimeConfiguration(),
+            False,
+            True
+        ))
+        self.assertIsNone(sync_map)
+        self.assertGreater(len(entries), 0)
+        exc, exc_traceback = error
+        self.assertIsInstance(exc, Exception)
+        self.assertIn(u"audio file", u"%s" % exc)
+        self.assertIn(u"Traceback", exc_traceback)
+
+    def test_detached_text_file(self):
+        task = self.job(1).tasks[0]
+        text_file = pickle.loads(pickle.dumps(_detached_text_file(task.text_file)))
+        self.assertIsNotNone(task.text_file.logger)
+        self.assertEqual(len(text_file), len(task.text_file))
+        self.assertEqual(text_file.chars, task.text_file.chars)
+        self.assertIsNone(_detached_text_file(None))
+
+    def test_audio_file_properties(self):
+        task = Task(u"task_language=eng|is_text_type=plain|os_task_file_format=json")
+        self.assertIsNone(_audio_file_properties(None))
+        task.audio_file_path_absolute = gf.absolute_path(self.AUDIO_FILE_1, __file__)
+        self.assertIsNone(_audio_file_properties(task.audio_file))
+        task.audio_file.audio_length = TimeValue("1.000")
+        task.audio_file.audio_sample_rate = 16000
+        properties = _audio_file_properties(task.audio_file)
+        self.assertEqual(properties["audio_length"], TimeValue("1.000"))
+        self.assertEqual(properties["audio_sample_rate"], 16000)
+
+    def test_execute_task_audio_properties(self):
+        task = self.job(1).tasks[0]
+        sync_map, entries, error = _execute_task((
+            task.configuration,
+            _detached_text_file(task.text_file),
+            gf.absolute_path(self.AUDIO_FILE_1, __file__),
+            {"audio_length": TimeValue("0.000")},
+            RuntimeConfiguration(),
+            False,
+            True
+        ))
+        exc, exc_traceback = error
+        # NOTE the properties sent are used, without probing the audio file
+        self.assertIn(u"invalid audio file", u"%s" % exc)
+
+    def test_execute_parallel_text_file_in_memory(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = 2
+        job = Job(u"job_language=eng|os_job_file_name=output|os_job_file_container=unpacked")
+        for i in range(2):
+            task = Task(u"task_language=eng|is_text_type=plain|os_task_file_format=json|task_custom_id=t%03d" % i)
+            task.audio_file_path_absolute = gf.absolute_path("../tools/res/audio.wav", __file__)
+            # NOTE as if the audio file had been probed already
+            task.audio_file.audio_length = TimeValue("53.240")
+            task.text_file = TextFile()
+            task.text_file.add_fragment(TextFragment(u"f001", Language.ENG, [u"Fragment 1"]))
+            job.add_task(task)
+        executor = ExecuteJob(job, rconf=rconf)
+        try:
+            executor.execute()
+        except ExecuteJobExecutionError:
+            # NOTE without ffmpeg and the TTS engine the tasks fail later on
+            pass
+        messages = [entry.message for entry in executor.logger.entries]
+        self.assertFalse(any([u"text file set" in m for m in messages]))
+        self.assertTrue(any([u"Both audio and text input file are present" in m for m in messages]))
+
+    def test_execute_sequential_isolates_failures(self):
+        message = self.execute(1, 3)
+        self.assertIn(u"3 tasks", message)
+        for i in range(3):
+            self.assertIn(u"t%03d" % i, message)
+
+    def test_execute_failures(self):
+        for workers in [1, 2]:
+            rconf = RuntimeConfiguration()
+            rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = workers
+            job = self.job(2)
+            executor = ExecuteJob(job, rconf=rconf)
+            with self.assertRaises(ExecuteJobExecutionError) as context:
+                executor.execute()
+            self.assertEqual([task for task, exc, exc_traceback in executor.failures], job.tasks)
+            for task, exc, exc_traceback in executor.failures:
+                # NOTE the type of the original exception is kept
+                self.assertNotIsInstance(exc, ExecuteJobExecutionError)
+                self.assertIn(type(exc).__name__, u"%s" % context.exception)
+                self.assertIn(u"Traceback", exc_traceback)
+
+    def test_execute_parallel_isolates_failures(self):
+        message = self.execute(2, 3)
+        self.assertIn(u"3 tasks", message)
+        for i in range(3):
+            self.assertIn(u"t%03d" % i, message)
+
+    def test_execute_parallel_more_workers_than_tasks(self):
+        message = self.execute(8, 2)
+        self.assertIn(u"2 tasks", message)
+
+    def test_execute_parallel_logger(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = 2
+        executor = ExecuteJob(self.job(2), rconf=rconf)
+        with self.assertRaises(ExecuteJobExecutionError):
+            executor.execute()
+        messages = [entry.message for entry in executor.logger.entries]
+        self.assertTrue(any([u"Error while executing task 't001'" in m for m in messages]))
+        self.assertTrue(any([u"The task does not seem to have its audio file set" in m for m in messages]))
+        self.assertTrue(any([u"Traceback in the worker process" in m for m in messages]))
+
+    def test_write_output_container_skips_failures(self):
+        job = self.job(2)
+        job.tasks[0].sync_map = self.sync_map()
+        executor = ExecuteJob(job)
+        executor.failures = [(job.tasks[1], ValueError(u"failed"), u"")]
+        self.assertEqual(self.write_output_container(executor), [u"t000.json"])
+
+    def test_write_output_container_all_failed(self):
+        job = self.job(2)
+        executor = ExecuteJob(job)
+        executor.failures = [(task, ValueError(u"failed"), u"") for task in job.tasks]
+        with self.assertRaises(ExecuteJobOutputError):
+            executor.write_output_container(gf.tmp_directory())
+
+    def test_execute_parallel_succeeds(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = 2
+        executor = ExecuteJob(self.executable_job(3), rconf=rconf)
+        executor.execute()
+        self.assertEqual(executor.failures, [])
+        for task in executor.job.tasks:
+            self.assertIsNotNone(task.sync_map)
+        self.assertEqual(self.write_output_container(executor), [u"t000.json", u"t001.json", u"t002.json"])
+
+    def test_execute_parallel_successes_and_failures(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = 2
+        job = self.executable_job(3, failing=[1])
+        executor = ExecuteJob(job, rconf=rconf)
+        with self.assertRaises(ExecuteJobExecutionError) as context:
+            executor.execute()
+        self.assertIn(u"1 tasks", u"%s" % context.exception)
+        self.assertIn(u"t001", u"%s" % context.exception)
+        self.assertEqual([task for task, exc, exc_traceback in executor.failures], [job.tasks[1]])
+        self.assertIsNone(job.tasks[1].sync_map)
+        self.assertIsNotNone(job.tasks[0].sync_map)
+        self.assertIsNotNone(job.tasks[2].sync_map)
+        self.assertEqual(self.write_output_container(executor), [u"t000.json", u"t002.json"])
+
+
+class CopyingAudioPredecoder(AudioPredecoder):
+    """ Copy the audio files instead of calling ffmpeg """
+
+    def __init__(self, tasks, rconf=None, logger=None):
+        super(CopyingAudioPredecoder, self).__init__(tasks, rconf=rconf, logger=logger)
+        self.converted = []
+        self.max_used_size = 0
+        self.lock = threading.Lock()
+
+    def _convert(self, input_file_path, output_file_path):
+        with self.lock:
+            self.converted.append(input_file_path)
+            self.max_used_size = max(self.max_used_size, self.used_size)
+        with open(input_file_path, "rb") as input_file:
+            with open(output_file_path, "wb") as output_file:
+                output_file.write(input_file.read())
+
+
+class TestAudioPredecoder(unittest.TestCase):
+
+    AUDIO_FILE_LONG = "res/audioformats/mono.16000.wav"          # 53.266 s, about 1.7 MB once converted
+    AUDIO_FILE_LONG_2 = "res/audioformats/mono.22050.wav"        # 53.266 s, about 1.7 MB once converted
+    AUDIO_FILE_SHORT = "res/audioformats/exact.5600.16000.wav"   # 5.600 s, about 0.2 MB once converted
+
+    def tasks(self, paths, defer=False):
+        config = u"task_language=eng|is_text_type=plain|os_task_file_format=json"
+        rconf = RuntimeConfiguration(u"task_defer_audio_probe=%s" % defer)
+        tasks = []
+        for path in paths:
+            task = Task(config, rconf=rconf)
+            task.audio_file_path_absolute = gf.absolute_path(path, __file__)
+            tasks.append(task)
+        return tasks
+
+    def predecoder(self, tasks, workers, max_size):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.JOB_PREDECODE_WORKERS] = workers
+        rconf[RuntimeConfiguration.JOB_PREDECODE_MAX_SIZE] = max_size
+        predecoder = CopyingAudioPredecoder(tasks, rconf=rconf)
+        predecoder.start()
+        return predecoder
+
+    def test_estimated_size(self):
+        for defer in [False, True]:
+            tasks = self.tasks([self.AUDIO_FILE_SHORT], defer=defer)
+            self.assertEqual(tasks[0].audio_file.audio_length is None, defer)
+            size = AudioPredecoder(tasks)._estimated_size(tasks[0])
+            self.assertEqual(size, 44 + 2 * (5600 * 16 + 1))
+            # the task is not modified
+            self.assertEqual(tasks[0].audio_file.audio_length is None, defer)
+
+    def test_estimated_size_not_existing(self):
+        handler, tmp_path = gf.tmp_file(suffix=".wav")
+        shutil.copyfile(gf.absolute_path(self.AUDIO_FILE_SHORT, __file__), tmp_path)
+        task = Task(u"task_language=eng|is_text_type=plain|os_task_file_format=json", rconf=RuntimeConfiguration(u"task_defer_audio_probe=True"))
+        task.audio_file_path_absolute = tmp_path
+        gf.delete_file(handler, tmp_path)
+        self.assertIsNone(AudioPredecoder([task])._estimated_size(task))
+
+    def test_order_and_budget(self):
+        # the budget allows only one converted file at a time
+        paths = [self.AUDIO_FILE_LONG, self.AUDIO_FILE_LONG_2, self.AUDIO_FILE_LONG, self.AUDIO_FILE_LONG_2]
+        for defer in [False, True]:
+            tasks = self.tasks(paths, defer=defer)
+            predecoder = self.predecoder(tasks, 2, 2)
+            for index, path in enumerate(paths):
+                converted_path = predecoder.get(index)
+                self.assertIsNotNone(converted_path)
+                self.assertTrue(os.path.exists(converted_path))
+                predecoder.release(index)
+                self.assertFalse(os.path.exists(converted_path))
+            predecoder.stop()
+            self.assertEqual(predecoder.converted, [gf.absolute_path(path, __file__) for path in paths])
+            self.assertLessEqual(predecoder.max_used_size, 2 * 1024 * 1024)
+            self.assertEqual(predecoder.used_size, 0)
+
+    def test_larger_than_budget(self):
+        paths = [self.AUDIO_FILE_SHORT, self.AUDIO_FILE_LONG, self.AUDIO_FILE_SHORT]
+        predecoder = self.predecoder(self.tasks(paths, defer=True), 2, 1)
+        self.assertIsNotNone(predecoder.get(0))
+        self.assertIsNone(predecoder.get(1))
+        self.assertIsNotNone(predecoder.get(2))
+        predecoder.stop()
+        self.assertEqual(len(predecoder.converted), 2)
+
+    def test_stop_deletes_converted_files(self):
+        paths = [self.AUDIO_FILE_SHORT] * 3
+        predecoder = self.predecoder(self.tasks(paths), 3, 16)
+        converted_paths = [predecoder.get(index) for index in range(len(paths))]
+        for converted_path in converted_paths:
+            self.assertTrue(os.path.exists(converted_path))
+        predecoder.stop()
+        for converted_path in converted_paths:
+            self.assertFalse(os.path.exists(converted_path))
+        self.assertEqual(predecoder.used_size, 0)
+        self.assertEqual(predecoder.results, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import io
+import os
+import stat
+import sys
+import unittest
+
+from aeneas.audiofile import AudioFile
+from aeneas.festivalserver import FestivalServer
+from aeneas.festivalserver import FestivalServerPool
+from aeneas.language import Language
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFragment
+from aeneas.ttswrappers.festivalttswrapper import FESTIVALTTSWrapper
+import aeneas.globalfunctions as gf
+
+
+class TestFestivalServer(unittest.TestCase):
+
+    # NOTE a stub of festival --server, speaking its protocol,
+    #      which synthesizes 800 samples (0.050 seconds) per character;
+    #      the text "key" adds FILE_STUFF_KEY to the data,
+    #      the text "error" makes it reply with an error,
+    #      and the text "crash PATH" makes it exit, if PATH does not exist
+    STUB_SERVER = u"\n".join([
+        u"#!%s" % sys.executable,
+        u"import os, re, socket, struct, sys, threading",
+        u"KEY = b'ft_StUfF_key'",
+        u"def stuff(data):",
+        u"    out, k = bytearray(), 0",
+        u"    for c in bytearray(data):",
+        u"        k = k + 1 if KEY[k:k + 1] == bytearray([c]) else 0",
+        u"        if k == len(KEY):",
+        u"            out.append(ord('X'))",
+        u"            k = 0",
+        u"        out.append(c)",
+        u"    return bytes(out)",
+        u"def wave(text):",
+        u"    data = struct.pack('<h', 8192) * (len(text) * 800)",
+        u"    if text == u'key':",
+        u"        data = KEY + data",
+        u"    fmt = struct.pack('<IHHIIHH', 16, 1, 1, 16000, 32000, 2, 16)",
+        u"    return b'RIFF' + struct.pack('<I', 36 + len(data)) + b'WAVEfmt ' + fmt + b'data' + struct.pack('<I', len(data)) + data",
+        u"def client(conn):",
+        u"    stream = conn.makefile('rb')",
+        u"    for line in stream:",
+        u"        line = line.decode('utf-8').strip()",
+        u"        match = re.match(r'^\\(utt.send.wave.client \\(utt.synth \\(Utterance Text \"(.*)\"\\)\\)\\)$', line)",
+        u"        if match is None:",
+        u"            conn.sendall(b'LP\\nnil' + KEY + b'OK\\n')",
+        u"            continue",
+        u"        text = re.sub(r'\\\\(.)', r'\\1', match.group(1))",
+        u"        if text == u'error':",
+        u"            conn.sendall(b'ER\\n')",
+        u"        elif text.startswith(u'crash ') and not os.path.exists(text[6:]):",
+        u"            open(text[6:], 'w').close()",
+        u"            os._exit(1)",
+        u"        else:",
+        u"            conn.sendall(b'WV\\n' + stuff(wave(text)) + KEY + b'OK\\n')",
+        u"port = int(re.search(r'server_port (\\d+)', sys.argv[-1]).group(1))",
+        u"server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)",
+        u"server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)",
+        u"server.bind(('127.0.0.1', port))",
+        u"server.listen(5)",
+        u"while True:",
+        u"    conn, address = server.accept()",
+        u"    thread = threading.Thread(target=client, args=(conn,))",
+        u"    thread.daemon = True",
+        u"    thread.start()",
+    ])
+
+    def setUp(self):
+        self.tmp_directory = gf.tmp_directory()
+        self.stub_path = os.path.join(self.tmp_directory, "festival")
+        with io.open(self.stub_path, "w", encoding="utf-8") as stub_file:
+            stub_file.write(self.STUB_SERVER)
+        os.chmod(self.stub_path, os.stat(self.stub_path).st_mode | stat.S_IEXEC)
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        gf.delete_directory(self.tmp_directory)
+
+    def start(self, festival_path=None, port=None):
+        server = FestivalServer(festival_path=festival_path, port=port)
+        self.servers.append(server)
+        server.start()
+        return server
+
+    def samples(self, data):
+        audio_file = AudioFile()
+        audio_file.read_samples_from_wave_data(data)
+        return audio_file.audio_samples_length
+
+    def test_start_not_existing(self):
+        with self.assertRaises(OSError):
+            self.start(festival_path="/this/path/does/not/exist/festival")
+
+    def test_connect_refused(self):
+        port = FestivalServer()._free_port()
+        with self.assertRaises(OSError):
+            self.start(port=port)
+
+    def test_synthesize(self):
+        server = self.start(festival_path=self.stub_path)
+        self.assertTrue(server.alive)
+        data = server.synthesize(u"(language_english)", u"hello")
+        self.assertEqual(self.samples(data), 5 * 800)
+        self.assertEqual(server.requests, 1)
+
+    def test_synthesize_escaped(self):
+        server = self.start(festival_path=self.stub_path)
+        text = u"say \"hello\" to C:\\path, àèìòù"
+        data = server.synthesize(u"(language_english)", text)
+        self.assertEqual(self.samples(data), len(text) * 800)
+
+    def test_synthesize_stuffed_key(self):
+        server = self.start(festival_path=self.stub_path)
+        data = server.synthesize(u"(language_english)", u"key")
+        self.assertEqual(data[44:56], FestivalServer.FILE_STUFF_KEY)
+        self.assertEqual(len(data), 44 + 12 + 3 * 1600)
+        # the connection is still in sync
+        data = server.synthesize(u"(language_english)", u"hello")
+        self.assertEqual(self.samples(data), 5 * 800)
+
+    def test_synthesize_many(self):
+        server = self.start(festival_path=self.stub_path)
+        for i in range(1, 50):
+            data = server.synthesize(u"(language_english)", u"x" * i)
+            self.assertEqual(self.samples(data), i * 800)
+
+    def test_synthesize_error(self):
+        server = self.start(festival_path=self.stub_path)
+        with self.assertRaises(ValueError):
+            server.synthesize(u"(language_english)", u"error")
+        # the connection is still usable
+        data = server.synthesize(u"(language_english)", u"hello")
+        self.assertEqual(self.samples(data), 5 * 800)
+
+    def test_synthesize_port(self):
+        server = self.start(festival_path=self.stub_path)
+        client = self.start(port=server.port)
+        self.assertIsNone(client.process)
+        data = client.synthesize(u"(language_english)", u"hello")
+        self.assertEqual(self.samples(data), 5 * 800)
+
+    def test_stop(self):
+        server = self.start(festival_path=self.stub_path)
+        server.stop()
+        self.assertFalse(server.alive)
+        self.assertIsNone(server.process)
+
+    def test_pool_shared(self):
+        pool = FestivalServerPool.get(self.stub_path, None, 2)
+        self.assertIs(FestivalServerPool.get(self.stub_path, None, 2), pool)
+        self.assertIsNot(FestivalServerPool.get(self.stub_path, None, 3), pool)
+
+    def test_pool_synthesize(self):
+        pool = FestivalServerPool(self.stub_path, None, 2)
+        try:
+            for text in [u"hello", u"world"]:
+                data = pool.synthesize(u"(language_english)", text)
+                self.assertEqual(self.samples(data), len(text) * 800)
+            # the same server served both requests
+            self.assertEqual(len(pool.idle), 1)
+            self.assertEqual(pool.idle[0].requests, 2)
+        finally:
+            pool.close()
+
+    def test_pool_respawn(self):
+        pool = FestivalServerPool(self.stub_path, None, 1)
+        marker = os.path.join(self.tmp_directory, "crashed")
+        try:
+            data = pool.synthesize(u"(language_english)", u"crash " + marker)
+            self.assertEqual(self.samples(data), len(u"crash " + marker) * 800)
+            self.assertEqual(pool.respawns, 1)
+        finally:
+            pool.close()
+
+    def synthesize_wrapper(self, texts, workers=1, port=None):
+        tfl = TextFile()
+        for i, text in enumerate(texts):
+            tfl.add_fragment(TextFragment(u"f%03d" % i, Language.ENG, [text], [text]))
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.FESTIVAL_SERVER_PATH] = self.stub_path
+        rconf[RuntimeConfiguration.FESTIVAL_SERVER_PORT] = port
+        rconf[RuntimeConfiguration.FESTIVAL_SERVER_WORKERS] = workers
+        rconf[RuntimeConfiguration.TTS_WORKERS] = workers
+        tts = FESTIVALTTSWrapper(rconf=rconf)
+        self.assertTrue(tts._uses_server())
+        audio_file = AudioFile()
+        return tts.synthesize_multiple(tfl, None, output_audio_file=audio_file)
+
+    def test_wrapper(self):
+        texts = [u"hello", u"", u"world", u"hello"]
+        for workers in [1, 3]:
+            anchors, total_time, num_chars = self.synthesize_wrapper(texts, workers=workers)
+            self.assertEqual([float(a[0]) for a in anchors], [0.0, 0.25, 0.25, 0.5])
+            self.assertEqual(float(total_time), 0.75)
+            FestivalServerPool.close_all()
+
+    def test_wrapper_port(self):
+        server = self.start(festival_path=self.stub_path)
+        anchors, total_time, num_chars = self.synthesize_wrapper([u"hello", u"world"], port=server.port)
+        self.assertEqual(float(total_time), 0.5)
+        FestivalServerPool.close_all()
+
+    def test_wrapper_disabled(self):
+        tfl = TextFile()
+        tfl.add_fragment(TextFragment(u"f000", Language.ENG, [u"hello"], [u"hello"]))
+        tts = FESTIVALTTSWrapper()
+        self.assertTrue(tts.HAS_PYTHON_CALL)
+        self.assertFalse(tts._uses_server())
+        self.assertEqual(tts._synthesize_multiple_python(tfl, None), (False, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
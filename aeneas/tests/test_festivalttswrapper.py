@@ -23,6 +23,7 @@
 
 import unittest
 
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.tests.base_ttswrapper import TestBaseTTSWrapper
 from aeneas.ttswrappers.festivalttswrapper import FESTIVALTTSWrapper
 
@@ -35,6 +36,14 @@ class TestFESTIVALTTSWrapper(TestBaseTTSWrapper):
     TTS_LANGUAGE = FESTIVALTTSWrapper.ENG
     TTS_LANGUAGE_VARIATION = FESTIVALTTSWrapper.ENG_GBR
 
+    def test_rate_to_subprocess(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_RATE] = 1.5
+        tts_engine = FESTIVALTTSWrapper(rconf=rconf)
+        self.assertEqual(tts_engine._rate_to_subprocess(tts_engine.rate), [u"-eval", u"(Parameter.set 'Duration_Stretch 0.667)"])
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_arguments)
+        self.assertIn(tts_engine.CLI_PARAMETER_RATE_FUNCTION, tts_engine.subprocess_pipe_arguments)
+
 
 if __name__ == "__main__":
     unittest.main()
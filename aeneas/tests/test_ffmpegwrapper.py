@@ -24,6 +24,7 @@
 import os
 import unittest
 
+from aeneas.exacttiming import TimeValue
 from aeneas.ffmpegwrapper import FFMPEGWrapper
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 import aeneas.globalfunctions as gf
@@ -34,27 +35,35 @@ class TestFFMPEGWrapper(unittest.TestCase):
     FILES = [
         {
             "path": "res/audioformats/p001.aac",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.aiff",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.flac",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.mp3",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.mp4",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.ogg",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.wav",
+            "length": TimeValue("9.0"),
         },
         {
             "path": "res/audioformats/p001.webm",
+            "length": TimeValue("9.0"),
         },
     ]
 
@@ -62,6 +71,20 @@ class TestFFMPEGWrapper(unittest.TestCase):
     NOT_EXISTING_PATH = "this_file_does_not_exist.mp3"
     EMPTY_FILE_PATH = "res/audioformats/p001.empty"
 
+    STDERR = (
+        b"ffmpeg version 4.4.2 Copyright (c) 2000-2021 the FFmpeg developers\n"
+        b"Input #0, mp3, from 'p001.mp3':\n"
+        b"  Metadata:\n"
+        b"    encoder         : Lavf56.40.101\n"
+        b"  Duration: 00:00:09.04, start: 0.025057, bitrate: 64 kb/s\n"
+        b"    Stream #0:0: Audio: mp3, 44100 Hz, stereo, fltp, 64 kb/s\n"
+        b"Stream mapping:\n"
+        b"  Stream #0:0 -> #0:0 (mp3 (mp3float) -> pcm_s16le (native))\n"
+        b"Output #0, s16le, to 'pipe:1':\n"
+        b"    Stream #0:0: Audio: pcm_s16le, 16000 Hz, mono, s16, 256 kb/s\n"
+        b"size=     282kB time=00:00:09.01 bitrate= 256.0kbits/s speed= 180x\n"
+    )
+
     def convert(self, input_file_path, ofp=None, runtime_configuration=None):
         if ofp is None:
             output_path = gf.tmp_directory()
@@ -104,6 +127,87 @@ class TestFFMPEGWrapper(unittest.TestCase):
         for f in self.FILES:
             self.convert(f["path"], runtime_configuration=rc)
 
+    def test_decode(self):
+        for f in self.FILES:
+            sample_rate, samples, properties = FFMPEGWrapper().decode(gf.absolute_path(f["path"], __file__))
+            self.assertEqual(sample_rate, 16000)
+            self.assertEqual(samples.dtype, "int16")
+            self.assertGreater(len(samples), 0)
+            self.assertEqual(properties["sample_rate"], u"44100")
+            # NOTE the duration printed by ffmpeg might be estimated from the bitrate
+            self.assertAlmostEqual(float(TimeValue(len(samples)) / sample_rate), float(f["length"]), delta=0.1)
+            self.assertGreater(properties["duration"], TimeValue("0.000"))
+
+    def test_decode_range(self):
+        sample_rate, samples, properties = FFMPEGWrapper().decode(
+            gf.absolute_path(self.FILES[6]["path"], __file__),
+            head_length=TimeValue("1.000"),
+            process_length=TimeValue("2.000")
+        )
+        self.assertEqual(len(samples), 2 * sample_rate)
+        # the properties describe the entire input file
+        self.assertAlmostEqual(float(properties["duration"]), float(self.FILES[6]["length"]), delta=0.1)
+
+    def test_decode_not_existing(self):
+        with self.assertRaises(OSError):
+            FFMPEGWrapper().decode(self.NOT_EXISTING_PATH)
+
+    def test_decode_empty(self):
+        with self.assertRaises(OSError):
+            FFMPEGWrapper().decode(gf.absolute_path(self.EMPTY_FILE_PATH, __file__))
+
+    def test_parse_stderr(self):
+        properties = FFMPEGWrapper()._parse_stderr(self.STDERR)
+        self.assertEqual(properties["codec_name"], u"mp3")
+        self.assertEqual(properties["sample_rate"], u"44100")
+        self.assertEqual(properties["channels"], u"2")
+        self.assertEqual(properties["duration"], TimeValue("9.04"))
+
+    def test_parse_stderr_unicode(self):
+        properties = FFMPEGWrapper()._parse_stderr(gf.safe_unicode(self.STDERR))
+        self.assertEqual(properties["codec_name"], u"mp3")
+
+    def test_parse_stderr_invalid_utf8(self):
+        properties = FFMPEGWrapper()._parse_stderr(b"    title           : \xff\xfe\n" + self.STDERR)
+        self.assertEqual(properties["codec_name"], u"mp3")
+
+    def test_parse_stderr_mp4(self):
+        stderr = (
+            b"Input #0, mov,mp4,m4a,3gp,3g2,mj2, from 'audio.mp4':\n"
+            b"  Duration: 00:00:09.02, start: 0.000000, bitrate: 131 kb/s\n"
+            b"    Stream #0:0(und): Audio: aac (LC) (mp4a / 0x6134706D), 22050 Hz, mono, fltp, 128 kb/s (default)\n"
+            b"Output #0, s16le, to 'pipe:1':\n"
+            b"    Stream #0:0(und): Audio: pcm_s16le, 16000 Hz, mono, s16, 256 kb/s (default)\n"
+        )
+        properties = FFMPEGWrapper()._parse_stderr(stderr)
+        self.assertEqual(properties["codec_name"], u"aac")
+        self.assertEqual(properties["sample_rate"], u"22050")
+        self.assertEqual(properties["channels"], u"1")
+        self.assertEqual(properties["duration"], TimeValue("9.02"))
+
+    def test_parse_stderr_no_duration(self):
+        stderr = (
+            b"Input #0, ogg, from 'audio.ogg':\n"
+            b"  Duration: N/A, start: 0.000000, bitrate: N/A\n"
+            b"    Stream #0:0: Audio: vorbis, 48000 Hz, 5.1(side), fltp\n"
+        )
+        properties = FFMPEGWrapper()._parse_stderr(stderr)
+        self.assertEqual(properties["codec_name"], u"vorbis")
+        self.assertEqual(properties["channels"], u"6")
+        self.assertIsNone(properties["duration"])
+
+    def test_parse_stderr_channels(self):
+        stderr = b"    Stream #0:0: Audio: pcm_s16le, 8000 Hz, 3 channels, s16, 384 kb/s\n"
+        properties = FFMPEGWrapper()._parse_stderr(stderr)
+        self.assertEqual(properties["channels"], u"3")
+        properties = FFMPEGWrapper()._parse_stderr(stderr.replace(b"3 channels", b"foo"))
+        self.assertIsNone(properties["channels"])
+
+    def test_parse_stderr_empty(self):
+        properties = FFMPEGWrapper()._parse_stderr(b"")
+        for value in properties.values():
+            self.assertIsNone(value)
+
 
 if __name__ == "__main__":
     unittest.main()
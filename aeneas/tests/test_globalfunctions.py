@@ -494,10 +494,24 @@ class TestGlobalFunctions(unittest.TestCase):
         gf.can_run_c_extension("foo")
         gf.can_run_c_extension("bar")
 
+    def test_cew_engine(self):
+        self.assertIn(gf.cew_engine(), [None, u"espeak", u"espeak-ng"])
+
     def test_run_c_extension_with_fallback(self):
         # TODO
         pass
 
+    def test_start_thread(self):
+        join = gf.start_thread(lambda x, y: x + y, 1, 2)
+        self.assertEqual(join(), 3)
+
+    def test_start_thread_error(self):
+        def function():
+            raise ValueError("foo")
+        join = gf.start_thread(function)
+        with self.assertRaises(ValueError):
+            join()
+
     def test_file_can_be_read_true(self):
         handler, path = gf.tmp_file()
         self.assertTrue(gf.file_can_be_read(path))
@@ -767,6 +781,15 @@ class TestGlobalFunctions(unittest.TestCase):
         # TODO
         pass
 
+    def test_parameters_digest(self):
+        digest = gf.parameters_digest([u"espeak", u"eng", 1.0, None])
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(gf.parameters_digest([b"espeak", u"eng", 1.0, None]), digest)
+        self.assertNotEqual(gf.parameters_digest([u"espeak", u"eng", 1.5, None]), digest)
+
+    def test_parameters_digest_separator(self):
+        self.assertNotEqual(gf.parameters_digest([u"ab", u"c"]), gf.parameters_digest([u"a", u"bc"]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy
+import unittest
+
+from aeneas.executetask import ExecuteTask
+from aeneas.exacttiming import TimeValue
+from aeneas.language import Language
+from aeneas.mfcccache import MFCCCache
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.synthesizer import Synthesizer
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFragment
+from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
+
+
+class SilenceStubTTSWrapper(BaseTTSWrapper):
+    """
+    A TTS engine returning 0.120 seconds of silence,
+    followed by 0.040 seconds of a sine wave per character,
+    and by 0.040 seconds of silence,
+    at 16000 Hz, via a Python call,
+    and recording the texts it synthesizes.
+    """
+
+    LANGUAGE_TO_VOICE_CODE = {Language.ENG: u"eng", Language.ITA: u"ita"}
+
+    DEFAULT_LANGUAGE = Language.ENG
+
+    OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 16000)
+
+    HAS_PYTHON_CALL = True
+
+    TAG = u"SilenceStubTTSWrapper"
+
+    def __init__(self, rconf=None, logger=None):
+        super(SilenceStubTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.texts = []
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        self.texts.append(text)
+        if len(text) == 0:
+            return (True, (TimeValue("0.000"), None, None, None))
+        num_samples = len(text) * 640
+        samples = numpy.concatenate([
+            numpy.zeros(1920),
+            0.5 * numpy.sin(numpy.arange(num_samples) * 2 * numpy.pi * (220 + 20 * len(text)) / 16000),
+            numpy.zeros(640)
+        ])
+        duration = TimeValue(len(samples)) / TimeValue(16000)
+        return (True, (duration, 16000, "pcm16", samples))
+
+
+class UnevenStubTTSWrapper(SilenceStubTTSWrapper):
+    """
+    A TTS engine returning ``LEADING_SAMPLES`` samples of silence,
+    followed by ``SAMPLES_PER_CHARACTER`` samples of a sine wave per character,
+    at 16000 Hz, via a Python call,
+    hence fragments whose length is not a multiple of the window shift.
+    """
+
+    LEADING_SAMPLES = 1920
+
+    SAMPLES_PER_CHARACTER = 333
+
+    TAG = u"UnevenStubTTSWrapper"
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        self.texts.append(text)
+        if len(text) == 0:
+            return (True, (TimeValue("0.000"), None, None, None))
+        num_samples = len(text) * self.SAMPLES_PER_CHARACTER
+        samples = numpy.concatenate([
+            numpy.zeros(self.LEADING_SAMPLES),
+            0.5 * numpy.sin(numpy.arange(num_samples) * 2 * numpy.pi * (220 + 20 * len(text)) / 16000)
+        ])
+        duration = TimeValue(len(samples)) / TimeValue(16000)
+        return (True, (duration, 16000, "pcm16", samples))
+
+
+class ShortStubTTSWrapper(UnevenStubTTSWrapper):
+    """
+    A TTS engine returning 100 samples of a sine wave per character,
+    at 16000 Hz, via a Python call,
+    hence fragments shorter than the window shift.
+    """
+
+    LEADING_SAMPLES = 0
+
+    SAMPLES_PER_CHARACTER = 100
+
+    TAG = u"ShortStubTTSWrapper"
+
+
+class TestMFCCCache(unittest.TestCase):
+
+    MAX_SIZE = 1024 * 1024
+
+    def setUp(self):
+        MFCCCache.shared(self.MAX_SIZE).clear()
+
+    def tearDown(self):
+        MFCCCache.shared(self.MAX_SIZE).clear()
+
+    def matrix(self, frames, value=0.0):
+        return numpy.zeros((13, frames)) + value
+
+    def execute_task(self, rconf=None, tts_class=SilenceStubTTSWrapper):
+        if rconf is None:
+            rconf = RuntimeConfiguration()
+            rconf[RuntimeConfiguration.MFCC_CACHE_MAX_SIZE] = 1
+        executor = ExecuteTask(rconf=rconf)
+        executor.synthesizer = Synthesizer(rconf=rconf)
+        executor.synthesizer.tts_engine = tts_class(rconf=rconf)
+        return executor
+
+    def text_file(self, texts):
+        tfl = TextFile()
+        for i, text in enumerate(texts):
+            tfl.add_fragment(TextFragment(u"f%03d" % i, Language.ENG, [text], [text]))
+        return tfl
+
+    def test_max_size_not_positive(self):
+        with self.assertRaises(ValueError):
+            MFCCCache(0)
+
+    def test_key(self):
+        key = MFCCCache.key([u"eng", u"hello", TimeValue("0.040")])
+        self.assertEqual(key, MFCCCache.key([u"eng", u"hello", TimeValue("0.040")]))
+        self.assertNotEqual(key, MFCCCache.key([u"eng", u"hello", TimeValue("0.020")]))
+        self.assertNotEqual(MFCCCache.key([u"ab", u"c"]), MFCCCache.key([u"a", u"bc"]))
+
+    def test_get_missing(self):
+        cache = MFCCCache(self.MAX_SIZE)
+        self.assertIsNone(cache.get(u"foo"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_put_get(self):
+        cache = MFCCCache(self.MAX_SIZE)
+        matrix = self.matrix(10)
+        self.assertTrue(cache.put(u"foo", matrix))
+        self.assertIs(cache.get(u"foo"), matrix)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.size, matrix.nbytes)
+        self.assertFalse(matrix.flags.writeable)
+
+    def test_put_existing(self):
+        cache = MFCCCache(self.MAX_SIZE)
+        cache.put(u"foo", self.matrix(10))
+        cache.put(u"foo", self.matrix(20))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, self.matrix(20).nbytes)
+
+    def test_put_too_large(self):
+        cache = MFCCCache(100)
+        self.assertFalse(cache.put(u"foo", self.matrix(10)))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru(self):
+        size = self.matrix(10).nbytes
+        cache = MFCCCache(3 * size)
+        for key in [u"a", u"b", u"c"]:
+            cache.put(key, self.matrix(10))
+        # reading the oldest entry makes it the most recently used one
+        cache.get(u"a")
+        cache.put(u"d", self.matrix(10))
+        self.assertIsNotNone(cache.get(u"a"))
+        self.assertIsNone(cache.get(u"b"))
+        self.assertIsNotNone(cache.get(u"c"))
+        self.assertIsNotNone(cache.get(u"d"))
+        self.assertEqual(cache.size, 3 * size)
+
+    def test_clear(self):
+        cache = MFCCCache(self.MAX_SIZE)
+        cache.put(u"foo", self.matrix(10))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+
+    def test_shared(self):
+        self.assertIs(MFCCCache.shared(self.MAX_SIZE), MFCCCache.shared(self.MAX_SIZE))
+        self.assertIsNot(MFCCCache.shared(self.MAX_SIZE), MFCCCache.shared(2 * self.MAX_SIZE))
+
+    def test_synthesize_mfcc_matches_synthetic_wave(self):
+        # NOTE each fragment begins with enough silence
+        #      to cover the window overlapping the previous fragment,
+        #      and its length is a multiple of the window shift,
+        #      hence the concatenation equals the MFCCs of the entire wave
+        tfl = self.text_file([u"hello", u"a", u"world", u"xx"])
+        executor = self.execute_task()
+        synt_wave_mfcc, anchors = executor._synthesize_mfcc(tfl)
+        synt_audio_file, expected_anchors = executor._synthesize(tfl)
+        expected = executor._extract_mfcc(audio_file=synt_audio_file)
+        self.assertEqual(synt_wave_mfcc.all_mfcc.shape, expected.all_mfcc.shape)
+        self.assertTrue(numpy.allclose(synt_wave_mfcc.all_mfcc, expected.all_mfcc))
+        self.assertEqual(anchors, expected_anchors)
+
+    def test_synthesize_mfcc_cached(self):
+        tfl = self.text_file([u"hello", u"world"])
+        synt_wave_mfcc, anchors = self.execute_task()._synthesize_mfcc(tfl)
+        executor = self.execute_task()
+        synt_wave_mfcc2, anchors2 = executor._synthesize_mfcc(tfl)
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [])
+        self.assertTrue(numpy.array_equal(synt_wave_mfcc2.all_mfcc, synt_wave_mfcc.all_mfcc))
+        self.assertEqual(anchors2, anchors)
+
+    def test_synthesize_mfcc_new_fragment(self):
+        self.execute_task()._synthesize_mfcc(self.text_file([u"hello", u"world"]))
+        executor = self.execute_task()
+        executor._synthesize_mfcc(self.text_file([u"hello", u"there", u"world"]))
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [u"there"])
+
+    def test_synthesize_mfcc_repeated_fragments(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.MFCC_CACHE_MAX_SIZE] = 1
+        rconf[RuntimeConfiguration.TTS_DEDUP_MAX_SIZE] = 0
+        executor = self.execute_task(rconf)
+        synt_wave_mfcc, anchors = executor._synthesize_mfcc(self.text_file([u"the", u"cat", u"the", u"the"]))
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [u"the", u"cat"])
+        # 3 + 3 + 1 frames each
+        self.assertEqual([a[0] for a in anchors], [TimeValue(i * 7) * rconf.mws for i in range(4)])
+        self.assertEqual(synt_wave_mfcc.all_length, 28)
+
+    def test_synthesize_mfcc_mfcc_parameters(self):
+        tfl = self.text_file([u"hello"])
+        self.execute_task()._synthesize_mfcc(tfl)
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.MFCC_CACHE_MAX_SIZE] = 1
+        rconf.set_granularity(3)
+        executor = self.execute_task(rconf)
+        executor._synthesize_mfcc(tfl)
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [u"hello"])
+
+    def test_synthesize_mfcc_voice_code(self):
+        self.execute_task()._synthesize_mfcc(self.text_file([u"hello"]))
+        tfl = TextFile()
+        tfl.add_fragment(TextFragment(u"f000", Language.ITA, [u"hello"], [u"hello"]))
+        executor = self.execute_task()
+        executor._synthesize_mfcc(tfl)
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [u"hello"])
+
+    def test_synthesize_mfcc_anchors(self):
+        executor = self.execute_task()
+        synt_wave_mfcc, anchors = executor._synthesize_mfcc(self.text_file([u"hello", u"", u"a"]))
+        # 3 + 5 + 1 frames, 0 frames, 3 + 1 + 1 frames
+        mws = executor.rconf.mws
+        self.assertEqual([a[0] for a in anchors], [TimeValue("0.000"), 9 * mws, 9 * mws])
+        self.assertEqual([a[1] for a in anchors], [u"f000", u"f001", u"f002"])
+        self.assertEqual(synt_wave_mfcc.all_length, 14)
+
+    def test_synthesize_mfcc_uneven_fragments(self):
+        # NOTE 3585, 2253, 3585 and 2586 samples,
+        #      each padded with silence to the next frame
+        tfl = self.text_file([u"hello", u"a", u"world", u"xx"])
+        executor = self.execute_task(tts_class=UnevenStubTTSWrapper)
+        synt_wave_mfcc, anchors = executor._synthesize_mfcc(tfl)
+        mws = executor.rconf.mws
+        self.assertEqual([a[0] for a in anchors], [TimeValue("0.000"), 6 * mws, 10 * mws, 16 * mws])
+        self.assertEqual(synt_wave_mfcc.all_length, 21)
+        # each anchor follows the begin of its synthesized fragment
+        # by less than a window shift per preceding fragment
+        synt_audio_file, expected_anchors = executor._synthesize(tfl)
+        for i, (anchor, expected_anchor) in enumerate(zip(anchors, expected_anchors)):
+            self.assertGreaterEqual(anchor[0], expected_anchor[0])
+            self.assertLessEqual(anchor[0] - expected_anchor[0], i * mws)
+        # the concatenation equals the MFCCs of the padded fragments
+        padded = []
+        for begin, end in executor._anchors_to_intervals(synt_audio_file, expected_anchors, synt_audio_file.audio_length):
+            samples = synt_audio_file.audio_samples_block(begin, end)
+            padded.append(samples)
+            padded.append(numpy.zeros((-len(samples)) % 640, dtype=samples.dtype))
+        synt_audio_file.clear_data()
+        synt_audio_file.add_samples(numpy.concatenate(padded))
+        expected = executor._extract_mfcc(audio_file=synt_audio_file)
+        self.assertEqual(synt_wave_mfcc.all_mfcc.shape, expected.all_mfcc.shape)
+        self.assertTrue(numpy.allclose(synt_wave_mfcc.all_mfcc, expected.all_mfcc))
+
+    def test_synthesize_mfcc_short_fragments(self):
+        # NOTE 100 and 500 samples, less than a window shift
+        executor = self.execute_task(tts_class=ShortStubTTSWrapper)
+        synt_wave_mfcc, anchors = executor._synthesize_mfcc(self.text_file([u"a", u"hello"]))
+        self.assertEqual([a[0] for a in anchors], [TimeValue("0.000"), executor.rconf.mws])
+        self.assertEqual(synt_wave_mfcc.all_length, 2)
+
+    def test_synthesize_mfcc_no_frames(self):
+        # NOTE without frames, the text is synthesized as usual,
+        #      failing as the text file contains only empty fragments
+        with self.assertRaises(ValueError):
+            self.execute_task()._synthesize_mfcc(self.text_file([u""]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import threading
+import time
+import unittest
+
+from aeneas.exacttiming import TimeValue
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.ttswrappers.nuancettswrapper import NuanceTTSWrapper
+
+
+class TestNuanceTTSWrapper(unittest.TestCase):
+
+    def wrapper(self, rate=0, burst=1, attempts=3):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_API_RATE] = rate
+        rconf[RuntimeConfiguration.TTS_API_BURST] = burst
+        rconf[RuntimeConfiguration.TTS_API_BACKOFF] = TimeValue("0.010")
+        rconf[RuntimeConfiguration.TTS_API_RETRY_ATTEMPTS] = attempts
+        return NuanceTTSWrapper(rconf=rconf)
+
+    def responses(self, responses):
+        calls = []
+
+        def request():
+            response = responses[len(calls)]
+            calls.append(time.time())
+            if isinstance(response, Exception):
+                raise response
+            return response
+        return (request, calls)
+
+    def test_api_request_ok(self):
+        request, calls = self.responses([(200, b"abcd", None)])
+        self.assertEqual(self.wrapper()._api_request(request), b"abcd")
+        self.assertEqual(len(calls), 1)
+
+    def test_api_request_retry_too_many_requests(self):
+        request, calls = self.responses([(429, None, None), (200, b"abcd", None)])
+        self.assertEqual(self.wrapper()._api_request(request), b"abcd")
+        self.assertEqual(len(calls), 2)
+
+    def test_api_request_retry_server_error(self):
+        request, calls = self.responses([(503, None, None), (500, None, None), (200, b"abcd", None)])
+        self.assertEqual(self.wrapper()._api_request(request), b"abcd")
+        self.assertEqual(len(calls), 3)
+
+    def test_api_request_retry_exception(self):
+        request, calls = self.responses([IOError("offline"), (200, b"abcd", None)])
+        self.assertEqual(self.wrapper()._api_request(request), b"abcd")
+        self.assertEqual(len(calls), 2)
+
+    def test_api_request_client_error(self):
+        request, calls = self.responses([(401, None, None), (200, b"abcd", None)])
+        with self.assertRaises(ValueError):
+            self.wrapper()._api_request(request)
+        self.assertEqual(len(calls), 1)
+
+    def test_api_request_all_failed(self):
+        request, calls = self.responses([(503, None, None)] * 3)
+        with self.assertRaises(ValueError):
+            self.wrapper(attempts=3)._api_request(request)
+        self.assertEqual(len(calls), 3)
+
+    def test_api_request_backoff(self):
+        request, calls = self.responses([(503, None, None)] * 3 + [(200, b"abcd", None)])
+        self.wrapper(attempts=4)._api_request(request)
+        # 0.010 + 0.020 + 0.040 seconds
+        self.assertGreaterEqual(calls[-1] - calls[0], 0.069)
+
+    def test_api_request_retry_after(self):
+        request, calls = self.responses([(429, None, 0.200), (200, b"abcd", None)])
+        self.wrapper()._api_request(request)
+        self.assertGreaterEqual(calls[1] - calls[0], 0.199)
+
+    def test_api_token_bucket_unlimited(self):
+        self.assertIsNone(self.wrapper(rate=0)._api_token_bucket())
+
+    def test_api_token_bucket_from_sleep(self):
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_API_SLEEP] = TimeValue("0.500")
+        self.assertEqual(NuanceTTSWrapper(rconf=rconf)._api_token_bucket().rate, 2.0)
+
+    def test_api_token_bucket_shared(self):
+        self.assertIs(self.wrapper(rate=1000)._api_token_bucket(), self.wrapper(rate=1000)._api_token_bucket())
+
+    def test_api_request_rate_threads(self):
+        tts = self.wrapper(rate=20, burst=2)
+        request, calls = self.responses([(200, b"abcd", None)] * 6)
+        threads = [threading.Thread(target=tts._api_request, args=(request,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 6)
+        # two requests in a burst, then one every 0.050 seconds
+        calls = sorted(calls)
+        self.assertGreaterEqual(calls[-1] - calls[0], 0.19)
+
+    def test_rate_to_ssml(self):
+        self.assertEqual(
+            self.wrapper()._rate_to_ssml(u"a < b & c", 1.5),
+            u"<speak><prosody rate=\"150%\">a &lt; b &amp; c</prosody></speak>"
+        )
+
+    def test_synthesize_http_stub(self):
+        try:
+            import requests
+            try:
+                from http.server import BaseHTTPRequestHandler
+                from http.server import HTTPServer
+            except ImportError:
+                from BaseHTTPServer import BaseHTTPRequestHandler
+                from BaseHTTPServer import HTTPServer
+            statuses = [429, 200]
+            paths = []
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_POST(self):
+                    length = int(self.headers.get("Content-Length"))
+                    self.rfile.read(length)
+                    paths.append(self.path)
+                    status = statuses.pop(0) if len(statuses) > 0 else 200
+                    body = (b"\x00\x10" * 1600) if status == 200 else b""
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "%d" % len(body))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            server = HTTPServer(("127.0.0.1", 0), Handler)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.daemon = True
+            thread.start()
+            try:
+                tts = self.wrapper()
+                tts.rconf[RuntimeConfiguration.NUANCE_TTS_API_URL] = "http://127.0.0.1:%d" % server.server_address[1]
+                result = tts._synthesize_single_python_helper(u"hello", u"Tom", return_audio_data=True)
+                tts._synthesize_single_python_helper(u"world", u"Tom", return_audio_data=True)
+            finally:
+                server.shutdown()
+                server.server_close()
+            self.assertTrue(result[0])
+            self.assertAlmostEqual(float(result[1][0]), 0.100)
+            self.assertEqual(len(result[1][3]), 1600)
+            self.assertEqual(len(paths), 3)
+            self.assertTrue(paths[0].startswith("/" + NuanceTTSWrapper.END_POINT))
+            self.assertIs(tts.sessions.session, tts._get_session())
+        except ImportError:
+            pass
+
+    def test_get_session_per_thread(self):
+        try:
+            import requests
+            tts = self.wrapper()
+            sessions = []
+            thread = threading.Thread(target=lambda: sessions.append(tts._get_session()))
+            thread.start()
+            thread.join()
+            self.assertIs(tts._get_session(), tts._get_session())
+            self.assertIsNot(tts._get_session(), sessions[0])
+        except ImportError:
+            pass
+
+    def test_disk_cache_parameters_url(self):
+        tts = self.wrapper()
+        parameters = tts._disk_cache_parameters(u"hello", u"Tom")
+        tts.rconf[RuntimeConfiguration.NUANCE_TTS_API_URL] = "http://127.0.0.1:8080"
+        parameters2 = tts._disk_cache_parameters(u"hello", u"Tom")
+        self.assertEqual(parameters2[0:len(parameters)], parameters)
+        self.assertNotEqual(parameters2, parameters)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import numpy
+import os
+import sys
+import unittest
+
+from aeneas.executetask import ExecuteTask
+from aeneas.exacttiming import TimeValue
+from aeneas.language import Language
+from aeneas.phonemetable import PhonemeTable
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.synthesizer import Synthesizer
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFragment
+from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
+import aeneas.globalfunctions as gf
+
+
+PHONEMES_SCRIPT = u"""
+import sys
+text = sys.stdin.read()
+if text == u"fail":
+    sys.exit(1)
+words = [u"_".join([u"'" + c for c in w]) for w in text.split()]
+sys.stdout.write(u" _: ".join(words) + u"\\n")
+"""
+
+
+class PhonemeStubTTSWrapper(BaseTTSWrapper):
+    """
+    A TTS engine returning 0.120 seconds of silence,
+    followed by 0.040 seconds of a sine wave per character,
+    each with a frequency depending on the character,
+    and by 0.040 seconds of silence,
+    at 16000 Hz, via a Python call,
+    and outputting the characters of each word,
+    with stress marks, as its phonemes.
+    """
+
+    LANGUAGE_TO_VOICE_CODE = {Language.ENG: u"eng", Language.ITA: u"ita"}
+
+    DEFAULT_LANGUAGE = Language.ENG
+
+    OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 16000)
+
+    HAS_PYTHON_CALL = True
+
+    TAG = u"PhonemeStubTTSWrapper"
+
+    def __init__(self, rconf=None, logger=None):
+        super(PhonemeStubTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.texts = []
+        self.set_subprocess_phoneme_arguments([
+            sys.executable,
+            u"-c",
+            PHONEMES_SCRIPT,
+            self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        self.texts.append(text)
+        if len(text) == 0:
+            return (True, (TimeValue("0.000"), None, None, None))
+        blocks = [numpy.zeros(1920)]
+        for c in text.replace(u" ", u""):
+            blocks.append(0.5 * numpy.sin(numpy.arange(640) * 2 * numpy.pi * (4 * ord(c)) / 16000))
+        blocks.append(numpy.zeros(640))
+        samples = numpy.concatenate(blocks)
+        duration = TimeValue(len(samples)) / TimeValue(16000)
+        return (True, (duration, 16000, "pcm16", samples))
+
+
+class TestPhonemeTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tables_path = gf.tmp_directory()
+
+    def tearDown(self):
+        gf.delete_directory(self.tables_path)
+
+    def synthesizer(self, rconf):
+        synthesizer = Synthesizer(rconf=rconf)
+        synthesizer.tts_engine = PhonemeStubTTSWrapper(rconf=rconf)
+        return synthesizer
+
+    def fragment(self, text, language=Language.ENG):
+        return TextFragment(u"f000", language, [text], [text])
+
+    def build(self, texts, rconf=None):
+        if rconf is None:
+            rconf = RuntimeConfiguration()
+        synthesizer = self.synthesizer(rconf)
+        table = PhonemeTable(rconf=rconf)
+        for text in texts:
+            tfl = TextFile()
+            tfl.add_fragment(self.fragment(text))
+            audio_file = synthesizer.synthesize_audio_file(tfl)[0]
+            mfcc = ExecuteTask(rconf=rconf)._extract_mfcc(audio_file=audio_file).all_mfcc
+            table.add(mfcc, synthesizer.fragment_phonemes(tfl.fragments[0]))
+        return table
+
+    def execute_task(self, rconf=None):
+        if rconf is None:
+            rconf = RuntimeConfiguration()
+            rconf[RuntimeConfiguration.TTS_PHONEME_TABLES_DIR] = self.tables_path
+        executor = ExecuteTask(rconf=rconf)
+        executor.synthesizer = self.synthesizer(rconf)
+        return executor
+
+    def test_phonemes(self):
+        tts = PhonemeStubTTSWrapper()
+        self.assertTrue(tts.has_phoneme_output)
+        self.assertEqual(tts.phonemes(u"ab c", u"eng"), [u"a", u"b", u"c"])
+        self.assertEqual(tts.phonemes(u"", u"eng"), [])
+
+    def test_phonemes_failure(self):
+        self.assertIsNone(PhonemeStubTTSWrapper().phonemes(u"fail", u"eng"))
+
+    def test_phonemes_not_supported(self):
+        tts = PhonemeStubTTSWrapper()
+        tts.set_subprocess_phoneme_arguments(None)
+        self.assertFalse(tts.has_phoneme_output)
+        self.assertIsNone(tts.phonemes(u"ab", u"eng"))
+
+    def test_phonemes_cached(self):
+        tts = PhonemeStubTTSWrapper()
+        tts.phonemes(u"ab", u"eng")
+        tts.set_subprocess_phoneme_arguments([u"/nonexistent/path"])
+        self.assertEqual(tts.phonemes(u"ab", u"eng"), [u"a", u"b"])
+        self.assertIsNone(tts.phonemes(u"ab", u"ita"))
+
+    def test_file_name(self):
+        rconf = RuntimeConfiguration()
+        name = PhonemeTable.file_name([u"ESPEAKTTSWrapper", u"en"], rconf)
+        self.assertTrue(name.endswith(PhonemeTable.FILE_EXTENSION))
+        self.assertNotEqual(name, PhonemeTable.file_name([u"ESPEAKTTSWrapper", u"it"], rconf))
+        rconf.set_granularity(3)
+        self.assertNotEqual(name, PhonemeTable.file_name([u"ESPEAKTTSWrapper", u"en"], rconf))
+        # NOTE the window shift does not matter
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.MFCC_WINDOW_SHIFT] = TimeValue("0.020")
+        self.assertEqual(name, PhonemeTable.file_name([u"ESPEAKTTSWrapper", u"en"], rconf))
+
+    def contains(self, mfcc, vector):
+        return any([numpy.allclose(mfcc[:, i], vector) for i in range(mfcc.shape[1])])
+
+    def test_add(self):
+        table = self.build([u"abc", u"ab"])
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.fragments, 2)
+        self.assertEqual(table.counts, {u"a": 2, u"b": 2, u"c": 1})
+        # 3 + 3 + 1 and 3 + 2 + 1 frames, with the silence at the begin
+        # classified by the VAD, which depends on the MFCC backend
+        self.assertGreater(table.lead, 0)
+        self.assertEqual(table.silence_frames + sum(table.frames.values()), 7 + 6)
+        self.assertAlmostEqual(table.lead + table.trail + sum(table.durations.values()), (7 + 6) * 0.040)
+
+    def test_add_no_phonemes(self):
+        table = PhonemeTable()
+        table.add(numpy.ones((13, 10)), [])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.silence_frames, 10)
+
+    def test_mfcc(self):
+        table = self.build([u"abc", u"cab"])
+        mfcc = table.mfcc([u"b", u"a"])
+        duration = (table.lead + table.trail) / table.fragments + table.durations[u"a"] / 2 + table.durations[u"b"] / 2
+        self.assertEqual(mfcc.shape, (13, int(round(duration / 0.040))))
+        self.assertTrue(numpy.allclose(mfcc[:, 0], table.silence_sum / table.silence_frames))
+        self.assertTrue(self.contains(mfcc, table.sums[u"a"] / table.frames[u"a"]))
+        self.assertTrue(self.contains(mfcc, table.sums[u"b"] / table.frames[u"b"]))
+        self.assertFalse(self.contains(mfcc, table.sums[u"c"] / table.frames[u"c"]))
+
+    def test_mfcc_window_shift(self):
+        table = self.build([u"abc"])
+        frames = table.mfcc([u"a", u"b"]).shape[1]
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.MFCC_WINDOW_SHIFT] = TimeValue("0.020")
+        table.rconf = rconf
+        self.assertEqual(table.mfcc([u"a", u"b"]).shape[1], 2 * frames)
+
+    def test_mfcc_unknown_phoneme(self):
+        table = self.build([u"abc"])
+        mfcc = table.mfcc([u"z"])
+        self.assertTrue(self.contains(mfcc, sum(table.sums.values()) / sum(table.frames.values())))
+
+    def test_mfcc_empty_table(self):
+        with self.assertRaises(ValueError):
+            PhonemeTable().mfcc([u"a"])
+
+    def test_save_load(self):
+        table = self.build([u"abc", u"ab"])
+        file_path = os.path.join(self.tables_path, u"table.npz")
+        table.save(file_path)
+        loaded = PhonemeTable.load(file_path)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.counts, table.counts)
+        self.assertEqual(loaded.frames, table.frames)
+        self.assertAlmostEqual(loaded.lead, table.lead)
+        self.assertTrue(numpy.allclose(loaded.mfcc([u"a", u"c"]), table.mfcc([u"a", u"c"])))
+
+    def test_load_missing(self):
+        self.assertIsNone(PhonemeTable.load(os.path.join(self.tables_path, u"missing.npz")))
+
+    def test_load_bad(self):
+        file_path = os.path.join(self.tables_path, u"bad.npz")
+        with open(file_path, "wb") as table_file:
+            table_file.write(b"bad")
+        with self.assertRaises(ValueError):
+            PhonemeTable.load(file_path)
+
+    def test_phoneme_mfcc(self):
+        rconf = RuntimeConfiguration()
+        table = self.build([u"abc", u"cab"], rconf)
+        voice_parameters = self.synthesizer(rconf).voice_parameters(self.fragment(u"abc"))
+        table.save(os.path.join(self.tables_path, PhonemeTable.file_name(voice_parameters, rconf)))
+        tfl = TextFile()
+        tfl.add_fragment(TextFragment(u"f000", Language.ENG, [u"ab"], [u"ab"]))
+        tfl.add_fragment(TextFragment(u"f001", Language.ENG, [u"c"], [u"c"]))
+        executor = self.execute_task()
+        synt_wave_mfcc, anchors = executor._phoneme_mfcc(tfl)
+        self.assertEqual(executor.synthesizer.tts_engine.texts, [])
+        frames = table.mfcc([u"a", u"b"]).shape[1]
+        self.assertEqual(synt_wave_mfcc.all_length, frames + table.mfcc([u"c"]).shape[1])
+        self.assertEqual([a[0] for a in anchors], [TimeValue("0.000"), frames * rconf.mws])
+        self.assertEqual([a[1] for a in anchors], [u"f000", u"f001"])
+
+    def test_phoneme_mfcc_missing_table(self):
+        tfl = TextFile()
+        tfl.add_fragment(self.fragment(u"ab"))
+        self.assertIsNone(self.execute_task()._phoneme_mfcc(tfl))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from aeneas.processpool import ProcessPool
+
+
+class FakeProcess(object):
+
+    def __init__(self):
+        self.alive = False
+        self.started = False
+        self.requests = 0
+        self.crash = 0
+
+    def start(self):
+        self.alive = True
+        self.started = True
+        self.requests = 0
+
+    def stop(self):
+        self.alive = False
+        self.started = False
+
+
+class FakePool(ProcessPool):
+
+    def __init__(self, size, max_requests=0, crash=0):
+        super(FakePool, self).__init__(size=size, max_requests=max_requests)
+        self.crash = crash
+
+    def _new_process(self):
+        return FakeProcess()
+
+    def _serve(self, process, request):
+        if self.crash > 0:
+            self.crash -= 1
+            process.alive = False
+            raise OSError("crashed")
+        process.requests += 1
+        return request * 2
+
+
+class OtherPool(FakePool):
+    pass
+
+
+class TestProcessPool(unittest.TestCase):
+
+    def test_not_implemented(self):
+        pool = ProcessPool(1)
+        with self.assertRaises(NotImplementedError):
+            pool._call(u"a")
+
+    def test_call(self):
+        pool = FakePool(1)
+        self.assertEqual(pool._call(u"a"), u"aa")
+        self.assertEqual(pool._call(u"b"), u"bb")
+        self.assertEqual(len(pool.idle), 1)
+        self.assertEqual(pool.idle[0].requests, 2)
+        self.assertEqual(pool.respawns, 0)
+        pool.close()
+        self.assertEqual(len(pool.idle), 0)
+
+    def test_call_respawn(self):
+        pool = FakePool(1, crash=1)
+        self.assertEqual(pool._call(u"a"), u"aa")
+        self.assertEqual(pool.respawns, 1)
+        self.assertTrue(pool.idle[0].alive)
+
+    def test_call_crash_twice(self):
+        pool = FakePool(1, crash=2)
+        with self.assertRaises(OSError):
+            pool._call(u"a")
+        self.assertEqual(len(pool.idle), 0)
+
+    def test_call_max_requests(self):
+        pool = FakePool(1, max_requests=1)
+        self.assertEqual(pool._call(u"a"), u"aa")
+        self.assertEqual(len(pool.idle), 0)
+
+    def test_get(self):
+        pool = FakePool.get(1)
+        self.assertIs(FakePool.get(1), pool)
+        self.assertIsNot(FakePool.get(2), pool)
+        self.assertIsNot(OtherPool.get(1), pool)
+        FakePool.close_all()
+        self.assertIsNot(FakePool.get(1), pool)
+        FakePool.close_all()
+
+    def test_close_all_subclass(self):
+        pool = FakePool.get(1)
+        other = OtherPool.get(1)
+        OtherPool.close_all()
+        self.assertIs(FakePool.get(1), pool)
+        self.assertIsNot(OtherPool.get(1), other)
+        FakePool.close_all()
+        self.assertEqual(len([k for k in ProcessPool._POOLS if issubclass(k[1], FakePool)]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy
+import unittest
+
+from aeneas.resampler import Resampler
+
+
+class TestResampler(unittest.TestCase):
+
+    def sine(self, sample_rate, length=2.0, frequency=440.0):
+        times = numpy.arange(int(length * sample_rate)) / float(sample_rate)
+        return 0.5 * numpy.sin(2 * numpy.pi * frequency * times)
+
+    def resample_sine(self, from_rate, to_rate):
+        resampled = Resampler().resample(self.sine(from_rate), from_rate, to_rate)
+        expected = self.sine(to_rate)
+        self.assertEqual(len(resampled), len(expected))
+        # ignore the filter transients at the borders
+        margin = to_rate // 100
+        error = numpy.max(numpy.abs(resampled[margin:-margin] - expected[margin:-margin]))
+        self.assertLess(error, 0.001)
+
+    def test_ratio(self):
+        self.assertEqual(Resampler._ratio(22050, 16000), (320, 441))
+        self.assertEqual(Resampler._ratio(48000, 16000), (1, 3))
+        self.assertEqual(Resampler._ratio(8000, 16000), (2, 1))
+
+    def test_resample_bad_rate(self):
+        with self.assertRaises(ValueError):
+            Resampler().resample(numpy.zeros(10), 0, 16000)
+        with self.assertRaises(ValueError):
+            Resampler().resample(numpy.zeros(10), 16000, -1)
+
+    def test_resample_same_rate(self):
+        samples = self.sine(16000)
+        resampled = Resampler().resample(samples, 16000, 16000)
+        self.assertTrue((resampled == samples).all())
+        self.assertFalse(resampled is samples)
+
+    def test_resample_empty(self):
+        self.assertEqual(len(Resampler().resample(numpy.zeros(0), 22050, 16000)), 0)
+
+    def test_resample_int16_input(self):
+        resampled = Resampler().resample(numpy.zeros(441, dtype=numpy.int16), 22050, 16000)
+        self.assertEqual(resampled.dtype, numpy.float64)
+        self.assertEqual(len(resampled), 320)
+
+    def test_resample_22050_16000(self):
+        self.resample_sine(22050, 16000)
+
+    def test_resample_44100_16000(self):
+        self.resample_sine(44100, 16000)
+
+    def test_resample_48000_16000(self):
+        self.resample_sine(48000, 16000)
+
+    def test_resample_16000_22050(self):
+        self.resample_sine(16000, 22050)
+
+    def test_resample_8000_16000(self):
+        self.resample_sine(8000, 16000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -71,6 +71,31 @@ class TestSD(unittest.TestCase):
         self.assertGreaterEqual(tail, 2.0)
         self.assertLessEqual(tail, 10.0)
 
+    def test_detect_head_tail(self):
+        sd = self.load()
+        head, tail = sd.detect_head_tail()
+        self.assertEqual(head, self.load().detect_head())
+        self.assertEqual(tail, self.load().detect_tail())
+
+    def test_detect_head_tail_min_max(self):
+        head, tail = self.load().detect_head_tail(
+            min_head_length=2.0,
+            max_head_length=10.0,
+            min_tail_length=2.0,
+            max_tail_length=10.0
+        )
+        self.assertGreaterEqual(head, 2.0)
+        self.assertLessEqual(head, 10.0)
+        self.assertGreaterEqual(tail, 2.0)
+        self.assertLessEqual(tail, 10.0)
+
+    def test_detect_tail_does_not_reverse(self):
+        sd = self.load()
+        all_mfcc = sd.real_wave_mfcc.all_mfcc
+        sd.detect_tail()
+        self.assertFalse(sd.real_wave_mfcc.is_reversed)
+        self.assertIs(sd.real_wave_mfcc.all_mfcc, all_mfcc)
+
     def test_detect_bad(self):
         sd = self.load()
         with self.assertRaises(TypeError):
@@ -89,6 +114,10 @@ class TestSD(unittest.TestCase):
             begin, end = sd.detect_interval(max_tail_length="foo")
         with self.assertRaises(ValueError):
             begin, end = sd.detect_interval(max_tail_length=-10.0)
+        with self.assertRaises(TypeError):
+            head, tail = sd.detect_head_tail(min_tail_length="foo")
+        with self.assertRaises(ValueError):
+            head, tail = sd.detect_head_tail(max_tail_length=-10.0)
 
 
 if __name__ == "__main__":
@@ -21,6 +21,9 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import numpy
+import sys
+import time
 import unittest
 
 from aeneas.exacttiming import TimeValue
@@ -30,9 +33,144 @@ from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.synthesizer import Synthesizer
 from aeneas.textfile import TextFile
 from aeneas.textfile import TextFileFormat
+from aeneas.textfile import TextFragment
+from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
 import aeneas.globalfunctions as gf
 
 
+class StubTTSWrapper(BaseTTSWrapper):
+    """
+    A TTS engine returning 0.050 seconds of a sine wave
+    per character, at 22050 Hz, via a Python call.
+    """
+
+    LANGUAGE_TO_VOICE_CODE = {Language.ENG: u"eng"}
+
+    DEFAULT_LANGUAGE = Language.ENG
+
+    OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 22050)
+
+    HAS_PYTHON_CALL = True
+
+    TAG = u"StubTTSWrapper"
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        if len(text) == 0:
+            return (True, (TimeValue("0.000"), None, None, None))
+        num_samples = int(len(text) * 0.050 * 22050)
+        samples = 0.5 * numpy.sin(numpy.arange(num_samples) * 2 * numpy.pi * 440 / 22050)
+        duration = TimeValue(num_samples) / TimeValue(22050)
+        return (True, (duration, 22050, "pcm16", samples))
+
+
+class SlowStubTTSWrapper(StubTTSWrapper):
+    """
+    A TTS engine like ``StubTTSWrapper``,
+    taking longer to synthesize shorter texts,
+    so that concurrent calls complete out of order.
+    """
+
+    TAG = u"SlowStubTTSWrapper"
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        time.sleep(0.020 / (1 + len(text) % 5))
+        return super(SlowStubTTSWrapper, self)._synthesize_single_python_helper(
+            text=text,
+            voice_code=voice_code,
+            output_file_path=output_file_path,
+            return_audio_data=return_audio_data
+        )
+
+
+class CountingStubTTSWrapper(SlowStubTTSWrapper):
+    """
+    A TTS engine like ``SlowStubTTSWrapper``,
+    recording the texts it synthesizes.
+    """
+
+    TAG = u"CountingStubTTSWrapper"
+
+    def __init__(self, rconf=None, logger=None):
+        super(CountingStubTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.texts = []
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        self.texts.append(text)
+        return super(CountingStubTTSWrapper, self)._synthesize_single_python_helper(
+            text=text,
+            voice_code=voice_code,
+            output_file_path=output_file_path,
+            return_audio_data=return_audio_data
+        )
+
+
+class SubprocessStubTTSWrapper(BaseTTSWrapper):
+    """
+    A TTS engine writing 0.050 seconds of audio per character,
+    at 16000 Hz, to the file given as its last argument,
+    or to stdout, as a streaming writer does,
+    via ``subprocess``.
+    """
+
+    SCRIPT = u"\n".join([
+        u"import struct, sys",
+        u"text = getattr(sys.stdin, 'buffer', sys.stdin).read().decode('utf-8')",
+        u"data = struct.pack('<h', 8192) * (len(text) * 800)",
+        u"size = 0x7ffff000 if sys.argv[1] == '-' else len(data)",
+        u"fmt = struct.pack('<IHHIIHH', 16, 1, 1, 16000, 32000, 2, 16)",
+        u"data = b'RIFF' + struct.pack('<I', size) + b'WAVEfmt ' + fmt + b'data' + struct.pack('<I', size) + data",
+        u"output = getattr(sys.stdout, 'buffer', sys.stdout) if sys.argv[1] == '-' else open(sys.argv[1], 'wb')",
+        u"output.write(data)",
+        u"output.close()",
+    ])
+
+    LANGUAGE_TO_VOICE_CODE = {Language.ENG: u"eng"}
+
+    DEFAULT_LANGUAGE = Language.ENG
+
+    OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 16000)
+
+    HAS_SUBPROCESS_CALL = True
+
+    TAG = u"SubprocessStubTTSWrapper"
+
+    def __init__(self, rconf=None, logger=None):
+        super(SubprocessStubTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.set_subprocess_arguments([
+            sys.executable,
+            u"-c",
+            self.SCRIPT,
+            self.CLI_PARAMETER_WAVE_PATH,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+        self.set_subprocess_pipe_arguments([
+            sys.executable,
+            u"-c",
+            self.SCRIPT,
+            u"-",
+            self.CLI_PARAMETER_WAVE_STDOUT,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+
+
+class FallbackStubTTSWrapper(SubprocessStubTTSWrapper):
+    """
+    A TTS engine like ``SubprocessStubTTSWrapper``,
+    whose Python call fails after synthesizing some fragments,
+    so that the subprocess call is used instead.
+    """
+
+    HAS_PYTHON_CALL = True
+
+    TAG = u"FallbackStubTTSWrapper"
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        if u"beauty" in text:
+            return (False, None)
+        samples = numpy.ones(len(text) * 400) * 0.25
+        return (True, (TimeValue(len(samples)) / TimeValue(16000), 16000, "pcm16", samples))
+
+
 class TestSynthesizer(unittest.TestCase):
 
     PATH_NOT_WRITEABLE = gf.absolute_path("x/y/z/not_writeable.wav", __file__)
@@ -79,6 +217,187 @@ class TestSynthesizer(unittest.TestCase):
     def test_synthesize(self):
         self.perform("res/inputtext/sonnet_plain.txt", 15)
 
+    def test_synthesize_audio_file_none(self):
+        synth = Synthesizer()
+        with self.assertRaises(TypeError):
+            synth.synthesize_audio_file(None)
+
+    def test_synthesize_audio_file(self):
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        synth = Synthesizer()
+        synth.tts_engine = StubTTSWrapper(rconf=synth.rconf)
+        audio_file, anchors, total_time, num_chars = synth.synthesize_audio_file(tfl)
+        self.assertEqual(len(anchors), 15)
+        self.assertEqual(num_chars, tfl.chars)
+        self.assertIsNone(audio_file.file_path)
+        # resampled to the sample rate used internally
+        self.assertEqual(audio_file.audio_sample_rate, 16000)
+        self.assertAlmostEqual(audio_file.audio_length, total_time, places=2)
+
+    def test_synthesize_audio_file_no_safety_checks(self):
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        synth = Synthesizer(rconf=RuntimeConfiguration(u"safety_checks=False"))
+        synth.tts_engine = StubTTSWrapper(rconf=synth.rconf)
+        audio_file, anchors, total_time, num_chars = synth.synthesize_audio_file(tfl, quit_after=TimeValue("10.000"))
+        self.assertEqual(audio_file.audio_sample_rate, 22050)
+        self.assertEqual(audio_file.audio_length, total_time)
+        self.assertLess(len(anchors), 15)
+
+    def synthesize_workers(self, workers, tts_cache=False, quit_after=None, backwards=False):
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_WORKERS] = workers
+        rconf[RuntimeConfiguration.TTS_CACHE] = tts_cache
+        synth = Synthesizer(rconf=rconf)
+        synth.tts_engine = SlowStubTTSWrapper(rconf=synth.rconf)
+        try:
+            return synth.synthesize_audio_file(tfl, quit_after=quit_after, backwards=backwards)
+        finally:
+            synth.clear_cache()
+
+    def check_workers(self, tts_cache=False, quit_after=None, backwards=False):
+        audio_file, anchors, total_time, num_chars = self.synthesize_workers(1, tts_cache, quit_after, backwards)
+        for workers in [2, 4, 32]:
+            audio_file2, anchors2, total_time2, num_chars2 = self.synthesize_workers(workers, tts_cache, quit_after, backwards)
+            self.assertEqual(anchors2, anchors)
+            self.assertEqual(total_time2, total_time)
+            self.assertEqual(num_chars2, num_chars)
+            self.assertTrue(numpy.array_equal(audio_file2.audio_samples, audio_file.audio_samples))
+
+    def test_synthesize_workers(self):
+        self.check_workers()
+
+    def test_synthesize_workers_tts_cache(self):
+        self.check_workers(tts_cache=True)
+
+    def test_synthesize_workers_quit_after(self):
+        self.check_workers(quit_after=TimeValue("10.000"))
+
+    def test_synthesize_workers_backwards(self):
+        self.check_workers(backwards=True)
+
+    def test_synthesize_workers_quit_after_backwards(self):
+        self.check_workers(quit_after=TimeValue("10.000"), backwards=True)
+
+    def test_synthesize_workers_failure(self):
+        class FailingStubTTSWrapper(SlowStubTTSWrapper):
+            def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+                if u"beauty" in text:
+                    raise ValueError(u"Failure")
+                return super(FailingStubTTSWrapper, self)._synthesize_single_python_helper(text, voice_code, output_file_path, return_audio_data)
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        synth = Synthesizer(rconf=RuntimeConfiguration(u"tts_workers=4"))
+        synth.tts_engine = FailingStubTTSWrapper(rconf=synth.rconf)
+        with self.assertRaises(RuntimeError):
+            synth.synthesize_audio_file(tfl)
+
+    def synthesize_dedup(self, texts, dedup_max_size, workers=1, tts_cache=False, quit_after=None, backwards=False):
+        tfl = TextFile()
+        for i, text in enumerate(texts):
+            tfl.add_fragment(TextFragment(u"f%03d" % i, Language.ENG, [text], [text]))
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_DEDUP_MAX_SIZE] = dedup_max_size
+        rconf[RuntimeConfiguration.TTS_WORKERS] = workers
+        rconf[RuntimeConfiguration.TTS_CACHE] = tts_cache
+        synth = Synthesizer(rconf=rconf)
+        synth.tts_engine = CountingStubTTSWrapper(rconf=synth.rconf)
+        try:
+            result = synth.synthesize_audio_file(tfl, quit_after=quit_after, backwards=backwards)
+        finally:
+            synth.clear_cache()
+        return (synth.tts_engine.texts, result)
+
+    def check_dedup(self, texts, expected_calls, dedup_max_size=64, **kwargs):
+        # NOTE the stub does not write the output file,
+        #      hence repeated fragments cannot be read from the TTS cache
+        calls, result = self.synthesize_dedup(texts, 0, **dict(kwargs, tts_cache=False))
+        calls2, result2 = self.synthesize_dedup(texts, dedup_max_size, **kwargs)
+        self.assertEqual(sorted(calls2), sorted(expected_calls))
+        self.assertEqual(result2[1], result[1])
+        self.assertEqual(result2[2], result[2])
+        self.assertTrue(numpy.array_equal(result2[0].audio_samples, result[0].audio_samples))
+
+    def test_synthesize_dedup(self):
+        texts = [u"the", u"cat", u"and", u"the", u"dog", u"and", u"the", u"bird"]
+        self.check_dedup(texts, [u"the", u"cat", u"and", u"dog", u"bird"])
+
+    def test_synthesize_dedup_no_repetitions(self):
+        texts = [u"the", u"cat"]
+        self.check_dedup(texts, texts)
+
+    def test_synthesize_dedup_disabled(self):
+        texts = [u"the", u"cat", u"the"]
+        calls, result = self.synthesize_dedup(texts, 0)
+        self.assertEqual(calls, texts)
+
+    def test_synthesize_dedup_max_size(self):
+        # NOTE 200 characters are 220500 float64 samples, more than 1 MB
+        long_text = u"x" * 200
+        texts = [long_text, u"the", long_text, u"the"]
+        self.check_dedup(texts, [long_text, u"the", long_text], dedup_max_size=1)
+
+    def test_synthesize_dedup_workers(self):
+        texts = [u"the", u"cat", u"and", u"the", u"dog", u"and", u"the", u"bird"] * 4
+        for workers in [2, 4, 32]:
+            self.check_dedup(texts, [u"the", u"cat", u"and", u"dog", u"bird"], workers=workers)
+
+    def test_synthesize_dedup_tts_cache(self):
+        texts = [u"the", u"cat", u"and", u"the", u"dog", u"and", u"the", u"bird"]
+        self.check_dedup(texts, [u"the", u"cat", u"and", u"dog", u"bird"], tts_cache=True)
+
+    def test_synthesize_dedup_backwards(self):
+        texts = [u"the", u"cat", u"and", u"the", u"dog", u"and", u"the", u"bird"]
+        self.check_dedup(texts, [u"the", u"cat", u"and", u"dog", u"bird"], backwards=True)
+
+    def test_synthesize_dedup_empty(self):
+        texts = [u"the", u"", u"cat", u"", u"the"]
+        self.check_dedup(texts, [u"the", u"", u"cat"])
+
+    def synthesize_subprocess(self, tts_pipe, tts_cache=False):
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain_utf8.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_PIPE] = tts_pipe
+        rconf[RuntimeConfiguration.TTS_CACHE] = tts_cache
+        synth = Synthesizer(rconf=rconf)
+        synth.tts_engine = SubprocessStubTTSWrapper(rconf=synth.rconf)
+        try:
+            return synth.synthesize_audio_file(tfl)
+        finally:
+            synth.clear_cache()
+
+    def test_synthesize_subprocess_pipe(self):
+        audio_file, anchors, total_time, num_chars = self.synthesize_subprocess(False)
+        self.assertEqual(len(anchors), 15)
+        # NOTE one character is 800 samples: the text must be passed as UTF-8
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain_utf8.txt", __file__), TextFileFormat.PLAIN)
+        self.assertEqual(audio_file.audio_samples_length, 800 * sum([len(f.filtered_text) for f in tfl.fragments]))
+        for tts_cache in [False, True]:
+            audio_file2, anchors2, total_time2, num_chars2 = self.synthesize_subprocess(True, tts_cache)
+            self.assertEqual(anchors2, anchors)
+            self.assertEqual(total_time2, total_time)
+            self.assertTrue(numpy.array_equal(audio_file2.audio_samples, audio_file.audio_samples))
+
+    def test_synthesize_python_fallback(self):
+        tfl = TextFile(gf.absolute_path("res/inputtext/sonnet_plain_utf8.txt", __file__), TextFileFormat.PLAIN)
+        tfl.set_language(Language.ENG)
+        synth = Synthesizer()
+        synth.tts_engine = FallbackStubTTSWrapper(rconf=synth.rconf)
+        try:
+            audio_file, anchors, total_time, num_chars = synth.synthesize_audio_file(tfl)
+        finally:
+            synth.clear_cache()
+        # NOTE the samples of the failed Python call must be discarded
+        audio_file2, anchors2, total_time2, num_chars2 = self.synthesize_subprocess(False)
+        self.assertEqual(anchors, anchors2)
+        self.assertEqual(total_time, total_time2)
+        self.assertEqual(audio_file.audio_samples_length, audio_file2.audio_samples_length)
+        self.assertTrue(numpy.array_equal(audio_file.audio_samples, audio_file2.audio_samples))
+
     def test_synthesize_logger(self):
         logger = Logger()
         self.perform("res/inputtext/sonnet_plain.txt", 15, logger=logger)
@@ -28,6 +28,7 @@ from aeneas.exacttiming import TimeValue
 from aeneas.idsortingalgorithm import IDSortingAlgorithm
 from aeneas.language import Language
 from aeneas.logger import Logger
+from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.syncmap import SyncMap
 from aeneas.syncmap import SyncMapFormat
 from aeneas.syncmap import SyncMapFragment
@@ -139,12 +140,20 @@ class TestTask(unittest.TestCase):
         self.assertEqual(len(task.sync_map_leaves()), 0)
 
     def test_set_audio_file_path_absolute(self):
-        task = Task()
+        task = Task(rconf=RuntimeConfiguration(u"task_defer_audio_probe=False"))
         task.audio_file_path_absolute = gf.absolute_path("res/container/job/assets/p001.mp3", __file__)
         self.assertIsNotNone(task.audio_file)
         self.assertEqual(task.audio_file.file_size, 426735)
         self.assertAlmostEqual(task.audio_file.audio_length, TimeValue("53.3"), places=1)
 
+    def test_set_audio_file_path_absolute_deferred(self):
+        task = Task()
+        task.audio_file_path_absolute = gf.absolute_path("res/container/job/assets/p001.mp3", __file__)
+        self.assertIsNotNone(task.audio_file)
+        self.assertIsNone(task.audio_file.audio_length)
+        task.audio_file.read_properties()
+        self.assertAlmostEqual(task.audio_file.audio_length, TimeValue("53.3"), places=1)
+
     def test_set_audio_file_path_absolute_error(self):
         task = Task()
         with self.assertRaises(OSError):
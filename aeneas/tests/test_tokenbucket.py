@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import time
+import unittest
+
+from aeneas.tokenbucket import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate_zero(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_rate_negative(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=-1)
+
+    def test_capacity_zero(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=0)
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        start = time.time()
+        for i in range(3):
+            self.assertEqual(bucket.acquire(), 0.0)
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.time()
+        for i in range(5):
+            bucket.acquire()
+        # the first token is available immediately
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+    def test_rate_threads(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.time()
+        threads = [threading.Thread(target=bucket.acquire) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertGreaterEqual(time.time() - start, 0.19)
+
+    def test_waited(self):
+        bucket = TokenBucket(rate=20, capacity=1)
+        bucket.acquire()
+        self.assertGreater(bucket.acquire(), 0.0)
+
+    def test_shared(self):
+        bucket = TokenBucket.shared(u"test_shared", 10, 2)
+        self.assertIs(TokenBucket.shared(u"test_shared", 10, 2), bucket)
+        self.assertIsNot(TokenBucket.shared(u"test_shared", 20, 2), bucket)
+        self.assertIsNot(TokenBucket.shared(u"test_shared", 10, 1), bucket)
+        self.assertIsNot(TokenBucket.shared(u"test_shared_other", 10, 2), bucket)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import numpy
+import os
+import time
+import unittest
+
+from aeneas.exacttiming import TimeValue
+from aeneas.language import Language
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFragment
+from aeneas.ttsdiskcache import TTSDiskCache
+from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
+from aeneas.wavfile import write as scipywavwrite
+import aeneas.globalfunctions as gf
+
+
+class FileStubTTSWrapper(BaseTTSWrapper):
+    """
+    A TTS engine writing 0.050 seconds of a sine wave
+    per character, at 16000 Hz, to file, via a Python call,
+    and counting its calls.
+    """
+
+    LANGUAGE_TO_VOICE_CODE = {Language.ENG: u"eng", Language.ITA: u"ita"}
+
+    DEFAULT_LANGUAGE = Language.ENG
+
+    OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 16000)
+
+    HAS_PYTHON_CALL = True
+
+    TAG = u"FileStubTTSWrapper"
+
+    def __init__(self, rconf=None, logger=None):
+        super(FileStubTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.calls = 0
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        self.calls += 1
+        if len(text) == 0:
+            return (True, (TimeValue("0.000"), None, None, None))
+        num_samples = int(len(text) * 0.050 * 16000)
+        samples = 0.5 * numpy.sin(numpy.arange(num_samples) * 2 * numpy.pi * 440 / 16000)
+        if output_file_path is not None:
+            scipywavwrite(output_file_path, 16000, (samples * 32767).astype("int16"))
+        duration = TimeValue(num_samples) / TimeValue(16000)
+        return (True, (duration, 16000, "pcm16", samples))
+
+
+class TestTTSDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_path = gf.tmp_directory()
+
+    def tearDown(self):
+        gf.delete_directory(self.cache_path)
+
+    def add(self, cache, key, size):
+        tmp_path = cache.reserve(key)
+        with io.open(tmp_path, "wb") as tmp_file:
+            tmp_file.write(b"x" * size)
+        return cache.commit(key, tmp_path)
+
+    def synthesize(self, texts, rconf=None):
+        if rconf is None:
+            rconf = RuntimeConfiguration()
+            rconf[RuntimeConfiguration.TTS_CACHE_DIR] = self.cache_path
+        tfl = TextFile()
+        for i, text in enumerate(texts):
+            tfl.add_fragment(TextFragment(u"f%03d" % i, Language.ENG, [text], [text]))
+        tts = FileStubTTSWrapper(rconf=rconf)
+        handler, output_file_path = gf.tmp_file(suffix=".wav")
+        try:
+            anchors, total_time, num_chars = tts.synthesize_multiple(tfl, output_file_path)
+        finally:
+            gf.delete_file(handler, output_file_path)
+        return (tts, anchors, total_time)
+
+    def test_path_none(self):
+        with self.assertRaises(ValueError):
+            TTSDiskCache()
+
+    def test_create_directory(self):
+        path = os.path.join(self.cache_path, "sub", "dir")
+        cache = TTSDiskCache(cache_path=path)
+        self.assertTrue(gf.directory_exists(path))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_key(self):
+        key = TTSDiskCache.key([u"eng", u"hello", ("pcm_s16le", 1, 16000)])
+        self.assertEqual(len(key), 64)
+        self.assertEqual(key, TTSDiskCache.key([u"eng", u"hello", ("pcm_s16le", 1, 16000)]))
+        self.assertNotEqual(key, TTSDiskCache.key([u"ita", u"hello", ("pcm_s16le", 1, 16000)]))
+        self.assertNotEqual(key, TTSDiskCache.key([u"eng", u"hello", ("pcm_s16le", 1, 22050)]))
+        # NOTE parameters are separated, not concatenated
+        self.assertNotEqual(TTSDiskCache.key([u"ab", u"c"]), TTSDiskCache.key([u"a", u"bc"]))
+
+    def test_get_missing(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        self.assertIsNone(cache.get(TTSDiskCache.key([u"foo"])))
+        self.assertEqual(cache.misses, 1)
+
+    def test_commit_get(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        key = TTSDiskCache.key([u"foo"])
+        path = self.add(cache, key, 100)
+        self.assertEqual(cache.get(key), path)
+        self.assertEqual(cache.hits, 1)
+        self.assertTrue(path.startswith(os.path.join(cache.cache_path, key[0:2])))
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], 100)
+
+    def test_commit_existing(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        key = TTSDiskCache.key([u"foo"])
+        self.add(cache, key, 100)
+        self.add(cache, key, 200)
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["size"], 200)
+
+    def test_discard(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        key = TTSDiskCache.key([u"foo"])
+        tmp_path = cache.reserve(key)
+        cache.discard(tmp_path)
+        self.assertFalse(gf.file_exists(tmp_path))
+        self.assertIsNone(cache.get(key))
+
+    def test_temporary_files_not_entries(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        cache.reserve(TTSDiskCache.key([u"foo"]))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_prune_lru(self):
+        cache = TTSDiskCache(cache_path=self.cache_path, max_size=0)
+        keys = [TTSDiskCache.key([u"%d" % i]) for i in range(4)]
+        now = time.time()
+        for i, key in enumerate(keys):
+            path = self.add(cache, key, 100)
+            os.utime(path, (now - 100 + i, now - 100 + i))
+        # reading the oldest entry makes it the most recently used one
+        cache.get(keys[0])
+        removed, freed = cache.prune(max_size=250)
+        self.assertEqual((removed, freed), (2, 200))
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNone(cache.get(keys[2]))
+        self.assertIsNotNone(cache.get(keys[3]))
+
+    def test_prune_unbounded(self):
+        cache = TTSDiskCache(cache_path=self.cache_path, max_size=0)
+        self.add(cache, TTSDiskCache.key([u"foo"]), 100)
+        self.assertEqual(cache.prune(), (0, 0))
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_prune_stale_temporary(self):
+        cache = TTSDiskCache(cache_path=self.cache_path, max_size=1000)
+        tmp_path = cache.reserve(TTSDiskCache.key([u"foo"]))
+        old = time.time() - 2 * TTSDiskCache.STALE_TEMPORARY_AGE
+        os.utime(tmp_path, (old, old))
+        cache.prune()
+        self.assertFalse(gf.file_exists(tmp_path))
+
+    def test_prune_on_write(self):
+        cache = TTSDiskCache(cache_path=self.cache_path, max_size=1000)
+        for i in range(20):
+            self.add(cache, TTSDiskCache.key([u"%d" % i]), 100)
+        self.assertLessEqual(cache.stats()["size"], 1000)
+
+    def test_clear(self):
+        cache = TTSDiskCache(cache_path=self.cache_path)
+        for i in range(3):
+            self.add(cache, TTSDiskCache.key([u"%d" % i]), 100)
+        self.assertEqual(cache.clear(), (3, 300))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_synthesize(self):
+        tts, anchors, total_time = self.synthesize([u"hello", u"world"])
+        self.assertEqual(tts.calls, 2)
+        self.assertEqual(TTSDiskCache(cache_path=self.cache_path).stats()["entries"], 2)
+        # a new wrapper, as in another process, reads the cached fragments
+        tts2, anchors2, total_time2 = self.synthesize([u"hello", u"world"])
+        self.assertEqual(tts2.calls, 0)
+        self.assertEqual(tts2.disk_cache.hits, 2)
+        self.assertEqual(anchors2, anchors)
+        self.assertEqual(total_time2, total_time)
+
+    def test_synthesize_new_fragment(self):
+        self.synthesize([u"hello", u"world"])
+        tts, anchors, total_time = self.synthesize([u"hello", u"there", u"world"])
+        self.assertEqual(tts.calls, 1)
+        self.assertEqual(TTSDiskCache(cache_path=self.cache_path).stats()["entries"], 3)
+
+    def test_synthesize_voice_code(self):
+        self.synthesize([u"hello"])
+        rconf = RuntimeConfiguration()
+        rconf[RuntimeConfiguration.TTS_CACHE_DIR] = self.cache_path
+        rconf[RuntimeConfiguration.TTS_VOICE_CODE] = u"ita"
+        tts, anchors, total_time = self.synthesize([u"hello"], rconf=rconf)
+        self.assertEqual(tts.calls, 1)
+
+    def test_synthesize_empty_fragment_not_cached(self):
+        tts, anchors, total_time = self.synthesize([u"hello", u""])
+        self.assertEqual(TTSDiskCache(cache_path=self.cache_path).stats()["entries"], 1)
+
+    def test_synthesize_disabled(self):
+        tts, anchors, total_time = self.synthesize([u"hello"], rconf=RuntimeConfiguration())
+        self.assertIsNone(tts.disk_cache)
+        self.assertEqual(TTSDiskCache(cache_path=self.cache_path).stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import unittest
+
+from aeneas.tools.tts_cache import TTSCacheCLI
+from aeneas.ttsdiskcache import TTSDiskCache
+import aeneas.globalfunctions as gf
+
+
+class TestTTSCacheCLI(unittest.TestCase):
+
+    def execute(self, parameters, expected_exit_code):
+        output_path = gf.tmp_directory()
+        params = ["placeholder"]
+        for p_type, p_value in parameters:
+            if p_type == "cache":
+                params.append(output_path)
+            elif p_type == "missing":
+                params.append(os.path.join(output_path, p_value))
+            else:
+                params.append(p_value)
+        cache = TTSDiskCache(cache_path=output_path)
+        for i in range(3):
+            tmp_path = cache.reserve(TTSDiskCache.key([u"%d" % i]))
+            with open(tmp_path, "wb") as tmp_file:
+                tmp_file.write(b"x" * 1024)
+            cache.commit(TTSDiskCache.key([u"%d" % i]), tmp_path)
+        exit_code = TTSCacheCLI(use_sys=False).run(arguments=params)
+        entries = cache.stats()["entries"]
+        gf.delete_directory(output_path)
+        self.assertEqual(exit_code, expected_exit_code)
+        return entries
+
+    def test_help(self):
+        self.execute([], 2)
+        self.execute([("", "-h")], 2)
+        self.execute([("", "--help")], 2)
+        self.execute([("", "--help-rconf")], 2)
+        self.execute([("", "--version")], 2)
+
+    def test_stats(self):
+        entries = self.execute([
+            ("", "stats"),
+            ("cache", None)
+        ], 0)
+        self.assertEqual(entries, 3)
+
+    def test_prune(self):
+        entries = self.execute([
+            ("", "prune"),
+            ("cache", None)
+        ], 0)
+        self.assertEqual(entries, 3)
+
+    def test_prune_max_size(self):
+        entries = self.execute([
+            ("", "prune"),
+            ("cache", None),
+            ("", "--max-size=0")
+        ], 0)
+        self.assertEqual(entries, 0)
+
+    def test_prune_max_size_bad(self):
+        self.execute([
+            ("", "prune"),
+            ("cache", None),
+            ("", "--max-size=foo")
+        ], 1)
+
+    def test_clear(self):
+        entries = self.execute([
+            ("", "clear"),
+            ("cache", None)
+        ], 0)
+        self.assertEqual(entries, 0)
+
+    def test_unknown_command(self):
+        self.execute([
+            ("", "foo"),
+            ("cache", None)
+        ], 1)
+
+    def test_not_existing(self):
+        self.execute([
+            ("", "stats"),
+            ("missing", "not_existing")
+        ], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.tokenbucket.TokenBucket`,
+  a thread-safe token bucket rate limiter.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import threading
+import time
+
+
+class TokenBucket(object):
+    """
+    A thread-safe token bucket rate limiter.
+
+    The bucket holds at most ``capacity`` tokens,
+    and it is refilled at ``rate`` tokens per second.
+    Each operation acquires one token,
+    waiting until one is available,
+    hence at most ``capacity`` operations
+    can be performed in a burst,
+    and at most ``rate`` operations per second in the long run.
+
+    The bucket starts full.
+
+    :param float rate: the number of tokens added per second
+    :param int capacity: the maximum number of tokens
+    :raises: ValueError: if ``rate`` or ``capacity`` are not positive
+    """
+
+    _SHARED = {}
+    """ Buckets shared by the callers in the current process """
+
+    _SHARED_LOCK = threading.Lock()
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0:
+            raise ValueError(u"The rate must be positive")
+        if capacity < 1:
+            raise ValueError(u"The capacity must be positive")
+        self.rate = float(rate)
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.time()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, key, rate, capacity=1):
+        """
+        Return the bucket with the given key and parameters
+        shared by the callers in the current process,
+        creating it if needed.
+
+        :param object key: the key identifying the bucket (e.g., the API)
+        :param float rate: the number of tokens added per second
+        :param int capacity: the maximum number of tokens
+        :rtype: :class:`~aeneas.tokenbucket.TokenBucket`
+        """
+        key = (key, float(rate), capacity)
+        with cls._SHARED_LOCK:
+            if key not in cls._SHARED:
+                cls._SHARED[key] = cls(rate, capacity)
+            return cls._SHARED[key]
+
+    def acquire(self):
+        """
+        Acquire one token, waiting until one is available,
+        and return the number of seconds waited.
+
+        :rtype: float
+        """
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            # NOTE sleep without holding the lock,
+            #      and compete again for the token afterwards
+            time.sleep(delay)
+            waited += delay
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Build the phoneme table of a TTS voice,
+synthesizing the text fragments read from file.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import os
+import sys
+
+from aeneas.audiofilemfcc import AudioFileMFCC
+from aeneas.phonemetable import PhonemeTable
+from aeneas.synthesizer import Synthesizer
+from aeneas.textfile import TextFile
+from aeneas.textfile import TextFileFormat
+from aeneas.tools.abstract_cli_program import AbstractCLIProgram
+import aeneas.globalfunctions as gf
+
+
+class BuildPhonemeTableCLI(AbstractCLIProgram):
+    """
+    Build the phoneme table of a TTS voice,
+    synthesizing the text fragments read from file.
+    """
+    OUTPUT_DIRECTORY = "output/"
+    TEXT_FILE = gf.relative_path("res/plain.txt", __file__)
+
+    NAME = gf.file_name_without_extension(__file__)
+
+    HELP = {
+        "description": u"Build the phoneme table of a TTS voice, synthesizing the text fragments read from file.",
+        "synopsis": [
+            (u"TEXT_FILE LANGUAGE OUTPUT_DIRECTORY", True)
+        ],
+        "examples": [
+            u"%s eng %s" % (TEXT_FILE, OUTPUT_DIRECTORY),
+            u"%s eng %s -r=\"tts=espeak-ng\"" % (TEXT_FILE, OUTPUT_DIRECTORY),
+            u"%s eng %s --update" % (TEXT_FILE, OUTPUT_DIRECTORY),
+        ],
+        "options": [
+            u"--update : add the text fragments to the existing tables",
+        ]
+    }
+
+    def perform_command(self):
+        """
+        Perform command and return the appropriate exit code.
+
+        :rtype: int
+        """
+        if len(self.actual_arguments) < 3:
+            return self.print_help()
+        text_file_path = self.actual_arguments[0]
+        language = gf.safe_unicode(self.actual_arguments[1])
+        output_directory = self.actual_arguments[2]
+        update = self.has_option(u"--update")
+        if not self.check_input_file(text_file_path):
+            return self.ERROR_EXIT_CODE
+        if not self.check_output_directory(output_directory):
+            return self.ERROR_EXIT_CODE
+        text_file = self.get_text_file(TextFileFormat.PLAIN, text_file_path, None)
+        if text_file is None:
+            return self.ERROR_EXIT_CODE
+        elif len(text_file) == 0:
+            self.print_error(u"No text fragments found")
+            return self.ERROR_EXIT_CODE
+        text_file.set_language(language)
+        self.print_info(u"Read input text with %d fragments" % (len(text_file)))
+
+        # NOTE build one table for each distinct set of MFCC parameters,
+        #      that is, for single level tasks and for each level of multilevel tasks
+        level_rconfs = []
+        for level in [None, 1, 2, 3]:
+            rconf = self.rconf.clone()
+            if level is not None:
+                rconf.set_granularity(level)
+            if all([[rconf[k] for k in PhonemeTable.MFCC_PARAMETERS] != [r[k] for k in PhonemeTable.MFCC_PARAMETERS] for r in level_rconfs]):
+                level_rconfs.append(rconf)
+
+        try:
+            synt = Synthesizer(rconf=self.rconf, logger=self.logger)
+            voice_parameters = synt.voice_parameters(text_file.fragments[0])
+            tables = []
+            for rconf in level_rconfs:
+                file_path = os.path.join(output_directory, PhonemeTable.file_name(voice_parameters, rconf))
+                table = None
+                if update:
+                    table = PhonemeTable.load(file_path, rconf=rconf, logger=self.logger)
+                if table is None:
+                    table = PhonemeTable(rconf=rconf, logger=self.logger)
+                tables.append((file_path, table))
+            for fragment in text_file.fragments:
+                phonemes = synt.fragment_phonemes(fragment)
+                if phonemes is None:
+                    self.print_error(u"The TTS engine cannot output phonemes")
+                    return self.ERROR_EXIT_CODE
+                fragment_text_file = TextFile()
+                fragment_text_file.add_fragment(fragment)
+                audio_file = synt.synthesize_audio_file(fragment_text_file)[0]
+                for file_path, table in tables:
+                    audio_file_mfcc = AudioFileMFCC(audio_file=audio_file, rconf=table.rconf, logger=self.logger)
+                    table.add(audio_file_mfcc.all_mfcc, phonemes)
+                audio_file.clear_data()
+            synt.clear_cache()
+            for file_path, table in tables:
+                table.save(file_path)
+                self.print_success(u"Created file '%s' with %d phonemes" % (file_path, len(table)))
+            return self.NO_ERROR_EXIT_CODE
+        except Exception as exc:
+            self.print_error(u"An unexpected error occurred while building the phoneme table:")
+            self.print_error(u"%s" % exc)
+
+        return self.ERROR_EXIT_CODE
+
+
+def main():
+    """
+    Execute program.
+    """
+    BuildPhonemeTableCLI().run(arguments=sys.argv)
+
+if __name__ == '__main__':
+    main()
@@ -63,11 +63,13 @@ class ExecuteJobCLI(AbstractCLIProgram):
         "examples": [
             u"%s %s" % (CONTAINER_FILE, OUTPUT_DIRECTORY),
             u"%s %s --cewsubprocess" % (CONTAINER_FILE, OUTPUT_DIRECTORY),
+            u"%s %s --workers=4" % (CONTAINER_FILE, OUTPUT_DIRECTORY),
             u"%s %s \"%s\"" % (CONTAINER_FILE_NO_CONFIG, OUTPUT_DIRECTORY, CONFIG_STRING)
         ],
         "options": [
             u"--cewsubprocess : run cew in separate process (see docs)",
-            u"--skip-validator : do not validate the given container and/or config string"
+            u"--skip-validator : do not validate the given container and/or config string",
+            u"--workers=N : execute N tasks concurrently, in separate processes"
         ]
     }
 
@@ -91,6 +93,9 @@ class ExecuteJobCLI(AbstractCLIProgram):
         validate = not self.has_option(u"--skip-validator")
         if self.has_option(u"--cewsubprocess"):
             self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_ENABLED] = True
+        workers = gf.safe_int(self.has_option_with_value(u"--workers"), None)
+        if workers is not None:
+            self.rconf[RuntimeConfiguration.JOB_MAX_WORKERS] = workers
 
         if not self.check_input_file_or_directory(container_path):
             return self.ERROR_EXIT_CODE
@@ -128,9 +133,12 @@ class ExecuteJobCLI(AbstractCLIProgram):
             executor.execute()
             self.print_info(u"Executing... done")
         except Exception as exc:
-            self.print_error(u"An unexpected error occurred while executing the job:")
-            self.print_error(u"%s" % exc)
-            return self.ERROR_EXIT_CODE
+            # NOTE if only some tasks failed,
+            #      output the sync maps of the other ones
+            if (len(executor.failures) == 0) or (len(executor.failures) == len(executor.job)):
+                self.print_error(u"An unexpected error occurred while executing the job:")
+                self.print_error(u"%s" % exc)
+                return self.ERROR_EXIT_CODE
 
         try:
             self.print_info(u"Creating output container...")
@@ -138,12 +146,17 @@ class ExecuteJobCLI(AbstractCLIProgram):
             self.print_info(u"Creating output container... done")
             self.print_success(u"Created output file '%s'" % path)
             executor.clean(True)
-            return self.NO_ERROR_EXIT_CODE
         except Exception as exc:
             self.print_error(u"An unexpected error occurred while writing the output container:")
             self.print_error(u"%s" % exc)
+            return self.ERROR_EXIT_CODE
 
-        return self.ERROR_EXIT_CODE
+        if len(executor.failures) > 0:
+            self.print_error(u"The following tasks failed, their sync maps were not created:")
+            for task, exc, exc_traceback in executor.failures:
+                self.print_error(u"'%s': %s: %s" % (task.configuration["custom_id"], type(exc).__name__, exc))
+            return self.ERROR_EXIT_CODE
+        return self.NO_ERROR_EXIT_CODE
 
     def print_parameters(self):
         """
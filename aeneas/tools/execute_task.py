@@ -604,7 +604,7 @@ class ExecuteTaskCLI(AbstractCLIProgram):
 
         try:
             self.print_info(u"Creating task...")
-            task = Task(config_string, logger=self.logger)
+            task = Task(config_string, rconf=self.rconf, logger=self.logger)
             task.audio_file_path_absolute = audio_file_path
             task.text_file_path_absolute = text_file_path
             task.sync_map_file_path_absolute = sync_map_file_path
@@ -31,6 +31,7 @@ from __future__ import print_function
 import sys
 
 from aeneas.tools.abstract_cli_program import AbstractCLIProgram
+from aeneas.tools.build_phoneme_table import BuildPhonemeTableCLI
 from aeneas.tools.convert_syncmap import ConvertSyncMapCLI
 from aeneas.tools.download import DownloadCLI
 from aeneas.tools.execute_job import ExecuteJobCLI
@@ -44,6 +45,7 @@ from aeneas.tools.read_text import ReadTextCLI
 from aeneas.tools.run_sd import RunSDCLI
 from aeneas.tools.run_vad import RunVADCLI
 from aeneas.tools.synthesize_text import SynthesizeTextCLI
+from aeneas.tools.tts_cache import TTSCacheCLI
 from aeneas.tools.validate import ValidateCLI
 import aeneas.globalfunctions as gf
 
@@ -63,6 +65,7 @@ class HydraCLI(AbstractCLIProgram):
         "options": [
         ],
         "parameters": [
+            u"--build-phoneme-table: call aeneas.tools.build_phoneme_table",
             u"--convert-syncmap: call aeneas.tools.convert_syncmap",
             u"--download: call aeneas.tools.download",
             u"--execute-job: call aeneas.tools.execute_job",
@@ -76,6 +79,7 @@ class HydraCLI(AbstractCLIProgram):
             u"--run-sd: call aeneas.tools.run_sd",
             u"--run-vad: call aeneas.tools.run_vad",
             u"--synthesize-text: call aeneas.tools.synthesize_text",
+            u"--tts-cache: call aeneas.tools.tts_cache",
             u"--validate: call aeneas.tools.validate",
         ],
         "examples": [
@@ -87,6 +91,7 @@ class HydraCLI(AbstractCLIProgram):
     }
 
     TOOLS = [
+        (BuildPhonemeTableCLI, [u"--build-phoneme-table"]),
         (ConvertSyncMapCLI, [u"--convert-syncmap"]),
         (DownloadCLI, [u"--download"]),
         (ExecuteJobCLI, [u"--execute-job"]),
@@ -100,6 +105,7 @@ class HydraCLI(AbstractCLIProgram):
         (RunSDCLI, [u"--run-sd"]),
         (RunVADCLI, [u"--run-vad"]),
         (SynthesizeTextCLI, [u"--synthesize-text"]),
+        (TTSCacheCLI, [u"--tts-cache"]),
         (ValidateCLI, [u"--validate"]),
     ]
 
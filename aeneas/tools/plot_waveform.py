@@ -93,6 +93,7 @@ class PlotWaveformCLI(AbstractCLIProgram):
         begin_guides = not self.has_option("--no-begin-guides")
         end_guides = not self.has_option("--no-end-guides")
 
+        afm = None
         try:
             # import or ImportError
             from aeneas.plotter import PlotLabelset
@@ -106,7 +107,7 @@ class PlotWaveformCLI(AbstractCLIProgram):
 
             # add waveform
             afm = AudioFile(input_file_path, rconf=self.rconf, logger=self.logger)
-            afm.read_samples_from_file()
+            afm.read_samples_from_file(hold=True)
             plotter.add_waveform(PlotWaveform(afm, label=label, fast=fast, rconf=self.rconf, logger=self.logger))
 
             # add time scale, if requested
@@ -150,6 +151,10 @@ class PlotWaveformCLI(AbstractCLIProgram):
         except Exception as exc:
             self.print_error(u"An unexpected error occurred while generating the image file:")
             self.print_error(u"%s" % exc)
+        finally:
+            # NOTE release the samples held in the audio buffer registry
+            if afm is not None:
+                afm.clear_data()
 
         return self.ERROR_EXIT_CODE
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Show statistics about or prune a persistent TTS cache directory.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+import sys
+
+from aeneas.tools.abstract_cli_program import AbstractCLIProgram
+from aeneas.ttsdiskcache import TTSDiskCache
+import aeneas.globalfunctions as gf
+
+
+class TTSCacheCLI(AbstractCLIProgram):
+    """
+    Show statistics about or prune a persistent TTS cache directory.
+    """
+    CACHE_DIRECTORY = "/tmp/aeneas_tts_cache"
+
+    NAME = gf.file_name_without_extension(__file__)
+
+    HELP = {
+        "description": u"Show statistics about or prune a persistent TTS cache directory.",
+        "synopsis": [
+            (u"stats CACHE_DIRECTORY", True),
+            (u"prune CACHE_DIRECTORY", True),
+            (u"clear CACHE_DIRECTORY", True)
+        ],
+        "examples": [
+            u"stats %s" % (CACHE_DIRECTORY),
+            u"prune %s" % (CACHE_DIRECTORY),
+            u"prune %s --max-size=512" % (CACHE_DIRECTORY),
+            u"clear %s" % (CACHE_DIRECTORY)
+        ],
+        "options": [
+            u"--max-size=SIZE : prune the cache to SIZE MB (default: tts_cache_dir_max_size)",
+        ]
+    }
+
+    COMMANDS = [u"stats", u"prune", u"clear"]
+
+    def perform_command(self):
+        """
+        Perform command and return the appropriate exit code.
+
+        :rtype: int
+        """
+        if len(self.actual_arguments) < 2:
+            return self.print_help()
+        command = self.actual_arguments[0]
+        cache_path = self.actual_arguments[1]
+        if command not in self.COMMANDS:
+            self.print_error(u"Unknown command '%s'" % (command))
+            return self.ERROR_EXIT_CODE
+        if not gf.directory_exists(cache_path):
+            self.print_error(u"Directory '%s' does not exist" % (cache_path))
+            return self.ERROR_EXIT_CODE
+        max_size = self.has_option_with_value(u"--max-size")
+        if max_size is not None:
+            max_size = gf.safe_int(max_size, None)
+            if (max_size is None) or (max_size < 0):
+                self.print_error(u"The value of --max-size must be a non-negative integer")
+                return self.ERROR_EXIT_CODE
+            max_size *= 1024 * 1024
+
+        cache = TTSDiskCache(cache_path=cache_path, max_size=max_size, rconf=self.rconf, logger=self.logger)
+        if command == u"stats":
+            stats = cache.stats()
+            self.print_generic(u"Directory: %s" % (cache.cache_path))
+            self.print_generic(u"Entries:   %d" % (stats["entries"]))
+            self.print_generic(u"Size:      %.3f MB" % (stats["size"] / 1048576.0))
+            if stats["max_size"] > 0:
+                self.print_generic(u"Max size:  %.3f MB" % (stats["max_size"] / 1048576.0))
+            else:
+                self.print_generic(u"Max size:  unbounded")
+            return self.NO_ERROR_EXIT_CODE
+        if command == u"prune":
+            removed, freed = cache.prune(max_size=max_size)
+        else:
+            removed, freed = cache.clear()
+        self.print_success(u"Removed %d entries (%.3f MB)" % (removed, freed / 1048576.0))
+        return self.NO_ERROR_EXIT_CODE
+
+
+def main():
+    """
+    Execute program.
+    """
+    TTSCacheCLI().run(arguments=sys.argv)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# coding=utf-8
+
+# aeneas is a Python/C library and a set of tools
+# to automagically synchronize audio and text (aka forced alignment)
+#
+# Copyright (C) 2012-2013, Alberto Pettarin (www.albertopettarin.it)
+# Copyright (C) 2013-2015, ReadBeyond Srl   (www.readbeyond.it)
+# Copyright (C) 2015-2017, Alberto Pettarin (www.albertopettarin.it)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+This module contains the following classes:
+
+* :class:`~aeneas.ttsdiskcache.TTSDiskCache`,
+  a persistent, content-addressed cache of synthesized audio files.
+
+.. versionadded:: 1.8.0
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import os
+import tempfile
+import threading
+import time
+
+from aeneas.logger import Loggable
+from aeneas.runtimeconfiguration import RuntimeConfiguration
+import aeneas.globalfunctions as gf
+
+
+class TTSDiskCache(Loggable):
+    """
+    A persistent, content-addressed cache of synthesized audio files,
+    stored in a directory on disk,
+    which can be shared by several processes,
+    and which survives across runs.
+
+    Each entry is the audio file produced by a TTS engine
+    for a text fragment,
+    identified by the SHA-256 digest of the parameters
+    affecting the synthesis
+    (e.g., the TTS engine, its path and version,
+    the voice code, the text, and the output format),
+    computed by :func:`~aeneas.ttsdiskcache.TTSDiskCache.key`.
+    The file of an entry with key ``k``
+    is stored at ``k[0:2]/k.wav`` inside the cache directory.
+
+    Entries are written to a temporary file
+    in the same directory of the entry file,
+    and then atomically renamed,
+    hence concurrent readers never see a partially written entry,
+    and concurrent writers of the same entry do not conflict.
+
+    The modification time of an entry file
+    is updated each time the entry is read,
+    so that, when the total size of the cache
+    exceeds its maximum size,
+    the least recently used entries are removed first.
+    Since the cache might be shared by several processes,
+    the size is checked after writing a certain amount of data
+    (see :data:`~aeneas.ttsdiskcache.TTSDiskCache.PRUNE_EVERY_RATIO`),
+    rather than after each write.
+
+    :param string cache_path: the path of the cache directory;
+                              if ``None``, use ``tts_cache_dir``
+    :param int max_size: the maximum size of the cache, in bytes
+                         (``0`` for unbounded);
+                         if ``None``, use ``tts_cache_dir_max_size``
+    :param rconf: a runtime configuration
+    :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
+    :param logger: the logger object
+    :type  logger: :class:`~aeneas.logger.Logger`
+    :raises: ValueError: if the cache path is ``None``
+    :raises: OSError: if the cache directory cannot be created
+    """
+
+    ENTRY_EXTENSION = u".wav"
+    """ Extension of the entry files """
+
+    PRUNE_RATIO = 0.9
+    """
+    When pruning, remove entries until the total size
+    is below this fraction of the maximum size,
+    so that the cache is not pruned again right after the next write.
+    """
+
+    PRUNE_EVERY_RATIO = 0.05
+    """
+    Check the size of the cache (and prune it, if needed)
+    after writing this fraction of the maximum size.
+    """
+
+    STALE_TEMPORARY_AGE = 3600
+    """
+    Age, in seconds, after which a temporary file
+    (e.g., left by a crashed writer)
+    is removed when pruning the cache.
+    """
+
+    TEMPORARY_EXTENSION = u".tmp"
+    """
+    Extension of the temporary files,
+    followed by ``ENTRY_EXTENSION``,
+    since some TTS engines infer the output format from it.
+    """
+
+    _WRITTEN = {}
+    """ Bytes written since the last size check, keyed by cache path """
+
+    _WRITTEN_LOCK = threading.Lock()
+
+    TAG = u"TTSDiskCache"
+
+    def __init__(self, cache_path=None, max_size=None, rconf=None, logger=None):
+        super(TTSDiskCache, self).__init__(rconf=rconf, logger=logger)
+        if cache_path is None:
+            cache_path = self.rconf[RuntimeConfiguration.TTS_CACHE_DIR]
+        if cache_path is None:
+            self.log_exc(u"The TTS cache path is None", None, True, ValueError)
+        if max_size is None:
+            max_size = self.rconf[RuntimeConfiguration.TTS_CACHE_DIR_MAX_SIZE] * 1024 * 1024
+        self.cache_path = os.path.abspath(cache_path)
+        self.max_size = max(0, int(max_size))
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(self.cache_path):
+            try:
+                os.makedirs(self.cache_path)
+            except OSError:
+                # NOTE another process might have created it meanwhile
+                if not os.path.isdir(self.cache_path):
+                    self.log_exc(u"Unable to create the TTS cache directory '%s'" % (self.cache_path), None, True, OSError)
+        self.log([u"TTS cache directory: '%s' (max size %d)", self.cache_path, self.max_size])
+
+    @classmethod
+    def key(cls, parameters):
+        """
+        Return the key of the entry identified
+        by the given list of parameters,
+        that is, the hexadecimal SHA-256 digest
+        of their Unicode representation.
+
+        :param list parameters: the parameters
+        :rtype: string
+        """
+        return gf.parameters_digest(parameters)
+
+    def entry_path(self, key):
+        """
+        Return the path of the file of the entry with the given key.
+
+        :param string key: the key
+        :rtype: string
+        """
+        return os.path.join(self.cache_path, key[0:2], key + self.ENTRY_EXTENSION)
+
+    def get(self, key):
+        """
+        Return the path of the file of the entry with the given key,
+        marking it as the most recently used one,
+        or ``None`` if the entry is not in the cache.
+
+        Note that the returned file might be removed
+        by another process before it is read.
+
+        :param string key: the key
+        :rtype: string
+        """
+        path = self.entry_path(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def reserve(self, key):
+        """
+        Create an empty temporary file where the entry
+        with the given key can be written,
+        and return its path,
+        to be passed to
+        :func:`~aeneas.ttsdiskcache.TTSDiskCache.commit`
+        or to
+        :func:`~aeneas.ttsdiskcache.TTSDiskCache.discard`.
+
+        :param string key: the key
+        :rtype: string
+        :raises: OSError: if the temporary file cannot be created
+        """
+        directory = os.path.dirname(self.entry_path(key))
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        handler, tmp_path = tempfile.mkstemp(suffix=self.TEMPORARY_EXTENSION + self.ENTRY_EXTENSION, prefix=key[0:8], dir=directory)
+        gf.close_file_handler(handler)
+        return tmp_path
+
+    def commit(self, key, tmp_path):
+        """
+        Atomically store the temporary file
+        returned by :func:`~aeneas.ttsdiskcache.TTSDiskCache.reserve`,
+        already written, as the entry with the given key,
+        and return the path of the entry file.
+
+        :param string key: the key
+        :param string tmp_path: the path of the temporary file
+        :rtype: string
+        """
+        path = self.entry_path(key)
+        size = os.path.getsize(tmp_path)
+        # NOTE os.replace() is atomic also on Windows, where os.rename() fails
+        #      if the destination exists
+        getattr(os, "replace", os.rename)(tmp_path, path)
+        self.log([u"Stored entry '%s' (%d bytes)", key, size])
+        self._written(size)
+        return path
+
+    def discard(self, tmp_path):
+        """
+        Remove the temporary file
+        returned by :func:`~aeneas.ttsdiskcache.TTSDiskCache.reserve`.
+
+        :param string tmp_path: the path of the temporary file
+        """
+        gf.delete_file(None, tmp_path)
+
+    def entries(self):
+        """
+        Return the list of the entries in the cache,
+        as tuples ``(path, size, mtime)``,
+        sorted by modification time (least recently used first).
+
+        :rtype: list
+        """
+        return sorted([e for e in self._scan() if not e[0].endswith(self.TEMPORARY_EXTENSION + self.ENTRY_EXTENSION)], key=lambda e: e[2])
+
+    def stats(self):
+        """
+        Return a dictionary with the statistics of the cache:
+        the number of entries (``entries``),
+        their total size in bytes (``size``),
+        the maximum size in bytes (``max_size``),
+        and the hits and misses of this object
+        (``hits`` and ``misses``).
+
+        :rtype: dict
+        """
+        entries = self.entries()
+        return {
+            "entries": len(entries),
+            "size": sum([e[1] for e in entries]),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def prune(self, max_size=None):
+        """
+        Remove the least recently used entries
+        until the total size of the cache is at most
+        ``PRUNE_RATIO`` times ``max_size``,
+        and remove stale temporary files.
+        Return the pair ``(entries, size)``
+        of the number of removed entries and of the freed bytes.
+
+        :param int max_size: the maximum size, in bytes;
+                             if ``None``, use the maximum size of the cache;
+                             if ``0``, remove all the entries
+        :rtype: tuple ``(int, int)``
+        """
+        if max_size is None:
+            if self.max_size == 0:
+                self.log(u"Unbounded cache: nothing to prune")
+                return (0, 0)
+            max_size = int(self.max_size * self.PRUNE_RATIO)
+        now = time.time()
+        for path, size_nu, mtime in self._scan():
+            if path.endswith(self.TEMPORARY_EXTENSION + self.ENTRY_EXTENSION) and (now - mtime > self.STALE_TEMPORARY_AGE):
+                self._remove(path)
+        entries = self.entries()
+        total = sum([e[1] for e in entries])
+        removed, freed = 0, 0
+        for path, size, mtime_nu in entries:
+            if total - freed <= max_size:
+                break
+            if self._remove(path):
+                removed += 1
+                freed += size
+        self.log([u"Pruned %d entries (%d bytes)", removed, freed])
+        return (removed, freed)
+
+    def clear(self):
+        """
+        Remove all the entries from the cache.
+
+        :rtype: tuple ``(int, int)``
+        """
+        return self.prune(max_size=0)
+
+    def _written(self, size):
+        """
+        Account for ``size`` bytes written to the cache,
+        and prune it if enough data has been written
+        since the last check.
+
+        :param int size: the number of bytes written
+        """
+        if self.max_size == 0:
+            return
+        with self._WRITTEN_LOCK:
+            written = self._WRITTEN.get(self.cache_path, 0) + size
+            check = (written >= self.max_size * self.PRUNE_EVERY_RATIO)
+            self._WRITTEN[self.cache_path] = 0 if check else written
+        if check:
+            self.log(u"Checking the size of the cache...")
+            self.prune()
+            self.log(u"Checking the size of the cache... done")
+
+    def _scan(self):
+        """
+        Return the list of files in the cache,
+        including temporary files,
+        as tuples ``(path, size, mtime)``.
+
+        :rtype: list
+        """
+        result = []
+        for directory in os.listdir(self.cache_path):
+            directory = os.path.join(self.cache_path, directory)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # NOTE removed by another process meanwhile
+                    continue
+                result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def _remove(self, path):
+        """
+        Remove the given file, returning ``True`` on success.
+
+        :param string path: the path of the file
+        :rtype: bool
+        """
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
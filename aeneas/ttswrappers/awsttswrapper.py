@@ -52,13 +52,12 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 import numpy
-import time
+import threading
 import uuid
 
 from aeneas.audiofile import AudioFile
 from aeneas.exacttiming import TimeValue
 from aeneas.language import Language
-from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
 import aeneas.globalfunctions as gf
 
@@ -94,6 +93,11 @@ class AWSTTSWrapper(BaseTTSWrapper):
 
         "tts=aws|tts_cache=True"
 
+    If ``tts_rate`` is set, the text is sent as an SSML document,
+    setting the speaking rate with a ``prosody`` element ::
+
+        "tts=aws|tts_rate=1.500"
+
     See :class:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper`
     for the available functions.
     Below are listed the languages supported by this wrapper.
@@ -263,58 +267,63 @@ class AWSTTSWrapper(BaseTTSWrapper):
     SAMPLE_RATE = 16000
     """ Synthesize 16kHz PCM16 mono """
 
+    THROTTLING_ERROR_CODES = [u"ThrottlingException", u"TooManyRequestsException"]
+    """ Error codes returned by AWS when throttling requests """
+
     TAG = u"AWSTTSWrapper"
 
     def __init__(self, rconf=None, logger=None):
         super(AWSTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.client = None
+        self.client_lock = threading.Lock()
+
+    def _get_client(self):
+        """
+        Return the AWS Polly client of this wrapper,
+        creating it the first time,
+        so that connections are reused across requests.
+
+        :rtype: ``boto3`` client
+        """
+        with self.client_lock:
+            if self.client is None:
+                self.log(u"Importing boto3...")
+                import boto3
+                self.log(u"Importing boto3... done")
+                # NOTE clients are thread-safe, while sessions are not
+                self.client = boto3.client("polly")
+            return self.client
 
     def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
-        self.log(u"Importing boto3...")
-        import boto3
-        self.log(u"Importing boto3... done")
+        polly_client = self._get_client()
 
-        # prepare client
-        polly_client = boto3.client("polly")
+        # set the speaking rate via SSML, if requested
+        text_type = u"text"
+        if self.rate is not None:
+            text = self._rate_to_ssml(text, self.rate)
+            text_type = u"ssml"
 
         # post request
-        sleep_delay = self.rconf[RuntimeConfiguration.TTS_API_SLEEP]
-        attempts = self.rconf[RuntimeConfiguration.TTS_API_RETRY_ATTEMPTS]
-        self.log([u"Sleep delay:    %.3f", sleep_delay])
-        self.log([u"Retry attempts: %d", attempts])
-
-        while attempts > 0:
-            self.log(u"Sleeping to throttle API usage...")
-            time.sleep(sleep_delay)
-            self.log(u"Sleeping to throttle API usage... done")
-            self.log(u"Posting...")
+        def request():
             try:
                 response = polly_client.synthesize_speech(
                     Text=text,
+                    TextType=text_type,
                     OutputFormat=self.SAMPLE_FORMAT,
                     SampleRate="%d" % self.SAMPLE_RATE,
                     VoiceId=voice_code
                 )
             except Exception as exc:
-                self.log_exc(u"Unexpected exception on HTTP POST. Are you offline?", exc, True, ValueError)
-            self.log(u"Posting... done")
-            self.log(u"Reading response...")
-            try:
-                status_code = response["ResponseMetadata"]["HTTPStatusCode"]
-                response_content = response["AudioStream"].read()
-            except Exception as exc:
-                self.log_warn(u"Error while reading the response status code or the response content")
-                status_code = 999
-            self.log(u"Reading response... done")
-            self.log([u"Status code: %d", status_code])
-            if status_code == 200:
-                self.log(u"Got status code 200, break")
-                break
-            else:
-                self.log_warn(u"Got status code other than 200, retry")
-                attempts -= 1
-
-        if attempts <= 0:
-            self.log_exc(u"All API requests returned status code != 200", None, True, ValueError)
+                # NOTE botocore raises ClientError on error responses
+                error = getattr(exc, "response", None)
+                if not isinstance(error, dict):
+                    raise
+                status_code = error.get("ResponseMetadata", {}).get("HTTPStatusCode", 999)
+                if error.get("Error", {}).get("Code") in self.THROTTLING_ERROR_CODES:
+                    status_code = 429
+                return (status_code, None, None)
+            return (response["ResponseMetadata"]["HTTPStatusCode"], response["AudioStream"].read(), None)
+        response_content = self._api_request(request)
 
         # save to file if requested
         if output_file_path is None:
@@ -338,7 +347,7 @@ class AWSTTSWrapper(BaseTTSWrapper):
         self.log([u"Number of frames: %d", number_of_frames])
         self.log([u"Audio length (s): %.3f", audio_length])
         audio_format = "pcm16"
-        audio_samples = numpy.fromstring(response_content, dtype=numpy.int16).astype("float64") / 32768
+        audio_samples = numpy.frombuffer(response_content, dtype=numpy.int16).astype("float64") / 32768
 
         # return data
         return (True, (audio_length, audio_sample_rate, audio_format, audio_samples))
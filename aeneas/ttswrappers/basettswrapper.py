@@ -33,13 +33,21 @@ This module contains the following classes:
 from __future__ import absolute_import
 from __future__ import print_function
 import io
+import os
+import shutil
 import subprocess
+import threading
+import time
+from xml.sax.saxutils import escape
 
 from aeneas.audiofile import AudioFile
 from aeneas.audiofile import AudioFileUnsupportedFormatError
 from aeneas.exacttiming import TimeValue
 from aeneas.logger import Loggable
+from aeneas.resampler import Resampler
 from aeneas.runtimeconfiguration import RuntimeConfiguration
+from aeneas.tokenbucket import TokenBucket
+from aeneas.ttsdiskcache import TTSDiskCache
 import aeneas.globalfunctions as gf
 
 
@@ -63,6 +71,8 @@ class TTSCache(Loggable):
     since we might want to close it explicitly
     before removing the file from disk.
 
+    The cache can be used from multiple threads.
+
     :param rconf: a runtime configuration
     :type  rconf: :class:`~aeneas.runtimeconfiguration.RuntimeConfiguration`
     :param logger: the logger object
@@ -77,6 +87,7 @@ class TTSCache(Loggable):
 
     def _initialize_cache(self):
         self.cache = dict()
+        self.lock = threading.Lock()
         self.log(u"Cache initialized")
 
     def __len__(self):
@@ -109,9 +120,10 @@ class TTSCache(Loggable):
         :type  file_info: tuple ``(handler, path)``
         :raises: ValueError if the key is already present in the cache
         """
-        if self.is_cached(fragment_info):
-            raise ValueError(u"Attempt to add text already cached")
-        self.cache[fragment_info] = file_info
+        with self.lock:
+            if self.is_cached(fragment_info):
+                raise ValueError(u"Attempt to add text already cached")
+            self.cache[fragment_info] = file_info
 
     def get(self, fragment_info):
         """
@@ -171,6 +183,15 @@ class BaseTTSWrapper(Loggable):
     :raises: NotImplementedError: if none of the call methods is available
     """
 
+    CLI_PARAMETER_RATE_FUNCTION = "RATE_FUNCTION"
+    """
+    Placeholder to specify a list of arguments
+    for the TTS engine to set the speaking rate,
+    if not the default one.
+
+    .. versionadded:: 1.8.0
+    """
+
     CLI_PARAMETER_TEXT_PATH = "TEXT_PATH"
     """
     Placeholder to specify the path to the UTF-8 encoded file
@@ -277,6 +298,50 @@ class BaseTTSWrapper(Loggable):
     set here the name of the corresponding Python C/C++ extension.
     """
 
+    CHARACTERS_PER_SECOND = 14.0
+    """
+    The approximate number of characters per second
+    spoken by the TTS engine at its default speaking rate,
+    used to estimate the duration of the synthetic wave
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.TTS_RATE_AUTO`).
+
+    .. versionadded:: 1.8.0
+    """
+
+    MIN_RATE = 0.500
+    """
+    The minimum speaking rate supported by the TTS engine,
+    as a multiple of its default speaking rate.
+
+    .. versionadded:: 1.8.0
+    """
+
+    MAX_RATE = 2.000
+    """
+    The maximum speaking rate supported by the TTS engine,
+    as a multiple of its default speaking rate.
+
+    .. versionadded:: 1.8.0
+    """
+
+    PHONEME_SEPARATOR = u"_"
+    """
+    The string separating the phonemes
+    output by the TTS engine
+    (see :func:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper.set_subprocess_phoneme_arguments`).
+
+    .. versionadded:: 1.8.0
+    """
+
+    PHONEME_MARKS = u"',%=!"
+    """
+    The characters (e.g., stress and length marks)
+    removed from the begin and the end of the phonemes
+    output by the TTS engine.
+
+    .. versionadded:: 1.8.0
+    """
+
     TAG = u"BaseTTSWrapper"
 
     def __init__(self, rconf=None, logger=None):
@@ -284,14 +349,22 @@ class BaseTTSWrapper(Loggable):
             raise NotImplementedError(u"You must implement at least one call method: subprocess, C extension, or Python")
         super(BaseTTSWrapper, self).__init__(rconf=rconf, logger=logger)
         self.subprocess_arguments = []
+        self.subprocess_pipe_arguments = None
+        self.subprocess_phoneme_arguments = None
+        self.phonemes_cache = {}
         self.tts_path = self.rconf[RuntimeConfiguration.TTS_PATH]
         if self.tts_path is None:
             self.log(u"No tts_path specified in rconf, setting default TTS path")
             self.tts_path = self.DEFAULT_TTS_PATH
         self.use_cache = self.rconf[RuntimeConfiguration.TTS_CACHE]
         self.cache = TTSCache(rconf=rconf, logger=logger) if self.use_cache else None
+        self.disk_cache = None
+        if self.rconf[RuntimeConfiguration.TTS_CACHE_DIR] is not None:
+            self.disk_cache = TTSDiskCache(rconf=rconf, logger=logger)
+        self.__tts_path_version = None
         self.log([u"TTS path is             %s", self.tts_path])
         self.log([u"TTS cache?              %s", self.use_cache])
+        self.log([u"TTS cache directory?    %s", self.disk_cache is not None])
         self.log([u"Has Python      call?   %s", self.HAS_PYTHON_CALL])
         self.log([u"Has C extension call?   %s", self.HAS_C_EXTENSION_CALL])
         self.log([u"Has subprocess  call?   %s", self.HAS_SUBPROCESS_CALL])
@@ -328,6 +401,46 @@ class BaseTTSWrapper(Loggable):
         """
         return []
 
+    @property
+    def rate(self):
+        """
+        The speaking rate requested in the runtime configuration,
+        as a multiple of the default speaking rate of the TTS engine,
+        clamped to ``[MIN_RATE, MAX_RATE]``,
+        or ``None`` if the default speaking rate should be used.
+
+        :rtype: float
+
+        .. versionadded:: 1.8.0
+        """
+        rate = self.rconf[RuntimeConfiguration.TTS_RATE]
+        if (rate is None) or (rate == 1.0):
+            return None
+        return min(max(rate, self.MIN_RATE), self.MAX_RATE)
+
+    def _rate_to_ssml(self, text, rate):
+        """
+        Return the SSML document speaking the given text
+        at the given (not ``None``) speaking ``rate``,
+        for the TTS APIs accepting SSML input.
+
+        :param string text: the text to be synthesized
+        :param float rate: the speaking rate
+        :rtype: string
+
+        .. versionadded:: 1.8.0
+        """
+        return u"<speak><prosody rate=\"%d%%\">%s</prosody></speak>" % (int(round(rate * 100)), escape(text))
+
+    def _rate_to_subprocess(self, rate):
+        """
+        Convert the (not ``None``) speaking ``rate`` to a list of parameters
+        used when calling the TTS via subprocess.
+
+        .. versionadded:: 1.8.0
+        """
+        return []
+
     def clear_cache(self):
         """
         Clear the TTS cache, removing all cache files from disk.
@@ -338,6 +451,196 @@ class BaseTTSWrapper(Loggable):
             self.log(u"Requested to clear TTS cache")
             self.cache.clear()
 
+    def _api_token_bucket(self):
+        """
+        Return the token bucket limiting the rate of the requests
+        to the TTS API of this wrapper,
+        shared by all the wrappers of the same class
+        in the current process,
+        or ``None`` if the requests are not limited.
+
+        .. versionadded:: 1.8.0
+
+        :rtype: :class:`~aeneas.tokenbucket.TokenBucket`
+        """
+        rate = self.rconf[RuntimeConfiguration.TTS_API_RATE]
+        if rate is None:
+            sleep_delay = self.rconf[RuntimeConfiguration.TTS_API_SLEEP]
+            rate = (1 / float(sleep_delay)) if sleep_delay > 0 else 0
+        if rate <= 0:
+            return None
+        return TokenBucket.shared(self.TAG, rate, max(1, self.rconf[RuntimeConfiguration.TTS_API_BURST]))
+
+    def _api_request(self, request_function):
+        """
+        Send a request to the TTS API of this wrapper,
+        by calling ``request_function``,
+        and return the content of the response.
+
+        ``request_function`` takes no arguments
+        and returns a tuple ``(status_code, content, retry_after)``,
+        where ``retry_after`` is the number of seconds
+        the service asks to wait before retrying, or ``None``.
+
+        The requests are rate limited
+        by :func:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper._api_token_bucket`.
+        A request failing because of too many requests (status code ``429``),
+        a server error (status code ``5xx``),
+        or an exception (e.g., a connection error)
+        is retried up to ``tts_api_retry_attempts`` times in total,
+        waiting ``tts_api_backoff`` seconds,
+        doubled at each retry,
+        or ``retry_after`` seconds, if longer.
+
+        .. versionadded:: 1.8.0
+
+        :param function request_function: the function sending the request
+        :rtype: bytes
+        :raises: ValueError: if the request failed
+        """
+        bucket = self._api_token_bucket()
+        attempts = self.rconf[RuntimeConfiguration.TTS_API_RETRY_ATTEMPTS]
+        backoff = float(self.rconf[RuntimeConfiguration.TTS_API_BACKOFF])
+        self.log([u"Retry attempts: %d", attempts])
+        for attempt in range(1, attempts + 1):
+            if bucket is not None:
+                waited = bucket.acquire()
+                self.log([u"Waited %.3f seconds to throttle API usage", waited])
+            self.log(u"Posting...")
+            retry_after = None
+            try:
+                status_code, content, retry_after = request_function()
+                self.log([u"Status code: %d", status_code])
+            except Exception as exc:
+                self.log_exc(u"Unexpected exception on HTTP POST. Are you offline?", exc, False, None)
+                status_code = None
+            self.log(u"Posting... done")
+            if status_code == 200:
+                return content
+            if (status_code is not None) and (status_code != 429) and (status_code < 500):
+                self.log_exc(u"The API request returned status code %d" % (status_code), None, True, ValueError)
+            if attempt < attempts:
+                delay = max(backoff * (2 ** (attempt - 1)), retry_after or 0)
+                self.log_warn([u"API request failed, retrying in %.3f seconds", delay])
+                time.sleep(delay)
+        self.log_exc(u"All API requests failed", None, True, ValueError)
+
+    def _disk_cache_parameters(self, text, voice_code):
+        """
+        Return the list of the parameters identifying
+        the audio file synthesized for the given text and voice code,
+        used as the key of the persistent TTS cache.
+
+        The speaking rate is included, if not the default one.
+        Concrete subclasses whose output depends
+        on additional parameters
+        (e.g., the API endpoint)
+        must extend this list.
+
+        :param string text: the text to be synthesized
+        :param string voice_code: the voice code
+        :rtype: list
+
+        .. versionadded:: 1.8.0
+        """
+        parameters = [
+            self.__class__.__name__,
+            self.tts_path,
+            self._tts_path_version(),
+            voice_code,
+            text,
+            self.OUTPUT_AUDIO_FORMAT,
+        ]
+        # NOTE add the rate only if not the default one,
+        #      so that existing cache entries remain valid
+        if self.rate is not None:
+            parameters.append(u"rate=%.3f" % (self.rate))
+        return parameters
+
+    def _tts_path_version(self):
+        """
+        Return a string identifying the version
+        of the TTS executable at ``self.tts_path``,
+        built from its size and modification time,
+        so that entries of the persistent TTS cache
+        are not reused if the TTS engine is updated,
+        or ``None`` if the executable cannot be found.
+
+        :rtype: string
+
+        .. versionadded:: 1.8.0
+        """
+        if (self.__tts_path_version is None) and (self.tts_path is not None):
+            candidates = [self.tts_path]
+            if os.path.dirname(self.tts_path) == u"":
+                candidates = [os.path.join(d, self.tts_path) for d in os.environ.get("PATH", u"").split(os.pathsep)]
+            for candidate in candidates:
+                if os.path.isfile(candidate):
+                    stat = os.stat(candidate)
+                    self.__tts_path_version = u"%d:%d" % (stat.st_size, int(stat.st_mtime))
+                    break
+        return self.__tts_path_version
+
+    def _disk_cached_helper(self, helper_function):
+        """
+        Return a function with the same signature
+        of the given ``helper_function``,
+        which reads the audio file synthesized for a text fragment
+        from the persistent TTS cache, if present,
+        or calls ``helper_function`` and stores its output
+        in the persistent TTS cache otherwise.
+
+        :rtype: function
+
+        .. versionadded:: 1.8.0
+        """
+        def helper(text, voice_code, output_file_path=None, return_audio_data=True):
+            key = self.disk_cache.key(self._disk_cache_parameters(text, voice_code))
+            cached_path = self.disk_cache.get(key)
+            if cached_path is not None:
+                self.log([u"Fragment in the TTS cache directory: '%s'", cached_path])
+                try:
+                    if output_file_path is not None:
+                        shutil.copyfile(cached_path, output_file_path)
+                    if not return_audio_data:
+                        return (True, None)
+                    succeeded, data = self._read_audio_data(cached_path)
+                    if succeeded:
+                        return (True, data)
+                except (IOError, OSError) as exc:
+                    self.log_exc(u"Unable to read the cached fragment", exc, False, None)
+                # NOTE e.g., removed by another process meanwhile
+                self.log_warn(u"Unable to read the cached fragment: synthesizing it again")
+            try:
+                tmp_path = self.disk_cache.reserve(key)
+            except (IOError, OSError) as exc:
+                self.log_exc(u"Unable to write to the TTS cache directory", exc, False, None)
+                return helper_function(text=text, voice_code=voice_code, output_file_path=output_file_path, return_audio_data=return_audio_data)
+            try:
+                succeeded, data = helper_function(
+                    text=text,
+                    voice_code=voice_code,
+                    output_file_path=tmp_path,
+                    return_audio_data=return_audio_data
+                )
+                if (
+                        (not succeeded) or
+                        ((data is not None) and (data[0] <= 0)) or
+                        (gf.file_size(tmp_path) <= 0)
+                ):
+                    # NOTE do not cache failures, fragments with zero duration,
+                    #      or helpers not writing the output file
+                    self.disk_cache.discard(tmp_path)
+                    return (succeeded, data)
+                if output_file_path is not None:
+                    shutil.copyfile(tmp_path, output_file_path)
+                self.disk_cache.commit(key, tmp_path)
+                return (succeeded, data)
+            except Exception:
+                self.disk_cache.discard(tmp_path)
+                raise
+        return helper
+
     def set_subprocess_arguments(self, subprocess_arguments):
         """
         Set the list of arguments that the wrapper will pass to ``subprocess``.
@@ -360,13 +663,128 @@ class BaseTTSWrapper(Loggable):
         self.subprocess_arguments = subprocess_arguments
         self.log([u"Subprocess arguments: %s", subprocess_arguments])
 
-    def synthesize_multiple(self, text_file, output_file_path, quit_after=None, backwards=False):
+    def set_subprocess_pipe_arguments(self, subprocess_pipe_arguments):
+        """
+        Set the list of arguments that the wrapper will pass to ``subprocess``
+        if ``tts_pipe`` is ``True``,
+        to make the TTS engine read the text from stdin
+        (``CLI_PARAMETER_TEXT_STDIN``)
+        and write the audio data to stdout
+        (``CLI_PARAMETER_WAVE_STDOUT``),
+        so that no temporary file is needed.
+
+        See :func:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper.set_subprocess_arguments`.
+
+        .. versionadded:: 1.8.0
+
+        :param list subprocess_pipe_arguments: the list of arguments to be passed to
+                                               the TTS engine via subprocess
+        """
+        self.subprocess_pipe_arguments = subprocess_pipe_arguments
+        self.log([u"Subprocess pipe arguments: %s", subprocess_pipe_arguments])
+
+    def set_subprocess_phoneme_arguments(self, subprocess_phoneme_arguments):
+        """
+        Set the list of arguments that the wrapper will pass to ``subprocess``
+        to make the TTS engine read the text from stdin
+        (``CLI_PARAMETER_TEXT_STDIN``)
+        and write its phonemes to stdout,
+        separated by whitespace or by ``PHONEME_SEPARATOR``,
+        without synthesizing it.
+
+        See :func:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper.set_subprocess_arguments`.
+
+        .. versionadded:: 1.8.0
+
+        :param list subprocess_phoneme_arguments: the list of arguments to be passed to
+                                                  the TTS engine via subprocess
+        """
+        self.subprocess_phoneme_arguments = subprocess_phoneme_arguments
+        self.log([u"Subprocess phoneme arguments: %s", subprocess_phoneme_arguments])
+
+    @property
+    def has_phoneme_output(self):
+        """
+        Return ``True`` if the TTS engine can output
+        the phonemes of a text without synthesizing it.
+
+        .. versionadded:: 1.8.0
+
+        :rtype: bool
+        """
+        return self.subprocess_phoneme_arguments is not None
+
+    def phonemes(self, text, voice_code):
+        """
+        Return the list of the phonemes of the given text,
+        output by the TTS engine with the given voice code,
+        without synthesizing it,
+        or ``None`` if the TTS engine cannot output phonemes
+        or if an error occurred.
+
+        The phonemes of each text and voice code
+        are computed only once.
+
+        .. versionadded:: 1.8.0
+
+        :param string text: the text
+        :param string voice_code: the voice code
+        :rtype: list of strings
+        """
+        if not self.has_phoneme_output:
+            return None
+        if len(text) == 0:
+            return []
+        key = (voice_code, text)
+        if key in self.phonemes_cache:
+            return self.phonemes_cache[key]
+        arguments = []
+        for arg in self.subprocess_phoneme_arguments:
+            if arg == self.CLI_PARAMETER_VOICE_CODE_STRING:
+                arguments.append(voice_code)
+            elif arg != self.CLI_PARAMETER_TEXT_STDIN:
+                arguments.append(arg)
+        self.log([u"Calling with arguments '%s'", arguments])
+        try:
+            proc = subprocess.Popen(
+                arguments,
+                stdout=subprocess.PIPE,
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            (stdoutdata, stderrdata) = proc.communicate(input=gf.safe_bytes(text))
+            proc.stdout.close()
+            proc.stdin.close()
+            proc.stderr.close()
+        except Exception as exc:
+            self.log_exc(u"An unexpected error occurred while calling TTS engine for phonemes", exc, False, None)
+            return None
+        if proc.returncode != 0:
+            self.log_warn([u"TTS engine exited with code %d while outputting phonemes", proc.returncode])
+            return None
+        phonemes = []
+        for token in gf.safe_unicode(stdoutdata).replace(self.PHONEME_SEPARATOR, u" ").split():
+            phoneme = token.strip(self.PHONEME_MARKS)
+            # NOTE skip the pauses, output as length marks alone
+            if len(phoneme.strip(u":")) > 0:
+                phonemes.append(phoneme)
+        self.phonemes_cache[key] = phonemes
+        return phonemes
+
+    def synthesize_multiple(self, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
         """
         Synthesize the text contained in the given fragment list
         into a WAVE file.
 
         Return a tuple (anchors, total_time, num_chars).
 
+        If ``output_audio_file`` is not ``None``,
+        the synthesized audio samples are also stored into it.
+        In this case, ``output_file_path`` can be ``None``,
+        and no WAVE file will be written,
+        unless the TTS engine is called via a C extension,
+        which always writes a (temporary) WAVE file.
+
         Concrete subclasses must implement at least one
         of the following private functions:
 
@@ -381,6 +799,8 @@ class BaseTTSWrapper(Loggable):
                                  reaching this many seconds
         :type quit_after: :class:`~aeneas.exacttiming.TimeValue`
         :param bool backwards: if > 0, synthesize from the end of the text file
+        :param output_audio_file: the audio file where the samples will be stored, or ``None``
+        :type  output_audio_file: :class:`~aeneas.audiofile.AudioFile`
         :rtype: tuple (anchors, total_time, num_chars)
         :raises: TypeError: if ``text_file`` is ``None`` or
                             one of the text fragments is not a Unicode string
@@ -413,14 +833,16 @@ class BaseTTSWrapper(Loggable):
             self.log(u"Synthesizing backwards")
 
         # check that output_file_path can be written
-        if not gf.file_can_be_written(output_file_path):
+        if (output_file_path is None) and (output_audio_file is None):
+            self.log_exc(u"Both output_file_path and output_audio_file are None", None, True, TypeError)
+        if (output_file_path is not None) and (not gf.file_can_be_written(output_file_path)):
             self.log_exc(u"Cannot write to output file '%s'" % (output_file_path), None, True, OSError)
 
         # first, call Python function _synthesize_multiple_python() if available
         if self.HAS_PYTHON_CALL:
             self.log(u"Calling TTS engine via Python")
             try:
-                computed, result = self._synthesize_multiple_python(text_file, output_file_path, quit_after, backwards)
+                computed, result = self._synthesize_multiple_python(text_file, output_file_path, quit_after, backwards, output_audio_file)
                 if computed:
                     self.log(u"The _synthesize_multiple_python call was successful, returning anchors")
                     return result
@@ -431,18 +853,18 @@ class BaseTTSWrapper(Loggable):
 
         # call _synthesize_multiple_c_extension() or _synthesize_multiple_subprocess()
         self.log(u"Calling TTS engine via C extension or subprocess")
-        c_extension_function = self._synthesize_multiple_c_extension if self.HAS_C_EXTENSION_CALL else None
+        c_extension_function = self._synthesize_multiple_c_extension_audio_file if self.HAS_C_EXTENSION_CALL else None
         subprocess_function = self._synthesize_multiple_subprocess if self.HAS_SUBPROCESS_CALL else None
         return gf.run_c_extension_with_fallback(
             self.log,
             self.C_EXTENSION_NAME,
             c_extension_function,
             subprocess_function,
-            (text_file, output_file_path, quit_after, backwards),
+            (text_file, output_file_path, quit_after, backwards, output_audio_file),
             rconf=self.rconf
         )
 
-    def _synthesize_multiple_python(self, text_file, output_file_path, quit_after=None, backwards=False):
+    def _synthesize_multiple_python(self, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
         """
         Synthesize multiple fragments via a Python call.
 
@@ -454,7 +876,8 @@ class BaseTTSWrapper(Loggable):
             text_file=text_file,
             output_file_path=output_file_path,
             quit_after=quit_after,
-            backwards=backwards
+            backwards=backwards,
+            output_audio_file=output_audio_file
         )
         self.log(u"Synthesizing multiple via a Python call... done")
         return ret
@@ -482,6 +905,149 @@ class BaseTTSWrapper(Loggable):
         """
         raise NotImplementedError(u"This function must be implemented in concrete subclasses supporting C extension call")
 
+    def _synthesize_multiple_c_extension_data(self, text_file, quit_after=None, backwards=False):
+        """
+        Synthesize multiple fragments via a Python C extension,
+        returning the audio data in memory,
+        as PCM16 mono samples (little-endian, without header),
+        instead of writing a WAVE file.
+
+        Concrete subclasses might implement it,
+        if their C extension can be called that way.
+
+        :rtype: tuple (result, ((anchors, current_time, num_chars), sample_rate, data))
+        """
+        return (False, None)
+
+    def _c_parameters(self, quit_after, backwards):
+        """
+        Convert the given parameters from Python values
+        to the values passed to the C extension.
+
+        :rtype: tuple (float, int)
+        """
+        try:
+            c_quit_after = float(quit_after)
+        except TypeError:
+            c_quit_after = 0.0
+        c_backwards = 0
+        if backwards:
+            c_backwards = 1
+        self.log([u"c_quit_after:     %.3f", c_quit_after])
+        self.log([u"c_backwards:      %d", c_backwards])
+        return (c_quit_after, c_backwards)
+
+    def _u_text(self, text_file):
+        """
+        Return the list of ``(voice_code, text)`` tuples
+        of the fragments of the given text file.
+
+        :rtype: list
+        """
+        self.log(u"Preparing u_text...")
+        u_text = []
+        for fragment in text_file.fragments:
+            f_lang = fragment.language
+            f_text = fragment.filtered_text
+            if f_lang is None:
+                f_lang = self.DEFAULT_LANGUAGE
+            f_voice_code = self._language_to_voice_code(f_lang)
+            if f_text is None:
+                f_text = u""
+            u_text.append((f_voice_code, f_text))
+        self.log(u"Preparing u_text... done")
+        return u_text
+
+    def _anchors(self, text_file, sf, intervals, backwards):
+        """
+        Return the tuple ``(anchors, current_time, num_chars)``
+        for the first ``sf`` fragments of the given text file,
+        synthesized in the given intervals.
+
+        :rtype: tuple (list, :class:`~aeneas.exacttiming.TimeValue`, int)
+        """
+        anchors = []
+        current_time = TimeValue("0.000")
+        num_chars = 0
+        fragments = text_file.fragments
+        if backwards:
+            fragments = fragments[::-1]
+        for i in range(sf):
+            # get the correct fragment
+            fragment = fragments[i]
+            # store for later output
+            anchors.append([
+                TimeValue(intervals[i][0]),
+                fragment.identifier,
+                fragment.filtered_text
+            ])
+            # increase the character counter
+            num_chars += fragment.characters
+            # update current_time
+            current_time = TimeValue(intervals[i][1])
+
+        # NOTE anchors do not make sense if backwards == True
+        self.log([u"Returning %d time anchors", len(anchors)])
+        self.log([u"Current time %.3f", current_time])
+        self.log([u"Synthesized %d characters", num_chars])
+        return (anchors, current_time, num_chars)
+
+    def _synthesize_multiple_c_extension_audio_file(self, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
+        """
+        Synthesize multiple fragments via a Python C extension,
+        calling ``_synthesize_multiple_c_extension()``.
+
+        Since the C extension always writes a WAVE file,
+        if ``output_audio_file`` is not ``None``,
+        the samples are read from the written file
+        (a temporary one, if ``output_file_path`` is ``None``)
+        and stored into ``output_audio_file``,
+        unless ``output_file_path`` is ``None``
+        and ``_synthesize_multiple_c_extension_data()``
+        returns the audio data in memory.
+
+        :rtype: tuple (result, (anchors, current_time, num_chars))
+        """
+        if self.rate is not None:
+            # NOTE the C extensions cannot set the speaking rate
+            self.log(u"Speaking rate requested => not calling the C extension")
+            return (False, None)
+        if output_audio_file is None:
+            return self._synthesize_multiple_c_extension(text_file, output_file_path, quit_after, backwards)
+        if output_file_path is None:
+            computed, result = self._synthesize_multiple_c_extension_data(text_file, quit_after, backwards)
+            if computed:
+                result, sample_rate, data = result
+                audio_file = AudioFile(rconf=self.rconf, logger=self.logger)
+                audio_file.read_samples_from_pcm_data(data, sample_rate)
+                output_audio_file.audio_format = audio_file.audio_format
+                output_audio_file.audio_channels = 1
+                output_audio_file.audio_sample_rate = audio_file.audio_sample_rate
+                output_audio_file.add_samples(audio_file.audio_samples)
+                output_audio_file.minimize_memory()
+                return (True, result)
+        synt_tmp_file = (output_file_path is None)
+        if synt_tmp_file:
+            self.log(u"Synthesizing into a temporary file...")
+            output_file_handler, output_file_path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
+        try:
+            computed, result = self._synthesize_multiple_c_extension(text_file, output_file_path, quit_after, backwards)
+            if computed:
+                succeeded, data = self._read_audio_data(output_file_path)
+                if not succeeded:
+                    return (False, None)
+                duration_nu, sample_rate, codec, samples = data
+                output_audio_file.audio_format = codec
+                output_audio_file.audio_channels = 1
+                output_audio_file.audio_sample_rate = sample_rate
+                output_audio_file.add_samples(samples)
+                output_audio_file.minimize_memory()
+            return (computed, result)
+        finally:
+            if synt_tmp_file:
+                self.log([u"Removing temporary output file path '%s'", output_file_path])
+                gf.delete_file(output_file_handler, output_file_path)
+
     def _synthesize_single_c_extension_helper(self, text, voice_code, output_file_path=None):
         """
         This is an helper function to synthesize a single text fragment via a Python C extension.
@@ -493,7 +1059,7 @@ class BaseTTSWrapper(Loggable):
         """
         raise NotImplementedError(u"This function might be implemented in concrete subclasses supporting C extension call")
 
-    def _synthesize_multiple_subprocess(self, text_file, output_file_path, quit_after=None, backwards=False):
+    def _synthesize_multiple_subprocess(self, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
         """
         Synthesize multiple fragments via ``subprocess``.
 
@@ -505,7 +1071,8 @@ class BaseTTSWrapper(Loggable):
             text_file=text_file,
             output_file_path=output_file_path,
             quit_after=quit_after,
-            backwards=backwards
+            backwards=backwards,
+            output_audio_file=output_audio_file
         )
         self.log(u"Synthesizing multiple via subprocess... done")
         return ret
@@ -532,8 +1099,15 @@ class BaseTTSWrapper(Loggable):
             self.log(u"len(text) is zero: returning 0.000")
             return (True, (TimeValue("0.000"), None, None, None))
 
+        # read the audio data from stdout, if possible
+        subprocess_arguments = self.subprocess_arguments
+        if (self.rconf[RuntimeConfiguration.TTS_PIPE]) and (self.subprocess_pipe_arguments is not None):
+            self.log(u"Using subprocess pipe arguments")
+            subprocess_arguments = self.subprocess_pipe_arguments
+        wave_stdout = (self.CLI_PARAMETER_WAVE_STDOUT in subprocess_arguments)
+
         # create a temporary output file if needed
-        synt_tmp_file = (output_file_path is None)
+        synt_tmp_file = (output_file_path is None) and (not wave_stdout)
         if synt_tmp_file:
             self.log(u"Synthesizer helper called with output_file_path=None => creating temporary output file")
             output_file_handler, output_file_path = gf.tmp_file(suffix=u".wav", root=self.rconf[RuntimeConfiguration.TMP_PATH])
@@ -542,7 +1116,7 @@ class BaseTTSWrapper(Loggable):
         try:
             # if the TTS engine reads text from file,
             # write the text into a temporary file
-            if self.CLI_PARAMETER_TEXT_PATH in self.subprocess_arguments:
+            if self.CLI_PARAMETER_TEXT_PATH in subprocess_arguments:
                 self.log(u"TTS engine reads text from file")
                 tmp_text_file_handler, tmp_text_file_path = gf.tmp_file(suffix=u".txt", root=self.rconf[RuntimeConfiguration.TMP_PATH])
                 self.log([u"Creating temporary text file '%s'...", tmp_text_file_path])
@@ -557,11 +1131,14 @@ class BaseTTSWrapper(Loggable):
             # copy all relevant arguments
             self.log(u"Creating arguments list...")
             arguments = []
-            for arg in self.subprocess_arguments:
+            for arg in subprocess_arguments:
                 if arg == self.CLI_PARAMETER_VOICE_CODE_FUNCTION:
                     arguments.extend(self._voice_code_to_subprocess(voice_code))
                 elif arg == self.CLI_PARAMETER_VOICE_CODE_STRING:
                     arguments.append(voice_code)
+                elif arg == self.CLI_PARAMETER_RATE_FUNCTION:
+                    if self.rate is not None:
+                        arguments.extend(self._rate_to_subprocess(self.rate))
                 elif arg == self.CLI_PARAMETER_TEXT_PATH:
                     arguments.append(tmp_text_file_path)
                 elif arg == self.CLI_PARAMETER_WAVE_PATH:
@@ -580,19 +1157,16 @@ class BaseTTSWrapper(Loggable):
             self.log(u"Calling TTS engine...")
             self.log([u"Calling with arguments '%s'", arguments])
             self.log([u"Calling with text '%s'", text])
+            # NOTE binary pipes, since stdout might carry audio data
             proc = subprocess.Popen(
                 arguments,
                 stdout=subprocess.PIPE,
                 stdin=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True
+                stderr=subprocess.PIPE
             )
-            if self.CLI_PARAMETER_TEXT_STDIN in self.subprocess_arguments:
+            if self.CLI_PARAMETER_TEXT_STDIN in subprocess_arguments:
                 self.log(u"Passing text via stdin...")
-                if gf.PY2:
-                    (stdoutdata, stderrdata) = proc.communicate(input=gf.safe_bytes(text))
-                else:
-                    (stdoutdata, stderrdata) = proc.communicate(input=text)
+                (stdoutdata, stderrdata) = proc.communicate(input=gf.safe_bytes(text))
                 self.log(u"Passing text via stdin... done")
             else:
                 self.log(u"Passing text via file...")
@@ -602,12 +1176,13 @@ class BaseTTSWrapper(Loggable):
             proc.stdin.close()
             proc.stderr.close()
 
-            if self.CLI_PARAMETER_WAVE_STDOUT in self.subprocess_arguments:
-                self.log(u"TTS engine wrote audio data to stdout")
-                self.log([u"Writing audio data to file '%s'...", output_file_path])
-                with io.open(output_file_path, "wb") as output_file:
-                    output_file.write(stdoutdata)
-                self.log([u"Writing audio data to file '%s'... done", output_file_path])
+            if wave_stdout:
+                self.log([u"TTS engine wrote %d bytes of audio data to stdout", len(stdoutdata)])
+                if output_file_path is not None:
+                    self.log([u"Writing audio data to file '%s'...", output_file_path])
+                    with io.open(output_file_path, "wb") as output_file:
+                        output_file.write(stdoutdata)
+                    self.log([u"Writing audio data to file '%s'... done", output_file_path])
             else:
                 self.log(u"TTS engine wrote audio data to file")
 
@@ -620,6 +1195,13 @@ class BaseTTSWrapper(Loggable):
             self.log_exc(u"An unexpected error occurred while calling TTS engine via subprocess", exc, False, None)
             return (False, None)
 
+        if wave_stdout:
+            # parse the audio data in memory
+            if len(stdoutdata) == 0:
+                self.log_exc(u"TTS engine wrote no audio data to stdout", None, True, None)
+                return (False, None)
+            return self._read_audio_data_from_wave_data(stdoutdata) if return_audio_data else (True, None)
+
         # check the file can be read
         if not gf.file_can_be_read(output_file_path):
             self.log_exc(u"Output file '%s' cannot be read" % (output_file_path), None, True, None)
@@ -644,10 +1226,10 @@ class BaseTTSWrapper(Loggable):
         """
         try:
             self.log(u"Reading audio data...")
-            # if we know the TTS outputs to PCM16 mono WAVE
-            # with the correct sample rate,
+            # if we know the TTS outputs to PCM16 mono WAVE,
             # we can read samples directly from it,
-            # without an intermediate conversion through ffmpeg
+            # without an intermediate conversion through ffmpeg,
+            # resampling them in memory if needed
             audio_file = AudioFile(
                 file_path=file_path,
                 file_format=self.OUTPUT_AUDIO_FORMAT,
@@ -667,7 +1249,33 @@ class BaseTTSWrapper(Loggable):
             self.log_exc(u"An unexpected error occurred while reading audio data", exc, True, None)
             return (False, None)
 
-    def _synthesize_multiple_generic(self, helper_function, text_file, output_file_path, quit_after=None, backwards=False):
+    def _read_audio_data_from_wave_data(self, data):
+        """
+        Read audio data from the given WAVE data, in memory.
+
+        :rtype: tuple (True, (duration, sample_rate, codec, data)) or (False, None) on exception
+        """
+        try:
+            self.log(u"Reading audio data from WAVE data...")
+            audio_file = AudioFile(
+                file_format=self.OUTPUT_AUDIO_FORMAT,
+                rconf=self.rconf,
+                logger=self.logger
+            )
+            audio_file.read_samples_from_wave_data(data)
+            self.log([u"Duration: %f", audio_file.audio_length])
+            self.log(u"Reading audio data from WAVE data... done")
+            return (True, (
+                audio_file.audio_length,
+                audio_file.audio_sample_rate,
+                audio_file.audio_format,
+                audio_file.audio_samples
+            ))
+        except AudioFileUnsupportedFormatError as exc:
+            self.log_exc(u"An unexpected error occurred while reading audio data", exc, True, None)
+            return (False, None)
+
+    def _synthesize_multiple_generic(self, helper_function, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
         """
         Synthesize multiple fragments, generic function.
 
@@ -676,10 +1284,23 @@ class BaseTTSWrapper(Loggable):
         and returns a tuple
         ``(result, (audio_length, audio_sample_rate, audio_format, audio_samples))``.
 
+        The samples are stored into ``output_audio_file``,
+        if not ``None``, and written to ``output_file_path``,
+        if not ``None``.
+        The samples are assembled into a new audio file,
+        and they are stored into ``output_audio_file``
+        only on success, so that a failed call
+        does not leave partial samples in it
+        (e.g., before falling back to a subprocess call).
+
         :rtype: tuple (result, (anchors, current_time, num_chars))
         """
         self.log(u"Calling TTS engine using multiple generic function...")
 
+        if self.disk_cache is not None:
+            self.log(u"Using the TTS cache directory")
+            helper_function = self._disk_cached_helper(helper_function)
+
         # get sample rate and codec
         self.log(u"Determining codec and sample rate...")
         if (self.OUTPUT_AUDIO_FORMAT is None) or (len(self.OUTPUT_AUDIO_FORMAT) != 3):
@@ -707,24 +1328,72 @@ class BaseTTSWrapper(Loggable):
         output_file.audio_channels = 1
         output_file.audio_sample_rate = sample_rate
 
-        # create output
-        anchors = []
-        current_time = TimeValue("0.000")
-        num_chars = 0
         fragments = text_file.fragments
         if backwards:
             fragments = fragments[::-1]
         loop_function = self._loop_use_cache if self.use_cache else self._loop_no_cache
-        for num, fragment in enumerate(fragments):
-            succeeded, data = loop_function(
-                helper_function=helper_function,
-                num=num,
-                fragment=fragment
-            )
+        loop_function = self._deduplicated_loop(loop_function, fragments)
+        workers = self.rconf[RuntimeConfiguration.TTS_WORKERS]
+        if workers > 1:
+            self.log([u"Synthesizing fragments with %d workers", workers])
+            results = self._loop_parallel(loop_function, helper_function, fragments, workers)
+        else:
+            results = self._loop_sequential(loop_function, helper_function, fragments)
+        try:
+            succeeded, result = self._assemble_fragments(results, fragments, output_file, output_file_path, quit_after, backwards)
+        finally:
+            # NOTE stop the workers, if any, e.g. after reaching quit_after
+            results.close()
+        if (succeeded) and (output_audio_file is not None):
+            self._store_samples(output_file, output_audio_file)
+        output_file.clear_data()
+        return (succeeded, result)
+
+    def _store_samples(self, audio_file, output_audio_file):
+        """
+        Store the format and the samples of ``audio_file``
+        into ``output_audio_file``.
+
+        :param audio_file: the audio file holding the samples
+        :type  audio_file: :class:`~aeneas.audiofile.AudioFile`
+        :param output_audio_file: the audio file where the samples will be stored
+        :type  output_audio_file: :class:`~aeneas.audiofile.AudioFile`
+        """
+        output_audio_file.audio_format = audio_file.audio_format
+        output_audio_file.audio_channels = 1
+        output_audio_file.audio_sample_rate = audio_file.audio_sample_rate
+        if audio_file.audio_length is None:
+            self.log(u"No samples to store")
+            return
+        output_audio_file.add_samples(audio_file.audio_samples_block())
+        output_audio_file.minimize_memory()
+
+    def _assemble_fragments(self, results, fragments, output_file, output_file_path, quit_after=None, backwards=False):
+        """
+        Assemble the audio data of the given fragments,
+        yielded in order by ``results``,
+        into ``output_file``, and write it to ``output_file_path``,
+        if not ``None``.
+
+        :rtype: tuple (result, (anchors, current_time, num_chars))
+        """
+        # NOTE the samples returned by helper_function might have
+        #      a sample rate different from the one determined above
+        #      (e.g., if they are resampled while being read from file),
+        #      hence the output file takes the sample rate
+        #      of the first non-empty fragment
+        resampler = Resampler(rconf=self.rconf, logger=self.logger)
+        sample_rate_set = False
+
+        # create output
+        anchors = []
+        current_time = TimeValue("0.000")
+        num_chars = 0
+        for num, (fragment, (succeeded, data)) in enumerate(zip(fragments, results)):
             if not succeeded:
                 self.log_crit(u"An unexpected error occurred in loop_function")
                 return (False, None)
-            duration, sr_nu, enc_nu, samples = data
+            duration, fragment_sample_rate, enc_nu, samples = data
             # store for later output
             anchors.append([current_time, fragment.identifier, fragment.text])
             # increase the character counter
@@ -734,6 +1403,11 @@ class BaseTTSWrapper(Loggable):
             if duration > 0:
                 self.log([u"Fragment %d duration: %.3f", num, duration])
                 current_time += duration
+                if not sample_rate_set:
+                    output_file.audio_sample_rate = fragment_sample_rate
+                    sample_rate_set = True
+                elif fragment_sample_rate != output_file.audio_sample_rate:
+                    samples = resampler.resample(samples, fragment_sample_rate, output_file.audio_sample_rate)
                 output_file.add_samples(samples, reverse=backwards)
             else:
                 self.log([u"Fragment %d has zero duration", num])
@@ -754,8 +1428,9 @@ class BaseTTSWrapper(Loggable):
             self.log(u"Reversing audio samples... done")
 
         # write output file
-        self.log([u"Writing audio file '%s'", output_file_path])
-        output_file.write(file_path=output_file_path)
+        if output_file_path is not None:
+            self.log([u"Writing audio file '%s'", output_file_path])
+            output_file.write(file_path=output_file_path)
 
         # return output
         if backwards:
@@ -766,6 +1441,171 @@ class BaseTTSWrapper(Loggable):
         self.log(u"Calling TTS engine using multiple generic function... done")
         return (True, (anchors, current_time, num_chars))
 
+    def _deduplicated_loop(self, loop_function, fragments):
+        """
+        Return a function wrapping ``loop_function``,
+        so that the fragments with the same language and text
+        occurring more than once in ``fragments``
+        are synthesized only once,
+        and their audio data is reused for the later occurrences.
+
+        The audio data is kept in memory
+        only until the last occurrence of its fragment,
+        and up to ``tts_dedup_max_size`` MB:
+        beyond that, fragments are synthesized again.
+
+        The returned function can be called from multiple threads:
+        an occurrence being synthesized by another thread
+        is waited for, rather than synthesized again.
+
+        .. versionadded:: 1.8.0
+
+        :param function loop_function: the function synthesizing a fragment
+        :param list fragments: the fragments to be synthesized, in order
+        :rtype: function
+        """
+        max_size = self.rconf[RuntimeConfiguration.TTS_DEDUP_MAX_SIZE] * 1024 * 1024
+        if max_size <= 0:
+            return loop_function
+        remaining = {}
+        for fragment in fragments:
+            fragment_info = (fragment.language, fragment.filtered_text)
+            remaining[fragment_info] = remaining.get(fragment_info, 0) + 1
+        remaining = dict([(k, v) for k, v in remaining.items() if v > 1])
+        if len(remaining) == 0:
+            self.log(u"No repeated fragments")
+            return loop_function
+        self.log([u"Found %d repeated fragments", len(remaining)])
+
+        pending = object()
+        condition = threading.Condition()
+        entries = {}
+        state = {"size": 0}
+
+        def size_of(data):
+            return getattr(data[3], "nbytes", 0)
+
+        def loop(helper_function, num, fragment):
+            fragment_info = (fragment.language, fragment.filtered_text)
+            with condition:
+                if fragment_info not in remaining:
+                    last = True
+                else:
+                    while entries.get(fragment_info) is pending:
+                        condition.wait()
+                    # NOTE count the occurrences served, not the ones arrived,
+                    #      since waiting threads might be woken in any order
+                    remaining[fragment_info] -= 1
+                    last = (remaining[fragment_info] == 0)
+                    data = entries.get(fragment_info)
+                    if data is not None:
+                        if last:
+                            del entries[fragment_info]
+                            state["size"] -= size_of(data)
+                        self.log([u"Fragment %d already synthesized: reusing its audio data", num])
+                        return (True, data)
+                    if not last:
+                        entries[fragment_info] = pending
+            if last:
+                return loop_function(helper_function=helper_function, num=num, fragment=fragment)
+            result = (False, None)
+            try:
+                result = loop_function(helper_function=helper_function, num=num, fragment=fragment)
+            finally:
+                with condition:
+                    succeeded, data = result
+                    if (succeeded) and (state["size"] + size_of(data) <= max_size):
+                        entries[fragment_info] = data
+                        state["size"] += size_of(data)
+                    else:
+                        # NOTE the next occurrence will be synthesized again
+                        del entries[fragment_info]
+                    condition.notify_all()
+            return result
+        return loop
+
+    def _loop_sequential(self, loop_function, helper_function, fragments):
+        """
+        Synthesize the given fragments sequentially,
+        yielding the result of ``loop_function`` for each of them.
+
+        .. versionadded:: 1.8.0
+        """
+        for num, fragment in enumerate(fragments):
+            yield loop_function(
+                helper_function=helper_function,
+                num=num,
+                fragment=fragment
+            )
+
+    def _loop_parallel(self, loop_function, helper_function, fragments, workers):
+        """
+        Synthesize the given fragments with ``workers`` threads,
+        yielding the result of ``loop_function`` for each of them,
+        in the original order.
+
+        Workers synthesize at most ``2 * workers`` fragments
+        ahead of the last fragment yielded,
+        so that little work is wasted
+        if the caller stops consuming the results
+        (e.g., because of ``quit_after``).
+        Closing the generator stops the workers.
+
+        An exception raised while synthesizing a fragment
+        is raised again when its result would be yielded,
+        as in the sequential case.
+
+        .. versionadded:: 1.8.0
+        """
+        window = 2 * workers
+        condition = threading.Condition()
+        results = {}
+        state = {"next": 0, "limit": min(window, len(fragments)), "stop": False}
+
+        def worker():
+            while True:
+                with condition:
+                    while (not state["stop"]) and (state["next"] >= state["limit"]) and (state["next"] < len(fragments)):
+                        condition.wait()
+                    if state["stop"] or (state["next"] >= len(fragments)):
+                        return
+                    num = state["next"]
+                    state["next"] += 1
+                result, error = None, None
+                try:
+                    result = loop_function(
+                        helper_function=helper_function,
+                        num=num,
+                        fragment=fragments[num]
+                    )
+                except Exception as exc:
+                    error = exc
+                with condition:
+                    results[num] = (result, error)
+                    condition.notify_all()
+
+        threads = [threading.Thread(target=worker) for i in range(min(workers, len(fragments)))]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for num in range(len(fragments)):
+                with condition:
+                    while num not in results:
+                        condition.wait()
+                    result, error = results.pop(num)
+                    state["limit"] = min(num + 1 + window, len(fragments))
+                    condition.notify_all()
+                if error is not None:
+                    raise error
+                yield result
+        finally:
+            with condition:
+                state["stop"] = True
+                condition.notify_all()
+            for thread in threads:
+                thread.join()
+
     def _loop_no_cache(self, helper_function, num, fragment):
         """ Synthesize all fragments without using the cache """
         self.log([u"Examining fragment %d (no cache)...", num])
@@ -823,13 +1663,18 @@ class BaseTTSWrapper(Loggable):
                 return (False, None)
             self.log([u"Synthesizing fragment to '%s'... done", file_path])
             duration, sr_nu, enc_nu, samples = data
+            self.log([u"Closing file handler for cached output file path '%s'", file_path])
+            gf.close_file_handler(file_handler)
             if duration > 0:
                 self.log(u"Fragment has > 0 duration, adding it to cache")
-                self.cache.add(fragment_info, file_info)
-                self.log(u"Added fragment to cache")
+                try:
+                    self.cache.add(fragment_info, (None, file_path))
+                    self.log(u"Added fragment to cache")
+                except ValueError:
+                    # NOTE another worker synthesized the same text meanwhile
+                    self.log(u"Fragment already added to cache, removing file")
+                    gf.delete_file(None, file_path)
             else:
                 self.log(u"Fragment has zero duration, not adding it to cache")
-            self.log([u"Closing file handler for cached output file path '%s'", file_path])
-            gf.close_file_handler(file_handler)
         self.log([u"Examining fragment %d (cache)... done", num])
         return (True, data)
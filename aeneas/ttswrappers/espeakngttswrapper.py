@@ -47,15 +47,37 @@ class ESPEAKNGTTSWrapper(BaseTTSWrapper):
     A wrapper for the ``eSpeak-ng`` TTS engine.
 
     This wrapper supports calling the TTS engine
-    via ``subprocess``.
-
-    Future support for calling via Python C extension
-    is planned.
+    via ``subprocess``, or via the Python C extension ``cew``,
+    if it has been built against the eSpeak-ng library,
+    by setting the ``AENEAS_CEW_ESPEAK_NG=True``
+    environment variable when installing aeneas.
+    In the latter case, if ``cew_ssml_marks`` is ``True``,
+    consecutive fragments with the same voice code
+    are synthesized as a single SSML message
+    (see :data:`~aeneas.runtimeconfiguration.RuntimeConfiguration.CEW_SSML_MARKS`).
+    Otherwise, each fragment is synthesized separately,
+    by a separate call to ``espeak-ng``.
 
     In abstract terms, it performs one or more calls like ::
 
         $ espeak-ng -v voice_code -w /tmp/output_file.wav < text
 
+    or, if ``tts_pipe`` is ``True`` (default),
+    reading the audio data from stdout ::
+
+        $ espeak-ng -v voice_code --stdout < text
+
+    If ``tts_rate`` is set, the speaking rate is passed
+    in words per minute (``175`` being the default one) ::
+
+        $ espeak-ng -v voice_code -s 262 --stdout < text
+
+    If ``tts_phoneme_tables_dir`` is set,
+    the phonemes of the text are read
+    without synthesizing it ::
+
+        $ espeak-ng -q -x --sep=_ -v voice_code < text
+
     To use this TTS engine, specify ::
 
         "tts=espeak-ng"
@@ -1008,8 +1030,19 @@ class ESPEAKNGTTSWrapper(BaseTTSWrapper):
 
     OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 22050)
 
+    MIN_RATE = 0.500
+
+    MAX_RATE = 2.500
+
+    WORDS_PER_MINUTE = 175
+    """ Default speaking rate, in words per minute """
+
     HAS_SUBPROCESS_CALL = True
 
+    HAS_C_EXTENSION_CALL = True
+
+    C_EXTENSION_NAME = "cew"
+
     TAG = u"ESPEAKNGTTSWrapper"
 
     def __init__(self, rconf=None, logger=None):
@@ -1018,7 +1051,98 @@ class ESPEAKNGTTSWrapper(BaseTTSWrapper):
             self.tts_path,
             u"-v",
             self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_RATE_FUNCTION,
             u"-w",
             self.CLI_PARAMETER_WAVE_PATH,
             self.CLI_PARAMETER_TEXT_STDIN
         ])
+        self.set_subprocess_pipe_arguments([
+            self.tts_path,
+            u"-v",
+            self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_RATE_FUNCTION,
+            u"--stdout",
+            self.CLI_PARAMETER_WAVE_STDOUT,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+        self.set_subprocess_phoneme_arguments([
+            self.tts_path,
+            u"-q",
+            u"-x",
+            u"--sep=%s" % (self.PHONEME_SEPARATOR),
+            u"-v",
+            self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+
+    def _rate_to_subprocess(self, rate):
+        return [u"-s", u"%d" % int(round(self.WORDS_PER_MINUTE * rate))]
+
+    def _synthesize_multiple_c_extension(self, text_file, output_file_path, quit_after=None, backwards=False):
+        """
+        Synthesize multiple text fragments, using the cew extension,
+        if it is linked against the eSpeak-ng library.
+
+        Unlike :class:`~aeneas.ttswrappers.espeakttswrapper.ESPEAKTTSWrapper`,
+        ``aeneas.cew`` is always called directly,
+        even if ``cew_subprocess_enabled`` is ``True``.
+
+        Return a tuple (anchors, total_time, num_chars).
+
+        :rtype: (bool, (list, :class:`~aeneas.exacttiming.TimeValue`, int))
+        """
+        self.log(u"Synthesizing using C extension...")
+        engine = gf.cew_engine()
+        if engine != u"espeak-ng":
+            self.log([u"aeneas.cew is linked against '%s', not calling it", engine])
+            return (False, None)
+
+        # convert parameters from Python values to C values
+        c_quit_after, c_backwards = self._c_parameters(quit_after, backwards)
+        self.log([u"output_file_path: %s", output_file_path])
+        u_text = self._u_text(text_file)
+        if gf.PY2:
+            # Python 2 => pass byte strings
+            c_text = [(gf.safe_bytes(t[0]), gf.safe_bytes(t[1])) for t in u_text]
+        else:
+            # Python 3 => pass Unicode strings
+            c_text = [(gf.safe_unicode(t[0]), gf.safe_unicode(t[1])) for t in u_text]
+
+        # call C extension
+        sr = None
+        sf = None
+        intervals = None
+        try:
+            self.log(u"Importing aeneas.cew...")
+            import aeneas.cew.cew
+            self.log(u"Importing aeneas.cew... done")
+            if self.rconf[RuntimeConfiguration.CEW_SSML_MARKS]:
+                self.log(u"Calling aeneas.cew with SSML marks...")
+                try:
+                    sr, sf, intervals = aeneas.cew.cew.synthesize_multiple_marks(
+                        output_file_path,
+                        c_quit_after,
+                        c_backwards,
+                        c_text
+                    )
+                    self.log(u"Calling aeneas.cew with SSML marks... done")
+                except Exception as exc:
+                    self.log_exc(u"Unable to synthesize with SSML marks, synthesizing fragments separately", exc, False, None)
+            if sr is None:
+                self.log(u"Calling aeneas.cew...")
+                sr, sf, intervals = aeneas.cew.cew.synthesize_multiple(
+                    output_file_path,
+                    c_quit_after,
+                    c_backwards,
+                    c_text
+                )
+                self.log(u"Calling aeneas.cew... done")
+        except Exception as exc:
+            self.log_exc(u"An unexpected error occurred while running cew", exc, False, None)
+            return (False, None)
+
+        self.log([u"sr: %d", sr])
+        self.log([u"sf: %d", sf])
+        result = self._anchors(text_file, sf, intervals, backwards)
+        self.log(u"Synthesizing using C extension... done")
+        return (True, result)
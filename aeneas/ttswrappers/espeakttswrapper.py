@@ -35,7 +35,6 @@ for further details.
 from __future__ import absolute_import
 from __future__ import print_function
 
-from aeneas.exacttiming import TimeValue
 from aeneas.language import Language
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
@@ -55,6 +54,22 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
 
         $ espeak -v voice_code -w /tmp/output_file.wav < text
 
+    or, if ``tts_pipe`` is ``True`` (default),
+    reading the audio data from stdout ::
+
+        $ espeak -v voice_code --stdout < text
+
+    If ``tts_rate`` is set, the speaking rate is passed
+    in words per minute (``175`` being the default one) ::
+
+        $ espeak -v voice_code -s 262 --stdout < text
+
+    If ``tts_phoneme_tables_dir`` is set,
+    the phonemes of the text are read
+    without synthesizing it ::
+
+        $ espeak -q -x --sep=_ -v voice_code < text
+
     To use this TTS engine, specify ::
 
         "tts=espeak"
@@ -72,6 +87,10 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
         "cew_subprocess_enabled=True|cew_subprocess_path=/path/to/python"
 
     in the ``rconf`` object.
+    To serve the calls by a pool of long-lived processes,
+    instead of starting a new one for each call, add ::
+
+        "cew_subprocess_workers=2|cew_subprocess_worker_max_requests=100"
 
     See :class:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper`
     for the available functions.
@@ -781,6 +800,13 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
 
     OUTPUT_AUDIO_FORMAT = ("pcm_s16le", 1, 22050)
 
+    MIN_RATE = 0.500
+
+    MAX_RATE = 2.500
+
+    WORDS_PER_MINUTE = 175
+    """ Default speaking rate, in words per minute """
+
     HAS_SUBPROCESS_CALL = True
 
     HAS_C_EXTENSION_CALL = True
@@ -795,10 +821,32 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
             self.tts_path,
             u"-v",
             self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_RATE_FUNCTION,
             u"-w",
             self.CLI_PARAMETER_WAVE_PATH,
             self.CLI_PARAMETER_TEXT_STDIN
         ])
+        self.set_subprocess_pipe_arguments([
+            self.tts_path,
+            u"-v",
+            self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_RATE_FUNCTION,
+            u"--stdout",
+            self.CLI_PARAMETER_WAVE_STDOUT,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+        self.set_subprocess_phoneme_arguments([
+            self.tts_path,
+            u"-q",
+            u"-x",
+            u"--sep=%s" % (self.PHONEME_SEPARATOR),
+            u"-v",
+            self.CLI_PARAMETER_VOICE_CODE_STRING,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
+
+    def _rate_to_subprocess(self, rate):
+        return [u"-s", u"%d" % int(round(self.WORDS_PER_MINUTE * rate))]
 
     def _synthesize_multiple_c_extension(self, text_file, output_file_path, quit_after=None, backwards=False):
         """
@@ -809,31 +857,13 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
         :rtype: (bool, (list, :class:`~aeneas.exacttiming.TimeValue`, int))
         """
         self.log(u"Synthesizing using C extension...")
+        if not self._cew_is_espeak():
+            return (False, None)
 
         # convert parameters from Python values to C values
-        try:
-            c_quit_after = float(quit_after)
-        except TypeError:
-            c_quit_after = 0.0
-        c_backwards = 0
-        if backwards:
-            c_backwards = 1
+        c_quit_after, c_backwards = self._c_parameters(quit_after, backwards)
         self.log([u"output_file_path: %s", output_file_path])
-        self.log([u"c_quit_after:     %.3f", c_quit_after])
-        self.log([u"c_backwards:      %d", c_backwards])
-        self.log(u"Preparing u_text...")
-        u_text = []
-        fragments = text_file.fragments
-        for fragment in fragments:
-            f_lang = fragment.language
-            f_text = fragment.filtered_text
-            if f_lang is None:
-                f_lang = self.DEFAULT_LANGUAGE
-            f_voice_code = self._language_to_voice_code(f_lang)
-            if f_text is None:
-                f_text = u""
-            u_text.append((f_voice_code, f_text))
-        self.log(u"Preparing u_text... done")
+        u_text = self._u_text(text_file)
 
         # call C extension
         sr = None
@@ -869,45 +899,81 @@ class ESPEAKTTSWrapper(BaseTTSWrapper):
                 self.log(u"Importing aeneas.cew...")
                 import aeneas.cew.cew
                 self.log(u"Importing aeneas.cew... done")
-                self.log(u"Calling aeneas.cew...")
-                sr, sf, intervals = aeneas.cew.cew.synthesize_multiple(
-                    output_file_path,
-                    c_quit_after,
-                    c_backwards,
-                    c_text
-                )
-                self.log(u"Calling aeneas.cew... done")
+                if self.rconf[RuntimeConfiguration.CEW_SSML_MARKS]:
+                    self.log(u"Calling aeneas.cew with SSML marks...")
+                    try:
+                        sr, sf, intervals = aeneas.cew.cew.synthesize_multiple_marks(
+                            output_file_path,
+                            c_quit_after,
+                            c_backwards,
+                            c_text
+                        )
+                        self.log(u"Calling aeneas.cew with SSML marks... done")
+                    except Exception as exc:
+                        # NOTE an older aeneas.cew, or an eSpeak library not reporting mark events
+                        self.log_exc(u"Unable to synthesize with SSML marks, synthesizing fragments separately", exc, False, None)
+                if sr is None:
+                    self.log(u"Calling aeneas.cew...")
+                    sr, sf, intervals = aeneas.cew.cew.synthesize_multiple(
+                        output_file_path,
+                        c_quit_after,
+                        c_backwards,
+                        c_text
+                    )
+                    self.log(u"Calling aeneas.cew... done")
             except Exception as exc:
                 self.log_exc(u"An unexpected error occurred while running cew", exc, False, None)
                 return (False, None)
 
         self.log([u"sr: %d", sr])
         self.log([u"sf: %d", sf])
-
-        # create output
-        anchors = []
-        current_time = TimeValue("0.000")
-        num_chars = 0
-        if backwards:
-            fragments = fragments[::-1]
-        for i in range(sf):
-            # get the correct fragment
-            fragment = fragments[i]
-            # store for later output
-            anchors.append([
-                TimeValue(intervals[i][0]),
-                fragment.identifier,
-                fragment.filtered_text
-            ])
-            # increase the character counter
-            num_chars += fragment.characters
-            # update current_time
-            current_time = TimeValue(intervals[i][1])
-
-        # return output
-        # NOTE anchors do not make sense if backwards == True
-        self.log([u"Returning %d time anchors", len(anchors)])
-        self.log([u"Current time %.3f", current_time])
-        self.log([u"Synthesized %d characters", num_chars])
+        result = self._anchors(text_file, sf, intervals, backwards)
         self.log(u"Synthesizing using C extension... done")
-        return (True, (anchors, current_time, num_chars))
+        return (True, result)
+
+    def _synthesize_multiple_c_extension_data(self, text_file, quit_after=None, backwards=False):
+        """
+        Synthesize multiple text fragments,
+        using a worker of :class:`~aeneas.cewsubprocess.CEWSubprocess`,
+        which sends the audio data back instead of writing a file.
+
+        Return ``(False, None)`` if ``cew_subprocess_enabled`` is ``False``,
+        since ``aeneas.cew`` called directly always writes a file.
+
+        :rtype: (bool, ((list, :class:`~aeneas.exacttiming.TimeValue`, int), int, bytes))
+        """
+        if not self.rconf[RuntimeConfiguration.CEW_SUBPROCESS_ENABLED]:
+            return (False, None)
+        if not self._cew_is_espeak():
+            return (False, None)
+        self.log(u"Synthesizing using cewsubprocess, in memory...")
+        c_quit_after, c_backwards = self._c_parameters(quit_after, backwards)
+        u_text = self._u_text(text_file)
+        try:
+            self.log(u"Importing aeneas.cewsubprocess...")
+            from aeneas.cewsubprocess import CEWSubprocess
+            self.log(u"Importing aeneas.cewsubprocess... done")
+            cewsub = CEWSubprocess(rconf=self.rconf, logger=self.logger)
+            sr, sf, intervals, data = cewsub.synthesize_multiple_data(c_quit_after, c_backwards, u_text)
+        except Exception as exc:
+            self.log_exc(u"An unexpected error occurred while running cewsubprocess", exc, False, None)
+            return (False, None)
+        self.log([u"sr: %d", sr])
+        self.log([u"sf: %d", sf])
+        result = self._anchors(text_file, sf, intervals, backwards)
+        self.log(u"Synthesizing using cewsubprocess, in memory... done")
+        return (True, (result, sr, data))
+
+    def _cew_is_espeak(self):
+        """
+        Return ``True`` if ``aeneas.cew`` is linked against
+        the eSpeak library, not the eSpeak-ng one
+        (which :class:`~aeneas.ttswrappers.espeakngttswrapper.ESPEAKNGTTSWrapper` uses).
+
+        :rtype: bool
+        """
+        engine = gf.cew_engine()
+        if engine != u"espeak":
+            self.log_warn([u"aeneas.cew is linked against '%s', not calling it", engine])
+            return False
+        return True
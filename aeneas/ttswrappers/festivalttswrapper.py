@@ -34,8 +34,10 @@ for further details.
 
 from __future__ import absolute_import
 from __future__ import print_function
+import io
 
 from aeneas.exacttiming import TimeValue
+from aeneas.festivalserver import FestivalServerPool
 from aeneas.language import Language
 from aeneas.runtimeconfiguration import RuntimeConfiguration
 from aeneas.ttswrappers.basettswrapper import BaseTTSWrapper
@@ -47,7 +49,11 @@ class FESTIVALTTSWrapper(BaseTTSWrapper):
     A wrapper for the ``Festival`` TTS engine.
 
     This wrapper supports calling the TTS engine
-    via ``subprocess`` or via Python C++ extension.
+    via ``subprocess`` or via Python C++ extension,
+    or sending requests to ``Festival`` servers
+    (see :class:`~aeneas.festivalserver.FestivalServerPool`),
+    if ``festival_server_workers`` is greater than ``0``
+    or ``festival_server_port`` is not ``None``.
 
     .. warning::
         The C++ extension call is experimental and
@@ -57,6 +63,16 @@ class FESTIVALTTSWrapper(BaseTTSWrapper):
 
         $ echo text | text2wave -eval "(language_italian)" -o output_file.wav
 
+    or, if ``tts_pipe`` is ``True`` (default),
+    reading the audio data from stdout ::
+
+        $ echo text | text2wave -eval "(language_italian)"
+
+    If ``tts_rate`` is set, the speaking rate is set
+    by stretching the duration of the phones ::
+
+        $ echo text | text2wave -eval "(language_italian)" -eval "(Parameter.set 'Duration_Stretch 0.667)"
+
     To use this TTS engine, specify ::
 
         "tts=festival"
@@ -156,6 +172,8 @@ class FESTIVALTTSWrapper(BaseTTSWrapper):
 
     HAS_C_EXTENSION_CALL = True
 
+    HAS_PYTHON_CALL = True
+
     C_EXTENSION_NAME = "cfw"
 
     TAG = u"FESTIVALTTSWrapper"
@@ -165,14 +183,100 @@ class FESTIVALTTSWrapper(BaseTTSWrapper):
         self.set_subprocess_arguments([
             self.tts_path,
             self.CLI_PARAMETER_VOICE_CODE_FUNCTION,
+            self.CLI_PARAMETER_RATE_FUNCTION,
             u"-o",
             self.CLI_PARAMETER_WAVE_PATH,
             self.CLI_PARAMETER_TEXT_STDIN
         ])
+        # NOTE text2wave writes to stdout if -o is not given
+        self.set_subprocess_pipe_arguments([
+            self.tts_path,
+            self.CLI_PARAMETER_VOICE_CODE_FUNCTION,
+            self.CLI_PARAMETER_RATE_FUNCTION,
+            self.CLI_PARAMETER_WAVE_STDOUT,
+            self.CLI_PARAMETER_TEXT_STDIN
+        ])
 
     def _voice_code_to_subprocess(self, voice_code):
         return [u"-eval", self.VOICE_CODE_TO_SUBPROCESS[voice_code]]
 
+    def _rate_to_subprocess(self, rate):
+        return [u"-eval", self._rate_function(rate)]
+
+    def _rate_function(self, rate):
+        """
+        Return the Scheme expression setting the given speaking rate.
+
+        :param float rate: the speaking rate
+        :rtype: string
+        """
+        return u"(Parameter.set 'Duration_Stretch %.3f)" % (1.0 / rate)
+
+    def _uses_server(self):
+        """
+        Return ``True`` if the text should be synthesized
+        by ``Festival`` servers.
+
+        :rtype: bool
+        """
+        return (self.rconf[RuntimeConfiguration.FESTIVAL_SERVER_WORKERS] > 0) or (self.rconf[RuntimeConfiguration.FESTIVAL_SERVER_PORT] is not None)
+
+    def _synthesize_multiple_python(self, text_file, output_file_path, quit_after=None, backwards=False, output_audio_file=None):
+        """
+        Synthesize multiple fragments using ``Festival`` servers,
+        if configured.
+
+        If no server is configured, return ``(False, None)``,
+        so that the C extension or subprocess is called instead.
+
+        :rtype: tuple (result, (anchors, current_time, num_chars))
+        """
+        if not self._uses_server():
+            self.log(u"No Festival server configured")
+            return (False, None)
+        return super(FESTIVALTTSWrapper, self)._synthesize_multiple_python(
+            text_file,
+            output_file_path,
+            quit_after,
+            backwards,
+            output_audio_file
+        )
+
+    def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
+        """
+        Synthesize a single text fragment
+        using a server of the shared ``Festival`` server pool.
+
+        :rtype: tuple (result, (duration, sample_rate, codec, data)) or (result, None)
+        """
+        if len(text) == 0:
+            self.log(u"len(text) is zero: returning 0.000")
+            return (True, (TimeValue("0.000"), None, None, None))
+        port = self.rconf[RuntimeConfiguration.FESTIVAL_SERVER_PORT]
+        pool = FestivalServerPool.get(
+            self.rconf[RuntimeConfiguration.FESTIVAL_SERVER_PATH] if port is None else None,
+            port,
+            max(1, self.rconf[RuntimeConfiguration.FESTIVAL_SERVER_WORKERS])
+        )
+        # NOTE the servers keep the parameters set by previous requests,
+        #      hence the speaking rate is always set
+        voice_function = u"(begin %s %s)" % (
+            self.VOICE_CODE_TO_SUBPROCESS[voice_code],
+            self._rate_function(self.rate or 1.0)
+        )
+        try:
+            data = pool.synthesize(voice_function, text)
+        except Exception as exc:
+            self.log_exc(u"An unexpected error occurred while calling the Festival server", exc, False, None)
+            return (False, None)
+        self.log([u"Festival server sent %d bytes of audio data", len(data)])
+        if output_file_path is not None:
+            self.log([u"Writing audio data to file '%s'...", output_file_path])
+            with io.open(output_file_path, "wb") as output_file:
+                output_file.write(data)
+            self.log([u"Writing audio data to file '%s'... done", output_file_path])
+        return self._read_audio_data_from_wave_data(data) if return_audio_data else (True, None)
+
     def _synthesize_multiple_c_extension(self, text_file, output_file_path, quit_after=None, backwards=False):
         """
         Synthesize multiple text fragments, using the cfw extension.
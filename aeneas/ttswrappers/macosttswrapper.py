@@ -53,6 +53,11 @@ class MacOSTTSWrapper(BaseTTSWrapper):
 
         $ say -v voice_name -o /tmp/output_file.wav --data-format LEF32@22050 < text
 
+    If ``tts_rate`` is set, the speaking rate is passed
+    in words per minute (``175`` being assumed as the default one) ::
+
+        $ say -v voice_name -r 262 -o /tmp/output_file.wav --data-format LEF32@22050 < text
+
     To use this TTS engine, specify ::
 
         "tts=macos"
@@ -222,6 +227,9 @@ class MacOSTTSWrapper(BaseTTSWrapper):
 
     HAS_SUBPROCESS_CALL = True
 
+    WORDS_PER_MINUTE = 175
+    """ Default speaking rate, in words per minute """
+
     TAG = u"MacOSTTSWrapper"
 
     def __init__(self, rconf=None, logger=None):
@@ -231,9 +239,13 @@ class MacOSTTSWrapper(BaseTTSWrapper):
             u"say",                                 # path to say
             u"-v",                                  # append "-v"
             self.CLI_PARAMETER_VOICE_CODE_STRING,   # it will be replaced by the actual voice code
+            self.CLI_PARAMETER_RATE_FUNCTION,       # it will be replaced by the speaking rate, if set
             u"-o",                                  # append "-o"
             self.CLI_PARAMETER_WAVE_PATH,           # it will be replaced by the actual output file
             self.CLI_PARAMETER_TEXT_STDIN,          # text is read from stdin,
             u"--data-format",                       # set output data format
             u"LEF32@22050"                          # data format string
         ])
+
+    def _rate_to_subprocess(self, rate):
+        return [u"-r", u"%d" % int(round(self.WORDS_PER_MINUTE * rate))]
@@ -44,7 +44,7 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 import numpy
-import time
+import threading
 import uuid
 
 from aeneas.audiofile import AudioFile
@@ -78,6 +78,11 @@ class NuanceTTSWrapper(BaseTTSWrapper):
 
         "tts=nuance|tts_cache=True"
 
+    If ``tts_rate`` is set, the text is sent as an SSML document,
+    setting the speaking rate with a ``prosody`` element ::
+
+        "tts=nuance|tts_rate=1.500"
+
     See :class:`~aeneas.ttswrappers.basettswrapper.BaseTTSWrapper`
     for the available functions.
     Below are listed the languages supported by this wrapper.
@@ -350,11 +355,40 @@ class NuanceTTSWrapper(BaseTTSWrapper):
 
     def __init__(self, rconf=None, logger=None):
         super(NuanceTTSWrapper, self).__init__(rconf=rconf, logger=logger)
+        self.sessions = threading.local()
+
+    def _get_session(self):
+        """
+        Return the HTTP session of the current thread,
+        creating it the first time,
+        so that connections are reused across the requests
+        made by the same thread.
+
+        Since ``requests.Session`` is not thread-safe,
+        each thread synthesizing fragments
+        (see ``tts_workers``) uses its own session.
+
+        :rtype: ``requests.Session``
+        """
+        session = getattr(self.sessions, "session", None)
+        if session is None:
+            self.log(u"Importing requests...")
+            import requests
+            self.log(u"Importing requests... done")
+            session = requests.Session()
+            self.sessions.session = session
+        return session
+
+    def _disk_cache_parameters(self, text, voice_code):
+        parameters = super(NuanceTTSWrapper, self)._disk_cache_parameters(text, voice_code)
+        # NOTE add the API URL only if not the default one,
+        #      so that existing cache entries remain valid
+        if self.rconf[RuntimeConfiguration.NUANCE_TTS_API_URL] is not None:
+            parameters.append(u"url=%s" % (self.rconf[RuntimeConfiguration.NUANCE_TTS_API_URL]))
+        return parameters
 
     def _synthesize_single_python_helper(self, text, voice_code, output_file_path=None, return_audio_data=True):
-        self.log(u"Importing requests...")
-        import requests
-        self.log(u"Importing requests... done")
+        session = self._get_session()
 
         # prepare request header and contents
         request_id = str(uuid.uuid4()).replace("-", "")[0:16]
@@ -362,9 +396,13 @@ class NuanceTTSWrapper(BaseTTSWrapper):
             u"Content-Type": u"text/plain; charset=utf-8",
             u"Accept": u"audio/x-wav;codec=pcm;bit=16;rate=%d" % self.SAMPLE_RATE
         }
+        if self.rate is not None:
+            # set the speaking rate via SSML
+            headers[u"Content-Type"] = u"application/ssml+xml; charset=utf-8"
+            text = self._rate_to_ssml(text, self.rate)
         text_to_synth = text.encode("utf-8")
         url = "%s/%s?appId=%s&appKey=%s&id=%s&voice=%s" % (
-            self.URL,
+            self.rconf[RuntimeConfiguration.NUANCE_TTS_API_URL] or self.URL,
             self.END_POINT,
             self.rconf[RuntimeConfiguration.NUANCE_TTS_API_ID],
             self.rconf[RuntimeConfiguration.NUANCE_TTS_API_KEY],
@@ -373,31 +411,14 @@ class NuanceTTSWrapper(BaseTTSWrapper):
         )
 
         # post request
-        sleep_delay = self.rconf[RuntimeConfiguration.TTS_API_SLEEP]
-        attempts = self.rconf[RuntimeConfiguration.TTS_API_RETRY_ATTEMPTS]
-        self.log([u"Sleep delay:    %.3f", sleep_delay])
-        self.log([u"Retry attempts: %d", attempts])
-        while attempts > 0:
-            self.log(u"Sleeping to throttle API usage...")
-            time.sleep(sleep_delay)
-            self.log(u"Sleeping to throttle API usage... done")
-            self.log(u"Posting...")
-            try:
-                response = requests.post(url, data=text_to_synth, headers=headers)
-            except Exception as exc:
-                self.log_exc(u"Unexpected exception on HTTP POST. Are you offline?", exc, True, ValueError)
-            self.log(u"Posting... done")
-            status_code = response.status_code
-            self.log([u"Status code: %d", status_code])
-            if status_code == 200:
-                self.log(u"Got status code 200, break")
-                break
-            else:
-                self.log_warn(u"Got status code other than 200, retry")
-                attempts -= 1
-
-        if attempts <= 0:
-            self.log_exc(u"All API requests returned status code != 200", None, True, ValueError)
+        def request():
+            response = session.post(url, data=text_to_synth, headers=headers)
+            return (
+                response.status_code,
+                response.content,
+                gf.safe_float(response.headers.get("Retry-After"), None)
+            )
+        response_content = self._api_request(request)
 
         # save to file if requested
         if output_file_path is None:
@@ -409,19 +430,19 @@ class NuanceTTSWrapper(BaseTTSWrapper):
             output_file.setframerate(self.SAMPLE_RATE)  # sample rate
             output_file.setnchannels(1)                 # 1 channel, i.e. mono
             output_file.setsampwidth(2)                 # 16 bit/sample, i.e. 2 bytes/sample
-            output_file.writeframes(response.content)
+            output_file.writeframes(response_content)
             output_file.close()
             self.log(u"output_file_path is not None => saving to file... done")
 
         # get length and data
         audio_sample_rate = self.SAMPLE_RATE
-        number_of_frames = len(response.content) / 2
+        number_of_frames = len(response_content) / 2
         audio_length = TimeValue(number_of_frames / audio_sample_rate)
-        self.log([u"Response (bytes): %d", len(response.content)])
+        self.log([u"Response (bytes): %d", len(response_content)])
         self.log([u"Number of frames: %d", number_of_frames])
         self.log([u"Audio length (s): %.3f", audio_length])
         audio_format = "pcm16"
-        audio_samples = numpy.fromstring(response.content, dtype=numpy.int16).astype("float64") / 32768
+        audio_samples = numpy.frombuffer(response_content, dtype=numpy.int16).astype("float64") / 32768
 
         # return data
         return (True, (audio_length, audio_sample_rate, audio_format, audio_samples))
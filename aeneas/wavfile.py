@@ -75,7 +75,12 @@ def _read_data_chunk(fid, comp, noc, bits, mmap=False):
         else:
             dtype += 'f%d' % bytes
     if not mmap:
-        data = numpy.fromstring(fid.read(size), dtype=dtype)
+        # read directly into a (writable) array if fid is a real file,
+        # otherwise wrap the bytes read (numpy.fromstring is deprecated)
+        try:
+            data = numpy.fromfile(fid, dtype=dtype, count=size // bytes)
+        except (AttributeError, IOError, OSError, ValueError):
+            data = numpy.frombuffer(fid.read(size), dtype=dtype).copy()
     else:
         start = fid.tell()
         data = numpy.memmap(fid, dtype=dtype, mode='c', offset=start,
@@ -174,7 +174,9 @@ TRUE_VALUES = [
 WITHOUT_CDTW = os.getenv("AENEAS_WITH_CDTW", "True") not in TRUE_VALUES
 WITHOUT_CMFCC = os.getenv("AENEAS_WITH_CMFCC", "True") not in TRUE_VALUES
 WITHOUT_CEW = os.getenv("AENEAS_WITH_CEW", "True") not in TRUE_VALUES
+WITHOUT_CWAVE = os.getenv("AENEAS_WITH_CWAVE", "True") not in TRUE_VALUES
 FORCE_CEW = os.getenv("AENEAS_FORCE_CEW", "False") in TRUE_VALUES
+CEW_ESPEAK_NG = os.getenv("AENEAS_CEW_ESPEAK_NG", "False") in TRUE_VALUES
 FORCE_CFW = os.getenv("AENEAS_FORCE_CFW", "False") in TRUE_VALUES
 
 
@@ -194,7 +196,7 @@ except ImportError:
     print("[INFO] $ sudo pip install numpy")
     sys.exit(1)
 
-# to compile cdtw and cmfcc, we need to include the NumPy dirs
+# to compile cdtw, cmfcc, and cwave, we need to include the NumPy dirs
 INCLUDE_DIRS = [misc_util.get_numpy_include_dirs()]
 
 # scripts to be installed globally
@@ -237,6 +239,21 @@ EXTENSION_CEW = Extension(
         "espeak"
     ]
 )
+if CEW_ESPEAK_NG:
+    # NOTE libespeak-ng provides the same API as libespeak
+    EXTENSION_CEW = Extension(
+        name="aeneas.cew.cew",
+        sources=[
+            "aeneas/cew/cew_py.c",
+            "aeneas/cew/cew_func.c"
+        ],
+        libraries=[
+            "espeak-ng"
+        ],
+        define_macros=[
+            ("CEW_ENGINE", "\"espeak-ng\"")
+        ]
+    )
 EXTENSION_CFW = Extension(
     name="aeneas.cfw.cfw",
     sources=[
@@ -254,17 +271,17 @@ EXTENSION_CFW = Extension(
         "eststring",
     ]
 )
-# cwave is ready, but currently not used
-# EXTENSION_CWAVE = Extension(
-#     name="aeneas.cwave.cwave",
-#     sources=[
-#         "aeneas/cwave/cwave_py.c",
-#         "aeneas/cwave/cwave_func.c"
-#     ],
-#     include_dirs=[
-#         get_include()
-#     ]
-# )
+EXTENSION_CWAVE = Extension(
+    name="aeneas.cwave.cwave",
+    sources=[
+        "aeneas/cwave/cwave_py.c",
+        "aeneas/cwave/cwave_func.c",
+        "aeneas/cint/cint.c"
+    ],
+    include_dirs=[
+        get_include()
+    ]
+)
 
 # append or ignore cew extension as requested
 EXTENSIONS = []
@@ -285,6 +302,20 @@ if WITHOUT_CMFCC:
 else:
     EXTENSIONS.append(EXTENSION_CMFCC)
 
+if WITHOUT_CWAVE:
+    print("[INFO] **************************************************************")
+    print("[INFO] The user specified AENEAS_WITH_CWAVE=False: not building cwave")
+    print("[INFO] **************************************************************")
+    print("[INFO] ")
+else:
+    EXTENSIONS.append(EXTENSION_CWAVE)
+
+if (not WITHOUT_CEW) and CEW_ESPEAK_NG:
+    print("[INFO] ******************************************************************************")
+    print("[INFO] The user specified AENEAS_CEW_ESPEAK_NG=True: building cew against libespeak-ng")
+    print("[INFO] ******************************************************************************")
+    print("[INFO] ")
+
 if WITHOUT_CEW:
     print("[INFO] **********************************************************")
     print("[INFO] The user specified AENEAS_WITH_CEW=False: not building cew")